@@ -1,8 +1,17 @@
+import os
+import sys
 import tkinter as tk
 from tkinter import ttk, messagebox
 
-#keep using existing root-level database.py for now
+# database.py lives in schedule_manager_app/ (shared with the Qt app)
+APP_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "schedule_manager_app")
+if APP_DIR not in sys.path:
+    sys.path.insert(0, APP_DIR)
+
 import database
+from clock import tk_clock
+from reminders import tk_reminders
+from undo import UndoJournal
 
 # styles 
 try:
@@ -55,6 +64,10 @@ class App(tk.Tk):
         except Exception as e:
             messagebox.showerror("Database Error", f"Failed to initialize the database:\n{e}")
 
+        # bursts of edits share one transaction; flushed on logout and close
+        database.enable_write_buffer()
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
+
         container = ttk.Frame(self)
         container.pack(fill="both", expand=True)
         container.rowconfigure(0, weight=1)
@@ -62,6 +75,14 @@ class App(tk.Tk):
 
         self.current_user = None
         self.frames = {}
+        self._current_frame = None
+
+        # shared minute tick for time-sensitive pages (only runs while one is visible)
+        self.clock = tk_clock(self)
+        # the logged-in user's event reminders (see set_user)
+        self.reminders = None
+        # the logged-in user's undo/redo journal; every event edit of the pages goes through it
+        self.undo = None
 
         # Register each page class here
         for Page in (LoginPage, RegisterPage, HomePage, TodayPage, CalendarPage):
@@ -78,6 +99,13 @@ class App(tk.Tk):
     def show_frame(self, name: str) -> None:
         """Raise the page with the given class name"""
         frame = self.frames[name]
+        previous = self._current_frame
+        if previous is not None and previous is not frame and hasattr(previous, "on_hide"):
+            try:
+                previous.on_hide()
+            except Exception:
+                pass
+        self._current_frame = frame
         frame.tkraise()
         if hasattr(frame, "on_show"):
             try:
@@ -87,4 +115,43 @@ class App(tk.Tk):
 
     def set_user(self, username: str | None) -> None:
         """Set/clear the logged-in user for session state"""
+        if self.current_user is not None and username != self.current_user:
+            self._flush_writes()
+        if self.reminders is not None and username != self.current_user:
+            self.reminders.stop()
+            self.reminders = None
+        if username != self.current_user:
+            self.undo = None if username is None else UndoJournal(username)
+        if username is not None:
+            database.user_id(username)  # cache the id every event call maps the name to
+            if self.reminders is None:
+                self.reminders = tk_reminders(self, self._show_reminder, username)
+                self.reminders.start()
         self.current_user = username
+
+    def _show_reminder(self, reminder, event) -> None:
+        """A small always-on-top window for one due reminder; it does not block the app."""
+        popup = tk.Toplevel(self)
+        popup.title("Reminder")
+        popup.attributes("-topmost", True)
+        popup.resizable(False, False)
+        ttk.Label(popup, text=event.title, font=("Segoe UI", 11, "bold")).pack(padx=16, pady=(12, 4))
+        ttk.Label(popup, text=f"{event.date}  {event.start} - {event.end}").pack(padx=16)
+        ttk.Button(popup, text="Dismiss", command=popup.destroy).pack(pady=12)
+        self.bell()
+
+    def on_close(self) -> None:
+        """Commit any buffered writes, then quit"""
+        if self.reminders is not None:
+            self.reminders.stop()
+        try:
+            database.disable_write_buffer()
+        except Exception as e:
+            messagebox.showerror("Database Error", f"Some changes could not be saved:\n{e}")
+        self.destroy()
+
+    def _flush_writes(self) -> None:
+        try:
+            database.flush_writes()
+        except Exception as e:
+            messagebox.showerror("Database Error", f"Some changes could not be saved:\n{e}")
@@ -0,0 +1,136 @@
+"""
+Columnar analytics over a user's whole event history.
+
+load_columns() reads every event of a user once into contiguous int32 columns
+(day number, start minute, duration, interned title id). The aggregations run
+vectorized with NumPy when it is installed and fall back to plain loops over
+the arrays otherwise, so NumPy stays an optional dependency.
+
+    cols = analytics.load_columns("alice")
+    analytics.hours_per_weekday(cols)   # [Mon, ..., Sun] hours
+    analytics.busiest_hour(cols)        # 0..23
+    analytics.minutes_per_month(cols)   # {"2025-01": 1260, ...}
+"""
+from array import array
+from datetime import date
+
+try:
+    import numpy as np
+except ImportError:  # optional: pure-Python fallback below
+    np = None
+
+import database
+
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+MINUTES_PER_DAY = 24 * 60
+
+
+class EventColumns:
+    """Parallel int32 columns, one entry per event."""
+
+    __slots__ = ("day", "start", "duration", "title_id", "titles")
+
+    def __init__(self):
+        self.day = array("i")       # days since 1970-01-01
+        self.start = array("i")     # minute of the day, 0..1439
+        self.duration = array("i")  # minutes, at least 1
+        self.title_id = array("i")  # index into titles
+        self.titles: list[str] = []
+
+    def __len__(self):
+        return len(self.day)
+
+    def append(self, day: int, start: int, duration: int, title: str, _index: dict) -> None:
+        """Add one event; _index is the title -> id dict used for interning."""
+        tid = _index.get(title)
+        if tid is None:
+            tid = _index[title] = len(self.titles)
+            self.titles.append(title)
+        self.day.append(day)
+        self.start.append(start)
+        self.duration.append(duration)
+        self.title_id.append(tid)
+
+    def as_numpy(self):
+        """Zero-copy NumPy views of (day, start, duration, title_id)."""
+        return tuple(np.frombuffer(col, dtype=np.int32) for col in (self.day, self.start, self.duration, self.title_id))
+
+
+# ---- Loading ---------------------------------------------------------------
+def load_columns(username: str, snapshot_mode: str = "wal") -> EventColumns:
+    """Read all of a user's events into an EventColumns (from a snapshot, so writes are never held up)."""
+    cols = EventColumns()
+    titles: dict[str, int] = {}
+    days: dict[str, int] = {}
+
+    with database.snapshot(snapshot_mode, username) as conn:
+        rows = conn.execute("SELECT date, start_min, end_min, title FROM all_events WHERE user_id = ?",
+                            (database.user_id(username),))
+        for d, start, end, title in rows:
+            day = days.get(d)
+            if day is None:
+                day = days[d] = date.fromisoformat(d).toordinal() - EPOCH_ORDINAL
+            cols.append(day, start, max(1, end - start), title, titles)
+    return cols
+
+
+# ---- Aggregations ----------------------------------------------------------
+def hours_per_weekday(cols: EventColumns) -> list[float]:
+    """Scheduled hours per weekday, Monday first."""
+    if np is not None:
+        day, _, dur, _ = cols.as_numpy()
+        weekday = (day + 3) % 7  # 1970-01-01 was a Thursday
+        return (np.bincount(weekday, weights=dur, minlength=7) / 60).tolist()
+
+    totals = [0] * 7
+    for day, dur in zip(cols.day, cols.duration):
+        totals[(day + 3) % 7] += dur
+    return [t / 60 for t in totals]
+
+
+def busiest_hour(cols: EventColumns) -> int | None:
+    """Hour of the day (0-23) with the most scheduled minutes across all days."""
+    if not len(cols):
+        return None
+    if np is not None:
+        _, start, dur, _ = cols.as_numpy()
+        end = np.minimum(start + dur, MINUTES_PER_DAY)
+        # +1 where an event starts, -1 where it ends; the running sum is occupancy per minute
+        delta = np.bincount(start, minlength=MINUTES_PER_DAY + 1) - np.bincount(end, minlength=MINUTES_PER_DAY + 1)
+        occupancy = np.cumsum(delta[:MINUTES_PER_DAY])
+        return int(occupancy.reshape(24, 60).sum(axis=1).argmax())
+
+    delta = [0] * (MINUTES_PER_DAY + 1)
+    for start, dur in zip(cols.start, cols.duration):
+        delta[start] += 1
+        delta[min(start + dur, MINUTES_PER_DAY)] -= 1
+    per_hour = [0] * 24
+    running = 0
+    for minute in range(MINUTES_PER_DAY):
+        running += delta[minute]
+        per_hour[minute // 60] += running
+    return max(range(24), key=per_hour.__getitem__)
+
+
+def minutes_per_month(cols: EventColumns) -> dict[str, int]:
+    """Total scheduled minutes per 'YYYY-MM', in month order."""
+    if not len(cols):
+        return {}
+    if np is not None:
+        day, _, dur, _ = cols.as_numpy()
+        month = day.astype("datetime64[D]").astype("datetime64[M]").astype(np.int64)
+        first = int(month.min())
+        totals = np.bincount(month - first, weights=dur)
+        return {
+            f"{1970 + (first + i) // 12}-{(first + i) % 12 + 1:02d}": int(t)
+            for i, t in enumerate(totals) if t
+        }
+
+    months: dict[int, str] = {}
+    totals: dict[str, int] = {}
+    for day, dur in zip(cols.day, cols.duration):
+        key = months.get(day)
+        if key is None:
+            key = months[day] = date.fromordinal(day + EPOCH_ORDINAL).strftime("%Y-%m")
+        totals[key] = totals.get(key, 0) + dur
+    return dict(sorted(totals.items()))
@@ -1,7 +1,7 @@
 """New skeleton code to begin new implementation"""
 # app_qt.py
 import sys
-from PySide6.QtWidgets import QApplication, QMainWindow, QStackedWidget
+from PySide6.QtWidgets import QApplication, QMainWindow, QMessageBox, QStackedWidget, QStyle, QSystemTrayIcon
 from PySide6.QtCore import Qt
 
 from login_page_qt import LoginPage
@@ -12,7 +12,11 @@ from calendar_page_qt import CalendarPage
 from PySide6.QtWidgets import QWidget, QLabel, QVBoxLayout
 
 import database
+from clock import qt_clock
+from reminders import qt_reminders
+from undo import UndoJournal
 database.init_db()
+database.enable_write_buffer()  # bursts of edits share one transaction; flushed on close
 
 """
 class CalendarPage(QWidget):
@@ -34,6 +38,18 @@ class ScheduleApp(QMainWindow):
         # Track the logged-in user
         self.current_user: str | None = None
 
+        # shared minute tick; only runs while a DayView is visible
+        self.clock = qt_clock()
+
+        # the logged-in user's event reminders (see set_user), shown through the tray if there is one
+        self.reminders = None
+        # the logged-in user's undo/redo journal; every event edit of the pages goes through it
+        self.undo: UndoJournal | None = None
+        self.tray = None
+        if QSystemTrayIcon.isSystemTrayAvailable():
+            self.tray = QSystemTrayIcon(self.style().standardIcon(QStyle.SP_MessageBoxInformation), self)
+            self.tray.show()
+
         #page container
         self.stack = QStackedWidget()
         self.setCentralWidget(self.stack)
@@ -50,6 +66,42 @@ class ScheduleApp(QMainWindow):
 
         self.show_page("LoginPage")
 
+    def closeEvent(self, event):
+        """Commit any buffered writes before the window goes away"""
+        self.pages["CalendarPage"].events.close()
+        if self.reminders is not None:
+            self.reminders.stop()
+        try:
+            database.disable_write_buffer()
+        except Exception as e:
+            QMessageBox.warning(self, "Database Error", f"Some changes could not be saved:\n{e}")
+        super().closeEvent(event)
+
+    def set_user(self, username: str | None):
+        """Set/clear the logged-in user and start firing their reminders"""
+        if self.reminders is not None and username != self.current_user:
+            self.reminders.stop()
+            self.reminders = None
+        if username != self.current_user:
+            self.undo = None if username is None else UndoJournal(username)
+        if username is not None:
+            database.user_id(username)  # cache the id every event call maps the name to
+            if self.reminders is None:
+                self.reminders = qt_reminders(self.show_reminder, username)
+                self.reminders.start()
+        self.current_user = username
+
+    def show_reminder(self, reminder, event):
+        """Notify about one due reminder without blocking the app"""
+        text = f"{event.title}\n{event.date}  {event.start} - {event.end}"
+        if self.tray is not None:
+            self.tray.showMessage("Reminder", text, QSystemTrayIcon.Information)
+            return
+        box = QMessageBox(QMessageBox.Information, "Reminder", text, QMessageBox.Ok, self)
+        box.setAttribute(Qt.WA_DeleteOnClose)
+        box.setModal(False)
+        box.show()
+
     def show_page(self, name: str):
         """Switch to a page by name if it exists, and refresh if supported"""
         page = self.pages.get(name)
@@ -0,0 +1,126 @@
+"""
+Archival tiering: move old events out of the hot events table.
+
+Years of past events inflate every index, page cache and backup of the file
+the apps write to. archive_events() moves the events dated before a horizon
+into an archive file next to each hot file (name.archive.db: same schema,
+same ids), and database.py reads the archive only when a query's range
+reaches below the horizon: a day before it, a listing page that runs past
+it, or an id the hot file no longer has. Edits of archived events are applied
+in the archive.
+
+    python cli.py archive --days 730 --vacuum
+
+The job runs next to the apps without any event going missing:
+- the horizon is raised before anything moves, and readers read it after
+  their hot rows, so a reader that missed a row in the hot file knows to look
+  in the archive;
+- each batch is committed to the archive before it is deleted from the hot
+  file, so a crash leaves duplicates at worst (readers take the hot copy and
+  the next run finishes the batch), never a gap;
+- a row edited or deleted after it was copied (its version no longer
+  matches) stays as it is in the hot file and its archive copy is dropped.
+"""
+import os
+from contextlib import closing
+from datetime import date, timedelta
+
+import database
+
+# events older than this many days are archived unless told otherwise
+HORIZON_DAYS = 730
+BATCH_SIZE = 5000
+
+_INSERT = (
+    f"INSERT OR REPLACE INTO events ({database.ROW_COLUMNS})"
+    f" VALUES ({', '.join('?' * len(database.ROW_COLUMNS.split(',')))})"
+)
+_VERSION = database.ROW_COLUMNS.split(", ").index("version")
+
+
+def archive_events(before: str, path: str | None = None, batch_size: int = BATCH_SIZE,
+                   vacuum: bool = False) -> int:
+    """
+    Move the events dated before `before` (YYYY-MM-DD) from the hot file at
+    path (None = DB_FILE) to its archive; returns how many moved.
+
+    vacuum=True then VACUUMs both files so the hot file shrinks on disk
+    (writers wait while it runs); otherwise freed pages are reused by later
+    inserts.
+    """
+    hot = path or database.DB_FILE
+    archive = database.archive_path(hot)
+    database.init_db(archive)
+    database.flush_writes()
+    _raise_horizon(hot, before)
+
+    moved = 0
+    after_id = 0
+    with closing(database._get_conn(hot)) as conn, closing(database._get_conn(archive)) as dst:
+        while True:
+            rows = conn.execute(
+                f"SELECT {database.ROW_COLUMNS} FROM events WHERE id > ? AND date < ? ORDER BY id LIMIT ?",
+                (after_id, before, batch_size),
+            ).fetchall()
+            if not rows:
+                break
+            after_id = rows[-1][0]
+            dst.executemany(_INSERT, rows)
+            dst.commit()
+            changed = [
+                (row[0],) for row in rows
+                if conn.execute("DELETE FROM events WHERE id = ? AND version = ?",
+                                (row[0], row[_VERSION])).rowcount == 0
+            ]
+            # reminders of archived events are long past
+            conn.executemany("DELETE FROM reminders WHERE event_id = ?",
+                             [(row[0],) for row in rows if (row[0],) not in changed])
+            conn.commit()
+            if changed:
+                dst.executemany("DELETE FROM events WHERE id = ?", changed)
+                dst.commit()
+            moved += len(rows) - len(changed)
+
+    if vacuum:
+        for file in (hot, archive):
+            with closing(database._get_conn(file)) as conn:
+                conn.execute("VACUUM")
+                conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")  # VACUUM's pages sit in the WAL until then
+    return moved
+
+
+def archive_old_events(days: int = HORIZON_DAYS, today: date | None = None, **kwargs) -> int:
+    """Archive events older than `days` days, in DB_FILE and, when sharded, every shard file."""
+    before = ((today or date.today()) - timedelta(days=days)).isoformat()
+    paths = database._router.paths if database._router is not None else [None]
+    return sum(archive_events(before, path, **kwargs) for path in paths)
+
+
+def _raise_horizon(path: str, before: str) -> None:
+    """Record that events before `before` may be archived; the horizon never moves back."""
+    with closing(database._get_conn(path)) as conn:
+        conn.execute(
+            "INSERT INTO archive_state (id, archived_before) VALUES (0, ?)"
+            " ON CONFLICT (id) DO UPDATE SET archived_before = max(archived_before, excluded.archived_before)",
+            (before,),
+        )
+        conn.commit()
+
+
+# ---- Moving users between shards --------------------------------------------
+def user_rows(path: str, uid: int) -> list[tuple]:
+    """Every archived row of a user in path's archive (shards.move_user takes them along)."""
+    archive = database.archive_path(path)
+    if not os.path.exists(archive):
+        return []
+    with closing(database._get_conn(archive)) as conn:
+        return conn.execute(f"SELECT {database.ROW_COLUMNS} FROM events WHERE user_id = ?", (uid,)).fetchall()
+
+
+def drop(path: str, ids: list[int]) -> None:
+    """Delete these rows from path's archive."""
+    if not ids:
+        return
+    with closing(database._get_conn(database.archive_path(path))) as conn:
+        conn.executemany("DELETE FROM events WHERE id = ?", [(i,) for i in ids])
+        conn.commit()
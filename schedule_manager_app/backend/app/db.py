@@ -0,0 +1,32 @@
+"""Gives the backend access to the shared schedule_manager_app/database.py."""
+import os
+import sys
+
+# schedule_manager_app/ holds database.py and friends (two levels up from here)
+APP_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if APP_DIR not in sys.path:
+    sys.path.insert(0, APP_DIR)
+
+import database  # noqa: E402
+import ics  # noqa: E402
+import instrumentation  # noqa: E402
+import reminders  # noqa: E402
+import sessions  # noqa: E402
+import shards  # noqa: E402
+import timeutil  # noqa: E402
+import writer  # noqa: E402
+
+# Under serve.py every worker sends its writes to the single writer process,
+# which has already created the schema; standalone we write (and init) here.
+_writer = writer.WriterClient.from_env()
+if _writer is not None:
+    database.set_writer(_writer.call)
+else:
+    database.init_db()
+
+# serve.py --shards: events are spread over several files by user
+_router = shards.from_env()
+if _router is not None:
+    database.enable_sharding(_router)
+
+__all__ = ["database", "ics", "instrumentation", "reminders", "sessions", "timeutil"]
@@ -1,7 +1,324 @@
-from fastapi import FastAPI
+import asyncio
+import io
+import json
+import math
+import threading
+from datetime import date
+
+from fastapi import Depends, FastAPI, HTTPException, Request, UploadFile
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, StreamingResponse
+
+from .db import database, instrumentation, ics, reminders, sessions, timeutil
+from .models import EventIn, LoginIn, RemindersIn, ZoneIn
 
 app = FastAPI()
 
+
+@app.exception_handler(database.UnknownUser)
+async def unknown_user(request: Request, exc: database.UnknownUser):
+    """Writes for a username without an account (reads just find no events)."""
+    return JSONResponse(status_code=404, content={"detail": f"no such user: {exc.args[0]}"})
+
+
+@app.exception_handler(sessions.RateLimited)
+async def rate_limited(request: Request, exc: sessions.RateLimited):
+    """Too many failed logins or bad tokens from a client, or requests from a user."""
+    return JSONResponse(status_code=429, content={"detail": str(exc)},
+                        headers={"Retry-After": str(math.ceil(exc.retry_after))})
+
+
 @app.get("/")
 async def root():
     return {"message": "Backend is running 🚀"}
+
+
+# ---- Sessions ----
+# Everything below /users/{username} and /events needs "Authorization: Bearer
+# <token>" with a token from POST /login; a user sees and changes only their
+# own calendar (403 for another user's, 404 for another user's event).
+def _client_ip(request: Request) -> str | None:
+    return request.client.host if request.client else None
+
+
+def _bearer(request: Request) -> str | None:
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer":
+        return None
+    return token.strip() or None
+
+
+async def current_session(request: Request) -> sessions.Session:
+    """The session of the request's bearer token (401 without a valid one)."""
+    token = _bearer(request)
+    session = sessions.cached(token) if token else None
+    if session is not None:
+        session = sessions.admit(token, session)
+    elif token:
+        # not seen lately: the sessions table is read off the event loop
+        session = await run_in_threadpool(sessions.validate, token, _client_ip(request))
+    if session is None:
+        raise HTTPException(status_code=401, detail="not logged in", headers={"WWW-Authenticate": "Bearer"})
+    return session
+
+
+async def user_session(username: str, session: sessions.Session = Depends(current_session)) -> sessions.Session:
+    """current_session, for a path naming the session's own user."""
+    if session.username != username:
+        raise HTTPException(status_code=403, detail="not your calendar")
+    return session
+
+
+def _own_event(event_id: int, session: sessions.Session) -> None:
+    event = database.get_event(event_id)
+    if event is None or event.user_id != session.user_id:
+        raise HTTPException(status_code=404, detail="event not found")
+
+
+@app.post("/login")
+def login(body: LoginIn, request: Request):
+    """A session token for the user; 401 if the password is wrong, 429 after too many wrong ones."""
+    token = sessions.login(body.username, body.password, _client_ip(request))
+    if token is None:
+        raise HTTPException(status_code=401, detail="wrong username or password")
+    return {"token": token, "token_type": "bearer", "expires_in": sessions.SESSION_TTL_S}
+
+
+@app.post("/logout", status_code=204, dependencies=[Depends(current_session)])
+def logout(request: Request):
+    """End the session of the request's token."""
+    sessions.logout(_bearer(request))
+
+
+@app.get("/me")
+async def me(session: sessions.Session = Depends(current_session)):
+    """Who the request's token belongs to."""
+    return {"username": session.username}
+
+
+@app.get("/metrics", dependencies=[Depends(current_session)])
+async def metrics():
+    """
+    Per-call and per-statement timings (enable with SCHEDULE_MANAGER_PROFILE=1).
+    Logged-in users only: the statements' SQL text and timings tell an
+    outsider too much about the schema and load.
+    """
+    return instrumentation.stats()
+
+
+@app.get("/users/{username}/events", dependencies=[Depends(user_session)])
+def events_for_day(username: str, date: str, tz: str | None = None):
+    """
+    Events of one day (date = YYYY-MM-DD), in the shared Event shape; with
+    ?tz= the day is that zone's and the events are converted to it.
+    """
+    try:
+        return [ev.to_dict() for ev in database.get_events_for_day(username, date, tz)]
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc))
+
+
+@app.get("/users/{username}/events/range", dependencies=[Depends(user_session)])
+def events_between(username: str, first: str, last: str, tz: str | None = None):
+    """Events starting on days first..last of zone tz (default: the user's), converted to it."""
+    try:
+        return [ev.to_dict() for ev in database.get_events_between(username, first, last, tz)]
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc))
+
+
+@app.post("/users/{username}/events", status_code=201, dependencies=[Depends(user_session)])
+def create_event(username: str, event: EventIn):
+    """Add an event; returns its id and version."""
+    _check_event(event)
+    try:
+        event_id = database.add_event(username, event.title, event.date, event.start, event.end,
+                                      reminders=event.reminders or (), tz=event.tz)
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc))
+    return {"id": event_id, "version": 1}
+
+
+@app.put("/events/{event_id}")
+def update_event(event_id: int, event: EventIn, session: sessions.Session = Depends(current_session)):
+    """Update an event; with "version" only if it is still current (409 with the current event if not)."""
+    _own_event(event_id, session)
+    _check_event(event)
+    try:
+        version = database.update_event(event_id, event.title, event.date, event.start, event.end, event.version,
+                                        tz=event.tz)
+    except database.ConflictError as exc:
+        raise _conflict(exc)
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc))
+    if version is None:
+        raise HTTPException(status_code=404, detail="event not found")
+    if event.reminders is not None:
+        _set_reminders(event_id, event.reminders)
+    return {"id": event_id, "version": version}
+
+
+@app.delete("/events/{event_id}", status_code=204)
+def delete_event(event_id: int, version: int | None = None, session: sessions.Session = Depends(current_session)):
+    """Delete an event; with ?version= only if it is still current."""
+    _own_event(event_id, session)
+    try:
+        database.delete_event(event_id, version)
+    except database.ConflictError as exc:
+        raise _conflict(exc)
+
+
+@app.get("/users/{username}/timezone", dependencies=[Depends(user_session)])
+def get_timezone(username: str):
+    """The zone the user's events are entered in unless a request names one."""
+    if database.user_id(username) is None:
+        raise database.UnknownUser(username)
+    return {"tz": database.user_zone(username)}
+
+
+@app.put("/users/{username}/timezone", dependencies=[Depends(user_session)])
+def put_timezone(username: str, body: ZoneIn):
+    """Change the user's zone; their existing events keep the zone they were entered in."""
+    try:
+        found = database.set_user_zone(username, body.tz)
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc))
+    if found is False:
+        raise database.UnknownUser(username)
+    return {"tz": body.tz}
+
+
+def _conflict(exc) -> HTTPException:
+    if exc.current is None:
+        return HTTPException(status_code=404, detail="event not found")
+    return HTTPException(status_code=409, detail={"message": str(exc), "current": exc.current.to_dict()})
+
+
+def _check_event(event: EventIn) -> None:
+    """422 unless event has a valid date and times, ending no earlier than it starts."""
+    try:
+        date.fromisoformat(event.date)
+        start, end = timeutil.parse_minutes(event.start), timeutil.parse_minutes(event.end)
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc))
+    if end < start:
+        raise HTTPException(status_code=422, detail="end must not be before start")
+
+
+def _encode_cursor(key: tuple | None) -> str | None:
+    return None if key is None else "{}.{}.{}".format(*key)
+
+
+def _decode_cursor(cursor: str) -> tuple:
+    try:
+        day, start_min, event_id = cursor.split(".")
+        return day, int(start_min), int(event_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="invalid cursor")
+
+
+@app.get("/users/{username}/events/list", dependencies=[Depends(user_session)])
+def list_events(username: str, after: str | None = None, limit: int = 50, order: str = "asc"):
+    """Keyset-paginated listing; pass the returned "next" as ?after= for the following page."""
+    if order not in ("asc", "desc") or not 1 <= limit <= 1000:
+        raise HTTPException(status_code=400, detail="order must be asc/desc and limit 1..1000")
+    events, next_key = database.list_events(
+        username, _decode_cursor(after) if after else None, limit, order
+    )
+    return {"events": [ev.to_dict() for ev in events], "next": _encode_cursor(next_key)}
+
+
+# ---- Reminders ----
+@app.get("/events/{event_id}/reminders")
+def get_reminders(event_id: int, session: sessions.Session = Depends(current_session)):
+    """The event's reminder offsets (minutes before its start)."""
+    _own_event(event_id, session)
+    return {"offsets": database.get_reminders(event_id)}
+
+
+@app.put("/events/{event_id}/reminders")
+def put_reminders(event_id: int, body: RemindersIn, session: sessions.Session = Depends(current_session)):
+    """Replace the event's reminders."""
+    _own_event(event_id, session)
+    _set_reminders(event_id, body.offsets)
+    return {"offsets": database.get_reminders(event_id)}
+
+
+def _set_reminders(event_id: int, offsets: list[int]) -> None:
+    try:
+        found = database.set_reminders(event_id, offsets)
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc))
+    if found is False:
+        raise HTTPException(status_code=404, detail="event not found")
+
+
+# Due reminders of every user come from one scheduler per process, started
+# with the first stream; it hands them to the streams open for their user.
+# Other processes' writes reach it when it loads its next window, so the
+# window is kept to a minute.
+_streams: dict[int, set] = {}  # user id -> {(loop, queue)}
+_streams_lock = threading.Lock()
+_scheduler = None
+KEEPALIVE_S = 15
+
+
+def _fire_reminder(reminder, event) -> None:
+    payload = {"event": event.to_dict(), "offset_min": reminder.offset_min,
+               "due": reminder.due.isoformat(timespec="minutes")}
+    with _streams_lock:
+        streams = list(_streams.get(reminder.user_id, ()))
+    for loop, queue in streams:
+        loop.call_soon_threadsafe(queue.put_nowait, payload)
+
+
+@app.get("/users/{username}/reminders/stream", dependencies=[Depends(user_session)])
+async def reminder_stream(username: str):
+    """Server-sent events: one "reminder" event per reminder of the user as it comes due."""
+    global _scheduler
+    user_id = await run_in_threadpool(database.user_id, username)
+    if user_id is None:
+        raise database.UnknownUser(username)
+    stream = (asyncio.get_running_loop(), asyncio.Queue())
+    with _streams_lock:
+        _streams.setdefault(user_id, set()).add(stream)
+        if _scheduler is None:
+            _scheduler = reminders.thread_reminders(_fire_reminder, window_min=1)
+            _scheduler.start()
+
+    async def events():
+        try:
+            while True:
+                try:
+                    payload = await asyncio.wait_for(stream[1].get(), KEEPALIVE_S)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"  # also how a closed connection is noticed
+                    continue
+                yield f"event: reminder\ndata: {json.dumps(payload)}\n\n"
+        finally:
+            with _streams_lock:
+                _streams[user_id].discard(stream)
+                if not _streams[user_id]:
+                    del _streams[user_id]
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+
+@app.post("/users/{username}/import.ics", dependencies=[Depends(user_session)])
+def import_ics(username: str, file: UploadFile):
+    """Stream an uploaded .ics file into the user's calendar."""
+    text = io.TextIOWrapper(file.file, encoding="utf-8", errors="replace", newline="")
+    try:
+        return {"imported": ics.import_ics(username, text)}
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc))
+
+
+@app.get("/users/{username}/export.ics", dependencies=[Depends(user_session)])
+def export_ics(username: str):
+    """The user's whole calendar as .ics, streamed page by page."""
+    return StreamingResponse(
+        ics.iter_ics(username),
+        media_type="text/calendar",
+        headers={"Content-Disposition": f'attachment; filename="{username}.ics"'},
+    )
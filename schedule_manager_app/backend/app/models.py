@@ -0,0 +1,28 @@
+from pydantic import BaseModel
+
+
+class EventIn(BaseModel):
+    """Body of event create/update requests (times as 'hh:mm AM/PM')."""
+    title: str
+    date: str   # YYYY-MM-DD
+    start: str
+    end: str
+    tz: str | None = None  # IANA zone of date/start/end; default: the user's (create) or the event's (update)
+    version: int | None = None  # on update: the version read; a mismatch answers 409
+    reminders: list[int] | None = None  # minutes before start; on update, None leaves them as they are
+
+
+class ZoneIn(BaseModel):
+    """Body of PUT /users/{username}/timezone."""
+    tz: str  # IANA zone name, e.g. "Europe/Berlin"
+
+
+class RemindersIn(BaseModel):
+    """Body of PUT /events/{id}/reminders: minutes before the start, replacing the current ones."""
+    offsets: list[int]
+
+
+class LoginIn(BaseModel):
+    """Body of POST /login."""
+    username: str
+    password: str
@@ -0,0 +1,86 @@
+"""
+Run the backend under several worker processes with one writer process.
+
+Reads are served by the uvicorn workers straight from the SQLite file (WAL
+mode, so they run in parallel); every write is forwarded to a single writer
+process that group-commits them, so workers never contend for the write lock.
+
+    python serve.py --workers 4 --port 8000
+    python serve.py --workers 4 --direct     # no writer: workers write themselves
+    python serve.py --workers 4 --shards 4   # events spread over 4 files by user
+"""
+import argparse
+import multiprocessing
+import os
+import secrets
+import socket
+import sys
+
+import uvicorn
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+APP_DIR = os.path.dirname(BACKEND_DIR)
+if APP_DIR not in sys.path:
+    sys.path.insert(0, APP_DIR)
+
+import database  # noqa: E402
+import shards  # noqa: E402
+import writer  # noqa: E402
+from group_commit import MAX_BATCH  # noqa: E402
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--db", help="database file (default: %s)" % database.DB_FILE)
+    parser.add_argument("--direct", action="store_true", help="no writer process; each worker writes itself")
+    parser.add_argument("--max-batch", type=int, default=MAX_BATCH, help="writes per transaction at most")
+    parser.add_argument("--max-wait-ms", type=float, default=0.0,
+                        help="how long the writer waits for more writes before committing a batch")
+    parser.add_argument("--shards", type=int, default=1, help="number of SQLite files events are spread over")
+    parser.add_argument("--placement", choices=shards.PLACEMENTS, default="hash", help="how users are assigned to shards")
+    args = parser.parse_args(argv)
+
+    if args.db:
+        # workers are fresh processes: pass the DB location through the environment
+        os.environ["SCHEDULE_MANAGER_DB"] = database.DB_FILE = os.path.abspath(args.db)
+
+    if args.shards > 1:
+        os.environ[shards.SHARDS_ENV] = f"{args.shards}:{args.placement}"
+        shards.from_env()  # create the shard files once, before any worker starts
+
+    writer_proc = None
+    if not args.direct:
+        address = ("127.0.0.1", _free_port())
+        authkey = secrets.token_hex(16)
+        ready = multiprocessing.Event()
+        writer_proc = multiprocessing.Process(
+            target=writer.serve, name="writer", daemon=True,
+            args=(address, authkey.encode(), database.DB_FILE, args.max_batch, args.max_wait_ms, ready),
+        )
+        writer_proc.start()
+        if not ready.wait(30):
+            sys.exit("writer process did not start")
+        os.environ[writer.ADDRESS_ENV] = "%s:%d" % address
+        os.environ[writer.AUTHKEY_ENV] = authkey
+    else:
+        database.init_db()
+
+    try:
+        uvicorn.run("app.main:app", host=args.host, port=args.port, workers=args.workers, app_dir=BACKEND_DIR)
+    finally:
+        if writer_proc is not None:
+            writer_proc.terminate()
+            writer_proc.join()
+
+
+if __name__ == "__main__":
+    main()
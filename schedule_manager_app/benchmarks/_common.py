@@ -0,0 +1,95 @@
+"""Shared helpers for the benchmark scripts (synthetic data, timing, memory)."""
+import os
+import random
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+# make the flat app modules (database, views, ...) importable
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ROOT = os.path.dirname(APP_DIR)
+for p in (APP_DIR, ROOT):
+    if p not in sys.path:
+        sys.path.insert(0, p)
+
+
+import database  # noqa: E402
+from event import Event  # noqa: E402
+from timeutil import format_minutes  # noqa: E402
+
+
+def synthetic_day(n: int, seed: int = 0, date: str = "2025-01-06") -> list[Event]:
+    """Return n random Events for one day."""
+    rng = random.Random(seed)
+    rows = []
+    for i in range(n):
+        start = rng.randrange(0, 24 * 60 - 15)
+        dur = rng.choice((15, 30, 45, 60, 90, 120))
+        end = min(24 * 60 - 1, start + dur)
+        rows.append(Event.from_minutes(f"Event {i + 1}", date, start, end, id=i + 1))
+    return rows
+
+
+def ensure_user(username: str) -> int:
+    """Create username (password "bench") unless it exists; return its user id."""
+    database.create_user(username, "bench")
+    return database.user_id(username)
+
+
+def insert_events(username: str, rows) -> None:
+    """Bulk insert (title, date, start_min, end_min) rows for username (in their zone), in one transaction."""
+    uid = ensure_user(username)
+    tz = database.user_zone(username)
+    with database._get_conn() as conn:
+        conn.executemany(
+            "INSERT INTO events (user_id, title, date, start, end, start_min, end_min, tz, start_utc, end_utc)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            ((uid, title, day, format_minutes(s), format_minutes(e), s, e, tz, *database._utc(day, s, e, tz))
+             for title, day, s, e in rows),
+        )
+        conn.commit()
+
+
+@contextmanager
+def timed(results: dict, key: str):
+    """Store the wall time of the block (ms) in results[key]."""
+    t0 = time.perf_counter()
+    yield
+    results[key] = (time.perf_counter() - t0) * 1000
+
+
+@contextmanager
+def traced(results: dict, key: str):
+    """Store the peak traced Python allocation of the block (KiB) in results[key]."""
+    tracemalloc.start()
+    try:
+        yield
+    finally:
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        results[key] = peak / 1024
+
+
+def rss_kib() -> int | None:
+    """Current resident set size in KiB (Linux only, None elsewhere)."""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+    except (OSError, ValueError, IndexError):
+        return None
+    return pages * os.sysconf("SC_PAGE_SIZE") // 1024
+
+
+def print_table(rows: list[dict], columns: list[str]) -> None:
+    """Print a plain fixed-width table of result dicts."""
+    widths = {c: max(len(c), *(len(_cell(r.get(c))) for r in rows)) for c in columns}
+    print("  ".join(c.rjust(widths[c]) for c in columns))
+    for r in rows:
+        print("  ".join(_cell(r.get(c)).rjust(widths[c]) for c in columns))
+
+
+def _cell(value) -> str:
+    if isinstance(value, float):
+        return f"{value:.2f}"
+    return "-" if value is None else str(value)
@@ -0,0 +1,152 @@
+"""
+Scroll-load latency and memory of the Qt agenda over a 1M-event history.
+
+Fills one user's calendar with --count events, opens an AgendaView headless
+at --start days into it and scrolls it a screen at a time (as page-down or a
+fling would), --rows rows down and then --rows rows back up, repainting
+after every step. Each step's time is recorded; those that loaded a page
+(a keyset list_events query) are reported apart. The model's row count and
+the memory its rows hold are sampled as it goes. For comparison the first
+--keep-all-rows of the scroll are made again with a model that never drops
+rows (max_rows = --count); its loads slow down with every row it holds.
+
+On the way down every event passed must have been on screen, and the top
+row must only move forward.
+
+    python benchmarks/agenda_bench.py --count 1000000 --rows 200000
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+from _common import insert_events, print_table
+import database
+from event_model_qt import EVENT_ROLE
+
+COLUMNS = ["model", "direction", "steps", "loads", "step_p50_ms", "load_p50_ms", "load_p95_ms", "load_max_ms",
+           "max_rows", "rows_kib"]
+FIRST_DAY = date(2000, 1, 1)
+
+
+def fill(count: int) -> None:
+    rng = random.Random(4)
+    database.init_db()
+    insert_events("bench", (
+        (f"Event {i}", (FIRST_DAY + timedelta(days=rng.randrange(9000))).isoformat(), s, s + 30)
+        for i, s in ((i, rng.randrange(1380)) for i in range(count))
+    ))
+
+
+def rows_kib(model) -> float:
+    """Memory held by the model's rows: the Event objects and the values in their slots."""
+    total = sys.getsizeof(model._events)
+    for ev in model._events:
+        total += sys.getsizeof(ev) + sum(sys.getsizeof(getattr(ev, name)) for name in ev.__slots__)
+    return total / 1024
+
+
+def on_screen(view) -> list:
+    """The events of the rows in the viewport, top to bottom."""
+    lst = view.results
+    top = lst.indexAt(lst.viewport().rect().topLeft()).row()
+    bottom = lst.indexAt(lst.viewport().rect().bottomLeft()).row()
+    bottom = view.model.rowCount() - 1 if bottom < 0 else bottom
+    return [view.model.index(row).data(EVENT_ROLE) for row in range(max(top, 0), bottom + 1)]
+
+
+def scroll(app, view, rows: int, down: bool, seen: list | None) -> dict:
+    """Scroll rows rows a screen at a time; times each step. seen collects the screens shown."""
+    model, bar = view.model, view.results.verticalScrollBar()
+    row_px = view._row_step()
+    steps, loads, most_rows, most_kib = [], [], model.rowCount(), rows_kib(model)
+    moved = 0
+    while moved < rows:
+        pages = model.pages
+        t0 = time.perf_counter()
+        bar.setValue(bar.value() + (bar.pageStep() if down else -bar.pageStep()))
+        view.results.viewport().repaint()
+        took = (time.perf_counter() - t0) * 1000
+        (loads if model.pages != pages else steps).append(took)
+        if model.pages != pages:
+            most_rows = max(most_rows, model.rowCount())
+            most_kib = max(most_kib, rows_kib(model))
+        moved += bar.pageStep() // row_px
+        if seen is not None:
+            seen.append(on_screen(view))
+        if (bar.value() == bar.minimum() and not model.can_fetch_previous() and not down) or \
+                (bar.value() == bar.maximum() and not model.canFetchMore() and down):
+            break  # the calendar's end
+        app.processEvents()
+    steps.sort()
+    loads.sort()
+    return {
+        "direction": "down" if down else "up",
+        "steps": len(steps) + len(loads),
+        "loads": len(loads),
+        "step_p50_ms": steps[len(steps) // 2] if steps else None,
+        "load_p50_ms": loads[len(loads) // 2] if loads else None,
+        "load_p95_ms": loads[int(len(loads) * 0.95)] if loads else None,
+        "load_max_ms": loads[-1] if loads else None,
+        "max_rows": most_rows,
+        "rows_kib": most_kib,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--count", type=int, default=1_000_000)
+    parser.add_argument("--rows", type=int, default=200_000, help="rows scrolled down, then up")
+    parser.add_argument("--keep-all-rows", type=int, default=20_000)
+    parser.add_argument("--start", type=int, default=4500, help="days into the history the agenda opens at")
+    args = parser.parse_args()
+
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PySide6.QtWidgets import QApplication
+    from views.agenda_view_qt import MAX_ROWS, AgendaModel, AgendaView
+    app = QApplication.instance() or QApplication(sys.argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database.DB_FILE = os.path.join(tmp, "bench.db")
+        t0 = time.perf_counter()
+        fill(args.count)
+        fill_s = time.perf_counter() - t0
+        start = (FIRST_DAY + timedelta(days=args.start)).isoformat()
+
+        rows, in_order = [], None
+        for name, max_rows, scrolled in (("window", MAX_ROWS, args.rows),
+                                         ("keep all", args.count, min(args.rows, args.keep_all_rows))):
+            view = AgendaView(model=AgendaModel(max_rows=max_rows))
+            view.resize(800, 600)
+            view.show()
+            view.show_from("bench", start)
+            app.processEvents()
+            seen = [on_screen(view)] if name == "window" else None
+            for down in (True, False):
+                rows.append({"model": name, **scroll(app, view, scrolled, down, seen if down else None)})
+            if seen is not None:
+                tops = [database.event_key(screen[0]) for screen in seen]
+                in_order = all(a < b for a, b in zip(tops, tops[1:]))
+                shown = {ev.id for screen in seen for ev in screen}
+                first, last = tops[0], database.event_key(seen[-1][-1])
+                with database._get_conn() as conn:
+                    between = conn.execute(
+                        "SELECT COUNT(*) FROM events WHERE (date, start_min, id) >= (?, ?, ?)"
+                        " AND (date, start_min, id) <= (?, ?, ?)", (*first, *last)).fetchone()[0]
+                passed = (len(shown), between, len(seen))
+            view.hide()
+            view.deleteLater()
+            app.processEvents()
+
+    print(f"{args.count:,} events (filled in {fill_s:.0f}s), agenda opened at {start}, "
+          f"{args.rows:,} rows scrolled down then up a screen at a time\n")
+    print_table(rows, COLUMNS)
+    print(f"\nwindowed scroll down: top row only moved forward: {in_order}; {passed[0]:,} events shown "
+          f"in {passed[2]:,} screens, of the {passed[1]:,} in that range: none skipped: {passed[0] == passed[1]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Columnar analytics versus row-by-row Python loops over one user's history.
+
+Fills a temporary database with N events (default 1,000,000) for one user and
+times hours-per-weekday, busiest-hour and minutes-per-month three ways:
+  rows     fetch tuples and aggregate in a Python loop per row (today's approach)
+  columns  analytics.py over array columns, pure-Python fallback
+  numpy    analytics.py over array columns, vectorized (if NumPy is installed)
+
+Usage:
+    python benchmarks/analytics_bench.py [--count 1000000]
+"""
+import argparse
+import os
+import random
+import tempfile
+from datetime import date, datetime, timedelta
+
+from _common import timed, insert_events, print_table
+import analytics
+import database
+
+COLUMNS = ["method", "load_ms", "aggregate_ms", "total_ms"]
+
+
+def fill(count: int, username: str = "bench") -> None:
+    rng = random.Random(1)
+    base = date(2015, 1, 1)
+    database.init_db()
+    insert_events(username, (
+        (f"Meeting {rng.randrange(500)}", (base + timedelta(days=rng.randrange(3650))).isoformat(),
+         s, min(1439, s + rng.choice((15, 30, 60, 90))))
+        for s in (rng.randrange(1380) for _ in range(count))
+    ))
+
+
+def rows_baseline(username: str) -> dict:
+    """The straightforward version: tuples from the cursor, datetime parsing per row."""
+    r = {"method": "rows"}
+    with timed(r, "load_ms"):
+        with database._get_conn() as conn:
+            rows = conn.execute("SELECT date, start, end, title FROM events WHERE user_id = ?",
+                                (database.user_id(username),)).fetchall()
+    with timed(r, "aggregate_ms"):
+        weekday = [0] * 7
+        per_minute = [0] * 1440
+        months = {}
+        for d, s, e, _title in rows:
+            day = datetime.strptime(d, "%Y-%m-%d")
+            start = datetime.strptime(s, "%I:%M %p")
+            end = datetime.strptime(e, "%I:%M %p")
+            s_min = start.hour * 60 + start.minute
+            dur = max(1, end.hour * 60 + end.minute - s_min)
+            weekday[day.weekday()] += dur
+            for m in range(s_min, min(1440, s_min + dur)):
+                per_minute[m] += 1
+            key = d[:7]
+            months[key] = months.get(key, 0) + dur
+        max(range(24), key=lambda h: sum(per_minute[h * 60:(h + 1) * 60]))
+    return r
+
+
+def columnar(username: str, label: str) -> dict:
+    r = {"method": label}
+    with timed(r, "load_ms"):
+        cols = analytics.load_columns(username)
+    with timed(r, "aggregate_ms"):
+        analytics.hours_per_weekday(cols)
+        analytics.busiest_hour(cols)
+        analytics.minutes_per_month(cols)
+    return r
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--count", type=int, default=1_000_000)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database.DB_FILE = os.path.join(tmp, "bench.db")
+        fill(args.count)
+
+        results = [rows_baseline("bench")]
+        numpy = analytics.np
+        analytics.np = None
+        results.append(columnar("bench", "columns"))
+        analytics.np = numpy
+        if numpy is not None:
+            results.append(columnar("bench", "numpy"))
+        for r in results:
+            r["total_ms"] = r["load_ms"] + r["aggregate_ms"]
+        print(f"{args.count:,} events")
+        print_table(results, COLUMNS)
+
+
+if __name__ == "__main__":
+    main()
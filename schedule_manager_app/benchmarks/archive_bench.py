@@ -0,0 +1,128 @@
+"""
+Hot-file size and query latency before and after archiving old events.
+
+Fills --count events for --users users spread evenly over the last --years
+years, then archives everything older than --days days (with VACUUM) and
+compares: file sizes, a day view and the newest listing page in the recent
+range (served by the hot file alone), and a day view in the archived range
+(hot file + archive).
+
+While the archive job runs, a reader thread keeps re-reading sample days
+and counts any day whose events differ from before the job; there must be
+none.
+
+    python benchmarks/archive_bench.py --count 1000000 --years 8 --days 365
+"""
+import argparse
+import os
+import random
+import tempfile
+import threading
+import time
+from datetime import date, timedelta
+
+from _common import insert_events, print_table
+import archive
+import database
+
+COLUMNS = ["state", "hot_mb", "archive_mb", "recent_day_us", "recent_page_us", "old_day_us"]
+TODAY = date(2025, 6, 30)
+
+
+def fill(count: int, users: list[str], years: int) -> None:
+    rng = random.Random(5)
+    span = 365 * years
+    per_user = count // len(users)
+    database.init_db()
+    for u in users:
+        insert_events(u, ((f"Event {i}", (TODAY - timedelta(days=rng.randrange(span))).isoformat(), s, s + 30)
+                          for i, s in ((i, rng.randrange(1380)) for i in range(per_user))))
+    with database._get_conn() as conn:
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+
+def _mb(path: str) -> float:
+    return os.path.getsize(path) / 2**20 if os.path.exists(path) else 0.0
+
+
+def _best_of(fn, repeat: int) -> float:
+    """Mean microseconds per fn call, best of 5 rounds of repeat calls."""
+    best = float("inf")
+    for _ in range(5):
+        t0 = time.perf_counter()
+        for _ in range(repeat):
+            fn()
+        best = min(best, (time.perf_counter() - t0) * 1e6 / repeat)
+    return best
+
+
+def measure(state: str, users: list[str], args) -> dict:
+    rng = random.Random(9)
+    recent = [(rng.choice(users), (TODAY - timedelta(days=rng.randrange(args.days))).isoformat())
+              for _ in range(args.repeat)]
+    old = [(rng.choice(users), (TODAY - timedelta(days=rng.randrange(args.days, 365 * args.years))).isoformat())
+           for _ in range(args.repeat)]
+    probes = {"recent": iter(recent * 5), "old": iter(old * 5), "page": iter(recent * 5)}
+    return {
+        "state": state,
+        "hot_mb": _mb(database.DB_FILE),
+        "archive_mb": _mb(database.archive_path()),
+        "recent_day_us": _best_of(lambda: database.get_events_for_day(*next(probes["recent"])), args.repeat),
+        "recent_page_us": _best_of(lambda: database.list_events(next(probes["page"])[0], None, 50, "desc"),
+                                   args.repeat),
+        "old_day_us": _best_of(lambda: database.get_events_for_day(*next(probes["old"])), args.repeat),
+    }
+
+
+def read_while_archiving(users: list[str], args) -> dict:
+    """Archive on a thread while this one re-reads sample days; count reads that differ from before."""
+    rng = random.Random(13)
+    # days on both sides of the horizon, where rows are moving
+    sample = [(rng.choice(users), (TODAY - timedelta(days=args.days + rng.randrange(-30, 400))).isoformat())
+              for _ in range(200)]
+    expected = {key: [ev.id for ev in database.get_events_for_day(*key)] for key in sample}
+
+    result = {}
+
+    def job():
+        t0 = time.perf_counter()
+        result["archived"] = archive.archive_old_events(args.days, today=TODAY, vacuum=True)
+        result["job_s"] = time.perf_counter() - t0
+
+    worker = threading.Thread(target=job)
+    worker.start()
+    reads = wrong = 0
+    while worker.is_alive():
+        key = rng.choice(sample)
+        wrong += [ev.id for ev in database.get_events_for_day(*key)] != expected[key]
+        reads += 1
+    worker.join()
+    result.update(reads_during_job=reads, wrong_reads=wrong)
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--count", type=int, default=1_000_000)
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--years", type=int, default=8)
+    parser.add_argument("--days", type=int, default=365, help="archive events older than this")
+    parser.add_argument("--repeat", type=int, default=300, help="queries per timing round")
+    args = parser.parse_args()
+    users = [f"user{i}" for i in range(args.users)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database.DB_FILE = os.path.join(tmp, "bench.db")
+        fill(args.count, users, args.years)
+        rows = [measure("all hot", users, args)]
+        job = read_while_archiving(users, args)
+        rows.append(measure(f"archived >{args.days}d", users, args))
+
+    print(f"{args.count:,} events over {args.years} years, {args.users} users")
+    print_table(rows, COLUMNS)
+    print(f"\narchive job: {job['archived']:,} events in {job['job_s']:.1f}s (incl. VACUUM); "
+          f"{job['reads_during_job']} reads meanwhile, {job['wrong_reads']} wrong")
+
+
+if __name__ == "__main__":
+    main()
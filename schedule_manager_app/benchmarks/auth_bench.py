@@ -0,0 +1,167 @@
+"""
+What authenticating a backend request costs, and how far guessing gets.
+
+Logs --users users in through sessions.py and times, per call:
+
+  validate, cached      a token from the LRU (what an active client's requests cost)
+  validate, looked up   a token read back from the sessions table
+  verify_user           checking the password instead, as every request would without tokens
+
+then drives the FastAPI app in-process (straight through its ASGI
+interface, no network or test client) and times GET / (no auth) against
+GET /me with a cached token; the difference is the overhead a request pays
+for authentication.
+
+Last, a guesser is let loose for --minutes on a simulated clock, --guesses a
+second: at one account, and at every account from one address. It counts
+the guesses that reached verify_user; the rest were answered 429.
+
+    python benchmarks/auth_bench.py --users 1000 --calls 20000 --minutes 60
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+from _common import APP_DIR, print_table
+import database
+import sessions
+
+COLUMNS = ["call", "p50_us", "p99_us", "mean_us"]
+
+
+def stats(name: str, times_ns: list) -> dict:
+    times_ns.sort()
+    return {"call": name, "p50_us": times_ns[len(times_ns) // 2] / 1000,
+            "p99_us": times_ns[int(len(times_ns) * 0.99)] / 1000, "mean_us": sum(times_ns) / len(times_ns) / 1000}
+
+
+def time_calls(fn, args: list) -> list:
+    times = []
+    for a in args:
+        t0 = time.perf_counter_ns()
+        fn(*a)
+        times.append(time.perf_counter_ns() - t0)
+    return times
+
+
+def asgi_times(app, path: str, token: str | None, n: int) -> list:
+    """Time n GETs of path made straight through the app's ASGI interface (ns each); all must answer 200."""
+    headers = [(b"host", b"bench")]
+    if token:
+        headers.append((b"authorization", b"Bearer " + token.encode()))
+    scope = {"type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET", "scheme": "http",
+             "path": path, "raw_path": path.encode(), "root_path": "", "query_string": b"", "headers": headers,
+             "client": ("127.0.0.1", 50000), "server": ("bench", 80)}
+    status = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            status.append(message["status"])
+
+    async def run():
+        times = []
+        for _ in range(n):
+            t0 = time.perf_counter_ns()
+            await app(scope, receive, send)
+            times.append(time.perf_counter_ns() - t0)
+        return times
+
+    times = asyncio.run(run())
+    if set(status) != {200}:
+        raise SystemExit(f"GET {path}: {set(status)}")
+    return times
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def guess(minutes: int, per_second: int, usernames: list) -> int:
+    """Wrong passwords for usernames in turn from one address; returns the ones verify_user saw."""
+    clock = Clock()
+    sessions.login_limits = sessions.TokenBucket(sessions.LOGIN_BURST, sessions.LOGIN_RATE, clock=clock)
+    sessions.address_limits = sessions.TokenBucket(sessions.ADDRESS_BURST, sessions.ADDRESS_RATE, clock=clock)
+    checked = 0
+    verify_user = database.verify_user
+
+    def counting(username, password):
+        nonlocal checked
+        checked += 1
+        return verify_user(username, password)
+
+    database.verify_user = counting
+    try:
+        for i in range(minutes * 60 * per_second):
+            clock.now = i / per_second
+            try:
+                sessions.login(usernames[i % len(usernames)], f"guess{i}", ip="198.51.100.9")
+            except sessions.RateLimited:
+                pass
+    finally:
+        database.verify_user = verify_user
+    return checked
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--calls", type=int, default=20_000)
+    parser.add_argument("--minutes", type=int, default=60, help="simulated minutes of guessing")
+    parser.add_argument("--guesses", type=int, default=100, help="guesses a second")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["SCHEDULE_MANAGER_DB"] = database.DB_FILE = os.path.join(tmp, "bench.db")
+        database.init_db()
+        names = [f"user{i}" for i in range(args.users)]
+        for name in names:
+            database.create_user(name, "bench")
+        tokens = [sessions.login(name, "bench") for name in names]
+        sessions.request_limits = sessions.TokenBucket(10 ** 9, 10 ** 9)  # measure, don't throttle
+        picks = [(tokens[i % len(tokens)],) for i in range(args.calls)]
+
+        rows = [stats("validate, cached", time_calls(sessions.validate, picks))]
+        looked_up = []
+        for (token,) in picks[:min(args.calls, 5000)]:
+            sessions.forget(token)
+            t0 = time.perf_counter_ns()
+            sessions.validate(token)
+            looked_up.append(time.perf_counter_ns() - t0)
+        rows.append(stats("validate, looked up", looked_up))
+        rows.append(stats("verify_user", time_calls(database.verify_user,
+                                                    [(names[i % len(names)], "bench") for i in range(5000)])))
+
+        sys.path.insert(0, os.path.join(APP_DIR, "backend"))
+        from app.main import app
+        token = tokens[0]
+        asgi_times(app, "/", None, 1000)  # warm up
+        asgi_times(app, "/me", token, 1000)
+        plain = asgi_times(app, "/", None, args.calls)
+        authed = asgi_times(app, "/me", token, args.calls)
+        rows += [stats("GET /", plain), stats("GET /me, cached token", authed)]
+        overhead = rows[-1]["p50_us"] - rows[-2]["p50_us"]
+
+        one = guess(args.minutes, args.guesses, [names[0]])
+        spray = guess(args.minutes, args.guesses, names)
+
+    print(f"{args.users:,} users logged in, {args.calls:,} calls per row\n")
+    print_table(rows, COLUMNS)
+    print(f"\nauthentication overhead per request (p50 GET /me - GET /): {overhead:.1f} us "
+          f"(under 100 us: {overhead < 100}); LRU hits {sessions.hits:,}, lookups {sessions.misses:,}")
+    attempts = args.minutes * 60 * args.guesses
+    print(f"{attempts:,} wrong guesses over {args.minutes} simulated minutes from one address: "
+          f"{one:,} reached verify_user at one account, {spray:,} across all {args.users:,} accounts")
+
+
+if __name__ == "__main__":
+    main()
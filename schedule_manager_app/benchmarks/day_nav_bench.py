@@ -0,0 +1,113 @@
+"""
+Day-to-day navigation latency in the Qt calendar, with and without prefetching.
+
+Opens CalendarPage headless on a database of --per-day events a day and
+steps "next day" --steps times, timing each click until the DayView holds
+the new day's events. Between clicks the user "reads" the day for
+--think-ms, which is when the page's EventModel loads in the background.
+It loads whole weeks, so even without prefetching most days are in memory
+already (a hit); with it the weeks either side of the day shown are too.
+
+--delay-ms adds latency to every load, standing in for a slow disk or
+a remote backend; with the default 0 the load is a local SQLite query.
+
+    python benchmarks/day_nav_bench.py --steps 60 --per-day 40 --delay-ms 0 25
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import types
+from datetime import date, timedelta
+
+from _common import insert_events, print_table
+import database
+from undo import UndoJournal
+
+COLUMNS = ["load", "mode", "p50_ms", "p95_ms", "max_ms", "hits", "misses"]
+START = date(2025, 3, 1)
+
+
+def fill(days: int, per_day: int) -> None:
+    database.init_db()
+    insert_events("bench", (
+        (f"Event {i}", (START + timedelta(days=d)).isoformat(), 480 + i * 10, 480 + i * 10 + 30)
+        for d in range(-10, days + 10) for i in range(per_day)
+    ))
+
+
+def run(app, delay_ms: float, prefetch: bool, args) -> dict:
+    from PySide6.QtCore import QDate
+    from calendar_page_qt import CalendarPage
+
+    get_events_between = database.get_events_between
+
+    def load(username, first, last, tz=None):
+        if delay_ms:
+            time.sleep(delay_ms / 1000)
+        return get_events_between(username, first, last, tz)
+
+    database.get_events_between = load  # what the page's EventModel loads with
+    try:
+        page = CalendarPage(types.SimpleNamespace(current_user="bench", clock=None, undo=UndoJournal("bench")))
+    finally:
+        database.get_events_between = get_events_between
+    page.prefetch_days = 7 if prefetch else 0
+    page.resize(900, 700)
+    page.show()
+    page.go_to_day(QDate(START.year, START.month, START.day))
+
+    lat, hits = [], 0
+    for _ in range(args.steps):
+        deadline = time.perf_counter() + args.think_ms / 1000
+        while time.perf_counter() < deadline:  # the user reads the day; Qt and the model's loads run
+            app.processEvents()
+            time.sleep(0.001)
+        day = page.current_date.addDays(1).toString("yyyy-MM-dd")
+        hits += page.events.loaded(day, day)
+        t0 = time.perf_counter()
+        page.next_btn.click()
+        while len(page.day_view.day_layout) != args.per_day:  # drawn once its week has loaded
+            app.processEvents()
+        lat.append((time.perf_counter() - t0) * 1000)
+
+    page.events.close()
+    page.close()
+    page.deleteLater()
+    app.processEvents()
+    lat.sort()
+    return {
+        "load": f"{delay_ms:g} ms",
+        "mode": "prefetch" if prefetch else "on demand",
+        "p50_ms": lat[len(lat) // 2],
+        "p95_ms": lat[int(len(lat) * 0.95)],
+        "max_ms": lat[-1],
+        "hits": hits,
+        "misses": args.steps - hits,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--steps", type=int, default=60)
+    parser.add_argument("--per-day", type=int, default=40)
+    parser.add_argument("--think-ms", type=float, default=150)
+    parser.add_argument("--delay-ms", type=float, nargs="+", default=[0, 25])
+    args = parser.parse_args()
+
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PySide6.QtWidgets import QApplication
+    app = QApplication.instance() or QApplication(sys.argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database.DB_FILE = os.path.join(tmp, "bench.db")
+        fill(args.steps, args.per_day)
+        rows = [run(app, delay, prefetch, args) for delay in args.delay_ms for prefetch in (False, True)]
+
+    print(f"{args.steps} next-day clicks, {args.per_day} events/day, {args.think_ms:g} ms between clicks")
+    print_table(rows, COLUMNS)
+
+
+if __name__ == "__main__":
+    main()
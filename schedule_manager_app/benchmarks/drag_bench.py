@@ -0,0 +1,124 @@
+"""
+Frame time of dragging an event in the Qt DayView.
+
+Opens CalendarPage headless on a day with --events events, presses on one
+event box and drags it --frames mouse moves down (then back up), repainting
+the view after every move, as the screen would each frame. The same is done
+on the bottom edge (resize). Database writes are counted with
+database.add_listener: there must be none during the drag and exactly one
+(the update_event) after the release.
+
+    python benchmarks/drag_bench.py --events 1000 --frames 240
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import types
+
+from _common import insert_events, print_table, synthetic_day
+import database
+from undo import UndoJournal
+
+COLUMNS = ["renderer", "drag", "frames", "p50_ms", "p95_ms", "max_ms", "fps", "writes_during", "writes_after", "save_ms"]
+DAY = "2025-01-06"
+
+
+def drag(app, page, renderer: str, mode: str, args) -> dict:
+    from PySide6.QtCore import QEvent, QPointF, Qt
+    from PySide6.QtGui import QMouseEvent
+
+    dv = page.day_view
+    dv.renderer = renderer
+    page.refresh_view()
+    view = dv.view
+    block = min((b for b in dv.day_layout.blocks() if not b.more),
+                key=lambda b: abs(b.start - 8 * 60))  # one around 8 AM
+    ev = block.events[0]
+    rect = dv.block_rect(block)
+    view.centerOn(rect.center())
+    grab = rect.center() if mode == "move" else QPointF(rect.center().x(), rect.bottom() - 2)
+    pos = QPointF(view.mapFromScene(grab))
+
+    def send(kind, p, button, buttons):
+        app.sendEvent(view.viewport(), QMouseEvent(kind, p, view.viewport().mapToGlobal(p),
+                                                   button, buttons, Qt.NoModifier))
+
+    writes = []
+    listener = lambda op, a: writes.append(op)  # noqa: E731
+    database.add_listener(listener)
+
+    send(QEvent.MouseButtonPress, pos, Qt.LeftButton, Qt.LeftButton)
+    frames = []
+    steps = [1] * (args.frames // 2) + [-1] * (args.frames // 2 - 10)  # down, then most of the way back
+    for step in steps:
+        pos = QPointF(pos.x(), pos.y() + step * args.step_px)
+        t0 = time.perf_counter()
+        send(QEvent.MouseMove, pos, Qt.NoButton, Qt.LeftButton)
+        view.viewport().repaint()
+        frames.append((time.perf_counter() - t0) * 1000)
+    during = len(writes)
+
+    t0 = time.perf_counter()
+    send(QEvent.MouseButtonRelease, pos, Qt.LeftButton, Qt.NoButton)
+    app.processEvents()  # the queued save and reload
+    save_ms = (time.perf_counter() - t0) * 1000
+    database.remove_listener(listener)
+
+    saved = database.get_event(ev.id)
+    assert (saved.start_min, saved.end_min) != (ev.start_min, ev.end_min), "drag was not saved"
+    assert saved.start_min % 15 == 0 or mode == "resize"
+    assert len(dv.day_layout) == args.events
+
+    frames.sort()
+    return {
+        "renderer": renderer,
+        "drag": mode,
+        "frames": len(frames),
+        "p50_ms": frames[len(frames) // 2],
+        "p95_ms": frames[int(len(frames) * 0.95)],
+        "max_ms": frames[-1],
+        "fps": 1000 / (sum(frames) / len(frames)),
+        "writes_during": during,
+        "writes_after": len(writes) - during,
+        "save_ms": save_ms,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--events", type=int, default=1000)
+    parser.add_argument("--frames", type=int, default=240)
+    parser.add_argument("--step-px", type=float, default=3, help="mouse travel per frame")
+    parser.add_argument("--renderer", nargs="+", choices=["layer", "items"], default=["layer", "items"])
+    args = parser.parse_args()
+
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PySide6.QtCore import QDate
+    from PySide6.QtWidgets import QApplication
+    from calendar_page_qt import CalendarPage
+    app = QApplication.instance() or QApplication(sys.argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database.DB_FILE = os.path.join(tmp, "bench.db")
+        database.init_db()
+        insert_events("bench", ((ev.title, ev.date, ev.start_min, ev.end_min) for ev in synthetic_day(args.events)))
+
+        page = CalendarPage(types.SimpleNamespace(current_user="bench", clock=None, undo=UndoJournal("bench")))
+        page.resize(900, 700)
+        page.show()
+        page.go_to_day(QDate.fromString(DAY, "yyyy-MM-dd"))
+        while not page.events.loaded(DAY, DAY):  # the model loads the week in the background
+            app.processEvents()
+        app.processEvents()
+        rows = [drag(app, page, renderer, mode, args) for renderer in args.renderer for mode in ("move", "resize")]
+        page.events.close()
+        page.close()
+
+    print(f"{args.events} events on the day, {args.step_px:g} px per frame")
+    print_table(rows, COLUMNS)
+
+
+if __name__ == "__main__":
+    main()
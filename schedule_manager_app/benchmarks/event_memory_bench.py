@@ -0,0 +1,63 @@
+"""
+Per-event memory of the Event model versus plain tuples and dicts.
+
+Loads N events (default 1,000,000) through the sqlite row factory from an
+in-memory table, and builds the same number of tuples and dicts for comparison.
+Reported bytes/event include the title/date/time strings each row owns.
+
+Usage:
+    python benchmarks/event_memory_bench.py [--count 1000000]
+"""
+import argparse
+import gc
+import sqlite3
+
+from _common import timed, traced, print_table
+from event import row_factory
+from timeutil import format_minutes
+
+COLUMNS = ["shape", "count", "load_ms", "bytes_per_event"]
+
+
+def _fill(conn: sqlite3.Connection, count: int) -> None:
+    conn.execute("CREATE TABLE events (id INTEGER PRIMARY KEY, username TEXT, title TEXT,"
+                 " date TEXT, start TEXT, end TEXT)")
+    conn.executemany(
+        "INSERT INTO events VALUES (?, ?, ?, ?, ?, ?)",
+        ((i, "bench", f"Event {i}", f"2025-{i % 12 + 1:02d}-{i % 28 + 1:02d}",
+          format_minutes(i % 1380), format_minutes(i % 1380 + 60)) for i in range(count)),
+    )
+
+
+def _measure(conn, count: int, shape: str, factory) -> dict:
+    conn.row_factory = factory
+    r = {"shape": shape, "count": count}
+    gc.collect()
+    with traced(r, "kib"), timed(r, "load_ms"):
+        rows = conn.execute("SELECT id, username, title, date, start, end FROM events").fetchall()
+    r["bytes_per_event"] = round(r.pop("kib") * 1024 / max(1, len(rows)), 1)
+    del rows
+    return r
+
+
+def _dict_factory(cursor, row):
+    return {d[0]: v for d, v in zip(cursor.description, row)}
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--count", type=int, default=1_000_000)
+    args = parser.parse_args(argv)
+
+    conn = sqlite3.connect(":memory:")
+    _fill(conn, args.count)
+    results = [
+        _measure(conn, args.count, "tuple", None),
+        _measure(conn, args.count, "dict", _dict_factory),
+        _measure(conn, args.count, "Event (__slots__)", row_factory),
+    ]
+    print_table(results, COLUMNS)
+
+
+if __name__ == "__main__":
+    main()
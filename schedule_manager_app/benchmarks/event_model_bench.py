@@ -0,0 +1,212 @@
+"""
+Events fetched per event shown, with the calendar views sharing one EventModel.
+
+Fills --weeks weeks with --events events, opens CalendarPage headless and
+walks it the way a user would: every month in the month view, every week in
+the week view, every day in the day view, then a search that scrolls to the
+end of the calendar. Every range load the page makes is recorded (the
+model's loader is wrapped), and must have fetched each event exactly once
+however many views showed it.
+
+For comparison the same walk is replayed with each view reading its own
+range from database.py, as the views did before the model: one
+get_events_between per month grid, week and day shown, and the search
+paging through list_events.
+
+Then --edits events are moved, renamed and deleted through the undo journal
+with all this loaded: the model must pick each one up as a row change
+(dataChanged / rowsMoved / rowsRemoved) without loading any range again.
+
+    python benchmarks/event_model_bench.py --events 20000 --weeks 26
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+import types
+from collections import Counter
+from datetime import date, timedelta
+
+from _common import insert_events, print_table
+import database
+from timeutil import format_minutes
+from undo import UndoJournal
+
+COLUMNS = ["reads", "queries", "rows_fetched", "events", "max_per_event"]
+START = date(2025, 1, 6)  # a Monday
+
+
+def fill(events: int, weeks: int, tz: str) -> None:
+    database.init_db()
+    database.create_user("bench", "bench")
+    database.set_user_zone("bench", tz)
+    rng = random.Random(5)
+    insert_events("bench", (
+        (f"Event {i}", (START + timedelta(days=rng.randrange(weeks * 7))).isoformat(), s, s + rng.choice((30, 60)))
+        for i, s in ((i, rng.randrange(0, 1380, 15)) for i in range(events))
+    ))
+
+
+def settle(app, page) -> None:
+    """Let the model finish loading and the views draw what it loaded."""
+    while not page.events.idle():
+        app.processEvents()
+        time.sleep(0.0005)
+    app.processEvents()
+
+
+def walk(app, page, weeks: int) -> dict:
+    """Every month, week and day of the filled range in its view, then a search to the end."""
+    from PySide6.QtCore import QDate, QModelIndex
+    shown = Counter()
+    first = QDate(START.year, START.month, START.day)
+    last = first.addDays(weeks * 7 - 1)
+
+    page.go_to(first)
+    page.switch_view("month")
+    while page.current_date <= last:
+        settle(app, page)
+        shown["month"] += 1
+        page.page_by(1)
+    page.current_date = first
+    page.switch_view("week")
+    while page.current_date <= last:
+        settle(app, page)
+        shown["week"] += 1
+        page.page_by(1)
+    page.current_date = first
+    page.switch_view("day")
+    while page.current_date <= last:
+        settle(app, page)
+        shown["day"] += 1
+        page.page_by(1)
+
+    page.switch_view("search")
+    search = page.content
+    search.query.setText("Event 1")
+    while True:  # scroll to the end, a page at a time
+        settle(app, page)
+        search.results.scrollToBottom()
+        if not search.proxy.canFetchMore(QModelIndex()):
+            break
+        search.proxy.fetchMore(QModelIndex())
+    settle(app, page)
+    shown["search results"] = search.proxy.rowCount()
+    return shown
+
+
+def per_view(weeks: int, tz: str) -> tuple[int, Counter]:
+    """The same walk with every view reading its own range; returns (queries, rows fetched per event)."""
+    fetched, queries = Counter(), 0
+    first, last = START, START + timedelta(days=weeks * 7 - 1)
+
+    def read(a: date, b: date):
+        nonlocal queries
+        queries += 1
+        fetched.update(ev.id for ev in database.get_events_between("bench", a.isoformat(), b.isoformat(), tz))
+
+    month = date(first.year, first.month, 1)
+    while month <= last:
+        read(month - timedelta(days=7), month + timedelta(days=41))
+        month = date(month.year + month.month // 12, month.month % 12 + 1, 1)
+    for w in range(weeks):
+        read(first + timedelta(weeks=w), first + timedelta(weeks=w, days=6))
+    for d in range(weeks * 7):
+        read(first + timedelta(days=d), first + timedelta(days=d))
+    key = None
+    while True:
+        page, key = database.list_events("bench", key, 200)
+        queries += 1
+        fetched.update(ev.id for ev in page)
+        if key is None:
+            break
+    return queries, fetched
+
+
+def edits(app, page, n: int, rng: random.Random) -> dict:
+    """Move, rename and delete n loaded events; count the model's signals and range loads."""
+    model = page.events
+    signals = Counter()
+    for name in ("dataChanged", "rowsMoved", "rowsInserted", "rowsRemoved", "modelReset"):
+        getattr(model, name).connect(lambda *_, name=name: signals.update([name]))
+    queries = model.queries
+    rows_ok = True
+    for i in range(n):
+        ev = rng.choice(model.events_between(START.isoformat(), "9999"))
+        kind = ("move", "rename", "delete")[i % 3]
+        if kind == "delete":
+            page.app.undo.delete(ev)
+        else:
+            day = (date.fromisoformat(ev.date) + timedelta(days=rng.choice((-1, 1)) if kind == "move" else 0))
+            start = rng.randrange(0, 1380, 15) if kind == "move" else ev.start_min
+            title = ev.title + "'" if kind == "rename" else ev.title
+            page.app.undo.update(ev, title, day.isoformat(), format_minutes(start), format_minutes(start + 30))
+        app.processEvents()
+        shown = {e.id: (e.title, e.date, e.start_min) for e in model.events_between(START.isoformat(), "9999")}
+        now = database.get_event(ev.id, tz=model.tz)
+        if now is not None and model.loaded(now.date, now.date):
+            rows_ok &= shown.get(ev.id) == (now.title, now.date, now.start_min)
+        else:  # deleted, or moved to a week not loaded
+            rows_ok &= ev.id not in shown
+    return {"signals": dict(signals), "range_loads": model.queries - queries, "rows_ok": rows_ok}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--events", type=int, default=20_000)
+    parser.add_argument("--weeks", type=int, default=26)
+    parser.add_argument("--edits", type=int, default=300)
+    args = parser.parse_args()
+
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PySide6.QtWidgets import QApplication
+    from calendar_page_qt import CalendarPage
+    import zones
+    app = QApplication.instance() or QApplication(sys.argv)
+    tz = zones.local_zone()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database.DB_FILE = os.path.join(tmp, "bench.db")
+        fill(args.events, args.weeks, tz)
+
+        fetched, queries = Counter(), 0
+        get_events_between = database.get_events_between
+
+        def load(username, first, last, tz=None):
+            nonlocal queries
+            events = get_events_between(username, first, last, tz)
+            queries += 1
+            fetched.update(ev.id for ev in events)
+            return events
+
+        database.get_events_between = load  # what the page's EventModel loads with
+        try:
+            page = CalendarPage(types.SimpleNamespace(current_user="bench", clock=None, undo=UndoJournal("bench")))
+        finally:
+            database.get_events_between = get_events_between
+        page.resize(1100, 800)
+        page.show()
+        shown = walk(app, page, args.weeks)
+        direct_queries, direct = per_view(args.weeks, tz)
+        edited = edits(app, page, args.edits, random.Random(8))
+        page.events.close()
+        page.close()
+
+    print(f"{args.events:,} events over {args.weeks} weeks; shown: "
+          + ", ".join(f"{n} {what}" for what, n in shown.items()) + "\n")
+    print_table([
+        {"reads": "shared EventModel", "queries": queries, "rows_fetched": sum(fetched.values()),
+         "events": len(fetched), "max_per_event": max(fetched.values(), default=0)},
+        {"reads": "each view reads", "queries": direct_queries, "rows_fetched": sum(direct.values()),
+         "events": len(direct), "max_per_event": max(direct.values(), default=0)},
+    ], COLUMNS)
+    print(f"\nevery event fetched exactly once by the model: {set(fetched.values()) == {1}} "
+          f"({len(fetched):,} of {args.events:,} events loaded)")
+    print(f"{args.edits} edits: {edited['signals']}, ranges loaded again: {edited['range_loads']}, "
+          f"rows match the database: {edited['rows_ok']}")
+
+
+if __name__ == "__main__":
+    main()
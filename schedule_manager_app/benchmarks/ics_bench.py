@@ -0,0 +1,77 @@
+"""
+.ics import/export throughput.
+
+Writes a synthetic calendar of N events (default 1,000,000) to a temporary
+file, imports it with ics.import_ics and exports it again with ics.export_ics,
+reporting events/s and the resident memory growth of each phase (flat memory
+means the streaming really streams).
+
+Usage:
+    python benchmarks/ics_bench.py [--count 1000000] [--batch-size 5000]
+"""
+import argparse
+import os
+import random
+import tempfile
+from datetime import date, timedelta
+
+from _common import ensure_user, timed, rss_kib, print_table
+import database
+import ics
+
+COLUMNS = ["phase", "events", "file_mb", "seconds", "events_per_s", "rss_growth_kib"]
+
+
+def write_calendar(path: str, count: int) -> None:
+    rng = random.Random(7)
+    base = date(2020, 1, 1)
+    with open(path, "w", encoding="utf-8", newline="") as fp:
+        fp.write("BEGIN:VCALENDAR\r\nVERSION:2.0\r\nPRODID:-//bench//EN\r\n")
+        for i in range(count):
+            day = (base + timedelta(days=rng.randrange(2000))).strftime("%Y%m%d")
+            h, m = rng.randrange(23), rng.choice((0, 15, 30, 45))
+            fp.write(
+                f"BEGIN:VEVENT\r\nUID:{i}@bench\r\nDTSTAMP:20250101T000000Z\r\n"
+                f"DTSTART:{day}T{h:02d}{m:02d}00\r\nDURATION:PT{rng.choice((15, 30, 60))}M\r\n"
+                f"SUMMARY:Imported event {i}\\, with a comma\r\nEND:VEVENT\r\n"
+            )
+        fp.write("END:VCALENDAR\r\n")
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--count", type=int, default=1_000_000)
+    parser.add_argument("--batch-size", type=int, default=ics.BATCH_SIZE)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database.DB_FILE = os.path.join(tmp, "bench.db")
+        database.init_db()
+        ensure_user("bench")
+        src, dst = os.path.join(tmp, "in.ics"), os.path.join(tmp, "out.ics")
+        write_calendar(src, args.count)
+
+        results = []
+        r = {"phase": "import", "file_mb": os.path.getsize(src) / 2**20}
+        before = rss_kib()
+        with timed(r, "ms"), open(src, encoding="utf-8", newline="") as fp:
+            r["events"] = ics.import_ics("bench", fp, batch_size=args.batch_size)
+        r["rss_growth_kib"] = (rss_kib() or 0) - (before or 0)
+        results.append(r)
+
+        r = {"phase": "export", "events": args.count}
+        before = rss_kib()
+        with timed(r, "ms"), open(dst, "w", encoding="utf-8", newline="") as fp:
+            ics.export_ics("bench", fp)
+        r["file_mb"] = os.path.getsize(dst) / 2**20
+        r["rss_growth_kib"] = (rss_kib() or 0) - (before or 0)
+        results.append(r)
+
+        for r in results:
+            r["seconds"] = r.pop("ms") / 1000
+            r["events_per_s"] = round(r["events"] / r["seconds"])
+        print_table(results, COLUMNS)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Load and paint time of dense days in the Qt DayView at several zoom levels.
+
+For each --events count, draws a day of random (heavily overlapping) events
+with DayView.load_events, then at each --zoom level scrolls the view from
+midnight to midnight in --step-px steps, repainting the viewport after every
+step, as the screen would while the user scrolls. Reports the load time, the
+mean and worst frame, and how many scene items the day needed.
+
+    python benchmarks/lod_bench.py --events 100 500 1000 --zoom 0.5 1 2
+"""
+import argparse
+import os
+import sys
+import time
+
+from _common import print_table, synthetic_day
+
+COLUMNS = ["events", "zoom", "items", "load_ms", "frames", "frame_ms", "max_frame_ms", "fps"]
+
+
+def scroll(app, dv, step_px: int) -> list[float]:
+    bar = dv.view.verticalScrollBar()
+    bar.setValue(0)
+    app.processEvents()
+    frames = []
+    for value in range(0, bar.maximum() + 1, step_px):
+        t0 = time.perf_counter()
+        bar.setValue(value)
+        dv.view.viewport().repaint()
+        frames.append((time.perf_counter() - t0) * 1000)
+    return frames
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--events", type=int, nargs="+", default=[100, 500, 1000])
+    parser.add_argument("--zoom", type=float, nargs="+", default=[0.5, 1, 2])
+    parser.add_argument("--step-px", type=int, default=40, help="scroll per frame")
+    args = parser.parse_args()
+
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PySide6.QtCore import QDate
+    from PySide6.QtWidgets import QApplication
+    from views.day_view_qt import DayView
+    app = QApplication.instance() or QApplication(sys.argv)
+
+    rows = []
+    for n in args.events:
+        events = synthetic_day(n)
+        for zoom in args.zoom:
+            dv = DayView(date=QDate(2025, 1, 6))
+            dv.resize(900, 700)
+            dv.show()
+            dv.set_zoom(zoom)
+            app.processEvents()
+            t0 = time.perf_counter()
+            dv.load_events(events)
+            load_ms = (time.perf_counter() - t0) * 1000
+            scroll(app, dv, args.step_px)  # warm-up: first paint of each item fills its cache
+            frames = scroll(app, dv, args.step_px)
+            rows.append({
+                "events": n,
+                "zoom": zoom,
+                "items": len(dv.scene.items()),
+                "load_ms": load_ms,
+                "frames": len(frames),
+                "frame_ms": sum(frames) / len(frames),
+                "max_frame_ms": max(frames),
+                "fps": 1000 * len(frames) / sum(frames),
+            })
+            dv.close()
+            dv.deleteLater()
+            app.processEvents()
+
+    print(f"scrolling a whole day, {args.step_px} px per frame")
+    print_table(rows, COLUMNS)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Lost updates under concurrent read-modify-write, blind vs version-checked.
+
+--procs processes each increment a counter kept in one event's title
+--increments times (get_event, +1, update_event). Blind updates overwrite each
+other; version-checked updates retry on ConflictError, so the final count must
+equal procs * increments. Also reports the SQL statements each update_event
+issues: one in the common case, plus one SELECT only when it conflicts.
+
+    python benchmarks/occ_stress_bench.py --procs 8 --increments 200
+"""
+import argparse
+import multiprocessing
+import os
+import tempfile
+import time
+
+from _common import ensure_user, print_table
+import database
+import instrumentation
+
+DAY = "2025-01-06"
+
+
+def _worker(db_file: str, event_id: int, increments: int, checked: bool) -> dict:
+    database.DB_FILE = db_file
+    instrumentation.enable(slow_ms=1e9)
+    conflicts = 0
+    done = 0
+    while done < increments:
+        ev = database.get_event(event_id)
+        count = int(ev.title.split()[1])
+        try:
+            database.update_event(event_id, f"count {count + 1}", ev.date, ev.start, ev.end,
+                                  ev.version if checked else None)
+            done += 1
+        except database.ConflictError:
+            conflicts += 1
+    sql = instrumentation.stats()["sql"]
+    updates = sum(s["count"] for stmt, s in sql.items() if stmt.startswith("UPDATE events"))
+    return {"conflicts": conflicts, "update_calls": done + conflicts, "update_sql": updates}
+
+
+def run(label: str, args, checked: bool) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        database.DB_FILE = os.path.join(tmp, "occ.db")
+        database.init_db()
+        ensure_user("bench")
+        eid = database.add_event("bench", "count 0", DAY, "09:00 AM", "10:00 AM")
+
+        t0 = time.perf_counter()
+        with multiprocessing.Pool(args.procs) as pool:
+            results = pool.starmap(_worker, [(database.DB_FILE, eid, args.increments, checked)] * args.procs)
+        elapsed = time.perf_counter() - t0
+        final = int(database.get_event(eid).title.split()[1])
+
+    expected = args.procs * args.increments
+    calls = sum(r["update_calls"] for r in results)
+    conflicts = sum(r["conflicts"] for r in results)
+    statements = sum(r["update_sql"] for r in results) + conflicts  # + the SELECT after each conflict
+    return {
+        "mode": label,
+        "expected": expected,
+        "final": final,
+        "lost": expected - final,
+        "conflicts": conflicts,
+        "sql/update": statements / calls,
+        "updates/s": expected / elapsed,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--procs", type=int, default=8)
+    parser.add_argument("--increments", type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"{args.procs} processes x {args.increments} increments of one event")
+    rows = [run("blind", args, False), run("versioned", args, True)]
+    print_table(rows, ["mode", "expected", "final", "lost", "conflicts", "sql/update", "updates/s"])
+
+    solo = argparse.Namespace(procs=1, increments=args.increments)
+    row = run("versioned, 1 process", solo, True)
+    print(f"\nuncontended: {row['sql/update']:.2f} SQL statements per update_event, {row['conflicts']} conflicts")
+
+
+if __name__ == "__main__":
+    main()
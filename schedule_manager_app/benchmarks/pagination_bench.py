@@ -0,0 +1,92 @@
+"""
+Keyset versus OFFSET pagination over one user's history.
+
+Fills a temporary database with N events for one user (default 1,000,000,
+plus other users' rows around them) and times fetching pages 1, 10, 100,
+1,000 and 10,000 (page size 50) with database.list_events' keyset cursor and
+with the equivalent LIMIT/OFFSET query.
+
+Usage:
+    python benchmarks/pagination_bench.py [--count 1000000] [--page-size 50]
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+from datetime import date, timedelta
+
+from _common import insert_events, print_table
+import database
+
+COLUMNS = ["page", "keyset_ms", "offset_ms", "plan"]
+PAGES = (1, 10, 100, 1_000, 10_000)
+
+
+def fill(count: int) -> None:
+    rng = random.Random(3)
+    base = date(2000, 1, 1)
+
+    def rows(n):
+        for i in range(n):
+            s = rng.randrange(1380)
+            yield f"Event {i}", (base + timedelta(days=rng.randrange(9000))).isoformat(), s, s + 30
+
+    database.init_db()
+    insert_events("bench", rows(count))
+    insert_events("someone-else", rows(count // 10))
+
+
+def _best_of(fn, repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, (time.perf_counter() - t0) * 1000)
+    return best
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--count", type=int, default=1_000_000)
+    parser.add_argument("--page-size", type=int, default=50)
+    args = parser.parse_args(argv)
+    size = args.page_size
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database.DB_FILE = os.path.join(tmp, "bench.db")
+        fill(args.count)
+
+        # walk the keyset chain once, remembering the cursor that starts each measured page
+        cursors, key, page = {}, None, 1
+        while page <= max(PAGES) and (page == 1 or key is not None):
+            if page in PAGES:
+                cursors[page] = key
+            _, key = database.list_events("bench", key, size)
+            page += 1
+
+        with database._get_conn() as conn:
+            plan = " / ".join(r[-1] for r in conn.execute(
+                "EXPLAIN QUERY PLAN SELECT id FROM events WHERE user_id = ? AND (date, start_min, id) > (?, ?, ?)"
+                " ORDER BY date, start_min, id LIMIT ?", (database.user_id("bench"), "2000-01-01", 0, 0, size)))
+
+        results = []
+        for page, cursor in cursors.items():
+            def offset_page():
+                with database._get_conn() as conn:
+                    conn.execute(
+                        f"SELECT {database.EVENT_COLUMNS} FROM events WHERE user_id = ?"
+                        " ORDER BY date, start_min, id LIMIT ? OFFSET ?",
+                        (database.user_id("bench"), size, (page - 1) * size),
+                    ).fetchall()
+            results.append({
+                "page": page,
+                "keyset_ms": _best_of(lambda: database.list_events("bench", cursor, size)),
+                "offset_ms": _best_of(offset_page),
+                "plan": plan if page == 1 else "",
+            })
+        print_table(results, COLUMNS)
+
+
+if __name__ == "__main__":
+    main()
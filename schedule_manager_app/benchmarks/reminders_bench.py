@@ -0,0 +1,241 @@
+"""
+Reminder scheduler on a simulated clock over a million pending reminders.
+
+Fills --events events for --users users spread over the next year, each with
+reminders 10 and 60 minutes before it (2 x --events reminders, all pending),
+then runs a ReminderScheduler for every user on a simulated clock for
+--days days: timers fire instantly in due order and now() follows them, so
+days pass in seconds. Meanwhile --writes random edits land at random
+simulated times (events moved, deleted and added, reminders changed), always
+to reminders that are still in the future.
+
+Afterwards every reminder the table holds with a due minute inside the run
+must have fired exactly once, at its minute, and nothing else may have
+fired. Reports the start-up load, the heap's high-water mark, the queries
+made and the simulated-days-per-second rate, next to the cost of the
+alternative of polling the table once a minute.
+
+    python benchmarks/reminders_bench.py --events 500000 --days 2 --writes 2000
+"""
+import argparse
+import heapq
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+from _common import ensure_user, insert_events, print_table
+import database
+from reminders import ReminderScheduler, to_minute
+from timeutil import format_minutes
+
+START = datetime(2025, 6, 30, tzinfo=timezone.utc)
+OFFSETS = (10, 60)
+COLUMNS = ["what", "queries_per_day", "query_ms_per_day", "held_in_memory"]
+
+
+class SimClock:
+    """call_later/cancel/now over simulated time; run() fires the timers in order."""
+
+    def __init__(self, now: datetime):
+        self.now = now
+        self._timers = []
+        self._seq = 0
+        self.fired = 0
+
+    def call_later(self, delay_ms, callback):
+        self._seq += 1
+        timer = [self.now + timedelta(milliseconds=delay_ms), self._seq, callback]
+        heapq.heappush(self._timers, timer)
+        return timer
+
+    def cancel(self, timer) -> None:
+        timer[2] = None
+
+    def run(self, until: datetime) -> None:
+        while self._timers and self._timers[0][0] < until:
+            at, _, callback = heapq.heappop(self._timers)
+            if callback is not None:
+                self.now = at
+                self.fired += 1
+                callback()
+        self.now = until
+
+
+def fill(events: int, users: list[str]) -> dict[int, tuple[int, tuple]]:
+    """Insert the events and their reminders; returns event id -> (start minute, offsets)."""
+    rng = random.Random(1)
+    per_user = events // len(users)
+    for u in users:
+        ensure_user(u)
+        database.set_user_zone(u, "UTC")
+        insert_events(u, ((f"Event {i}", (START + timedelta(days=rng.randrange(365))).date().isoformat(), s, s + 30)
+                          for i, s in ((i, rng.randrange(1380)) for i in range(per_user))))
+    with database._get_conn() as conn:
+        conn.execute(
+            "INSERT INTO reminders (event_id, user_id, offset_min, due_min)"
+            " SELECT id, user_id, o.m, start_utc - o.m FROM events,"
+            f" ({' UNION ALL '.join(f'SELECT {m} AS m' for m in OFFSETS)}) o"
+        )
+        conn.commit()
+        return {event_id: (minute, OFFSETS) for event_id, minute in
+                conn.execute("SELECT id, start_utc FROM events")}
+
+
+def _when(minute: int) -> tuple[str, str, str]:
+    """(date, start, end) of a 30 minute event starting at UTC minute (clipped to its day); users are on UTC."""
+    day = START + timedelta(minutes=minute - to_minute(START))
+    start = day.hour * 60 + day.minute
+    return day.date().isoformat(), format_minutes(start), format_minutes(min(start + 30, 1439))
+
+
+def random_write(rng, clock: SimClock, known: dict, users: list[str], span: int) -> str:
+    """One edit that only touches reminders due two or more minutes from now."""
+    now = to_minute(clock.now)
+    op = rng.choice(("move", "delete", "add", "set_reminders"))
+    if op == "add":
+        offsets = (rng.choice((0, 5, 15)),)
+        minute = now + 2 + offsets[0] + rng.randrange(span)
+        event_id = database.add_event(rng.choice(users), "Added", *_when(minute), reminders=offsets)
+        known[event_id] = (minute, offsets)
+        return op
+    # an event none of whose reminders (current or as set below) has come due yet, near enough to matter
+    for _ in range(1000):
+        event_id = rng.randrange(1, len(known) + 1)
+        minute, offsets = known.get(event_id, (0, ()))
+        if offsets and now + 2 <= minute - max(offsets[-1], 45) < now + span:
+            break
+    else:
+        return "skipped"
+    if op == "move":
+        minute = now + 2 + offsets[-1] + rng.randrange(span)
+        database.update_event(event_id, "Moved", *_when(minute))
+        known[event_id] = (minute, offsets)
+    elif op == "delete":
+        database.delete_event(event_id)
+        del known[event_id]
+    else:
+        offsets = tuple(sorted(rng.sample((0, 5, 30, 45), rng.randrange(3))))
+        database.set_reminders(event_id, offsets)
+        known[event_id] = (minute, offsets)
+    return op
+
+
+def poll_cost(repeat: int) -> tuple[float, float]:
+    """ms of one minute's poll: by the due_min index, and computing due from the events rows."""
+    minute = to_minute(START) + 600
+    with database._get_conn() as conn:
+        t0 = time.perf_counter()
+        for k in range(repeat):
+            conn.execute("SELECT event_id, offset_min FROM reminders WHERE due_min = ?", (minute + k,)).fetchall()
+        indexed = (time.perf_counter() - t0) * 1000 / repeat
+        t0 = time.perf_counter()
+        for k in range(3):
+            conn.execute(
+                "SELECT r.event_id, r.offset_min FROM reminders r JOIN events e ON e.id = r.event_id"
+                " WHERE CAST(julianday(e.date) * 1440 AS INTEGER) - 3514446000 + e.start_min"
+                " - r.offset_min = ?", (minute + k,)).fetchall()
+        scan = (time.perf_counter() - t0) * 1000 / 3
+    return indexed, scan
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--events", type=int, default=500_000, help="events; each has two reminders")
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--days", type=float, default=2, help="simulated days")
+    parser.add_argument("--writes", type=int, default=2000, help="random edits during the run")
+    parser.add_argument("--window", type=int, default=60, help="scheduler window (minutes)")
+    args = parser.parse_args()
+    users = [f"user{i}" for i in range(args.users)]
+    end = START + timedelta(days=args.days)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database.DB_FILE = os.path.join(tmp, "bench.db")
+        database.init_db()
+        t0 = time.perf_counter()
+        known = fill(args.events, users)
+        fill_s = time.perf_counter() - t0
+        with database._get_conn() as conn:
+            total = conn.execute("SELECT COUNT(*) FROM reminders").fetchone()[0]
+
+        clock = SimClock(START)
+        fired = []
+        peak = [0]
+
+        def fire(reminder, ev):
+            fired.append((reminder.event_id, reminder.offset_min, reminder.due_min, clock.now))
+
+        scheduler = ReminderScheduler(clock.call_later, clock.cancel, fire, now=lambda: clock.now,
+                                      window_min=args.window)
+        select, query_s = scheduler._select, [0.0]
+
+        def timed_select(*a):  # the scheduler's own queries, without firing and the edits
+            t0 = time.perf_counter()
+            try:
+                return select(*a)
+            finally:
+                query_s[0] += time.perf_counter() - t0
+        scheduler._select = timed_select
+        load_window, windows = scheduler._load_window, [0]
+
+        def counted_load(until):
+            windows[0] += 1
+            load_window(until)
+        scheduler._load_window = counted_load
+
+        def sample_peak():  # the heap's high-water mark, once a simulated minute
+            peak[0] = max(peak[0], scheduler.pending)
+            if clock.now < end:
+                clock.call_later(60_000, sample_peak)
+
+        rng = random.Random(7)
+        span_ms = int(args.days * 86_400_000)
+        writes: dict[str, int] = {}
+
+        def write():
+            op = random_write(rng, clock, known, users, span=180)
+            writes[op] = writes.get(op, 0) + 1
+
+        for _ in range(args.writes):
+            clock.call_later(rng.randrange(span_ms), write)
+
+        t0 = time.perf_counter()
+        scheduler.start()
+        start_ms = (time.perf_counter() - t0) * 1000
+        sample_peak()
+        t0 = time.perf_counter()
+        clock.run(end)
+        run_s = time.perf_counter() - t0
+        scheduler.stop()
+
+        with database._get_conn() as conn:
+            expected = set(conn.execute(
+                "SELECT event_id, offset_min, due_min FROM reminders WHERE due_min >= ? AND due_min < ?",
+                (to_minute(START), to_minute(end))))
+        got = [(event_id, offset, due) for event_id, offset, due, _ in fired]
+        late = [when - START - timedelta(minutes=due - to_minute(START)) for _, _, due, when in fired]
+        indexed_ms, scan_ms = poll_cost(200)
+
+    per_day = 1 / args.days
+    print(f"{total:,} pending reminders of {args.users} users over a year; filled in {fill_s:.1f}s")
+    print(f"simulated {args.days:g} days in {run_s:.2f}s ({args.days / run_s:.1f} days/s), "
+          f"{clock.fired:,} timer callbacks; start-up load {start_ms:.1f} ms")
+    print(f"writes: {', '.join(f'{n} {op}' for op, n in sorted(writes.items()))}")
+    print(f"fired {len(got):,}, expected {len(expected):,}: missed {len(expected - set(got))}, "
+          f"extra {len(set(got) - expected)}, duplicates {len(got) - len(set(got))}, "
+          f"latest {max(late, default=timedelta(0)).total_seconds():.1f}s after due\n")
+    print_table([
+        {"what": f"heap, {args.window} min window", "queries_per_day": round(scheduler.loads * per_day),
+         "query_ms_per_day": query_s[0] * 1000 * per_day, "held_in_memory": peak[0]},
+        {"what": "poll due_min each minute", "queries_per_day": 1440, "query_ms_per_day": indexed_ms * 1440,
+         "held_in_memory": 0},
+        {"what": "poll without due_min", "queries_per_day": 1440, "query_ms_per_day": scan_ms * 1440,
+         "held_in_memory": 0},
+    ], COLUMNS)
+    print(f"\n(the heap's queries: {windows[0]} window loads, {scheduler.loads - windows[0]} reloads after edits)")
+
+
+if __name__ == "__main__":
+    main()
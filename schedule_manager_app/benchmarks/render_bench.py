@@ -0,0 +1,113 @@
+"""
+Headless rendering benchmark for DayView (Qt) and Timeline (Tk).
+
+Loads synthetic days of 10/100/1,000/10,000 events and records, per size:
+  layout_ms  time spent in DayView.load_events / Timeline.draw_events
+  items      scene/canvas items after the load
+  paint_ms   time to paint the full day once
+  py_kib     peak Python allocation during the load (tracemalloc)
+  rss_kib    resident set size after the load
+
+Usage:
+    python benchmarks/render_bench.py                 # Qt, offscreen platform
+    xvfb-run -a python benchmarks/render_bench.py --toolkit tk
+"""
+import argparse
+import os
+import sys
+
+from _common import synthetic_day, timed, traced, rss_kib, print_table
+
+SIZES = (10, 100, 1_000, 10_000)
+COLUMNS = ["size", "layout_ms", "items", "paint_ms", "py_kib", "rss_kib"]
+
+
+# ---- Qt (DayView) ----------------------------------------------------------
+def bench_qt(sizes, repeat: int) -> list[dict]:
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PySide6.QtWidgets import QApplication
+    from PySide6.QtGui import QImage, QPainter, QColor
+    from PySide6.QtCore import QDate
+    from views.day_view_qt import DayView
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    results = []
+    for size in sizes:
+        events = synthetic_day(size)
+        best = None
+        for _ in range(repeat):
+            view = DayView(None, QDate(2025, 1, 6))
+            view.resize(800, 600)
+            r = {"size": size}
+            with traced(r, "py_kib"), timed(r, "layout_ms"):
+                view.load_events(events)
+            r["items"] = len(view.scene.items())
+
+            rect = view.scene.sceneRect()
+            image = QImage(int(rect.width()), int(rect.height()), QImage.Format_ARGB32_Premultiplied)
+            image.fill(QColor("white"))
+            with timed(r, "paint_ms"):
+                painter = QPainter(image)
+                view.scene.render(painter)
+                painter.end()
+            r["rss_kib"] = rss_kib()
+            app.processEvents()
+            view.deleteLater()
+            if best is None or r["layout_ms"] + r["paint_ms"] < best["layout_ms"] + best["paint_ms"]:
+                best = r
+        results.append(best)
+    return results
+
+
+# ---- Tk (Timeline) ---------------------------------------------------------
+def bench_tk(sizes, repeat: int) -> list[dict]:
+    if not os.environ.get("DISPLAY") and sys.platform.startswith("linux"):
+        sys.exit("Tk needs a display: run under Xvfb, e.g. `xvfb-run -a python benchmarks/render_bench.py --toolkit tk`")
+    import tkinter as tk
+    from ui.pages.today_page import Timeline
+
+    root = tk.Tk()
+    root.geometry("800x600")
+    results = []
+    for size in sizes:
+        rows = synthetic_day(size)
+        best = None
+        for _ in range(repeat):
+            timeline = Timeline(root, pixels_per_hour=60)
+            timeline.pack(fill="both", expand=True)
+            root.update()
+            r = {"size": size}
+            with traced(r, "py_kib"), timed(r, "layout_ms"):
+                timeline.draw_events(rows)
+            r["items"] = len(timeline.canvas.find_all())
+            with timed(r, "paint_ms"):
+                root.update_idletasks()
+                root.update()
+            r["rss_kib"] = rss_kib()
+            timeline.destroy()
+            if best is None or r["layout_ms"] + r["paint_ms"] < best["layout_ms"] + best["paint_ms"]:
+                best = r
+        results.append(best)
+    root.destroy()
+    return results
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--toolkit", choices=("qt", "tk", "both"), default="qt")
+    parser.add_argument("--sizes", default=",".join(map(str, SIZES)),
+                        help="comma separated event counts (default: %(default)s)")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per size, best is reported")
+    args = parser.parse_args(argv)
+    sizes = [int(s) for s in args.sizes.split(",") if s]
+
+    if args.toolkit in ("qt", "both"):
+        print("== Qt DayView (offscreen) ==")
+        print_table(bench_qt(sizes, args.repeat), COLUMNS)
+    if args.toolkit in ("tk", "both"):
+        print("== Tk Timeline ==")
+        print_table(bench_tk(sizes, args.repeat), COLUMNS)
+
+
+if __name__ == "__main__":
+    main()
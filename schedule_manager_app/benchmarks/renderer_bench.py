@@ -0,0 +1,113 @@
+"""
+Memory, load, frame and hit-test times of the two DayView renderers.
+
+"items" draws a QGraphicsItem per block of the day's layout; "layer" draws
+the whole day with one EventLayer that paints only the exposed blocks and
+hit-tests through the layout's index. For each renderer and --zoom level,
+loads a day of --events events, scrolls it from midnight to midnight in
+--step-px steps repainting every step, then resolves --hits random points
+to the event under them (what a double-click does).
+
+rss_kib is the growth of the process between before the load and after the
+scroll (scene items, caches and their Python wrappers).
+
+    python benchmarks/renderer_bench.py --events 10000 --zoom 1 4
+"""
+import argparse
+import gc
+import os
+import random
+import sys
+import time
+
+from _common import print_table, rss_kib, synthetic_day
+
+COLUMNS = ["renderer", "zoom", "blocks", "items", "rss_kib", "load_ms", "frame_ms", "max_frame_ms", "hit_us"]
+
+
+def hit_tester(dv):
+    """A function from a scene point to the event id under it, the way the renderer resolves a double-click."""
+    from PySide6.QtGui import QTransform
+    from views.day_view_qt import EventBox, EventLayer
+
+    def hit(point):
+        item = dv.scene.itemAt(point, QTransform())
+        if isinstance(item, EventLayer):
+            block = item.block_at(point)
+            return block.events[0].id if block is not None and not block.more else None
+        return item.event_id if isinstance(item, EventBox) else None
+    return hit
+
+
+def run(app, renderer: str, zoom: float, events: list, args) -> dict:
+    from PySide6.QtCore import QDate, QPointF
+    from views.day_view_qt import EVENTS_WIDTH, DayView
+
+    dv = DayView(date=QDate(2025, 1, 6), renderer=renderer)
+    dv.resize(900, 700)
+    dv.show()
+    dv.set_zoom(zoom)
+    app.processEvents()
+    gc.collect()
+    rss0 = rss_kib()
+
+    t0 = time.perf_counter()
+    dv.load_events(events)
+    load_ms = (time.perf_counter() - t0) * 1000
+
+    bar = dv.view.verticalScrollBar()
+    frames = []
+    for value in range(0, bar.maximum() + 1, args.step_px):
+        t0 = time.perf_counter()
+        bar.setValue(value)
+        dv.view.viewport().repaint()
+        frames.append((time.perf_counter() - t0) * 1000)
+    rss = rss_kib() - rss0 if rss0 is not None else None
+
+    rng = random.Random(3)
+    points = [QPointF(dv.time_column_width + rng.random() * EVENTS_WIDTH, rng.random() * 24 * 60 * dv.pixels_per_minute)
+              for _ in range(args.hits)]
+    hit = hit_tester(dv)
+    t0 = time.perf_counter()
+    for p in points:
+        hit(p)
+    hit_us = (time.perf_counter() - t0) * 1e6 / len(points)
+
+    row = {
+        "renderer": renderer,
+        "zoom": zoom,
+        "blocks": sum(1 for _ in dv.day_layout.blocks()),
+        "items": len(dv.scene.items()),
+        "rss_kib": rss,
+        "load_ms": load_ms,
+        "frame_ms": sum(frames) / len(frames),
+        "max_frame_ms": max(frames),
+        "hit_us": hit_us,
+    }
+    dv.close()
+    dv.deleteLater()
+    app.processEvents()
+    return row
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--events", type=int, default=10_000)
+    parser.add_argument("--zoom", type=float, nargs="+", default=[1, 4])
+    parser.add_argument("--step-px", type=int, default=40, help="scroll per frame")
+    parser.add_argument("--hits", type=int, default=2000, help="points hit-tested")
+    args = parser.parse_args()
+
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PySide6.QtWidgets import QApplication
+    app = QApplication.instance() or QApplication(sys.argv)
+
+    events = synthetic_day(args.events)
+    rows = [run(app, renderer, zoom, events, args) for zoom in args.zoom for renderer in ("items", "layer")]
+
+    print(f"{args.events:,} events on one day, scrolling {args.step_px} px per frame")
+    print_table(rows, COLUMNS)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Write throughput vs. number of shard files.
+
+--procs writer processes, each logged in as its own user, add events (one
+transaction each, like the apps do) for --seconds. Users are spread over the
+shards with directory placement, so with one shard every process contends
+for the same write lock and with N shards only procs/N of them do.
+
+Afterwards one user is moved to another shard while its process keeps
+writing, and every event it wrote must be found in the new shard.
+
+    python benchmarks/shard_bench.py --procs 8 --shards 1 2 4 8 --seconds 5
+"""
+import argparse
+import multiprocessing
+import os
+import tempfile
+import time
+
+from _common import ensure_user, print_table
+import database
+import shards
+
+DAY = "2025-01-06"
+
+
+def _writer(db_file: str, count: int, username: str, seconds: float, start, results) -> None:
+    database.DB_FILE = db_file
+    database.enable_sharding(shards.open_shards(count, "directory"))
+    start.wait()
+    n = 0
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        database.add_event(username, f"event {n}", DAY, "09:00 AM", "10:00 AM")
+        n += 1
+    results.put((username, n))
+
+
+def run(count: int, args) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        db_file = os.path.join(tmp, "main.db")
+        database.DB_FILE = db_file
+        database.init_db()
+        router = shards.open_shards(count, "directory")
+        users = [f"user{i}" for i in range(args.procs)]
+        for u in users:
+            ensure_user(u)
+            router.shard_for_user(u)  # place everyone up front
+
+        start = multiprocessing.Event()
+        results = multiprocessing.Queue()
+        procs = [multiprocessing.Process(target=_writer, args=(db_file, count, u, args.seconds, start, results))
+                 for u in users]
+        for p in procs:
+            p.start()
+        time.sleep(0.5)  # let every process open its router
+        start.set()
+        written = sum(results.get()[1] for _ in procs)
+        for p in procs:
+            p.join()
+        placed = router.users_per_shard()
+
+    return {
+        "shards": count,
+        "users/shard": "/".join(map(str, placed)),
+        "writes": written,
+        "writes/s": written / args.seconds,
+    }
+
+
+def move_check(args) -> dict:
+    """Move a user to another shard while their process writes."""
+    with tempfile.TemporaryDirectory() as tmp:
+        db_file = os.path.join(tmp, "main.db")
+        database.DB_FILE = db_file
+        database.init_db()
+        router = shards.open_shards(2, "directory")
+        database.enable_sharding(router)
+        ensure_user("mover")
+        src = router.shard_for_user("mover")
+
+        start = multiprocessing.Event()
+        results = multiprocessing.Queue()
+        proc = multiprocessing.Process(target=_writer, args=(db_file, 2, "mover", 2.0, start, results))
+        proc.start()
+        time.sleep(0.5)
+        start.set()
+        time.sleep(0.7)
+        t0 = time.perf_counter()
+        moved = router.move_user("mover", 1 - src)
+        move_ms = (time.perf_counter() - t0) * 1000
+        written = results.get()[1]
+        proc.join()
+        found = len(database.get_events_for_day("mover", DAY))
+        database.enable_sharding(None)
+
+    return {"moved": moved, "written": written, "found after": found, "move ms": move_ms,
+            "lost": written - found}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--procs", type=int, default=8)
+    parser.add_argument("--shards", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--seconds", type=float, default=5)
+    args = parser.parse_args()
+
+    print(f"{args.procs} writer processes, {args.seconds:g}s per shard count")
+    print_table([run(n, args) for n in args.shards], ["shards", "users/shard", "writes", "writes/s"])
+
+    print("\nonline move while the user keeps writing")
+    result = move_check(args)
+    print_table([result], list(result))
+
+
+if __name__ == "__main__":
+    main()
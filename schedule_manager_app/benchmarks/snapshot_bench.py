@@ -0,0 +1,107 @@
+"""
+Write latency while a long report scans the database.
+
+A background thread keeps a read transaction open for --seconds (default 30),
+stepping through every event row over and over, while the main thread issues
+add_event + update_event pairs and records their latency.
+
+  --mode wal     scan through database.snapshot("wal") (the default)
+  --mode copy    scan through database.snapshot("copy")
+  --mode locked  baseline: rollback journal + plain read transaction, which is
+                 what a long scan did before WAL; writes wait or fail
+
+Usage:
+    python benchmarks/snapshot_bench.py [--seconds 30] [--mode wal] [--rows 200000]
+"""
+import argparse
+import gc
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+from _common import insert_events, print_table
+import database
+
+COLUMNS = ["mode", "scan_rows", "writes", "errors", "p50_ms", "p99_ms", "max_ms"]
+
+
+def _fill(rows: int) -> None:
+    database.init_db()
+    insert_events("bench", ((f"Event {i}", f"2024-{i % 12 + 1:02d}-{i % 28 + 1:02d}", i % 1380, i % 1380 + 30)
+                            for i in range(rows)))
+
+
+def _scan(mode: str, seconds: float, started: threading.Event, counter: list) -> None:
+    deadline = time.monotonic() + seconds
+    if mode == "locked":
+        conn = sqlite3.connect(database.DB_FILE, isolation_level=None)
+        conn.execute("BEGIN")
+        ctx = None
+    else:
+        ctx = database.snapshot(mode)
+        conn = ctx.__enter__()
+    try:
+        started.set()
+        while time.monotonic() < deadline:
+            for _ in conn.execute("SELECT id, title, date, start, end FROM events"):
+                counter[0] += 1
+                if counter[0] % 1000 == 0 and time.monotonic() >= deadline:
+                    break
+    finally:
+        if ctx is None:
+            conn.close()
+        else:
+            ctx.__exit__(None, None, None)
+
+
+def run(mode: str, seconds: float, interval: float) -> dict:
+    if mode == "locked":
+        gc.collect()  # drop any lingering WAL connections before switching journal mode
+        with sqlite3.connect(database.DB_FILE) as conn:
+            conn.execute("PRAGMA journal_mode=DELETE")
+    started = threading.Event()
+    counter = [0]
+    scanner = threading.Thread(target=_scan, args=(mode, seconds, started, counter))
+    scanner.start()
+    started.wait()
+
+    latencies, errors = [], 0
+    while scanner.is_alive():
+        t0 = time.perf_counter()
+        try:
+            eid = database.add_event("bench", "write", "2025-01-01", "09:00 AM", "10:00 AM")
+            database.update_event(eid, "write (edited)", "2025-01-01", "09:30 AM", "10:30 AM")
+        except sqlite3.OperationalError:
+            errors += 1
+        latencies.append((time.perf_counter() - t0) * 1000)
+        time.sleep(interval)
+    scanner.join()
+
+    latencies.sort()
+    n = len(latencies)
+    return {
+        "mode": mode, "scan_rows": counter[0], "writes": n, "errors": errors,
+        "p50_ms": latencies[n // 2] if n else None,
+        "p99_ms": latencies[min(n - 1, int(n * 0.99))] if n else None,
+        "max_ms": latencies[-1] if n else None,
+    }
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, default=30)
+    parser.add_argument("--mode", choices=("wal", "copy", "locked"), default="wal")
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--interval", type=float, default=0.05, help="pause between writes (s)")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database.DB_FILE = os.path.join(tmp, "bench.db")
+        _fill(args.rows)
+        print_table([run(args.mode, args.seconds, args.interval)], COLUMNS)
+
+
+if __name__ == "__main__":
+    main()
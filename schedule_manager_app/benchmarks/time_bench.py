@@ -0,0 +1,79 @@
+"""
+Per-event cost of time parsing/formatting: the old per-view code versus the
+precomputed tables in timeutil.py.
+
+Usage:
+    python benchmarks/time_bench.py [--number 200000]
+"""
+import argparse
+import random
+import timeit
+from datetime import datetime
+
+from _common import print_table
+import timeutil
+
+COLUMNS = ["operation", "implementation", "ns_per_call"]
+
+
+# ---- what the views used to do --------------------------------------------
+def split_parse(time_str: str) -> int:
+    """The split()-based parser that was copied into DayView and EventDialog."""
+    parts = time_str.strip().split()
+    hh, mm = map(int, parts[0].split(":"))
+    ampm = parts[1].upper()
+    if ampm == "PM" and hh != 12:
+        hh += 12
+    if ampm == "AM" and hh == 12:
+        hh = 0
+    return hh * 60 + mm
+
+
+def strptime_parse(time_str: str) -> int:
+    """strptime with a fallback format, as Timeline.draw_events did."""
+    try:
+        dt = datetime.strptime(time_str, "%I:%M %p")
+    except ValueError:
+        dt = datetime.strptime(time_str, "%H:%M")
+    return dt.hour * 60 + dt.minute
+
+
+def fstring_format(minute: int) -> str:
+    """The arithmetic + f-string formatting Timeline and _draw_grid did per label."""
+    hour, mm = divmod(minute, 60)
+    hr12 = hour % 12
+    hr12 = 12 if hr12 == 0 else hr12
+    suffix = "AM" if hour < 12 else "PM"
+    return f"{hr12:02d}:{mm:02d} {suffix}"
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--number", type=int, default=200_000, help="calls per measurement")
+    args = parser.parse_args(argv)
+
+    rng = random.Random(0)
+    minutes = [rng.randrange(timeutil.MINUTES_PER_DAY) for _ in range(1024)]
+    strings = [timeutil.format_minutes(m) for m in minutes]
+
+    def per_call(fn, inputs) -> float:
+        n = args.number // len(inputs)
+        seconds = min(timeit.repeat(lambda: [fn(x) for x in inputs], number=n, repeat=3))
+        return seconds / (n * len(inputs)) * 1e9
+
+    results = [
+        {"operation": "parse", "implementation": "split()", "ns_per_call": per_call(split_parse, strings)},
+        {"operation": "parse", "implementation": "strptime", "ns_per_call": per_call(strptime_parse, strings)},
+        {"operation": "parse", "implementation": "timeutil", "ns_per_call": per_call(timeutil.parse_minutes, strings)},
+        {"operation": "format", "implementation": "f-string", "ns_per_call": per_call(fstring_format, minutes)},
+        {"operation": "format", "implementation": "strftime",
+         "ns_per_call": per_call(lambda m: datetime(2000, 1, 1, m // 60, m % 60).strftime("%I:%M %p"), minutes)},
+        {"operation": "format", "implementation": "timeutil", "ns_per_call": per_call(timeutil.format_minutes, minutes)},
+        {"operation": "lookup", "implementation": "dict.get (floor)",
+         "ns_per_call": per_call({s: 0 for s in strings}.get, strings)},
+    ]
+    print_table(results, COLUMNS)
+
+
+if __name__ == "__main__":
+    main()
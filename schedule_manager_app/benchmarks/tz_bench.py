@@ -0,0 +1,130 @@
+"""
+Cost of showing a month of events in another time zone.
+
+Fills one month with --events events entered in --zone, then reads the
+month back --repeat times (median reported):
+
+  by date        the month's rows by (user_id, date), as before UTC storage
+  same zone      get_events_between in the events' own zone (nothing converted)
+  other zone     get_events_between in --view (every event converted through
+                 the cached per-day offsets of zones.py)
+  other, cold    the same with the offset caches emptied before each read
+  naive          the same-zone rows converted with datetime/ZoneInfo per event
+
+and reports the conversion alone in microseconds per event.
+
+    python benchmarks/tz_bench.py --events 10000 --zone Europe/Berlin --view America/New_York
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+from _common import insert_events, print_table
+import database
+import zones
+from event import row_factory
+
+COLUMNS = ["read", "median_ms", "us_per_event", "events"]
+MONTH = ("2025-03-01", "2025-03-31")  # with the EU and US DST changes in it
+
+
+def fill(events: int, tz: str) -> None:
+    database.init_db()
+    database.create_user("bench", "bench")
+    database.set_user_zone("bench", tz)
+    rng = random.Random(1)
+    first = date.fromisoformat(MONTH[0])
+    insert_events("bench", (
+        (f"Event {i}", (first + timedelta(days=rng.randrange(31))).isoformat(), s, s + rng.choice((30, 60, 90)))
+        for i, s in ((i, rng.randrange(1320)) for i in range(events))
+    ))
+
+
+def by_date() -> list:
+    with database._get_conn() as conn:
+        conn.row_factory = row_factory
+        return conn.execute(
+            f"SELECT {database.EVENT_COLUMNS} FROM events WHERE user_id = ? AND date BETWEEN ? AND ?"
+            " ORDER BY date, start_min, id", (database.user_id("bench"), *MONTH)).fetchall()
+
+
+def naive(events: list, view: str) -> list:
+    """The wall-clock (date, start, end) of each event in view, one datetime conversion at a time."""
+    target = zones.zone(view)
+    out = []
+    for ev in events:
+        midnight = datetime.fromisoformat(ev.date).replace(tzinfo=zones.zone(ev.tz))
+        start = (midnight + timedelta(minutes=ev.start_min)).astimezone(target)
+        end = (midnight + timedelta(minutes=ev.end_min)).astimezone(target)
+        out.append((start.date().isoformat(), start.hour * 60 + start.minute, end.hour * 60 + end.minute))
+    return out
+
+
+def clear_caches() -> None:
+    for cached in (zones._wall_day, zones._utc_day, zones.day_number, zones.day_string):
+        cached.cache_clear()
+
+
+def median_ms(fn, repeat: int, before=None) -> tuple[float, int]:
+    times, n = [], 0
+    for _ in range(repeat):
+        if before:
+            before()
+        t0 = time.perf_counter()
+        n = len(fn())
+        times.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(times), n
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--events", type=int, default=10_000)
+    parser.add_argument("--zone", default="Europe/Berlin", help="zone the events are entered in")
+    parser.add_argument("--view", default="America/New_York", help="zone the month is shown in")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database.DB_FILE = os.path.join(tmp, "bench.db")
+        fill(args.events, args.zone)
+        between = database.get_events_between
+        rows = [
+            ("by date", *median_ms(by_date, args.repeat)),
+            ("same zone", *median_ms(lambda: between("bench", *MONTH, args.zone), args.repeat)),
+            ("other zone", *median_ms(lambda: between("bench", *MONTH, args.view), args.repeat)),
+            ("other, cold", *median_ms(lambda: between("bench", *MONTH, args.view), args.repeat, clear_caches)),
+            ("naive", *median_ms(lambda: naive(by_date(), args.view), args.repeat)),
+        ]
+
+        # the conversion alone, on the rows as read
+        events = by_date()
+        cached = [(ev.start_utc, ev.end_utc) for ev in events]
+        t0 = time.perf_counter()
+        for start_utc, end_utc in cached:
+            zones.from_utc(start_utc, args.view), zones.from_utc(end_utc, args.view)
+        cached_us = (time.perf_counter() - t0) * 1e6 / len(events)
+        t0 = time.perf_counter()
+        converted = naive(events, args.view)
+        naive_us = (time.perf_counter() - t0) * 1e6 / len(events)
+
+        # both conversions must agree (ends past midnight are clipped by get_events_between)
+        shown = {ev.id: (ev.date, ev.start_min) for ev in between("bench", "2025-02-28", "2025-04-01", args.view)}
+        mismatches = sum(shown.get(ev.id) != (day, start) for ev, (day, start, _) in zip(events, converted))
+
+    by_read = {name: ms for name, ms, _ in rows}
+    print(f"{args.events:,} events in {MONTH[0][:7]} entered in {args.zone}, shown in {args.view}\n")
+    print_table([
+        {"read": name, "median_ms": ms, "us_per_event": ms * 1000 / max(n, 1), "events": n}
+        for name, ms, n in rows
+    ], COLUMNS)
+    print(f"\nconversion alone: {cached_us:.2f} us/event cached offsets, {naive_us:.2f} us/event datetime/ZoneInfo")
+    print(f"other zone costs {by_read['other zone'] - by_read['same zone']:+.1f} ms over same zone; "
+          f"cached and naive conversions disagree on {mismatches} events")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+"""
+Undo journal memory and latency over 100k random edits.
+
+Runs --ops random commands through an UndoJournal (adds, updates that move
+or rename, deletes, and undos and redos in between) and samples the
+journal's memory as it goes, next to an unbounded history that keeps a full
+copy of the event before and after every edit. Then checks correctness:
+--limit more edits are made, all of them undone (the journal re-opened from
+the undo_log table halfway through), and the calendar must be as it was
+before them; redoing them all must give the calendar as it was after.
+
+Undo/redo latency is split into the journal's in-memory part and its one
+database write.
+
+    python benchmarks/undo_bench.py --ops 100000 --limit 1000
+"""
+import argparse
+import copy
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from collections import deque
+
+from _common import ensure_user, insert_events, print_table
+import database
+from event import Event
+from timeutil import format_minutes
+from undo import UndoJournal
+
+COLUMNS = ["ops", "entries", "journal_kib", "bytes_per_entry", "full_copies_kib"]
+DAYS = [f"2025-07-{d:02d}" for d in range(1, 32)]
+
+
+def deep_size(obj, seen=None) -> int:
+    """Bytes of obj and everything it holds (each object counted once)."""
+    seen = set() if seen is None else seen
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(deep_size(k, seen) + deep_size(v, seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, deque)):
+        size += sum(deep_size(v, seen) for v in obj)
+    elif hasattr(obj, "__slots__"):
+        size += sum(deep_size(getattr(obj, s, None), seen) for s in obj.__slots__)
+    return size
+
+
+def journal_size(journal: UndoJournal) -> int:
+    return deep_size((journal._undo, journal._redo, journal._versions, journal._refs))
+
+
+class Editor:
+    """Random edits to one user's calendar through a journal; ids tracks the events that exist."""
+
+    def __init__(self, journal: UndoJournal, ids: list[int], rng: random.Random):
+        self.journal = journal
+        self.ids = ids
+        self.rng = rng
+        self.history = []  # the unbounded alternative: (before, after) copies of every edit
+
+    def edit(self) -> str:
+        rng, journal = self.rng, self.journal
+        op = rng.choices(("add", "update", "delete"), (3, 5, 2))[0] if self.ids else "add"
+        if op == "add":
+            start = rng.randrange(0, 1380, 15)
+            day = rng.choice(DAYS)
+            title = f"Event {len(self.ids)}"
+            self.ids.append(journal.add(title, day, format_minutes(start), format_minutes(start + 60),
+                                        reminders=rng.choice(((), (10,), (5, 60)))))
+            self.history.append((None, Event.from_minutes(title, day, start, start + 60, id=self.ids[-1])))
+            return op
+        k = rng.randrange(len(self.ids))
+        before = database.get_event(self.ids[k])
+        if op == "delete":
+            journal.delete(before)
+            self.ids[k] = self.ids[-1]
+            self.ids.pop()
+            self.history.append((copy.copy(before), None))
+            return op
+        if rng.random() < 0.3:
+            title, day, start = before.title + "'", before.date, before.start_min
+        else:
+            title, day, start = before.title, rng.choice(DAYS), rng.randrange(0, 1380, 15)
+        after = copy.copy(before)
+        journal.update(before, title, day, format_minutes(start), format_minutes(start + 60))
+        after.title, after.date = title, day
+        self.history.append((copy.copy(before), after))
+        return op
+
+    def step(self, backwards: bool) -> tuple[str | None, float]:
+        """Undo or redo; returns its kind and the seconds it took."""
+        t0 = time.perf_counter()
+        kind = self.journal.undo() if backwards else self.journal.redo()
+        took = time.perf_counter() - t0
+        if kind is not None:
+            self.ids[:] = calendar_ids()
+        return kind, took
+
+
+def calendar_ids() -> list[int]:
+    with database._get_conn() as conn:
+        return [row[0] for row in conn.execute("SELECT id FROM events WHERE user_id = ?", (database.user_id("bench"),))]
+
+
+def calendar() -> set:
+    """The user's events and reminders, without versions (which undo moves on)."""
+    with database._get_conn() as conn:
+        uid = database.user_id("bench")
+        events = conn.execute("SELECT id, title, date, start, end, tz, start_utc, end_utc FROM events"
+                              " WHERE user_id = ?", (uid,)).fetchall()
+        reminders = conn.execute("SELECT event_id, offset_min, due_min FROM reminders WHERE user_id = ?",
+                                 (uid,)).fetchall()
+    return set(events) | set(reminders)
+
+
+def timed_writes(samples: list):
+    """Wrap the writes undo/redo make so their time can be told apart from the journal's own."""
+    for name in ("patch_event", "restore_event", "delete_event"):
+        fn = getattr(database, name)
+
+        def wrapper(*args, _fn=fn, **kwargs):
+            t0 = time.perf_counter()
+            try:
+                return _fn(*args, **kwargs)
+            finally:
+                samples.append(time.perf_counter() - t0)
+        setattr(database, name, wrapper)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--ops", type=int, default=100_000)
+    parser.add_argument("--limit", type=int, default=1000, help="journal entries kept")
+    parser.add_argument("--events", type=int, default=2000, help="events in the calendar at the start")
+    args = parser.parse_args()
+    checkpoints = sorted({min(args.ops, n) for n in (1000, 10_000, 50_000, args.ops)})
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database.DB_FILE = os.path.join(tmp, "bench.db")
+        database.init_db()
+        ensure_user("bench")
+        database.set_user_zone("bench", "UTC")
+        rng = random.Random(3)
+        insert_events("bench", ((f"Seed {i}", rng.choice(DAYS), s, s + 60)
+                                for i, s in ((i, rng.randrange(0, 1380, 15)) for i in range(args.events))))
+
+        journal = UndoJournal("bench", limit=args.limit)
+        editor = Editor(journal, calendar_ids(), rng)
+        write_s: list[float] = []
+        timed_writes(write_s)
+        rows, counts, step_ms, step_write_ms = [], {}, [], []
+        t0 = time.perf_counter()
+        for n in range(1, args.ops + 1):
+            r = rng.random()
+            if r < 0.15:  # undo and redo in between, as a user would
+                del write_s[:]
+                kind, took = editor.step(backwards=r < 0.1)
+                if kind is not None:
+                    step_ms.append(took * 1000)
+                    step_write_ms.append(sum(write_s) * 1000)
+                op = ("undo " if r < 0.1 else "redo ") + str(kind)
+            else:
+                op = editor.edit()
+            counts[op] = counts.get(op, 0) + 1
+            if n in checkpoints:
+                rows.append({"ops": n, "entries": len(journal), "journal_kib": journal_size(journal) / 1024,
+                             "bytes_per_entry": journal_size(journal) / max(1, len(journal)),
+                             "full_copies_kib": deep_size(editor.history) / 1024})
+        run_s = time.perf_counter() - t0
+        editor.history.clear()
+
+        # correctness: limit edits, all undone (re-opening a persisted journal halfway), all redone
+        database.flush_writes()
+        journal = UndoJournal("bench", limit=args.limit, persist=True)
+        editor.journal = journal
+        before = calendar()
+        for _ in range(args.limit):
+            editor.edit()
+        after = calendar()
+        undone = 0
+        for i in range(args.limit):
+            if i == args.limit // 2:
+                editor.journal = journal = UndoJournal("bench", limit=args.limit, persist=True)
+            undone += editor.step(backwards=True)[0] is not None
+        restored = calendar() == before
+        redone = sum(editor.step(backwards=False)[0] is not None for _ in range(args.limit))
+        reapplied = calendar() == after
+
+    print(f"{args.ops:,} commands in {run_s:.1f}s, journal limit {args.limit}: "
+          + ", ".join(f"{n:,} {op}" for op, n in sorted(counts.items())) + "\n")
+    print_table(rows, COLUMNS)
+    in_memory = [total - write for total, write in zip(step_ms, step_write_ms)]
+    print(f"\nundo/redo: p50 {statistics.median(step_ms):.3f} ms, of which the journal's own work "
+          f"p50 {statistics.median(in_memory) * 1000:.1f} us / max {max(in_memory) * 1000:.1f} us "
+          f"and the rest its one write")
+    print(f"{args.limit} edits undone ({undone}, journal re-opened halfway): calendar restored: {restored}; "
+          f"redone ({redone}): same as after the edits: {reapplied}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+"""
+File size and per-user query latency before and after the user id migration.
+
+Builds a database in the old layout (a username string on every event row and
+in both per-user indexes) with --count events spread over --users users, times
+the per-user queries, then rebuilds events around users.id the way init_db
+did when user ids came in (one transaction, then VACUUM) and times the same
+queries again. Both layouts are pinned below as they were at that change,
+so columns and indexes added to init_db's schema since do not count against
+either side. Usernames are e-mail style (~25 bytes), as they are once
+accounts come from a login provider.
+
+    python benchmarks/user_id_bench.py --count 1000000 --users 2000
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+from datetime import date, timedelta
+
+from _common import print_table
+import database
+from timeutil import format_minutes
+
+COLUMNS = ["layout", "file_mb", "day_us", "page_us", "count_us"]
+
+# the events table and indexes as they were before user ids
+OLD_SCHEMA = """
+    CREATE TABLE users (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        username TEXT UNIQUE NOT NULL,
+        password_hash TEXT NOT NULL
+    );
+    CREATE TABLE events (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        username TEXT NOT NULL,
+        title TEXT NOT NULL,
+        date TEXT NOT NULL,
+        start TEXT NOT NULL,
+        end   TEXT NOT NULL,
+        start_min INTEGER NOT NULL DEFAULT 0,
+        end_min   INTEGER NOT NULL DEFAULT 0,
+        version   INTEGER NOT NULL DEFAULT 1,
+        created_at TEXT NOT NULL DEFAULT (datetime('now','localtime')),
+        FOREIGN KEY (username) REFERENCES users(username)
+    );
+    CREATE INDEX idx_events_username_id ON events (username, id);
+    CREATE INDEX idx_events_username_date_start ON events (username, date, start_min, id);
+"""
+
+# the same rebuilt around users.id, as init_db's migration left it then
+MIGRATION = """
+    CREATE TABLE events_new (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id INTEGER NOT NULL,
+        title TEXT NOT NULL,
+        date TEXT NOT NULL,
+        start TEXT NOT NULL,
+        end   TEXT NOT NULL,
+        start_min INTEGER NOT NULL DEFAULT 0,
+        end_min   INTEGER NOT NULL DEFAULT 0,
+        version   INTEGER NOT NULL DEFAULT 1,
+        created_at TEXT NOT NULL DEFAULT (datetime('now','localtime')),
+        FOREIGN KEY (user_id) REFERENCES users(id)
+    );
+    INSERT INTO events_new (id, user_id, title, date, start, end, start_min, end_min, version, created_at)
+        SELECT e.id, u.id, e.title, e.date, e.start, e.end, e.start_min, e.end_min, e.version, e.created_at
+        FROM events e JOIN users u ON u.username = e.username;
+    DROP TABLE events;
+    ALTER TABLE events_new RENAME TO events;
+    CREATE INDEX idx_events_user_id ON events (user_id, id);
+    CREATE INDEX idx_events_user_date_start ON events (user_id, date, start_min, id);
+"""
+
+
+def fill_old(count: int, users: list[str]) -> None:
+    rng = random.Random(7)
+    base = date(2018, 1, 1)
+    with database._get_conn() as conn:
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(OLD_SCHEMA)
+        conn.executemany("INSERT INTO users (username, password_hash) VALUES (?, ?)",
+                         ((u, database.hash_password("bench")) for u in users))
+
+        def rows():
+            for i in range(count):
+                s = rng.randrange(1380)
+                yield (rng.choice(users), f"Event {i}", (base + timedelta(days=rng.randrange(2500))).isoformat(),
+                       format_minutes(s), format_minutes(s + 30), s, s + 30)
+
+        conn.executemany("INSERT INTO events (username, title, date, start, end, start_min, end_min)"
+                         " VALUES (?, ?, ?, ?, ?, ?, ?)", rows())
+        conn.commit()
+    with database._get_conn() as conn:
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+
+def migrate() -> None:
+    """MIGRATION in one BEGIN IMMEDIATE transaction, then VACUUM."""
+    conn = database._get_conn()
+    conn.isolation_level = None  # explicit BEGIN/COMMIT
+    conn.execute("BEGIN IMMEDIATE")
+    for statement in MIGRATION.split(";"):
+        if statement.strip():
+            conn.execute(statement)
+    conn.execute("COMMIT")
+    conn.execute("VACUUM")
+    conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    conn.close()
+
+
+def _best_of(fn, repeat: int) -> float:
+    """Mean microseconds per fn call, best of 5 rounds of repeat calls."""
+    best = float("inf")
+    for _ in range(5):
+        t0 = time.perf_counter()
+        for _ in range(repeat):
+            fn()
+        best = min(best, (time.perf_counter() - t0) * 1e6 / repeat)
+    return best
+
+
+def measure(layout: str, key: str, users: list[str], repeat: int) -> dict:
+    """Time the per-user queries, keyed by the username string or by users.id."""
+    rng = random.Random(11)
+    probes = [(rng.choice(users), (date(2018, 1, 1) + timedelta(days=rng.randrange(2500))).isoformat())
+              for _ in range(repeat)]
+    conn = database._get_conn()
+    ids = dict(conn.execute("SELECT username, id FROM users").fetchall())
+    param = (lambda u: u) if key == "username" else ids.get
+
+    def day():
+        u, d = next(it)
+        conn.execute(f"SELECT id, title, date, start, end, start_min, end_min, version FROM events"
+                     f" WHERE {key} = ? AND date = ? ORDER BY start_min, id", (param(u), d)).fetchall()
+
+    def page():
+        u, d = next(it)
+        conn.execute(f"SELECT id, title, date, start, end, start_min, end_min, version FROM events"
+                     f" WHERE {key} = ? AND (date, start_min, id) > (?, 0, 0)"
+                     " ORDER BY date, start_min, id LIMIT 50", (param(u), d)).fetchall()
+
+    def count():
+        u, _ = next(it)
+        conn.execute(f"SELECT COUNT(*) FROM events WHERE {key} = ?", (param(u),)).fetchone()
+
+    r = {"layout": layout, "file_mb": os.path.getsize(database.DB_FILE) / 2**20}
+    for name, fn in (("day_us", day), ("page_us", page), ("count_us", count)):
+        it = iter(probes * 5)
+        r[name] = _best_of(fn, repeat)
+    conn.close()
+    return r
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--count", type=int, default=1_000_000)
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=500, help="queries per timing round")
+    args = parser.parse_args()
+    users = [f"firstname.lastname{i:05d}@example.com" for i in range(args.users)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database.DB_FILE = os.path.join(tmp, "bench.db")
+        fill_old(args.count, users)
+        rows = [measure("username TEXT", "username", users, args.repeat)]
+
+        t0 = time.perf_counter()
+        migrate()
+        migrate_s = time.perf_counter() - t0
+        rows.append(measure("user_id INTEGER", "user_id", users, args.repeat))
+
+    print(f"{args.count:,} events, {args.users} users")
+    print_table(rows, COLUMNS)
+    print(f"\nmigration (rebuild + VACUUM): {migrate_s:.1f}s, "
+          f"file {rows[1]['file_mb'] / rows[0]['file_mb'] - 1:+.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""
+Interactive write latency and commits per second, with and without the write buffer.
+
+Simulates dragging events around: --edits update_event calls spread over
+--events events, paced at --rate calls per second (0 = as fast as possible).
+Each commit of a WAL database is one fsync of the WAL file, so commits/s is
+the fsync rate the edits cause.
+
+Then a crash check: a child process buffers edits, flushes, keeps editing and
+is SIGKILLed mid-burst. Everything flushed must be in the file, the file must
+pass PRAGMA integrity_check, and every event must hold a value that was
+actually written (no torn batches).
+
+    python benchmarks/write_buffer_bench.py --edits 600 --rate 120
+"""
+import argparse
+import os
+import signal
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+
+from _common import ensure_user, print_table
+import database
+from timeutil import format_minutes
+
+USER = "bench"
+DAY = "2025-01-06"
+
+
+def _edit_args(eid: int, n: int) -> tuple:
+    minute = 8 * 60 + n % 480
+    return (eid, f"edit {n}", DAY, format_minutes(minute), format_minutes(minute + 30))
+
+
+def run_edits(label: str, args, window_ms: float | None) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        database.DB_FILE = os.path.join(tmp, "buffer.db")
+        database.init_db()
+        ensure_user(USER)
+        ids = [database.add_event(USER, f"event {i}", DAY, "09:00 AM", "10:00 AM") for i in range(args.events)]
+        if window_ms is not None:
+            database.enable_write_buffer(window_ms)
+
+        lat = []
+        interval = 1 / args.rate if args.rate else 0
+        t0 = time.perf_counter()
+        for n in range(args.edits):
+            t = time.perf_counter()
+            database.update_event(*_edit_args(ids[n % len(ids)], n))
+            lat.append((time.perf_counter() - t) * 1000)
+            if interval:
+                time.sleep(max(0.0, t + interval - time.perf_counter()))
+        t = time.perf_counter()
+        database.flush_writes()
+        flush_ms = (time.perf_counter() - t) * 1000
+        elapsed = time.perf_counter() - t0
+
+        commits = args.edits
+        if database._buffer is not None:
+            commits = database._buffer.transactions
+        database.disable_write_buffer()
+
+    lat.sort()
+    return {
+        "mode": label,
+        "p50 ms": lat[len(lat) // 2],
+        "p99 ms": lat[int(len(lat) * 0.99)],
+        "max ms": lat[-1],
+        "final flush ms": flush_ms,
+        "commits": commits,
+        "commits/s": commits / elapsed,
+    }
+
+
+# ---- Crash check -----------------------------------------------------------
+def crash_child(db_file: str, events: int) -> None:
+    """Buffered edits, a flush, then more edits until the parent kills us."""
+    database.DB_FILE = db_file
+    database.init_db()
+    ensure_user(USER)
+    ids = [database.add_event(USER, "start", DAY, "09:00 AM", "10:00 AM") for _ in range(events)]
+    database.enable_write_buffer(20)
+    n = 0
+    for _ in range(20 * events):
+        database.update_event(*_edit_args(ids[n % events], n))
+        n += 1
+    database.flush_writes()
+    print(f"FLUSHED {n}", flush=True)
+    while True:  # unflushed burst, interrupted by SIGKILL at an arbitrary point
+        database.update_event(*_edit_args(ids[n % events], n))
+        n += 1
+        if n % 50 == 0:
+            time.sleep(0.001)
+
+
+def crash_check(args) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        db_file = os.path.join(tmp, "crash.db")
+        child = subprocess.Popen(
+            [sys.executable, __file__, "--crash-child", db_file, "--events", str(args.events)],
+            stdout=subprocess.PIPE, text=True,
+        )
+        line = child.stdout.readline().split()
+        flushed = int(line[1])
+        time.sleep(0.2)
+        os.kill(child.pid, signal.SIGKILL)
+        child.wait()
+
+        conn = sqlite3.connect(db_file)
+        integrity = conn.execute("PRAGMA integrity_check").fetchone()[0]
+        titles = [t for (t,) in conn.execute("SELECT title FROM events ORDER BY id")]
+        conn.close()
+
+    # the last flushed edit of each event, or a later one; never older, never garbage
+    last_flushed = {}
+    for n in range(flushed):
+        last_flushed[n % args.events] = n
+    ok = all(
+        t.startswith("edit ") and int(t.split()[1]) >= last_flushed[i] and int(t.split()[1]) % args.events == i
+        for i, t in enumerate(titles)
+    )
+    return {
+        "integrity": integrity,
+        "flushed edits": flushed,
+        "later edits kept": sum(int(t.split()[1]) > last_flushed[i] for i, t in enumerate(titles) if t.startswith("edit ")),
+        "flushed data intact": ok,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--edits", type=int, default=600)
+    parser.add_argument("--events", type=int, default=5)
+    parser.add_argument("--rate", type=float, default=120, help="edits per second (0 = unpaced)")
+    parser.add_argument("--window-ms", type=float, default=20)
+    parser.add_argument("--crash-child", metavar="DB", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.crash_child:
+        crash_child(args.crash_child, args.events)
+        return
+
+    print(f"{args.edits} edits over {args.events} events at {args.rate:g}/s")
+    rows = [
+        run_edits("commit per call", args, None),
+        run_edits(f"buffer {args.window_ms:g} ms", args, args.window_ms),
+    ]
+    print_table(rows, ["mode", "p50 ms", "p99 ms", "max ms", "final flush ms", "commits", "commits/s"])
+
+    print("\ncrash during an unflushed burst (SIGKILL)")
+    result = crash_check(args)
+    print_table([result], list(result))
+
+
+if __name__ == "__main__":
+    main()
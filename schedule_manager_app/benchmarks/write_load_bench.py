@@ -0,0 +1,146 @@
+"""
+Write throughput and lock errors of the multi-process backend under load.
+
+Starts backend/serve.py on a temporary database in each mode, then has N
+concurrent HTTP clients, each logged in as its own user, POST events for a
+fixed time:
+
+  direct        every uvicorn worker writes to SQLite itself
+  writer        writes go to the writer process, one transaction per write
+  group commit  writes go to the writer process, batched per transaction
+
+Failed requests (database is locked -> HTTP 500, timeouts) count as errors.
+
+    python benchmarks/write_load_bench.py --clients 64 --workers 4 --seconds 10
+"""
+import argparse
+import http.client
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from _common import APP_DIR, print_table
+import database
+from timeutil import format_minutes
+
+SERVE = os.path.join(APP_DIR, "backend", "serve.py")
+
+MODES = {
+    "direct": ["--direct"],
+    "writer": ["--max-batch", "1"],
+    "group commit": [],
+}
+
+
+def _wait_ready(port: int, proc: subprocess.Popen, timeout: float = 30) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            sys.exit(f"serve.py exited with {proc.returncode}")
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+            conn.request("GET", "/")
+            if conn.getresponse().status == 200:
+                return
+        except OSError:
+            time.sleep(0.2)
+    sys.exit("backend did not come up")
+
+
+def _login(port: int, username: str) -> str:
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+    conn.request("POST", "/login", json.dumps({"username": username, "password": "bench"}),
+                 {"Content-Type": "application/json"})
+    resp = conn.getresponse()
+    body = json.loads(resp.read())
+    conn.close()
+    if resp.status != 200:
+        sys.exit(f"login as {username} failed: {resp.status} {body}")
+    return body["token"]
+
+
+def _client(port: int, idx: int, stop: threading.Event, lat: list, errors: list) -> None:
+    headers = {"Content-Type": "application/json", "Authorization": "Bearer " + _login(port, f"load{idx}")}
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+    n = 0
+    while not stop.is_set():
+        minute = (idx * 7 + n) % (23 * 60)
+        body = json.dumps({
+            "title": f"load {idx}-{n}", "date": "2025-01-06",
+            "start": format_minutes(minute),
+            "end": "11:59 PM",
+        })
+        t0 = time.perf_counter()
+        try:
+            conn.request("POST", f"/users/load{idx}/events", body, headers)
+            resp = conn.getresponse()
+            resp.read()
+            ok = resp.status == 201
+        except OSError:
+            ok = False
+            conn.close()
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+        (lat if ok else errors).append((time.perf_counter() - t0) * 1000)
+        n += 1
+
+
+def run_mode(name: str, extra: list, args, port: int) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        db = database.DB_FILE = os.path.join(tmp, "load.db")
+        database.init_db()
+        for i in range(args.clients):
+            database.create_user(f"load{i}", "bench")
+        proc = subprocess.Popen(
+            [sys.executable, SERVE, "--db", db, "--port", str(port), "--workers", str(args.workers), *extra],
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        try:
+            _wait_ready(port, proc)
+            stop = threading.Event()
+            lat, errors = [], []
+            threads = [threading.Thread(target=_client, args=(port, i, stop, lat, errors))
+                       for i in range(args.clients)]
+            t0 = time.perf_counter()
+            for t in threads:
+                t.start()
+            time.sleep(args.seconds)
+            stop.set()
+            for t in threads:
+                t.join()
+            elapsed = time.perf_counter() - t0
+        finally:
+            proc.terminate()
+            proc.wait()
+
+    lat.sort()
+    total = len(lat) + len(errors)
+    return {
+        "mode": name,
+        "writes/s": len(lat) / elapsed,
+        "p50 ms": lat[len(lat) // 2] if lat else None,
+        "p99 ms": lat[int(len(lat) * 0.99)] if lat else None,
+        "errors": len(errors),
+        "error %": 100 * len(errors) / total if total else 0.0,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--clients", type=int, default=64)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--modes", nargs="+", default=list(MODES), choices=list(MODES))
+    args = parser.parse_args()
+
+    print(f"{args.clients} clients, {args.workers} workers, {args.seconds:g}s per mode")
+    rows = [run_mode(name, MODES[name], args, args.port) for name in args.modes]
+    print_table(rows, ["mode", "writes/s", "p50 ms", "p99 ms", "errors", "error %"])
+
+
+if __name__ == "__main__":
+    main()
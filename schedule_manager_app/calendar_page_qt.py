@@ -1,18 +1,39 @@
-from PySide6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QLabel, QCalendarWidget
-from PySide6.QtCore import QDate
+from PySide6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QLabel, QMessageBox
+from PySide6.QtCore import QDate, Qt
+from PySide6.QtGui import QKeySequence, QShortcut
 import database
+import zones
+from event import Event
+from event_model_qt import EventModel
+from views.agenda_view_qt import AgendaView
 from views.day_view_qt import DayView
+from views.month_view_qt import MonthView
+from views.search_view_qt import SearchView
+from views.week_view_qt import WeekView
 from event_dialog_qt import EventDialog
 
+PREFETCH_DAYS = 7  # loaded on either side of what a view shows, for paging
+
 
 class CalendarPage(QWidget):
-    """Main calendar page with month/week/day toggle views."""
+    """
+    Main calendar page: month/week/day/search views over one shared
+    EventModel, and the agenda, which pages through the whole history itself.
+    """
 
     def __init__(self, app):
         super().__init__()
         self.app = app
         self.current_date = QDate.currentDate()
         self.current_view = "month"
+        self.day_view = None
+        self.prefetch_days = PREFETCH_DAYS
+        # everything is shown (and entered) on this machine's clock, whatever zone an event was made in
+        self.tz = zones.local_zone()
+        # the events every view shows, loaded once and kept up to date with the writes
+        self.events = EventModel(self.tz, parent=self)
+        self.events.set_user(app.current_user)
+        self.events.daysChanged.connect(self.on_days_changed)
 
         layout = QVBoxLayout()
 
@@ -21,17 +42,41 @@ class CalendarPage(QWidget):
         self.month_btn = QPushButton("Month View")
         self.week_btn = QPushButton("Week View")
         self.day_btn = QPushButton("Day View")
+        self.agenda_btn = QPushButton("Agenda")
+        self.search_btn = QPushButton("Search")
         self.add_btn = QPushButton("Add Event")
+        self.undo_btn = QPushButton("Undo")
+        self.redo_btn = QPushButton("Redo")
+        self.prev_btn = QPushButton("◀")
+        self.today_btn = QPushButton("Today")
+        self.next_btn = QPushButton("▶")
 
         self.month_btn.clicked.connect(lambda: self.switch_view("month"))
         self.week_btn.clicked.connect(lambda: self.switch_view("week"))
         self.day_btn.clicked.connect(lambda: self.switch_view("day"))
+        self.agenda_btn.clicked.connect(lambda: self.switch_view("agenda"))
+        self.search_btn.clicked.connect(lambda: self.switch_view("search"))
         self.add_btn.clicked.connect(self.add_event)
+        self.undo_btn.clicked.connect(self.undo)
+        self.redo_btn.clicked.connect(self.redo)
+        QShortcut(QKeySequence.Undo, self, self.undo)
+        QShortcut(QKeySequence.Redo, self, self.redo)
+        self.prev_btn.clicked.connect(lambda: self.page_by(-1))
+        self.today_btn.clicked.connect(lambda: self.go_to(QDate.currentDate()))
+        self.next_btn.clicked.connect(lambda: self.page_by(1))
 
         toolbar.addWidget(self.month_btn)
         toolbar.addWidget(self.week_btn)
         toolbar.addWidget(self.day_btn)
+        toolbar.addWidget(self.agenda_btn)
+        toolbar.addWidget(self.search_btn)
+        toolbar.addSpacing(16)
+        toolbar.addWidget(self.prev_btn)
+        toolbar.addWidget(self.today_btn)
+        toolbar.addWidget(self.next_btn)
         toolbar.addStretch()
+        toolbar.addWidget(self.undo_btn)
+        toolbar.addWidget(self.redo_btn)
         toolbar.addWidget(self.add_btn)
 
         layout.addLayout(toolbar)
@@ -41,6 +86,7 @@ class CalendarPage(QWidget):
         self.setLayout(layout)
 
         self.switch_view("month")
+        self.update_undo_buttons()
 
     # ------------------------------------------------------
     # VIEW SWITCHING
@@ -53,28 +99,71 @@ class CalendarPage(QWidget):
             self.show_week_view()
         elif view_type == "day":
             self.show_day_view()
+        elif view_type == "agenda":
+            self.show_agenda_view()
+        elif view_type == "search":
+            self.show_search_view()
 
     def show_month_view(self):
-        cal = QCalendarWidget()
+        cal = MonthView()
         cal.setSelectedDate(self.current_date)
         cal.selectionChanged.connect(self.on_date_selected)
+        cal.currentPageChanged.connect(lambda _year, _month: self.refresh_view())
         self.replace_content(cal)
+        self.refresh_view()
 
     def show_week_view(self):
-        self.replace_content(QLabel("Week View (Coming Soon)"))
+        week = WeekView(self, self.current_date)
+        week.eventDoubleClicked.connect(self.edit_event)
+        week.eventRescheduled.connect(self.reschedule_event, Qt.QueuedConnection)
+        week.dayActivated.connect(self.go_to_day)
+        self.replace_content(week)
+        self.refresh_view()
 
     def show_day_view(self):
-        """Use DayView widget and load events from DB."""
-        self.day_view = DayView(self, self.current_date)   # ✅ FIXED: store reference
-        self.day_view.eventDoubleClicked.connect(self.edit_event)  # ✅ FIXED: connect signal
+        """Show current_date in the DayView (kept across day changes)."""
+        if self.day_view is None or self.content is not self.day_view:
+            self.day_view = DayView(self, self.current_date, clock=getattr(self.app, "clock", None))
+            self.day_view.eventDoubleClicked.connect(self.edit_event)  # ✅ FIXED: connect signal
+            # queued: the reload replaces the box whose mouse release emitted it
+            self.day_view.eventRescheduled.connect(self.reschedule_event, Qt.QueuedConnection)
+            self.replace_content(self.day_view)
+        else:
+            self.day_view.set_date(self.current_date)
+        self.refresh_view()
+
+    def show_agenda_view(self):
+        """Every event in one list, starting at current_date; scrolls into the past and the future."""
+        agenda = AgendaView(self)
+        agenda.eventDoubleClicked.connect(self.edit_event)
+        self.replace_content(agenda)
+        if self.app.current_user:
+            agenda.show_from(self.app.current_user, self.current_date.toString("yyyy-MM-dd"))
+
+    def show_search_view(self):
+        search = SearchView(self.events)
+        search.eventDoubleClicked.connect(self.edit_event)
+        self.replace_content(search)
+        search.query.setFocus()
+
+    def go_to_day(self, date: QDate):
+        """Page the day view to date (from memory when it was prefetched)."""
+        self.current_date = date
+        self.switch_view("day")
 
-        username = self.app.current_user
-        if username:
-            date_str = self.current_date.toString("yyyy-MM-dd")
-            events = database.get_events_for_day(username, date_str)
-            self.day_view.load_events(events)
+    def go_to(self, date: QDate):
+        """Show date in the current view (the day view from search)."""
+        self.current_date = date
+        self.switch_view("day" if self.current_view == "search" else self.current_view)
 
-        self.replace_content(self.day_view)
+    def page_by(self, steps: int):
+        """◀ / ▶: a day (day view, agenda), week or month back or forward, by the view shown."""
+        if self.current_view == "month":
+            self.go_to(self.current_date.addMonths(steps))
+        elif self.current_view == "week":
+            self.go_to(self.current_date.addDays(7 * steps))
+        else:
+            self.go_to(self.current_date.addDays(steps))
 
     # ------------------------------------------------------
     # EVENT HANDLING
@@ -86,65 +175,133 @@ class CalendarPage(QWidget):
 
         dlg = EventDialog(self, date=self.current_date.toString("yyyy-MM-dd"))
         if dlg.exec():
-            data = dlg.get_data()
-            if not data["title"]:
+            ev = dlg.get_data()
+            if not ev.title:
                 return
-            database.add_event(
-                self.app.current_user,
-                data["title"],
-                data["date"],
-                data["start"],
-                data["end"],
-            )
-            self.refresh_day_view()   # ✅ FIXED: refresh after add
+            self.app.undo.add(ev.title, ev.date, ev.start, ev.end, reminders=dlg.get_reminders() or (), tz=self.tz)
+            self.update_undo_buttons()
 
     def edit_event(self, event_id: int):
         """Open EventDialog to edit/delete an event."""
-        ev = database.get_event(event_id)
+        ev = database.get_event(event_id, tz=self.tz)
         if not ev:
             return
 
-        _, _, title, date, start, end = ev
-
-        dlg = EventDialog(self, title, date, start, end, event_id=event_id)
+        dlg = EventDialog(self, ev.title, ev.date, ev.start, ev.end, event_id=event_id,
+                          reminders=database.get_reminders(event_id))
         if dlg.exec():
-            data = dlg.get_data()
-            if data["deleted"]:
-                database.delete_event(event_id)
-            else:
-                if not data["title"]:
+            edited = None if dlg.deleted else dlg.get_data()
+            if edited is not None and not edited.title:
+                return
+            self.save_edit(ev, edited)
+            if edited is not None and dlg.get_reminders() is not None:
+                database.set_reminders(ev.id, dlg.get_reminders())
+            self.update_undo_buttons()
+
+    def reschedule_event(self, ev, start_min: int, end_min: int):
+        """Save a drag in DayView: one update with the event's new times."""
+        self.save_edit(ev, Event.from_minutes(ev.title, ev.date, start_min, end_min))
+        self.update_undo_buttons()
+
+    def save_edit(self, ev, edited):
+        """Write an edit (edited=None: delete), undoably, unless someone else changed the event meanwhile."""
+        tz, base = ev.tz, ev
+        while True:
+            try:
+                if edited is None:
+                    self.app.undo.delete(base)
+                else:
+                    self.app.undo.update(base, edited.title, edited.date, edited.start, edited.end, tz=tz)
+                return
+            except database.ConflictError as e:
+                if e.current is None:
+                    QMessageBox.information(self, "Event Deleted", "This event was deleted elsewhere.")
                     return
-                database.update_event(
-                    event_id,
-                    data["title"],
-                    data["date"],
-                    data["start"],
-                    data["end"],
+                answer = QMessageBox.question(
+                    self, "Event Changed",
+                    f"\"{e.current.title}\" was changed elsewhere since you opened it "
+                    f"({e.current.date} {e.current.start} - {e.current.end}).\n\n"
+                    "Overwrite it with your changes?",
                 )
-            self.refresh_day_view()   # ✅ FIXED: refresh after edit/delete
+                if answer != QMessageBox.Yes:
+                    return
+                base = e.current  # what gets overwritten, and what undo brings back
+
+    def undo(self):
+        """Revert the last add/edit/delete (Ctrl+Z)."""
+        self._step(lambda journal: journal.undo())
 
-    def refresh_day_view(self):
-        """Reload events into the current DayView."""
-        if not hasattr(self, "day_view"):
+    def redo(self):
+        """Apply the last undone change again (Ctrl+Y / Ctrl+Shift+Z)."""
+        self._step(lambda journal: journal.redo())
+
+    def _step(self, step):
+        journal = self.app.undo
+        if journal is None:
             return
-        username = self.app.current_user
-        if not username:
+        try:
+            step(journal)
+        except database.ConflictError as e:
+            QMessageBox.information(self, "Cannot Undo", f"{e}, so its earlier changes can no longer be undone.")
+        self.update_undo_buttons()
+
+    def update_undo_buttons(self):
+        journal = self.app.undo
+        self.undo_btn.setEnabled(journal is not None and journal.can_undo)
+        self.redo_btn.setEnabled(journal is not None and journal.can_redo)
+
+    def refresh(self):
+        """Called by the app when the page is shown (the logged-in user may have changed)."""
+        self.events.set_user(self.app.current_user)
+        self.update_undo_buttons()
+        self.refresh_view()
+        if self.current_view == "agenda" and self.app.current_user != self.content.model.username:
+            self.show_agenda_view()
+
+    def shown_days(self) -> tuple[str, str] | None:
+        """First and last day (YYYY-MM-DD) the current view shows; None for the agenda and search views."""
+        if self.current_view in ("month", "week"):
+            return self.content.days()
+        if self.current_view == "day" and self.day_view is not None:
+            day = self.current_date.toString("yyyy-MM-dd")   # ✅ FIXED: corrected format
+            return day, day
+        return None
+
+    def refresh_view(self):
+        """
+        Fill the current view with what the model holds of its days, and ask
+        the model for whatever of them (and the days around) it does not;
+        on_days_changed draws those when they arrive.
+        """
+        days = self.shown_days()
+        if days is None or not self.app.current_user:
             return
-        date_str = self.current_date.toString("yyyy-MM-dd")   # ✅ FIXED: corrected format
-        events = database.get_events_for_day(username, date_str)
-        self.day_view.load_events(events)
+        self.events.request(*days)
+        first, last = (QDate.fromString(day, "yyyy-MM-dd") for day in days)
+        self.events.request(first.addDays(-self.prefetch_days).toString("yyyy-MM-dd"),
+                            last.addDays(self.prefetch_days).toString("yyyy-MM-dd"))
+        self.content.load_events(self.events.events_between(*days))
+
+    def on_days_changed(self, first: str, last: str):
+        """The model loaded or changed days first..last: redraw the view if it shows any of them."""
+        days = self.shown_days()
+        if days is not None and first <= days[1] and last >= days[0]:
+            self.content.load_events(self.events.events_between(*days))
 
     # ------------------------------------------------------
     # HELPERS
     # ------------------------------------------------------
     def on_date_selected(self):
-        cal: QCalendarWidget = self.content
+        cal: MonthView = self.content
         self.current_date = cal.selectedDate()
         self.switch_view("day")
 
     def replace_content(self, widget):
         if self.content:
             self.layout().removeWidget(self.content)
+            self.content.hide()  # lets views release clock subscriptions before deletion
             self.content.deleteLater()
+            if self.content is self.day_view:
+                self.day_view = None
         self.content = widget
         self.layout().addWidget(self.content)
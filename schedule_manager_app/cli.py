@@ -0,0 +1,80 @@
+"""
+Command line tools for the schedule manager database.
+
+    python cli.py import-ics alice calendar.ics
+    python cli.py export-ics alice backup.ics
+    python cli.py archive --days 730 --vacuum
+"""
+import argparse
+import sys
+import time
+
+import archive
+import database
+import ics
+import shards
+
+
+def cmd_import_ics(args) -> None:
+    t0 = time.perf_counter()
+    with open(args.path, encoding="utf-8", errors="replace", newline="") as fp:
+        count = ics.import_ics(args.username, fp, batch_size=args.batch_size)
+    elapsed = time.perf_counter() - t0
+    print(f"Imported {count} events for {args.username} in {elapsed:.1f}s ({count / max(elapsed, 1e-9):,.0f}/s)")
+
+
+def cmd_export_ics(args) -> None:
+    t0 = time.perf_counter()
+    if args.path == "-":
+        ics.export_ics(args.username, sys.stdout, page_size=args.page_size)
+        return
+    with open(args.path, "w", encoding="utf-8", newline="") as fp:
+        ics.export_ics(args.username, fp, page_size=args.page_size)
+    print(f"Exported {args.username}'s events to {args.path} in {time.perf_counter() - t0:.1f}s")
+
+
+def cmd_archive(args) -> None:
+    t0 = time.perf_counter()
+    count = archive.archive_old_events(args.days, batch_size=args.batch_size, vacuum=args.vacuum)
+    print(f"Archived {count} events older than {args.days} days in {time.perf_counter() - t0:.1f}s")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Schedule Manager maintenance commands")
+    parser.add_argument("--db", help="database file (default: %s)" % database.DB_FILE)
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("import-ics", help="import a .ics file into a user's calendar")
+    p.add_argument("username")
+    p.add_argument("path")
+    p.add_argument("--batch-size", type=int, default=ics.BATCH_SIZE, help="events per transaction")
+    p.set_defaults(func=cmd_import_ics)
+
+    p = sub.add_parser("export-ics", help="export a user's calendar as .ics ('-' for stdout)")
+    p.add_argument("username")
+    p.add_argument("path")
+    p.add_argument("--page-size", type=int, default=ics.PAGE_SIZE, help="events fetched per query")
+    p.set_defaults(func=cmd_export_ics)
+
+    p = sub.add_parser("archive", help="move old events to the archive file")
+    p.add_argument("--days", type=int, default=archive.HORIZON_DAYS, help="archive events older than this")
+    p.add_argument("--batch-size", type=int, default=archive.BATCH_SIZE, help="events moved per transaction")
+    p.add_argument("--vacuum", action="store_true", help="then VACUUM to shrink the files (blocks writers)")
+    p.set_defaults(func=cmd_archive)
+
+    return parser
+
+
+def main(argv=None) -> None:
+    args = build_parser().parse_args(argv)
+    if args.db:
+        database.DB_FILE = args.db
+    database.init_db()
+    router = shards.from_env()  # same layout as backend/serve.py --shards
+    if router is not None:
+        database.enable_sharding(router)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
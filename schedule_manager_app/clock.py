@@ -0,0 +1,98 @@
+"""
+One minute-aligned clock shared by every time-sensitive view (now-lines).
+
+Views subscribe while they are visible and unsubscribe when hidden; the
+service keeps a single pending timer only while it has subscribers, and
+fires it on the next minute boundary rather than on a fixed interval.
+
+    clock = tk_clock(root)            # or qt_clock() in the Qt app
+    token = clock.subscribe(timeline.draw_nowline)
+    ...
+    clock.unsubscribe(token)          # no timer left once nobody listens
+"""
+import logging
+from datetime import datetime
+
+log = logging.getLogger(__name__)
+
+
+class ClockService:
+    """Calls every subscriber with the current datetime at each minute boundary."""
+
+    def __init__(self, call_later, cancel, now=datetime.now):
+        """
+        call_later(delay_ms, callback) -> handle   schedules a one-shot timer
+        cancel(handle)                             cancels it
+        now()                                      current time (injectable for tests)
+        """
+        self._call_later = call_later
+        self._cancel = cancel
+        self._now = now
+        self._subscribers: dict[int, object] = {}
+        self._next_token = 0
+        self._job = None
+
+    @property
+    def active(self) -> bool:
+        """True while a timer is pending (i.e. someone is subscribed)."""
+        return self._job is not None
+
+    def subscribe(self, callback) -> int:
+        """Call callback(now) right away and then every minute. Returns a token for unsubscribe()."""
+        token = self._next_token
+        self._next_token += 1
+        self._subscribers[token] = callback
+        callback(self._now())
+        if self._job is None:
+            self._schedule()
+        return token
+
+    def unsubscribe(self, token: int | None) -> None:
+        """Stop calling the subscriber; cancels the timer when it was the last one."""
+        self._subscribers.pop(token, None)
+        if not self._subscribers and self._job is not None:
+            self._cancel(self._job)
+            self._job = None
+
+    def _schedule(self) -> None:
+        now = self._now()
+        delay_ms = 60_000 - (now.second * 1000 + now.microsecond // 1000)
+        self._job = self._call_later(max(1, delay_ms), self._tick)
+
+    def _tick(self) -> None:
+        self._job = None
+        now = self._now()
+        for callback in list(self._subscribers.values()):
+            try:
+                callback(now)
+            except Exception:
+                log.exception("clock subscriber failed")
+        if self._subscribers:
+            self._schedule()
+
+
+def tk_clock(widget) -> ClockService:
+    """ClockService driven by Tk's after()/after_cancel()."""
+    return ClockService(widget.after, widget.after_cancel)
+
+
+def qt_clock() -> ClockService:
+    """ClockService driven by one reused single-shot QTimer (needs a QApplication)."""
+    return ClockService(*qt_timer())
+
+
+def qt_timer():
+    """(call_later, cancel) over one reused single-shot QTimer: one pending callback at a time."""
+    from PySide6.QtCore import QTimer
+
+    timer = QTimer()
+    timer.setSingleShot(True)
+    pending = []  # the callback of the current shot
+
+    def call_later(delay_ms, callback):
+        pending[:] = [callback]
+        timer.start(delay_ms)
+        return timer
+
+    timer.timeout.connect(lambda: pending and pending.pop()())
+    return call_later, lambda t: (t.stop(), pending.clear())
@@ -1,14 +1,34 @@
 import sqlite3
 import hashlib
+import hmac
 import os
+import atexit
+import logging
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+import instrumentation
+import zones
+from instrumentation import timed
+from event import Event, row_factory
+from timeutil import MINUTES_PER_DAY, format_minutes, parse_minutes
+
+log = logging.getLogger(__name__)
 
 # ---- DB location -----------------------------------------------------------
-DB_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "schedule_manager.db")
+DB_FILE = os.environ.get("SCHEDULE_MANAGER_DB") or os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "schedule_manager.db"
+)
 
+# columns selected whenever rows are turned into Events
+EVENT_COLUMNS = "id, user_id, title, date, start, end, start_min, end_min, version, tz, start_utc, end_utc"
+# every column of an events row, as copied between files (shards, archive)
+ROW_COLUMNS = EVENT_COLUMNS + ", created_at"
 
-def _get_conn() -> sqlite3.Connection:
-    """Open a connection to the single, known DB file."""
-    return sqlite3.connect(DB_FILE)
+
+def _get_conn(path: str | None = None) -> sqlite3.Connection:
+    """Open a connection to the DB file (DB_FILE, or a shard's file when given)."""
+    return instrumentation.connect(path or DB_FILE)
 
 
 # ---- Password hashing ------------------------------------------------------
@@ -18,11 +38,14 @@ def hash_password(password: str) -> str:
 
 
 # ---- Schema init / seeding -------------------------------------------------
-def init_db() -> None:
-    """Ensure the database and required tables exist."""
-    with _get_conn() as conn:
+def init_db(path: str | None = None) -> None:
+    """Ensure the database (DB_FILE or a shard file) and required tables exist."""
+    with _get_conn(path) as conn:
         cur = conn.cursor()
 
+        # WAL lets readers (reports, snapshots) run alongside the single writer
+        cur.execute("PRAGMA journal_mode=WAL")
+
         # Users table
         cur.execute("""
             CREATE TABLE IF NOT EXISTS users (
@@ -31,103 +54,1183 @@ def init_db() -> None:
                 password_hash TEXT NOT NULL
             )
         """)
+        # the zone the user's events are entered in; NULL = this machine's (see user_zone)
+        _add_column(cur, "users", "tz", "TEXT")
 
         # Events table
+        cur.execute(_EVENTS_TABLE.format(name="events"))
+
+        # Sortable minute columns, added to databases created before they existed
+        if _add_column(cur, "events", "start_min", "INTEGER NOT NULL DEFAULT 0"):
+            _add_column(cur, "events", "end_min", "INTEGER NOT NULL DEFAULT 0")
+            _backfill_minutes(cur)
+        _add_column(cur, "events", "version", "INTEGER NOT NULL DEFAULT 1")
+
+        # Shard bookkeeping (shards.py): where moved users and their events went.
+        # Empty unless users were moved out of this file.
+        cur.execute(_MOVED_USERS_TABLE.format(name="moved_users"))
         cur.execute("""
-            CREATE TABLE IF NOT EXISTS events (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                username TEXT NOT NULL,
-                title TEXT NOT NULL,
-                date TEXT NOT NULL,   -- YYYY-MM-DD
-                start TEXT NOT NULL,  -- HH:MM AM/PM
-                end   TEXT NOT NULL,  -- HH:MM AM/PM
-                created_at TEXT NOT NULL DEFAULT (datetime('now','localtime')),
-                FOREIGN KEY (username) REFERENCES users(username)
+            CREATE TABLE IF NOT EXISTS event_forwards (
+                old_id INTEGER PRIMARY KEY,
+                new_id INTEGER NOT NULL
+            )
+        """)
+
+        # Reminders (reminders.py): one row per reminder of an event, with the
+        # minute it is due, so the scheduler reads only the next window of them.
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS reminders (
+                event_id INTEGER NOT NULL,
+                user_id INTEGER NOT NULL,
+                offset_min INTEGER NOT NULL,  -- minutes before the event starts
+                due_min INTEGER NOT NULL,     -- minutes since 1970-01-01 00:00 UTC
+                PRIMARY KEY (event_id, offset_min)
+            ) WITHOUT ROWID
+        """)
+        cur.execute("CREATE INDEX IF NOT EXISTS idx_reminders_due ON reminders (due_min)")
+        cur.execute("CREATE INDEX IF NOT EXISTS idx_reminders_user_due ON reminders (user_id, due_min)")
+
+        # UTC instants and zones, added to databases created before they existed;
+        # their events were entered on this machine, so in its zone
+        if _add_column(cur, "events", "start_utc", "INTEGER NOT NULL DEFAULT 0"):
+            _add_column(cur, "events", "end_utc", "INTEGER NOT NULL DEFAULT 0")
+            _add_column(cur, "events", "tz", "TEXT NOT NULL DEFAULT ''")
+            _backfill_utc(cur, zones.local_zone())
+
+        # Archival tiering (archive.py): events dated before archived_before may
+        # be in the archive file next to this one. No row = nothing archived.
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS archive_state (
+                id INTEGER PRIMARY KEY CHECK (id = 0),
+                archived_before TEXT NOT NULL  -- YYYY-MM-DD
             )
         """)
 
+        # Undo journals kept across sessions (undo.py, persist=True): one row per
+        # entry, undone = 1 while it sits on the redo side.
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS undo_log (
+                user_id INTEGER NOT NULL,
+                seq INTEGER NOT NULL,
+                undone INTEGER NOT NULL DEFAULT 0,
+                version INTEGER NOT NULL,  -- the event's version after the entry was last done or undone
+                entry TEXT NOT NULL,       -- JSON, see undo.py
+                PRIMARY KEY (user_id, seq)
+            ) WITHOUT ROWID
+        """)
+
+        # Backend login sessions (sessions.py): the token's SHA-256, never the token itself
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS sessions (
+                token_hash TEXT PRIMARY KEY,
+                user_id INTEGER NOT NULL,
+                expires INTEGER NOT NULL  -- seconds since 1970-01-01 UTC
+            ) WITHOUT ROWID
+        """)
+        cur.execute("CREATE INDEX IF NOT EXISTS idx_sessions_expires ON sessions (expires)")
+
+        conn.commit()
+
+    # databases from before user ids keep a username on every event row
+    _migrate_user_ids(path)
+
+    with _get_conn(path) as conn:
+        # Per-user keyset paging by id (exports) and by (date, start_min, id) (listing, day view)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_events_user_id ON events (user_id, id)")
+        conn.execute("""
+            CREATE INDEX IF NOT EXISTS idx_events_user_date_start
+            ON events (user_id, date, start_min, id)
+        """)
+        # Range reads in a viewer's zone (get_events_between)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_events_user_utc ON events (user_id, start_utc)")
+        conn.commit()
+
+    # the archive next to this file (archive.py) is read with the same columns
+    if os.path.exists(archive_path(path)):
+        init_db(archive_path(path))
+
+
+_EVENTS_TABLE = """
+    CREATE TABLE IF NOT EXISTS {name} (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id INTEGER NOT NULL,  -- users.id (the users table is in DB_FILE when sharded)
+        title TEXT NOT NULL,
+        date TEXT NOT NULL,   -- YYYY-MM-DD
+        start TEXT NOT NULL,  -- HH:MM AM/PM
+        end   TEXT NOT NULL,  -- HH:MM AM/PM
+        start_min INTEGER NOT NULL DEFAULT 0,  -- start as minutes since midnight
+        end_min   INTEGER NOT NULL DEFAULT 0,
+        version   INTEGER NOT NULL DEFAULT 1,  -- bumped by every update (optimistic concurrency)
+        created_at TEXT NOT NULL DEFAULT (datetime('now')),  -- UTC
+        tz        TEXT NOT NULL DEFAULT '',        -- IANA zone of date/start/end
+        start_utc INTEGER NOT NULL DEFAULT 0,      -- start as minutes since 1970-01-01 00:00 UTC
+        end_utc   INTEGER NOT NULL DEFAULT 0,
+        FOREIGN KEY (user_id) REFERENCES users(id)
+    )
+"""
+
+_MOVED_USERS_TABLE = """
+    CREATE TABLE IF NOT EXISTS {name} (
+        user_id INTEGER PRIMARY KEY,
+        shard INTEGER NOT NULL
+    )
+"""
+
+
+def _add_column(cur, table: str, column: str, ddl: str) -> bool:
+    """ALTER TABLE ... ADD COLUMN unless it exists. Return True if it was added."""
+    if column in {row[1] for row in cur.execute(f"PRAGMA table_info({table})")}:
+        return False
+    cur.execute(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}")
+    return True
+
+
+def _table_columns(conn, table: str) -> set[str]:
+    return {row[1] for row in conn.execute(f"PRAGMA main.table_info({table})")}
+
+
+def _migrate_user_ids(path: str | None) -> None:
+    """
+    Rebuild events (and moved_users) keyed by username into tables keyed by
+    users.id, in one transaction, then VACUUM to give the freed space back.
+
+    A shard file has no users of its own, so DB_FILE's users table is
+    attached for the mapping. Usernames with events but no account get a
+    users row with an empty password hash: nobody can log in with it, and
+    create_user hands it to whoever registers the name.
+    """
+    conn = _get_conn(path)
+    conn.isolation_level = None  # explicit BEGIN/COMMIT below
+    try:
+        if "username" not in _table_columns(conn, "events") | _table_columns(conn, "moved_users"):
+            return
+        users = "users"
+        if path and os.path.abspath(path) != os.path.abspath(DB_FILE):
+            conn.execute("ATTACH DATABASE ? AS directory", (DB_FILE,))
+            users = "directory.users"
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            migrated = _rebuild_with_user_ids(conn, users)  # re-checked: another process may have won
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        if migrated:
+            log.info("migrated %s to user ids", path or DB_FILE)
+            conn.execute("VACUUM main")
+    finally:
+        conn.close()
+
+
+def _rebuild_with_user_ids(conn, users: str) -> bool:
+    migrated = False
+    if "username" in _table_columns(conn, "events"):
+        conn.execute(f"INSERT OR IGNORE INTO {users} (username, password_hash)"
+                     " SELECT DISTINCT username, '' FROM events")
+        seq = conn.execute("SELECT seq FROM main.sqlite_sequence WHERE name = 'events'").fetchone()
+        conn.execute(_EVENTS_TABLE.format(name="events_new"))
+        conn.execute(
+            "INSERT INTO events_new (id, user_id, title, date, start, end, start_min, end_min, version, created_at,"
+            " tz, start_utc, end_utc)"
+            " SELECT e.id, u.id, e.title, e.date, e.start, e.end, e.start_min, e.end_min, e.version, e.created_at,"
+            " e.tz, e.start_utc, e.end_utc"
+            f" FROM events e JOIN {users} u ON u.username = e.username"
+        )
+        conn.execute("DROP TABLE events")
+        conn.execute("ALTER TABLE events_new RENAME TO events")
+        # keep AUTOINCREMENT where it was: ids are never reused, and shards seed theirs (shards.py)
+        if seq:
+            conn.execute("DELETE FROM main.sqlite_sequence WHERE name = 'events'")
+            conn.execute("INSERT INTO main.sqlite_sequence (name, seq)"
+                         " SELECT 'events', max(?, coalesce((SELECT max(id) FROM events), 0))", seq)
+        migrated = True
+    if "username" in _table_columns(conn, "moved_users"):
+        conn.execute(_MOVED_USERS_TABLE.format(name="moved_users_new"))
+        conn.execute(f"INSERT INTO moved_users_new SELECT u.id, m.shard FROM moved_users m"
+                     f" JOIN {users} u ON u.username = m.username")
+        conn.execute("DROP TABLE moved_users")
+        conn.execute("ALTER TABLE moved_users_new RENAME TO moved_users")
+        migrated = True
+    return migrated
+
+
+def _minutes(time_str: str) -> int:
+    # 0 for an unparseable time only matters to the backfill of old rows: add/update/patch/restore check first
+    try:
+        return parse_minutes(time_str)
+    except ValueError:
+        return 0
+
+
+def _backfill_minutes(cur) -> None:
+    """Fill start_min/end_min from the start/end strings of existing rows."""
+    rows = cur.execute("SELECT id, start, end FROM events").fetchall()
+    cur.executemany(
+        "UPDATE events SET start_min = ?, end_min = ? WHERE id = ?",
+        [(_minutes(start), _minutes(end), eid) for eid, start, end in rows],
+    )
+
+
+def _backfill_utc(cur, tz: str) -> None:
+    """Fill tz/start_utc/end_utc of existing rows, read as times in zone tz, and make created_at UTC."""
+    rows = cur.execute("SELECT id, date, start_min, end_min, created_at FROM events").fetchall()
+    cur.executemany(
+        "UPDATE events SET tz = ?, start_utc = ?, end_utc = ?, created_at = ? WHERE id = ?",
+        [(tz, *_utc_or_epoch(day, start_min, end_min, tz), _created_utc(created, tz), eid)
+         for eid, day, start_min, end_min, created in rows],
+    )
+    # reminders were due in local minutes
+    cur.execute("UPDATE reminders SET due_min ="
+                " (SELECT start_utc FROM events WHERE events.id = reminders.event_id) - offset_min")
+
+
+def _created_utc(created: str, tz: str) -> str:
+    try:
+        local = datetime.fromisoformat(created).replace(tzinfo=zones.zone(tz))
+    except (TypeError, ValueError):
+        return created
+    return local.astimezone(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+
+
+def _utc(day: str, start_min: int, end_min: int, tz: str) -> tuple[int, int]:
+    """(start_utc, end_utc) of an event's wall-clock day and minutes in zone tz; ValueError for a bad day."""
+    start = zones.to_utc(_check_date(day), start_min, tz)
+    return start, max(start, zones.to_utc(day, end_min, tz))  # a start in a DST gap moves forward
+
+
+def _utc_or_epoch(day: str, start_min: int, end_min: int, tz: str) -> tuple[int, int]:
+    # the migration keeps rows written before dates were checked, at the epoch
+    try:
+        return _utc(day, start_min, end_min, tz)
+    except ValueError:
+        return 0, 0
+
+
+def _check_date(day: str) -> str:
+    """day itself if it is a YYYY-MM-DD date (the form dates are compared in), else ValueError."""
+    try:
+        valid = len(day) == 10 and datetime.strptime(day, "%Y-%m-%d")
+    except (TypeError, ValueError):
+        valid = False
+    if not valid:
+        raise ValueError(f"invalid date {day!r}, expected YYYY-MM-DD")
+    return day
+
+
+def _check_times(*times: str) -> None:
+    """ValueError unless every one of times is a time of day (see timeutil.parse_minutes)."""
+    for time_str in times:
+        parse_minutes(time_str)
+
+
+# ---- Snapshot reads --------------------------------------------------------
+@contextmanager
+def snapshot(mode: str = "wal", username: str | None = None):
+    """
+    Yield a read-only connection seeing one consistent state of the DB (of
+    username's shard when sharded), for long scans (exports, analytics) that
+    must not hold up add/update_event.
+
+    mode="wal":  a read transaction on the live file; in WAL mode it never
+                 blocks writers, and later writes are invisible to it.
+    mode="copy": copy the DB into memory first (sqlite backup API) and scan
+                 the copy; the file is only read for the duration of the copy.
+
+    Besides events, the connection has a temp view all_events that adds the
+    archived events (see archive.py), for scans over the whole history.
+    """
+    _wait_for_writes()
+    path = (username and _user_path(username)) or DB_FILE
+    archive = archive_path(path) if os.path.exists(archive_path(path)) else None
+    if mode == "wal":
+        conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True, isolation_level=None)
+        try:
+            _all_events_view(conn, archive)
+            conn.execute("BEGIN")
+            # pin the snapshot now; the hot file first, as readers always do (see archive.py)
+            conn.execute("SELECT 1 FROM main.sqlite_master LIMIT 1").fetchall()
+            if archive:
+                conn.execute("SELECT 1 FROM archive.sqlite_master LIMIT 1").fetchall()
+            yield conn
+        finally:
+            conn.close()
+    elif mode == "copy":
+        conn = sqlite3.connect(":memory:")
+        try:
+            src = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+            try:
+                src.backup(conn)
+            finally:
+                src.close()
+            _all_events_view(conn, archive)  # the archive is rarely written: it is read live, not copied
+            yield conn
+        finally:
+            conn.close()
+    else:
+        raise ValueError(f"unknown snapshot mode: {mode!r}")
+
+
+def _all_events_view(conn, archive: str | None) -> None:
+    if archive is None:
+        conn.execute("CREATE TEMP VIEW all_events AS SELECT * FROM main.events")
+        return
+    conn.execute("ATTACH DATABASE ? AS archive", (f"file:{archive}?mode=ro",))
+    # an event caught mid-archiving is in both files; the hot copy wins
+    conn.execute("""
+        CREATE TEMP VIEW all_events AS
+        SELECT * FROM main.events
+        UNION ALL
+        SELECT * FROM archive.events a WHERE NOT EXISTS (SELECT 1 FROM main.events h WHERE h.id = a.id)
+    """)
+
+
+# ---- Writes ----------------------------------------------------------------
+class ConflictError(Exception):
+    """A version-checked update/delete found the event changed (or deleted) since it was read."""
+
+    def __init__(self, event_id: int, current: Event | None):
+        super().__init__(event_id, current)  # args keep it picklable for the writer process
+        self.event_id = event_id
+        self.current = current  # the event as it is now, None if it was deleted
+
+    def __str__(self):
+        state = "deleted" if self.current is None else f"changed (now version {self.current.version})"
+        return f"event {self.event_id} was {state} by someone else"
+
+
+class UnknownUser(LookupError):
+    """A write named a username that has no users row."""
+
+
+class UserMoved(Exception):
+    """The user's events were moved to another shard (raised by a write that reached the old one)."""
+
+    def __init__(self, user_id: int, shard: int):
+        super().__init__(user_id, shard)
+        self.user_id = user_id
+        self.shard = shard
+
+
+class EventMoved(Exception):
+    """The event was moved to another shard under a new id (raised by a write that reached the old one)."""
+
+    def __init__(self, event_id: int, new_id: int):
+        super().__init__(event_id, new_id)
+        self.event_id = event_id
+        self.new_id = new_id
+
+
+# Every write is a function of an open connection that does not commit, so the
+# same code runs standalone (one transaction per call) or batched with other
+# writes into one transaction by a GroupCommitter / the writer process.
+def _create_user(conn, username: str, password: str) -> bool:
+    # an empty hash is a placeholder left by the user id migration; registering claims it
+    cur = conn.execute(
+        "INSERT INTO users (username, password_hash) VALUES (?, ?)"
+        " ON CONFLICT (username) DO UPDATE SET password_hash = excluded.password_hash"
+        " WHERE users.password_hash = ''",
+        (username, hash_password(password))
+    )
+    return cur.rowcount == 1
+
+
+def _add_event(conn, user_id: int, title: str, date: str, start: str, end: str, tz: str,
+               reminders: tuple = ()) -> int:
+    start_min, end_min = _minutes(start), _minutes(end)
+    # the moved_users check rides along in the INSERT: no extra statement
+    cur = conn.execute(
+        "INSERT INTO events (user_id, title, date, start, end, start_min, end_min, tz, start_utc, end_utc)"
+        " SELECT ?, ?, ?, ?, ?, ?, ?, ?, ?, ? WHERE NOT EXISTS (SELECT 1 FROM moved_users WHERE user_id = ?)",
+        (user_id, title, date, start, end, start_min, end_min, tz, *_utc(date, start_min, end_min, tz), user_id)
+    )
+    if cur.rowcount == 0:
+        raise UserMoved(user_id, _moved_to(conn, user_id))
+    if reminders:
+        _insert_reminders(conn, cur.lastrowid, reminders)
+    return cur.lastrowid
+
+
+def _update_event(conn, event_id: int, title: str, date: str, start: str, end: str,
+                  tz: str | None = None, version: int | None = None) -> int | None:
+    if tz is None:  # the times are in the zone the event already has
+        row = conn.execute("SELECT tz FROM events WHERE id = ?", (event_id,)).fetchone()
+        tz = row[0] if row else zones.UTC
+    start_min, end_min = _minutes(start), _minutes(end)
+    start_utc, end_utc = _utc(date, start_min, end_min, tz)
+    sql = ("UPDATE events SET title = ?, date = ?, start = ?, end = ?, start_min = ?, end_min = ?,"
+           " tz = ?, start_utc = ?, end_utc = ?, version = version + 1 WHERE id = ?")
+    params = [title, date, start, end, start_min, end_min, tz, start_utc, end_utc, event_id]
+    if version is not None:
+        sql += " AND version = ?"
+        params.append(version)
+    # the new version comes back with the update itself: no extra round trip unless it conflicts
+    row = conn.execute(sql + " RETURNING version", params).fetchall()
+    if row:
+        conn.execute("UPDATE reminders SET due_min = ? - offset_min WHERE event_id = ?", (start_utc, event_id))
+        return row[0][0]
+    current = None if version is None else _current_event(conn, event_id)
+    if current is None:
+        _check_forward(conn, event_id)
+    if version is not None:
+        raise ConflictError(event_id, current)
+    return None
+
+
+def _delete_event(conn, event_id: int, version: int | None = None) -> bool:
+    if version is None:
+        cur = conn.execute("DELETE FROM events WHERE id = ?", (event_id,))
+    else:
+        cur = conn.execute("DELETE FROM events WHERE id = ? AND version = ?", (event_id, version))
+    if cur.rowcount == 0:
+        current = None if version is None else _current_event(conn, event_id)
+        if current is not None:
+            raise ConflictError(event_id, current)
+        _check_forward(conn, event_id)  # already gone is fine for a delete, moved is not
+        return False
+    conn.execute("DELETE FROM reminders WHERE event_id = ?", (event_id,))
+    return True
+
+
+def _set_reminders(conn, event_id: int, offsets: list) -> bool:
+    if conn.execute("SELECT 1 FROM events WHERE id = ?", (event_id,)).fetchone() is None:
+        _check_forward(conn, event_id)
+        return False
+    conn.execute("DELETE FROM reminders WHERE event_id = ?", (event_id,))
+    _insert_reminders(conn, event_id, offsets)
+    return True
+
+
+def _insert_reminders(conn, event_id: int, offsets) -> None:
+    conn.executemany(
+        "INSERT OR IGNORE INTO reminders (event_id, user_id, offset_min, due_min)"
+        " SELECT id, user_id, ?, start_utc - ? FROM events WHERE id = ?",
+        [(offset, offset, event_id) for offset in offsets],
+    )
+
+
+def _current_event(conn, event_id: int) -> Event | None:
+    cur = conn.cursor()
+    cur.row_factory = row_factory
+    return cur.execute(f"SELECT {EVENT_COLUMNS} FROM events WHERE id = ?", (event_id,)).fetchone()
+
+
+def _insert_events(conn, rows: list) -> int:
+    users = sorted({row[0] for row in rows})
+    moved = conn.execute(
+        f"SELECT user_id, shard FROM moved_users WHERE user_id IN ({', '.join('?' * len(users))})", users
+    ).fetchone()
+    if moved:
+        raise UserMoved(*moved)
+    conn.executemany(
+        "INSERT INTO events (user_id, title, date, start, end, start_min, end_min, tz, start_utc, end_utc)"
+        " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        rows,
+    )
+    return len(rows)
+
+
+def _set_user_zone(conn, username: str, tz: str) -> bool:
+    return conn.execute("UPDATE users SET tz = ? WHERE username = ?", (tz, username)).rowcount == 1
+
+
+def _create_session(conn, user_id: int, token_hash: str, expires: int, now: int) -> None:
+    # logins clear out the sessions that have run out meanwhile
+    conn.execute("DELETE FROM sessions WHERE expires <= ?", (now,))
+    conn.execute("INSERT INTO sessions (token_hash, user_id, expires) VALUES (?, ?, ?)",
+                 (token_hash, user_id, expires))
+
+
+def _delete_session(conn, token_hash: str) -> bool:
+    return conn.execute("DELETE FROM sessions WHERE token_hash = ?", (token_hash,)).rowcount == 1
+
+
+def _patch_event(conn, event_id: int, title: str | None, when: tuple | None, version: int) -> int:
+    # only what changed: the title and/or (date, start, end, tz)
+    sets, params = ["version = version + 1"], []
+    if title is not None:
+        sets.append("title = ?")
+        params.append(title)
+    if when is not None:
+        date, start, end, tz = when
+        start_min, end_min = _minutes(start), _minutes(end)
+        start_utc, end_utc = _utc(date, start_min, end_min, tz)
+        sets.append("date = ?, start = ?, end = ?, start_min = ?, end_min = ?, tz = ?, start_utc = ?, end_utc = ?")
+        params += [date, start, end, start_min, end_min, tz, start_utc, end_utc]
+    row = conn.execute(
+        f"UPDATE events SET {', '.join(sets)} WHERE id = ? AND version = ? RETURNING version",
+        (*params, event_id, version),
+    ).fetchall()
+    if not row:
+        current = _current_event(conn, event_id)
+        if current is None:
+            _check_forward(conn, event_id)
+        raise ConflictError(event_id, current)
+    if when is not None:
+        conn.execute("UPDATE reminders SET due_min = ? - offset_min WHERE event_id = ?", (start_utc, event_id))
+    return row[0][0]
+
+
+def _restore_event(conn, event_id: int, user_id: int, title: str, date: str, start: str, end: str, tz: str,
+                   utc: tuple | None, reminders: tuple, version: int) -> None:
+    # back under its old id, unless that is taken or the user has moved to another shard since
+    start_min, end_min = _minutes(start), _minutes(end)
+    start_utc, end_utc = utc or _utc(date, start_min, end_min, tz)
+    cur = conn.execute(
+        "INSERT INTO events (id, user_id, title, date, start, end, start_min, end_min, tz, start_utc, end_utc,"
+        " version) SELECT ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?"
+        " WHERE NOT EXISTS (SELECT 1 FROM moved_users WHERE user_id = ?)"
+        " AND NOT EXISTS (SELECT 1 FROM events WHERE id = ?)",
+        (event_id, user_id, title, date, start, end, start_min, end_min, tz, start_utc, end_utc, version,
+         user_id, event_id),
+    )
+    if cur.rowcount == 0:
+        raise ConflictError(event_id, _current_event(conn, event_id))
+    _insert_reminders(conn, event_id, reminders)
+
+
+def _log_undo(conn, user_id: int, seq: int, entry: str, version: int, keep_from: int) -> None:
+    # a new entry ends whatever could be redone, and the oldest ones fall off
+    conn.execute("DELETE FROM undo_log WHERE user_id = ? AND (undone = 1 OR seq < ?)", (user_id, keep_from))
+    conn.execute("INSERT OR REPLACE INTO undo_log (user_id, seq, version, entry) VALUES (?, ?, ?, ?)",
+                 (user_id, seq, version, entry))
+
+
+def _mark_undo(conn, user_id: int, seq: int, undone: bool, version: int) -> None:
+    conn.execute("UPDATE undo_log SET undone = ?, version = ? WHERE user_id = ? AND seq = ?",
+                 (int(undone), version, user_id, seq))
+
+
+def _forget_undo(conn, user_id: int, seqs: list) -> None:
+    conn.executemany("DELETE FROM undo_log WHERE user_id = ? AND seq = ?", [(user_id, seq) for seq in seqs])
+
+
+# op name -> write function, as sent to a GroupCommitter or the writer process
+WRITES = {
+    "create_user": _create_user,
+    "add_event": _add_event,
+    "update_event": _update_event,
+    "delete_event": _delete_event,
+    "insert_events": _insert_events,
+    "set_reminders": _set_reminders,
+    "set_user_zone": _set_user_zone,
+    "patch_event": _patch_event,
+    "restore_event": _restore_event,
+    "log_undo": _log_undo,
+    "mark_undo": _mark_undo,
+    "forget_undo": _forget_undo,
+    "create_session": _create_session,
+    "delete_session": _delete_session,
+}
+
+# writer(op, args, path) that performs writes elsewhere (see writer.py); None = write here
+_writer = None
+
+
+def set_writer(writer) -> None:
+    """Send every write through writer(op, args, path) instead of committing locally (None restores)."""
+    global _writer
+    _writer = writer
+
+
+# ---- Write-behind buffer (desktop apps) -------------------------------------
+_buffer = None
+
+
+def enable_write_buffer(window_ms: float | None = None) -> None:
+    """Queue writes and commit those arriving within window_ms together (see write_buffer.py)."""
+    global _buffer
+    if _buffer is not None:
+        return
+    from write_buffer import WINDOW_MS, WriteBuffer
+    _buffer = WriteBuffer(WINDOW_MS if window_ms is None else window_ms)
+    set_writer(_buffer)
+
+
+def flush_writes() -> None:
+    """Block until every buffered write is committed (no-op without a buffer).
+
+    Raises the first error of a buffered write that failed since it last raised.
+    """
+    if _buffer is not None:
+        _buffer.flush()
+
+
+def _wait_for_writes() -> None:
+    # reads see the caller's own queued writes; failures are logged here and raised by flush_writes()
+    if _buffer is not None:
+        _buffer.flush(raise_errors=False)
+
+
+def disable_write_buffer() -> None:
+    """Flush, stop the buffer and go back to one transaction per write."""
+    global _buffer
+    if _buffer is None:
+        return
+    buffer, _buffer = _buffer, None
+    set_writer(None)
+    buffer.close()
+
+
+# whatever path the process exits by, queued writes are committed first
+atexit.register(disable_write_buffer)
+
+
+def _write(op: str, path: str | None, *args, wait: bool = False):
+    """
+    Run WRITES[op] against path (None = DB_FILE), here or through the writer.
+    With wait a buffered write also waits for its commit and returns (or
+    raises) its outcome, for callers that act on it.
+    """
+    if wait and _buffer is not None:
+        return _buffer(op, args, path, wait=True)
+    if _writer is not None:
+        return _writer(op, args, path)
+    with _get_conn(path) as conn:
+        result = WRITES[op](conn, *args)
         conn.commit()
+    return result
+
+
+def _write_user(op: str, username: str, *args):
+    """A write keyed by user: sent to the user's shard, and resent if they were moved meanwhile."""
+    uid = user_id(username)
+    if uid is None:
+        raise UnknownUser(username)
+    while True:
+        try:
+            return _write(op, _user_path(username), uid, *args)
+        except UserMoved as moved:
+            _router.moved(username, moved.shard)
+
+
+def _write_event(op: str, event_id: int, *args):
+    """
+    A write keyed by event id: sent to the event's shard, resent if it was
+    moved meanwhile, and applied to the archive if it is no longer hot.
+    """
+    while True:
+        path = _event_path(event_id)
+        # a buffered write waits for its outcome when that decides where else it goes: sharded,
+        # the event may have moved (it is resent); with an archive, it may be archived (it goes there)
+        archived = _buffer is not None and _has_archive(path)
+        try:
+            result = _write(op, path, event_id, *args, wait=archived or _router is not None)
+        except EventMoved as moved:
+            event_id = moved.new_id
+            continue
+        except ConflictError as conflict:
+            if conflict.current is not None or not _has_archive(path):
+                raise
+            return _write(op, archive_path(path), event_id, *args)
+        # nothing matched (a None from the write buffer only means queued)
+        if not result and (archived if _buffer is not None else _has_archive(path)):
+            return _write(op, archive_path(path), event_id, *args, wait=True)
+        return result
+
+
+# ---- Write listeners -------------------------------------------------------
+# Called after each successful event write made through this module, so
+# in-process caches (event_model_qt.py) and the reminder scheduler can react:
+#   ("add_event", (username, date, event_id))   ("update_event", (event_id, new_date))
+#   ("delete_event", (event_id,))               ("insert_events", (rows,))
+#   ("set_reminders", (event_id,))
+# restore_event reports as add_event, patch_event as update_event (new_date
+# None when the patch left the date alone).
+_listeners = []
+
+
+def add_listener(listener) -> None:
+    """Call listener(op, args) after every event write."""
+    _listeners.append(listener)
+
+
+def remove_listener(listener) -> None:
+    if listener in _listeners:
+        _listeners.remove(listener)
+
+
+def _notify(op: str, *args) -> None:
+    for listener in _listeners:
+        listener(op, args)
+
+
+# ---- Shard routing ---------------------------------------------------------
+# With a ShardRouter (shards.py) events live in per-user shard files while the
+# users table and the placement directory stay in DB_FILE. Without one every
+# path below is None, i.e. DB_FILE.
+_router = None
+
+
+def enable_sharding(router) -> None:
+    """Route every event read/write through router (a shards.ShardRouter); None turns it off."""
+    global _router
+    flush_writes()
+    _router = router
+
+
+def _user_path(username: str) -> str | None:
+    return None if _router is None else _router.path(_router.shard_for_user(username))
+
+
+def _event_path(event_id: int) -> str | None:
+    return None if _router is None else _router.path(_router.shard_for_event(event_id))
+
+
+def _moved_to(conn, uid: int) -> int | None:
+    cur = conn.cursor()
+    cur.row_factory = None
+    row = cur.execute("SELECT shard FROM moved_users WHERE user_id = ?", (uid,)).fetchone()
+    return row[0] if row else None
+
+
+def _forward(conn, event_id: int) -> int | None:
+    cur = conn.cursor()
+    cur.row_factory = None
+    row = cur.execute("SELECT new_id FROM event_forwards WHERE old_id = ?", (event_id,)).fetchone()
+    return row[0] if row else None
+
+
+def _check_forward(conn, event_id: int) -> None:
+    new_id = _forward(conn, event_id)
+    if new_id is not None:
+        raise EventMoved(event_id, new_id)
+
+
+def _read_user(username: str, sql: str, *params, archived=None) -> list[Event]:
+    """
+    Events from sql with the user's id bound first, read from the user's
+    shard (following them if they were moved meanwhile). An unknown user
+    has no events.
+
+    archived(horizon, events) says whether the query's range reaches below
+    the archive horizon given the hot result; if so the archive's events
+    are appended (callers re-sort).
+    """
+    uid = user_id(username)
+    if uid is None:
+        return []
+    while True:
+        path = _user_path(username)
+        with _get_conn(path) as conn:
+            conn.row_factory = row_factory
+            events = conn.execute(sql, (uid, *params)).fetchall()
+            # a move deletes the user's rows from the old shard, so only an empty result can be stale
+            shard = None if events or _router is None else _moved_to(conn, uid)
+            # read after the rows, never before: see archive.py
+            horizon = None if archived is None else _archived_before(conn)
+        if shard is None:
+            break
+        _router.moved(username, shard)
+    if horizon is not None and archived(horizon, events):
+        events += _read_archive(path, sql, (uid, *params), events)
+    for ev in events:
+        ev.username = username
+    return events
+
+
+# ---- Archive tier ----------------------------------------------------------
+# archive.py moves events dated before a horizon out of each hot file into an
+# archive file next to it. Queries whose range reaches below the horizon also
+# read the archive, and writes to an event the hot file no longer has go there.
+def archive_path(path: str | None = None) -> str:
+    """The archive file of a hot DB file (DB_FILE or a shard): name.archive.db."""
+    base, ext = os.path.splitext(path or DB_FILE)
+    return f"{base}.archive{ext or '.db'}"
+
+
+def _archived_before(conn) -> str | None:
+    cur = conn.cursor()
+    cur.row_factory = None
+    row = cur.execute("SELECT archived_before FROM archive_state").fetchone()
+    return row[0] if row else None
+
+
+def _has_archive(path: str | None) -> bool:
+    with _get_conn(path) as conn:
+        return _archived_before(conn) is not None
+
+
+def _read_archive(path: str | None, sql: str, params: tuple, hot: list[Event]) -> list[Event]:
+    """Events from sql on path's archive, minus those also in hot (caught mid-archiving: the hot copy wins)."""
+    with _get_conn(archive_path(path)) as conn:
+        conn.row_factory = row_factory
+        events = conn.execute(sql, params).fetchall()
+    ids = {ev.id for ev in hot}
+    return [ev for ev in events if ev.id not in ids]
+
+
+# ---- User ids --------------------------------------------------------------
+# Events reference users.id; the public API still takes usernames and maps
+# them here. Usernames never change and ids are never reused (AUTOINCREMENT),
+# so entries never go stale; unknown names are not cached, they may register.
+# The cache belongs to one DB_FILE and starts over when DB_FILE is pointed elsewhere.
+_user_ids: dict[str, int] = {}
+_usernames: dict[int, str] = {}
+_user_zones: dict[str, str] = {}
+_ids_file = None
+
+
+def _id_cache() -> dict[str, int]:
+    global _ids_file
+    if _ids_file != DB_FILE:
+        _user_ids.clear()
+        _usernames.clear()
+        _user_zones.clear()
+        _ids_file = DB_FILE
+    return _user_ids
+
+
+def user_id(username: str) -> int | None:
+    """The users.id of username (cached after the first lookup), None if there is no such user."""
+    uid = _id_cache().get(username)
+    if uid is None:
+        with _get_conn() as conn:
+            row = conn.execute("SELECT id FROM users WHERE username = ?", (username,)).fetchone()
+        if row is None:
+            return None
+        uid = _remember_user(username, row[0])
+    return uid
+
+
+def _username(uid: int) -> str | None:
+    _id_cache()
+    name = _usernames.get(uid)
+    if name is None:
+        with _get_conn() as conn:
+            row = conn.execute("SELECT username FROM users WHERE id = ?", (uid,)).fetchone()
+        if row is not None:
+            name = row[0]
+            _remember_user(name, uid)
+    return name
+
+
+def _remember_user(username: str, uid: int) -> int:
+    _id_cache()[username] = uid
+    _usernames[uid] = username
+    return uid
+
+
+# ---- Time zones ------------------------------------------------------------
+# Each user has the zone their events are entered in (users.tz; NULL means
+# this machine's zone, which keeps the desktop apps' users on local time) and
+# each event keeps the zone it was entered in, so changing a user's zone does
+# not move their existing events. Zones are cached like ids; a change made by
+# another process is seen after a restart.
+def user_zone(username: str) -> str:
+    """The IANA zone username's new events are entered in."""
+    _id_cache()
+    tz = _user_zones.get(username)
+    if tz is None:
+        with _get_conn() as conn:
+            row = conn.execute("SELECT tz FROM users WHERE username = ?", (username,)).fetchone()
+        tz = (row and row[0]) or zones.local_zone()
+        if row is not None:
+            _user_zones[username] = tz
+    return tz
+
+
+@timed
+def set_user_zone(username: str, tz: str) -> bool | None:
+    """Set the zone username's new events are entered in. False if there is no such user."""
+    found = _write("set_user_zone", None, username, zones.check_zone(tz))
+    if found is not False:
+        _id_cache()
+        _user_zones[username] = tz
+    return found
+
+
+def _to_zone(ev: Event, tz: str) -> Event:
+    """Move an event's wall-clock fields to zone tz; an end past midnight there is clipped to the start day."""
+    if ev.tz != tz:
+        ev.date, ev.start_min = zones.from_utc(ev.start_utc, tz)
+        end_date, end_min = zones.from_utc(ev.end_utc, tz)
+        ev.end_min = end_min if end_date == ev.date else MINUTES_PER_DAY - 1
+        ev.start, ev.end = format_minutes(ev.start_min), format_minutes(ev.end_min)
+        ev.tz = tz
+    return ev
 
 
 # ---- User functions --------------------------------------------------------
+@timed
 def create_user(username: str, password: str) -> bool:
     """Create a new user. Return True on success, False if username exists."""
     if not username or not password:
         return False
-    try:
-        with _get_conn() as conn:
-            conn.execute(
-                "INSERT INTO users (username, password_hash) VALUES (?, ?)",
-                (username, hash_password(password))
-            )
-            conn.commit()
-        return True
-    except sqlite3.IntegrityError:
-        return False
+    return _write("create_user", None, username, password)
 
 
+@timed
 def verify_user(username: str, password: str) -> bool:
     """Check if username/password matches DB."""
     with _get_conn() as conn:
         row = conn.execute(
-            "SELECT password_hash FROM users WHERE username = ?",
+            "SELECT id, password_hash FROM users WHERE username = ?",
             (username,)
         ).fetchone()
-    if not row:
+    # compare_digest: how long a wrong password takes says nothing about the hash
+    if not row or not hmac.compare_digest(row[1], hash_password(password)):
         return False
-    return row[0] == hash_password(password)
+    _remember_user(username, row[0])
+    return True
 
 
 # ---- Event functions -------------------------------------------------------
-def add_event(username: str, title: str, date: str, start: str, end: str) -> int:
-    """Insert a new event and return its ID."""
-    with _get_conn() as conn:
-        cur = conn.cursor()
-        cur.execute(
-            "INSERT INTO events (username, title, date, start, end) VALUES (?, ?, ?, ?, ?)",
-            (username, title, date, start, end)
-        )
-        conn.commit()
-        return cur.lastrowid
+@timed
+def add_event(username: str, title: str, date: str, start: str, end: str, reminders=(),
+              tz: str | None = None) -> int:
+    """
+    Insert a new event and return its ID; reminders are offsets in minutes
+    before its start. The times are wall-clock times in zone tz (None: the
+    user's zone, see user_zone).
+    """
+    _check_date(date)
+    _check_times(start, end)
+    reminders = _offsets(reminders)
+    tz = zones.check_zone(tz) if tz else user_zone(username)
+    event_id = _write_user("add_event", username, title, date, start, end, tz, reminders)
+    _notify("add_event", username, date, event_id)
+    return event_id
 
 
-def get_events_for_day(username: str, date: str) -> list[tuple]:
-    """Return [(id, title, start, end)] for a given user and date."""
-    with _get_conn() as conn:
-        cur = conn.cursor()
-        cur.execute(
-            "SELECT id, title, start, end FROM events WHERE username = ? AND date = ? ORDER BY start",
-            (username, date)
-        )
-        return cur.fetchall()
+@timed
+def insert_events(rows: list) -> int:
+    """
+    Insert (username, title, date, start, end, start_min, end_min) rows, one
+    transaction per shard. Times are in each user's zone.
+    """
+    names = {}
+    id_rows = []
+    for username, title, day, start, end, start_min, end_min in rows:
+        uid = user_id(username)
+        if uid is None:
+            raise UnknownUser(username)
+        names[uid] = username
+        tz = user_zone(username)
+        id_rows.append((uid, title, day, start, end, start_min, end_min, tz, *_utc(day, start_min, end_min, tz)))
 
+    count = 0
+    while id_rows:
+        batches = {}
+        for row in id_rows:
+            batches.setdefault(_user_path(names[row[0]]), []).append(row)
+        id_rows = []
+        for path, batch in batches.items():
+            try:
+                count += _write("insert_events", path, batch)
+            except UserMoved as moved:
+                _router.moved(names[moved.user_id], moved.shard)
+                id_rows.extend(batch)
+    _notify("insert_events", rows)
+    return count
 
-def get_event(event_id: int):
-    """Return (id, username, title, date, start, end) or None."""
-    with _get_conn() as conn:
-        cur = conn.cursor()
-        cur.execute(
-            "SELECT id, username, title, date, start, end FROM events WHERE id = ?",
-            (event_id,)
-        )
-        return cur.fetchone()
 
+@timed
+def get_events_for_day(username: str, date: str, tz: str | None = None) -> list[Event]:
+    """
+    Return the Events of a given user and date.
 
-def update_event(event_id: int, title: str, date: str, start: str, end: str) -> None:
-    """Update an existing event."""
-    with _get_conn() as conn:
-        conn.execute(
-            "UPDATE events SET title = ?, date = ?, start = ?, end = ? WHERE id = ?",
-            (title, date, start, end, event_id)
-        )
-        conn.commit()
+    Without tz: the events entered for that date, each in its own zone.
+    With tz: the events starting on that date in zone tz, converted to it
+    (see get_events_between).
+    """
+    if tz is not None:
+        return get_events_between(username, date, date, tz)
+    _wait_for_writes()
+    events = _read_user(
+        username,
+        f"SELECT {EVENT_COLUMNS} FROM events WHERE user_id = ? AND date = ? ORDER BY start_min, id",
+        date,
+        archived=lambda horizon, _events: date < horizon,
+    )
+    events.sort(key=_day_order)  # already sorted unless archived events were added
+    return events
 
 
-def delete_event(event_id: int) -> None:
-    """Delete an event by ID."""
-    with _get_conn() as conn:
-        conn.execute("DELETE FROM events WHERE id = ?", (event_id,))
-        conn.commit()
+def _day_order(ev: Event) -> tuple:
+    return (ev.start_min, ev.id)
+
+
+@timed
+def get_events_between(username: str, first: str, last: str, tz: str | None = None) -> list[Event]:
+    """
+    The user's events starting on days first..last (YYYY-MM-DD, inclusive)
+    of zone tz (None: the user's zone), converted to tz and ordered by
+    (date, start_min, id).
+
+    The range is read by UTC instant (idx_events_user_utc), so it costs the
+    same whatever zones the events were entered in; only events entered in
+    another zone are converted.
+    """
+    tz = zones.check_zone(tz) if tz else user_zone(username)
+    lo, hi = zones.day_bounds(first, last, tz)
+    _wait_for_writes()
+    events = _read_user(
+        username,
+        f"SELECT {EVENT_COLUMNS} FROM events WHERE user_id = ? AND start_utc >= ? AND start_utc < ?"
+        " ORDER BY start_utc, id",
+        lo, hi,
+        # an event starting on day first in tz may be dated the day before in its own zone
+        archived=lambda horizon, _events: first <= horizon,
+    )
+    for ev in events:
+        _to_zone(ev, tz)
+    events.sort(key=event_key)  # start_utc order, except around a DST change or with archived events added
+    return events
+
+
+@timed
+def get_event(event_id: int, tz: str | None = None) -> Event | None:
+    """Return the Event with this ID (in its own zone, or converted to tz) or None."""
+    _wait_for_writes()
+    sql = f"SELECT {EVENT_COLUMNS} FROM events WHERE id = ?"
+    while True:
+        path = _event_path(event_id)
+        with _get_conn(path) as conn:
+            conn.row_factory = row_factory
+            ev = conn.execute(sql, (event_id,)).fetchone()
+            new_id = None if ev is not None or _router is None else _forward(conn, event_id)
+            archived = ev is None and new_id is None and _archived_before(conn) is not None
+        if new_id is None:
+            break
+        event_id = new_id
+    if archived:
+        ev = next(iter(_read_archive(path, sql, (event_id,), [])), None)
+    if ev is not None:
+        ev.username = _username(ev.user_id)
+        if tz is not None:
+            _to_zone(ev, tz)
+    return ev
+
+
+@timed
+def update_event(event_id: int, title: str, date: str, start: str, end: str,
+                 version: int | None = None, tz: str | None = None) -> int | None:
+    """
+    Update an existing event and return its new version.
+
+    Pass the version the caller read to update only if nobody changed the
+    event since; otherwise ConflictError carries the current event. Without
+    a version the update is unconditional (last writer wins) and returns
+    None if there is no such event or the write buffer queued it.
+
+    The times are in zone tz, which becomes the event's zone (None: the
+    zone the event already has).
+    """
+    _check_date(date)
+    _check_times(start, end)
+    tz = zones.check_zone(tz) if tz else None
+    new_version = _write_event("update_event", event_id, title, date, start, end, tz, version)
+    _notify("update_event", event_id, date)
+    return new_version
+
+
+@timed
+def list_events(username: str, after_key: tuple | None = None, limit: int = 50,
+                order: str = "asc") -> tuple[list[Event], tuple | None]:
+    """
+    One page of a user's events ordered by (date, start_min, id).
+
+    Keyset pagination: pass the returned next_key as after_key to get the
+    following page, so every page costs the same however deep it is.
+    Returns (events, next_key); next_key is None on the last page.
+    """
+    if order not in ("asc", "desc"):
+        raise ValueError(f"order must be 'asc' or 'desc', not {order!r}")
+    op, direction = (">", "ASC") if order == "asc" else ("<", "DESC")
+    sql = f"SELECT {EVENT_COLUMNS} FROM events WHERE user_id = ?"
+    params: list = []
+    if after_key is not None:
+        sql += f" AND (date, start_min, id) {op} (?, ?, ?)"
+        params.extend(after_key)
+    sql += f" ORDER BY date {direction}, start_min {direction}, id {direction} LIMIT ?"
+    params.append(limit)
+
+    def archived(horizon, events):
+        if order == "asc":
+            return after_key is None or after_key[0] < horizon
+        # archived events are all dated before the horizon, so they sort after a full page ending at or above it
+        return len(events) < limit or events[-1].date < horizon
+
+    _wait_for_writes()
+    events = _read_user(username, sql, *params, archived=archived)
+    events.sort(key=event_key, reverse=order == "desc")  # already sorted unless archived events were added
+    del events[limit:]
+    next_key = event_key(events[-1]) if len(events) == limit else None
+    return events, next_key
+
+
+def event_key(ev: Event) -> tuple:
+    """The (date, start_min, id) keyset position of an event."""
+    return (ev.date, ev.start_min, ev.id)
+
+
+@timed
+def delete_event(event_id: int, version: int | None = None) -> None:
+    """Delete an event by ID (only if still at version, else ConflictError, when one is given)."""
+    _write_event("delete_event", event_id, version)
+    _notify("delete_event", event_id)
+
+
+@timed
+def patch_event(event_id: int, version: int, title: str | None = None, when: tuple | None = None) -> int:
+    """
+    Change only an event's title and/or when = (date, start, end, tz), if it
+    is still at version (else ConflictError); returns the new version. Used
+    by undo.py to apply its diffs.
+    """
+    if when is not None:
+        _check_date(when[0])
+        _check_times(*when[1:3])
+    new_version = _write_event("patch_event", event_id, title, when, version)
+    _notify("update_event", event_id, when[0] if when else None)
+    return new_version
+
+
+@timed
+def restore_event(username: str, event_id: int, title: str, date: str, start: str, end: str, tz: str,
+                  version: int, reminders=(), utc: tuple | None = None) -> None:
+    """
+    Put a deleted event back under its old id, at version, with its
+    reminders; utc = (start_utc, end_utc) keeps its exact instants (None:
+    from the wall-clock times). ConflictError if the id is taken again.
+    """
+    _check_date(date)
+    _check_times(start, end)
+    uid = user_id(username)
+    if uid is None:
+        raise UnknownUser(username)
+    _write("restore_event", _event_path(event_id), event_id, uid, title, date, start, end, tz,
+           tuple(utc) if utc else None, _offsets(reminders), version)
+    _notify("add_event", username, date, event_id)
+
+
+# ---- Reminders -------------------------------------------------------------
+@timed
+def set_reminders(event_id: int, offsets) -> bool | None:
+    """
+    Replace an event's reminders with these offsets (minutes before its
+    start). Returns False if there is no such event (None if the write
+    buffer queued it).
+    """
+    found = _write_event("set_reminders", event_id, _offsets(offsets))
+    _notify("set_reminders", event_id)
+    return found
+
+
+@timed
+def get_reminders(event_id: int) -> list[int]:
+    """The event's reminder offsets, smallest first."""
+    _wait_for_writes()
+    with _get_conn(_event_path(event_id)) as conn:
+        return [row[0] for row in conn.execute(
+            "SELECT offset_min FROM reminders WHERE event_id = ? ORDER BY offset_min", (event_id,))]
+
+
+def _offsets(offsets) -> tuple:
+    offsets = tuple(sorted({int(o) for o in offsets}))
+    if offsets and offsets[0] < 0:
+        raise ValueError("reminder offsets are minutes before the event and cannot be negative")
+    return offsets
 
 
 # ---- Dev test --------------------------------------------------------------
@@ -0,0 +1,87 @@
+"""
+Event record shared by the Qt app, the Tk app and the backend.
+
+Rows come out of sqlite as Event objects directly (see row_factory), with the
+"hh:mm AM/PM" start/end strings pre-parsed into minutes of the day so views
+never have to parse times while laying out. date/start/end are wall-clock
+times in the IANA zone tz; start_utc/end_utc are the same instants as UTC
+minutes since 1970-01-01 (see zones.py).
+"""
+from functools import lru_cache
+
+from timeutil import parse_minutes, format_minutes
+
+
+def _minutes_or_zero(time_str) -> int:
+    try:
+        return parse_minutes(time_str)
+    except ValueError:
+        return 0
+
+
+class Event:
+    """One calendar event. start/end are display strings, start_min/end_min their parsed minutes."""
+
+    __slots__ = ("id", "user_id", "username", "title", "date", "start", "end", "start_min", "end_min", "version",
+                 "tz", "start_utc", "end_utc")
+
+    def __init__(self, id=None, title="", date="", start="", end="", username=None,
+                 start_min=None, end_min=None, version=None, user_id=None, tz=None, start_utc=None, end_utc=None):
+        self.id = id
+        self.user_id = user_id  # users.id as stored; username is filled in by database.py reads
+        self.username = username
+        self.title = title
+        self.date = date
+        self.start = start
+        self.end = end
+        self.start_min = _minutes_or_zero(start) if start_min is None else start_min
+        self.end_min = _minutes_or_zero(end) if end_min is None else end_min
+        self.version = version  # row version for optimistic concurrency (None = not from the DB)
+        self.tz = tz  # zone of date/start/end (None = not from the DB)
+        self.start_utc = start_utc
+        self.end_utc = end_utc
+
+    @classmethod
+    def from_minutes(cls, title: str, date: str, start_min: int, end_min: int, id=None, username=None):
+        """Build an event from minutes of the day (the Tk dialogs work this way)."""
+        return cls(id, title, date, format_minutes(start_min), format_minutes(end_min),
+                   username, start_min, end_min)
+
+    @property
+    def duration(self) -> int:
+        """Length in minutes, at least 1 so zero-length events stay visible."""
+        return max(1, self.end_min - self.start_min)
+
+    def to_dict(self) -> dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __eq__(self, other):
+        if not isinstance(other, Event):
+            return NotImplemented
+        return all(getattr(self, n) == getattr(other, n) for n in self.__slots__)
+
+    def __repr__(self):
+        return f"Event(id={self.id!r}, title={self.title!r}, date={self.date!r}, {self.start}-{self.end})"
+
+
+# ---- sqlite row factory ----------------------------------------------------
+@lru_cache(maxsize=64)
+def _columns(description: tuple) -> tuple:
+    return tuple(d[0] if d[0] in Event.__slots__ else None for d in description)
+
+
+def row_factory(cursor, row) -> Event:
+    """sqlite3 row_factory building an Event from whichever event columns were selected."""
+    names = _columns(cursor.description)
+    ev = Event.__new__(Event)
+    ev.id = ev.user_id = ev.username = ev.start_min = ev.end_min = ev.version = None
+    ev.tz = ev.start_utc = ev.end_utc = None
+    ev.title = ev.date = ev.start = ev.end = ""
+    for name, value in zip(names, row):
+        if name:
+            setattr(ev, name, value)
+    if ev.start_min is None:
+        ev.start_min = _minutes_or_zero(ev.start)
+    if ev.end_min is None:
+        ev.end_min = _minutes_or_zero(ev.end)
+    return ev
@@ -3,12 +3,14 @@ from PySide6.QtWidgets import (
 )
 from PySide6.QtCore import Qt
 
+from event import Event
+
 class EventDetailsDialog(QDialog):
     """Universal Event Details with exit edit and delete options"""
 
     def __init__(self, parent=None, event_data=None):
         """
-        event_data = {
+        event_data = Event or {
         "id": int,
         "title": str,
         "start": "hh:mm AM/PM",
@@ -20,6 +22,8 @@ class EventDetailsDialog(QDialog):
         }
         """
         super().__init__(parent)
+        if isinstance(event_data, Event):
+            event_data = event_data.to_dict()
         self.setWindowTitle("Event Details")
         self.setMinimumWidth(300)
         self.result_action = None #will hold edit delete or exit
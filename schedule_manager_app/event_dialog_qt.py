@@ -1,14 +1,19 @@
 from PySide6.QtWidgets import (
     QDialog, QLineEdit, QDateEdit, QTimeEdit, QDialogButtonBox,
-    QHBoxLayout, QVBoxLayout, QLabel, QPushButton, QMessageBox
+    QHBoxLayout, QVBoxLayout, QLabel, QPushButton, QMessageBox, QComboBox
 )
 from PySide6.QtCore import QDate, QTime
 
+from event import Event
+from reminders import REMINDER_CHOICES
+from timeutil import parse_minutes, format_minutes
+
 
 class EventDialog(QDialog):
     """Google Calendar–style dialog for adding/editing events."""
 
-    def __init__(self, parent, title="", date=None, start_time=None, end_time=None, event_id=None):
+    def __init__(self, parent, title="", date=None, start_time=None, end_time=None, event_id=None,
+                 reminders=()):
         super().__init__(parent)
         self.setWindowTitle("Edit Event" if event_id else "Add Event")
         self.event_id = event_id
@@ -54,6 +59,19 @@ class EventDialog(QDialog):
         if end_time:
             self.end_input.setTime(self.parse_time_str(end_time))
 
+        # --- Reminder (the first one, if the event has several) ---
+        self.reminder_input = QComboBox()
+        for label, offset in REMINDER_CHOICES:
+            self.reminder_input.addItem(label, offset)
+        if reminders:
+            index = self.reminder_input.findData(reminders[0])
+            if index < 0:  # set elsewhere to an offset the list does not offer
+                self.reminder_input.addItem(f"{reminders[0]} minutes before", reminders[0])
+                index = self.reminder_input.count() - 1
+            self.reminder_input.setCurrentIndex(index)
+        self._initial_reminder = self.reminder_input.currentData()
+        main_layout.addWidget(self.reminder_input)
+
         # --- Save / Cancel buttons ---
         buttons = QDialogButtonBox(QDialogButtonBox.Save | QDialogButtonBox.Cancel)
         buttons.accepted.connect(self.accept)
@@ -75,15 +93,8 @@ class EventDialog(QDialog):
     def parse_time_str(self, time_str: str) -> QTime:
         """Parse 'hh:mm AM/PM' into QTime safely."""
         try:
-            parts = time_str.strip().split()
-            hh, mm = map(int, parts[0].split(":"))
-            ampm = parts[1].upper() if len(parts) > 1 else "AM"
-            if ampm == "PM" and hh != 12:
-                hh += 12
-            if ampm == "AM" and hh == 12:
-                hh = 0
-            return QTime(hh, mm)
-        except Exception:
+            return QTime(*divmod(parse_minutes(time_str), 60))
+        except ValueError:
             return QTime.currentTime()
 
     # ------------------------------------------------------
@@ -96,16 +107,26 @@ class EventDialog(QDialog):
             self.deleted = True
             self.accept()
 
-    def get_data(self):
-        """Return structured event data."""
-        date_str = self.date_input.date().toString("yyyy-MM-dd")
-        start_time = self.start_input.time().toString("hh:mm AP")
-        end_time = self.end_input.time().toString("hh:mm AP")
-
-        return {
-            "title": self.title_input.text().strip(),
-            "date": date_str,
-            "start": start_time,
-            "end": end_time,
-            "deleted": self.deleted,
-        }
+    def get_data(self) -> Event:
+        """Return the entered event (check self.deleted for a delete request)."""
+        start = self.start_input.time()
+        end = self.end_input.time()
+        start_min = start.hour() * 60 + start.minute()
+        end_min = end.hour() * 60 + end.minute()
+
+        return Event(
+            id=self.event_id,
+            title=self.title_input.text().strip(),
+            date=self.date_input.date().toString("yyyy-MM-dd"),
+            start=format_minutes(start_min),
+            end=format_minutes(end_min),
+            start_min=start_min,
+            end_min=end_min,
+        )
+
+    def get_reminders(self) -> list[int] | None:
+        """The reminder offsets to save, or None if the reminder was left as it was."""
+        offset = self.reminder_input.currentData()
+        if offset == self._initial_reminder:
+            return None
+        return [] if offset is None else [offset]
@@ -0,0 +1,364 @@
+"""
+The logged-in user's events as one Qt item model, shared by the calendar views.
+
+The day, week, month and search views of CalendarPage do not read
+database.py themselves; they ask the page's EventModel for a date range. It
+loads the weeks of the range it does not hold yet on a worker thread (a run
+of adjacent weeks in one get_events_between query) and inserts their rows
+when they arrive, so an event is fetched once however many views show it,
+and paging back to a week already seen costs no query.
+
+    model = EventModel("Europe/Berlin")
+    model.set_user("alice")
+    model.request("2025-06-01", "2025-06-30")         # loads in the background; daysChanged when done
+    model.events_between("2025-06-02", "2025-06-02")  # what is loaded of that range, from memory
+
+Rows are the events in (date, start_min, id) order, converted to the
+model's zone. Writes made through database.py are applied as they happen
+(database.add_listener): the event written is read again and its row
+updated (dataChanged), moved (rowsMoved), inserted or removed, and
+daysChanged(first, last) names the days whose events changed, which is
+what the calendar views lay out again. Writes by other processes are not
+seen until the user changes.
+
+canFetchMore/fetchMore extend the loaded weeks FETCH_WEEKS at a time past
+the last one, up to the user's last event, so list views page through the
+calendar as they scroll.
+
+At most max_weeks (MAX_WEEKS) weeks are held: past that, the weeks furthest
+from the last range requested are dropped (rowsRemoved, daysChanged), so
+memory stays bounded however far the views page or scroll. A dropped week
+is loaded again if it is asked for again.
+"""
+import bisect
+import logging
+import threading
+from datetime import date, timedelta
+
+from PySide6.QtCore import QAbstractListModel, QModelIndex, Qt, Signal
+
+import database
+from event import Event
+
+log = logging.getLogger(__name__)
+
+FETCH_WEEKS = 4  # weeks loaded by one fetchMore
+MAX_WEEKS = 104  # weeks held at most
+
+EVENT_ROLE = Qt.UserRole + 1  # the Event itself
+TITLE_ROLE = Qt.UserRole + 2  # its title alone (what the search view filters on)
+DATE_ROLE = Qt.UserRole + 3   # its date, YYYY-MM-DD
+
+
+def _monday(day: str) -> date:
+    d = date.fromisoformat(day)
+    return d - timedelta(days=d.weekday())
+
+
+class EventModel(QAbstractListModel):
+    """One user's events over the weeks the views have asked for, loaded in the background."""
+
+    # (first, last): the events of days first..last (YYYY-MM-DD) were loaded or changed
+    daysChanged = Signal(str, str)
+    # worker -> GUI thread: (username, weeks, events, epoch)
+    _loaded = Signal(str, object, object, int)
+    # a write from any thread, applied on the GUI thread
+    _written = Signal(str, object)
+
+    def __init__(self, tz: str, loader=None, parent=None, max_weeks: int = MAX_WEEKS):
+        super().__init__(parent)
+        self.tz = tz
+        self.max_weeks = max_weeks
+        self._load = loader or database.get_events_between
+        self.username = None
+        self._events: list[Event] = []  # the rows
+        self._keys: list[tuple] = []    # their event_key, for bisect
+        self._by_id: dict[int, Event] = {}
+        self._weeks: set[date] = set()  # Mondays of the loaded weeks
+        self._pending: set[date] = set()  # queued or loading
+        self._focus = None  # (first, last) Monday of the last range requested: what eviction keeps
+        self._last_day = None  # date of the user's last event: where fetchMore stops
+        self._lock = threading.Lock()
+        self._wake = threading.Condition(self._lock)
+        self._jobs: list[tuple[str, list[date]]] = []  # (username, run of adjacent weeks), oldest first
+        self._loading = False
+        self._closed = False
+        self._epoch = 0  # bumped by every write; a load that overlaps one is redone
+        self.queries = self.fetched = 0
+        self._loaded.connect(self._insert_loaded)
+        self._written.connect(self._apply_write)
+        self._thread = threading.Thread(target=self._run, name="event-model", daemon=True)
+        self._thread.start()
+        database.add_listener(self._on_write)
+
+    def set_user(self, username: str | None) -> None:
+        """Show username's events (nothing loaded yet); a no-op if it already does."""
+        if username == self.username:
+            return
+        self.beginResetModel()
+        self.username = username
+        self._clear()
+        self.endResetModel()
+        self._find_last_day()
+
+    def close(self) -> None:
+        """Stop the worker and stop listening for writes."""
+        database.remove_listener(self._on_write)
+        with self._lock:
+            self._closed = True
+            self._wake.notify()
+        self._thread.join()
+
+    # ---- Ranges ----
+    def request(self, first: str, last: str) -> bool:
+        """
+        Queue the weeks of days first..last that are not loaded or on their
+        way; True if all of them are loaded already.
+        """
+        if not self.username:
+            return True
+        monday, end = _monday(first), _monday(last)
+        self._focus = (monday, end)
+        run, missing = [], False
+        while monday <= end:
+            if monday not in self._weeks:
+                missing = True
+                if monday not in self._pending:
+                    run.append(monday)
+                elif run:
+                    self._queue(run)
+                    run = []
+            monday += timedelta(days=7)
+        if run:
+            self._queue(run)
+        return not missing
+
+    def loaded(self, first: str, last: str) -> bool:
+        """Whether the events of days first..last are all in the model."""
+        monday, end = _monday(first), _monday(last)
+        while monday <= end:
+            if monday not in self._weeks:
+                return False
+            monday += timedelta(days=7)
+        return True
+
+    def events_between(self, first: str, last: str) -> list[Event]:
+        """The loaded events of days first..last, in row order."""
+        lo = bisect.bisect_left(self._keys, (first,))
+        hi = bisect.bisect_left(self._keys, (last + "\x7f",), lo)
+        return self._events[lo:hi]
+
+    def idle(self) -> bool:
+        """True when no load is queued or running (its rows may still be on their way to the GUI thread)."""
+        with self._lock:
+            return not self._jobs and not self._loading
+
+    # ---- QAbstractListModel ----
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._events)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or not 0 <= index.row() < len(self._events):
+            return None
+        ev = self._events[index.row()]
+        if role == Qt.DisplayRole:
+            return f"{ev.date}   {ev.start} - {ev.end}   {ev.title}"
+        if role == EVENT_ROLE:
+            return ev
+        if role == TITLE_ROLE:
+            return ev.title
+        if role == DATE_ROLE:
+            return ev.date
+        return None
+
+    def roleNames(self):
+        names = super().roleNames()
+        names.update({EVENT_ROLE: b"event", TITLE_ROLE: b"title", DATE_ROLE: b"date"})
+        return names
+
+    def canFetchMore(self, parent=QModelIndex()):
+        if parent.isValid() or not self.username or self._last_day is None:
+            return False
+        monday = self._frontier()
+        return monday <= self._last_day and monday not in self._pending
+
+    def fetchMore(self, parent=QModelIndex()):
+        if not self.canFetchMore(parent):
+            return
+        first = self._frontier()
+        self.request(first.isoformat(), (first + timedelta(weeks=FETCH_WEEKS - 1)).isoformat())
+
+    def _frontier(self) -> date:
+        """Monday of the week after the last one loaded (this week's when none is)."""
+        if not self._weeks:
+            return _monday(date.today().isoformat())
+        return max(self._weeks) + timedelta(days=7)
+
+    # ---- Loading ----
+    def _queue(self, weeks: list[date]) -> None:
+        self._pending.update(weeks)
+        with self._lock:
+            self._jobs.append((self.username, weeks))
+            self._wake.notify()
+
+    def _run(self) -> None:
+        while True:
+            with self._lock:
+                self._loading = False
+                while not self._jobs and not self._closed:
+                    self._wake.wait()
+                if self._closed:
+                    return
+                username, weeks = self._jobs.pop(0)
+                self._loading = True
+                epoch = self._epoch
+            first, last = weeks[0], weeks[-1] + timedelta(days=6)
+            try:
+                events = self._load(username, first.isoformat(), last.isoformat(), self.tz)
+            except Exception:
+                log.exception("loading %s..%s failed", first, last)
+                events = None
+            self._loaded.emit(username, weeks, events, epoch)
+
+    def _insert_loaded(self, username: str, weeks: list, events: list | None, epoch: int) -> None:
+        if username != self.username:
+            return  # loaded for the previous user
+        if events is None:
+            self._pending.difference_update(weeks)  # failed; asked for again by the next request
+            return
+        with self._lock:
+            stale = epoch != self._epoch
+        if stale:  # a write landed while loading; the rows may predate it
+            with self._lock:
+                self._jobs.append((username, weeks))
+                self._wake.notify()
+            return
+        self.queries += 1
+        self.fetched += len(events)
+        self._pending.difference_update(weeks)
+        self._weeks.update(weeks)
+        events = [ev for ev in events if ev.id not in self._by_id]
+        if events:
+            # the weeks were not loaded, so their rows all go in at one place
+            row = bisect.bisect_left(self._keys, database.event_key(events[0]))
+            self.beginInsertRows(QModelIndex(), row, row + len(events) - 1)
+            self._events[row:row] = events
+            self._keys[row:row] = [database.event_key(ev) for ev in events]
+            for ev in events:
+                self._by_id[ev.id] = ev
+            self.endInsertRows()
+        self.daysChanged.emit(weeks[0].isoformat(), (weeks[-1] + timedelta(days=6)).isoformat())
+        self._evict()
+
+    def _evict(self) -> None:
+        """Drop the weeks furthest from the last request until at most max_weeks are held."""
+        extra = len(self._weeks) - self.max_weeks
+        if extra <= 0 or self._focus is None:
+            return
+        first, last = self._focus
+
+        def distance(monday: date) -> int:
+            return max((first - monday).days, (monday - last).days, 0)
+
+        for monday in sorted(self._weeks, key=distance, reverse=True)[:extra]:
+            if distance(monday) == 0:
+                break  # the requested range itself is kept whatever its length
+            self._drop_week(monday)
+
+    def _drop_week(self, monday: date) -> None:
+        self._weeks.discard(monday)
+        first, last = monday.isoformat(), (monday + timedelta(days=6)).isoformat()
+        lo = bisect.bisect_left(self._keys, (first,))
+        hi = bisect.bisect_left(self._keys, (last + "\x7f",), lo)
+        if hi > lo:
+            self.beginRemoveRows(QModelIndex(), lo, hi - 1)
+            for ev in self._events[lo:hi]:
+                del self._by_id[ev.id]
+            del self._events[lo:hi], self._keys[lo:hi]
+            self.endRemoveRows()
+        self.daysChanged.emit(first, last)
+
+    # ---- Writes ----
+    def _on_write(self, op: str, args: tuple) -> None:
+        if op == "set_reminders":
+            return  # reminders are not part of the rows
+        with self._lock:
+            self._epoch += 1
+        self._written.emit(op, args)  # direct on the GUI thread, queued from any other
+
+    def _apply_write(self, op: str, args: tuple) -> None:
+        if not self.username:
+            return
+        if op == "add_event":
+            if args[0] == self.username:
+                self._replace(args[2])
+        elif op == "update_event":
+            self._replace(args[0])
+        elif op == "delete_event":
+            self._remove(args[0])
+        else:  # bulk writes: load everything shown again
+            weeks = sorted(self._weeks | self._pending)
+            self.beginResetModel()
+            self._clear()
+            self.endResetModel()
+            self._find_last_day()
+            for monday in weeks:
+                self._queue([monday])
+
+    def _replace(self, event_id: int) -> None:
+        """Read the event again and put its row where it now belongs (or drop it)."""
+        ev = database.get_event(event_id, tz=self.tz)
+        old = self._by_id.get(event_id)
+        if ev is not None and ev.username == self.username:
+            day = date.fromisoformat(ev.date)
+            if self._last_day is None or day >= self._last_day:
+                self._last_day = day + timedelta(days=1)
+        if ev is None or ev.username != self.username or _monday(ev.date) not in self._weeks:
+            if old is not None:
+                self._remove(event_id)
+            return
+        key = database.event_key(ev)
+        self._by_id[event_id] = ev
+        if old is None:
+            row = bisect.bisect_left(self._keys, key)
+            self.beginInsertRows(QModelIndex(), row, row)
+            self._events.insert(row, ev)
+            self._keys.insert(row, key)
+            self.endInsertRows()
+            self.daysChanged.emit(ev.date, ev.date)
+            return
+        row = bisect.bisect_left(self._keys, database.event_key(old))
+        dest = bisect.bisect_left(self._keys, key)  # also where it goes once moved (see beginMoveRows)
+        if dest in (row, row + 1):
+            self._events[row], self._keys[row] = ev, key
+            self.dataChanged.emit(self.index(row), self.index(row))
+        else:
+            self.beginMoveRows(QModelIndex(), row, row, QModelIndex(), dest)
+            del self._events[row], self._keys[row]
+            at = dest if dest < row else dest - 1
+            self._events.insert(at, ev)
+            self._keys.insert(at, key)
+            self.endMoveRows()
+        self.daysChanged.emit(min(old.date, ev.date), max(old.date, ev.date))
+
+    def _remove(self, event_id: int) -> None:
+        old = self._by_id.pop(event_id, None)
+        if old is None:
+            return
+        row = bisect.bisect_left(self._keys, database.event_key(old))
+        self.beginRemoveRows(QModelIndex(), row, row)
+        del self._events[row], self._keys[row]
+        self.endRemoveRows()
+        self.daysChanged.emit(old.date, old.date)
+
+    def _find_last_day(self) -> None:
+        last = database.list_events(self.username, None, 1, "desc")[0] if self.username else None
+        self._last_day = date.fromisoformat(last[0].date) + timedelta(days=1) if last else None
+
+    def _clear(self) -> None:
+        self._events, self._keys = [], []
+        self._by_id.clear()
+        self._weeks.clear()
+        self._pending.clear()
+        with self._lock:
+            self._jobs.clear()
@@ -0,0 +1,130 @@
+"""
+Group commit: many writes, one transaction, one fsync.
+
+A GroupCommitter owns the only write connection and a background thread.
+Callers submit named writes (the ops in database.WRITES); the thread takes
+everything queued at that moment (up to max_batch, optionally waiting up to
+max_wait_ms for more) and runs it in a single transaction. Each write gets
+its own SAVEPOINT, so one failing write is rolled back and reported to its
+caller without affecting the others in the batch.
+
+    committer = GroupCommitter()
+    event_id = committer.call("add_event", "alice", "Standup", "2025-01-06", "09:00 AM", "09:15 AM")
+    committer.close()
+"""
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+import database
+import instrumentation
+
+log = logging.getLogger(__name__)
+
+MAX_BATCH = 256
+
+_STOP = object()
+
+
+class GroupCommitter:
+    """Serializes writes onto one connection and commits them in batches."""
+
+    def __init__(self, db_file: str | None = None, max_batch: int = MAX_BATCH, max_wait_ms: float = 0.0):
+        self.db_file = db_file or database.DB_FILE
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self.transactions = 0
+        self.writes = 0
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._run, name="group-commit", daemon=True)
+        self._thread.start()
+
+    def submit(self, op: str, *args) -> Future:
+        """Queue database.WRITES[op](conn, *args); the Future resolves once it is committed."""
+        if op not in database.WRITES:
+            raise ValueError(f"unknown write: {op!r}")
+        if not self._thread.is_alive():
+            raise RuntimeError("GroupCommitter is closed")
+        fut = Future()
+        self._queue.put((fut, op, args))
+        return fut
+
+    def call(self, op: str, *args):
+        """submit() and wait for the committed result (re-raises the write's exception)."""
+        return self.submit(op, *args).result()
+
+    def stats(self) -> dict:
+        return {
+            "transactions": self.transactions,
+            "writes": self.writes,
+            "avg_batch": self.writes / self.transactions if self.transactions else 0.0,
+        }
+
+    def close(self) -> None:
+        """Commit everything already submitted, then stop the thread."""
+        if self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join()
+
+    # ---- Writer thread ----
+    def _take_batch(self, first) -> tuple[list, bool]:
+        """first plus whatever else is queued (waiting up to max_wait). Returns (batch, stop)."""
+        batch = [first]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch:
+            try:
+                remaining = deadline - time.monotonic()
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is _STOP:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def _run(self) -> None:
+        # autocommit mode: transactions and savepoints are issued explicitly below
+        conn = instrumentation.connect(self.db_file, isolation_level=None)
+        try:
+            while True:
+                item = self._queue.get()
+                if item is _STOP:
+                    return
+                batch, stop = self._take_batch(item)
+                self._commit(conn, batch)
+                if stop:
+                    return
+        finally:
+            conn.close()
+
+    def _commit(self, conn, batch: list) -> None:
+        results = []
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            for fut, op, args in batch:
+                conn.execute("SAVEPOINT write")
+                try:
+                    results.append((fut, database.WRITES[op](conn, *args), None))
+                    conn.execute("RELEASE write")
+                except Exception as exc:
+                    conn.execute("ROLLBACK TO write")
+                    conn.execute("RELEASE write")
+                    results.append((fut, None, exc))
+            conn.execute("COMMIT")
+        except Exception as exc:
+            log.exception("group commit of %d writes failed", len(batch))
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            for fut, _, _ in batch:
+                fut.set_exception(exc)
+            return
+
+        self.transactions += 1
+        self.writes += len(batch)
+        for fut, result, exc in results:
+            if exc is None:
+                fut.set_result(result)
+            else:
+                fut.set_exception(exc)
@@ -0,0 +1,234 @@
+"""
+Streaming iCalendar (.ics) import/export.
+
+Import walks the file line by line (iter_vevents is a generator, so memory
+stays flat whatever the file size) and inserts events in batched
+transactions through database.insert_events. Export pages through a user's
+events by keyset pagination on events.id (the hot file, then the archive if
+anything was archived) and yields the calendar text chunk by chunk.
+
+Only what the events table can hold round-trips: SUMMARY, DTSTART and
+DTEND/DURATION. Times with a trailing Z or a known TZID are converted to the
+user's zone (database.user_zone); floating times and unknown TZIDs are taken
+as wall-clock times there. Events running past midnight are clipped to the
+end of their start day. Export writes every time in UTC (a trailing Z).
+"""
+import re
+from datetime import datetime, timedelta, timezone
+
+import database
+import zones
+from event import row_factory
+from timeutil import format_minutes
+
+BATCH_SIZE = 5000
+PAGE_SIZE = 1000
+PRODID = "-//Schedule Manager//EN"
+
+_DURATION = re.compile(r"([+-])?P(?:(\d+)W)?(?:(\d+)D)?(?:T(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?)?$")
+
+
+# ---- Parsing ---------------------------------------------------------------
+def _unfold(lines):
+    """Join RFC 5545 folded lines (continuations start with a space or tab)."""
+    current = None
+    for raw in lines:
+        line = raw.rstrip("\r\n")
+        if line[:1] in (" ", "\t") and current is not None:
+            current += line[1:]
+            continue
+        if current is not None:
+            yield current
+        current = line
+    if current:
+        yield current
+
+
+_WANTED = frozenset(("SUMMARY", "DTSTART", "DTEND", "DURATION"))
+
+
+def _params(head: str) -> dict:
+    """'DTSTART;TZID=X;VALUE=DATE-TIME' -> {'TZID': 'X', 'VALUE': 'DATE-TIME'}."""
+    return dict(p.partition("=")[::2] for p in head.split(";")[1:])
+
+
+def iter_vevents(lines):
+    """Yield {'SUMMARY': (params, value), 'DTSTART': ..., ...} for each VEVENT in the lines."""
+    event = None
+    depth = 0  # nested components (VALARM) inside a VEVENT
+    for line in _unfold(lines):
+        head, _, value = line.partition(":")
+        name = head.partition(";")[0].upper()
+        if name == "BEGIN":
+            if value.upper() == "VEVENT":
+                event = {}
+            elif event is not None:
+                depth += 1
+        elif name == "END":
+            if event is not None and depth:
+                depth -= 1
+            elif value.upper() == "VEVENT" and event is not None:
+                yield event
+                event = None
+        elif event is not None and not depth and name in _WANTED:
+            event[name] = (_params(head) if ";" in head else {}, value)
+
+
+def _parse_dt(params: dict, value: str, tz: str) -> datetime:
+    # slicing is several times faster than strptime, which dominates large imports
+    value = value.strip()
+    if len(value) < 8 or (len(value) > 8 and (len(value) < 15 or value[8] != "T")):
+        raise ValueError(f"bad date-time: {value!r}")
+    day = datetime(int(value[0:4]), int(value[4:6]), int(value[6:8]))
+    if params.get("VALUE", "").upper() == "DATE" or len(value) == 8:
+        return day
+    dt = day.replace(hour=int(value[9:11]), minute=int(value[11:13]), second=int(value[13:15]))
+    if value.endswith("Z"):
+        source = timezone.utc
+    else:
+        try:
+            source = zones.zone(params.get("TZID", "").strip('"'))
+        except ValueError:
+            return dt  # floating time, or a zone we do not know
+    return dt.replace(tzinfo=source).astimezone(zones.zone(tz)).replace(tzinfo=None)
+
+
+def _parse_duration(value: str) -> timedelta:
+    m = _DURATION.match(value.strip())
+    if not m:
+        raise ValueError(f"bad DURATION: {value!r}")
+    sign, w, d, h, mi, s = m.groups()
+    delta = timedelta(weeks=int(w or 0), days=int(d or 0), hours=int(h or 0),
+                      minutes=int(mi or 0), seconds=int(s or 0))
+    return -delta if sign == "-" else delta
+
+
+def _unescape(text: str) -> str:
+    return re.sub(r"\\([\\;,nN])", lambda m: "\n" if m.group(1) in "nN" else m.group(1), text)
+
+
+def vevent_to_row(vevent: dict, tz: str | None = None) -> tuple | None:
+    """
+    (title, date, start, end, start_min, end_min) for the events table, in
+    zone tz (default: this machine's), or None if the VEVENT has no usable
+    DTSTART (including one before year 1000, which is no YYYY-MM-DD date).
+    """
+    if "DTSTART" not in vevent:
+        return None
+    tz = tz or zones.local_zone()
+    try:
+        start = _parse_dt(*vevent["DTSTART"], tz)
+        if "DTEND" in vevent:
+            end = _parse_dt(*vevent["DTEND"], tz)
+        elif "DURATION" in vevent:
+            end = start + _parse_duration(vevent["DURATION"][1])
+        else:
+            end = start
+        day = database._check_date(start.strftime("%Y-%m-%d"))
+    except ValueError:
+        return None
+
+    start_min = start.hour * 60 + start.minute
+    if end.date() != start.date() or end < start:
+        end_min = 24 * 60 - 1  # clip to the start day
+    else:
+        end_min = end.hour * 60 + end.minute
+    title = _unescape(vevent.get("SUMMARY", ({}, "Untitled"))[1]) or "Untitled"
+    return (title, day, format_minutes(start_min), format_minutes(end_min),
+            start_min, end_min)
+
+
+# ---- Import ----------------------------------------------------------------
+def import_ics(username: str, lines, batch_size: int = BATCH_SIZE) -> int:
+    """Insert every VEVENT in lines (an open text file works) for username. Returns the count."""
+    count = 0
+    batch = []
+    tz = database.user_zone(username)
+    for vevent in iter_vevents(lines):
+        row = vevent_to_row(vevent, tz)
+        if row is None:
+            continue
+        batch.append((username, *row))
+        if len(batch) >= batch_size:
+            count += database.insert_events(batch)
+            batch = []
+    if batch:
+        count += database.insert_events(batch)
+    return count
+
+
+# ---- Export ----------------------------------------------------------------
+def _escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,").replace("\n", "\\n")
+
+
+def _fold(line: str) -> str:
+    """Fold a content line at 75 octets as RFC 5545 requires."""
+    data = line.encode()
+    if len(data) <= 75:
+        return line + "\r\n"
+    parts = []
+    while data:
+        limit = 75 if not parts else 74
+        cut = min(limit, len(data))
+        while cut < len(data) and (data[cut] & 0xC0) == 0x80:  # don't split a UTF-8 sequence
+            cut -= 1
+        parts.append(data[:cut].decode())
+        data = data[cut:]
+    return "\r\n ".join(parts) + "\r\n"
+
+
+def iter_ics(username: str, page_size: int = PAGE_SIZE):
+    """Yield the user's calendar as .ics text, one chunk per page of events."""
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    yield f"BEGIN:VCALENDAR\r\nVERSION:2.0\r\nPRODID:{PRODID}\r\n"
+    uid = database.user_id(username)
+    if uid is not None:
+        for path in _tiers(username):
+            yield from _vevent_pages(path, uid, stamp, page_size)
+    yield "END:VCALENDAR\r\n"
+
+
+def _tiers(username: str) -> list[str | None]:
+    # hot first, then the archive: an event archived meanwhile may be exported twice, never skipped
+    path = database._user_path(username)
+    return [path, database.archive_path(path)] if database._has_archive(path) else [path]
+
+
+def _utc_stamp(minute: int) -> str:
+    """A UTC minute as an iCalendar UTC date-time (20250106T143000Z)."""
+    day, minute = divmod(minute, zones.MINUTES_PER_DAY)
+    return f"{zones.day_string(day).replace('-', '')}T{minute // 60:02d}{minute % 60:02d}00Z"
+
+
+def _vevent_pages(path: str | None, uid: int, stamp: str, page_size: int):
+    after_id = 0
+    while True:
+        with database._get_conn(path) as conn:
+            conn.row_factory = row_factory
+            page = conn.execute(
+                "SELECT id, title, start_utc, end_utc FROM events"
+                " WHERE user_id = ? AND id > ? ORDER BY id LIMIT ?",
+                (uid, after_id, page_size),
+            ).fetchall()
+        if not page:
+            break
+        chunk = []
+        for ev in page:
+            chunk.append(
+                "BEGIN:VEVENT\r\n"
+                f"UID:{ev.id}@schedule-manager\r\n"
+                f"DTSTAMP:{stamp}\r\n"
+                f"DTSTART:{_utc_stamp(ev.start_utc)}\r\n"
+                f"DTEND:{_utc_stamp(ev.end_utc)}\r\n"
+                + _fold(f"SUMMARY:{_escape(ev.title)}")
+                + "END:VEVENT\r\n"
+            )
+        yield "".join(chunk)
+        after_id = page[-1].id
+
+
+def export_ics(username: str, fp, page_size: int = PAGE_SIZE) -> None:
+    """Write the user's calendar to an open text file."""
+    for chunk in iter_ics(username, page_size):
+        fp.write(chunk)
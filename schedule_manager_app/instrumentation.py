@@ -0,0 +1,218 @@
+"""
+Opt-in timing for database.py.
+
+When enabled (SCHEDULE_MANAGER_PROFILE=1 or instrumentation.enable()) every
+public database.py call and every SQL statement is timed into a rolling
+histogram, and statements slower than the threshold are logged together with
+their EXPLAIN QUERY PLAN. Disabled, the overhead is one flag check per call.
+
+    import instrumentation
+    instrumentation.enable(slow_ms=20)
+    ...
+    instrumentation.stats()   # {"calls": {...}, "sql": {...}}
+"""
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import deque
+from functools import wraps
+
+log = logging.getLogger("schedule_manager.perf")
+
+# samples kept per operation; percentiles and buckets are over this window
+WINDOW = 1024
+# histogram bucket upper bounds in milliseconds (last bucket is open ended)
+BUCKETS_MS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 1000)
+
+_enabled = os.environ.get("SCHEDULE_MANAGER_PROFILE") == "1"
+_slow_ms = float(os.environ.get("SCHEDULE_MANAGER_SLOW_MS", "50"))
+_lock = threading.Lock()
+_calls: dict[str, "_Histogram"] = {}
+_sql: dict[str, "_Histogram"] = {}
+_explained: set[str] = set()
+
+
+class _Histogram:
+    """Lifetime count/total plus a rolling window of recent samples."""
+
+    __slots__ = ("samples", "count", "total_ms", "max_ms")
+
+    def __init__(self):
+        self.samples = deque(maxlen=WINDOW)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def add(self, ms: float) -> None:
+        self.samples.append(ms)
+        self.count += 1
+        self.total_ms += ms
+        if ms > self.max_ms:
+            self.max_ms = ms
+
+    def summary(self) -> dict:
+        window = sorted(self.samples)
+        n = len(window)
+
+        def pct(p):
+            return window[min(n - 1, int(p * n))] if n else 0.0
+
+        buckets = [0] * (len(BUCKETS_MS) + 1)
+        i = 0
+        for ms in window:
+            while i < len(BUCKETS_MS) and ms > BUCKETS_MS[i]:
+                i += 1
+            buckets[i] += 1
+        labels = [f"le_{b}" for b in BUCKETS_MS] + ["inf"]
+        return {
+            "count": self.count,
+            "total_ms": round(self.total_ms, 3),
+            "mean_ms": round(self.total_ms / self.count, 3) if self.count else 0.0,
+            "p50_ms": round(pct(0.50), 3),
+            "p90_ms": round(pct(0.90), 3),
+            "p99_ms": round(pct(0.99), 3),
+            "max_ms": round(self.max_ms, 3),
+            "buckets": dict(zip(labels, buckets)),
+        }
+
+
+# ---- Public API ------------------------------------------------------------
+def enable(slow_ms: float | None = None) -> None:
+    """Start collecting timings (optionally changing the slow query threshold)."""
+    global _enabled, _slow_ms
+    if slow_ms is not None:
+        _slow_ms = float(slow_ms)
+    _enabled = True
+
+
+def disable() -> None:
+    """Stop collecting timings; collected stats are kept until reset()."""
+    global _enabled
+    _enabled = False
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def reset() -> None:
+    """Drop all collected stats."""
+    with _lock:
+        _calls.clear()
+        _sql.clear()
+        _explained.clear()
+
+
+def stats() -> dict:
+    """Return {"enabled", "slow_ms", "calls": {name: summary}, "sql": {statement: summary}}."""
+    with _lock:
+        return {
+            "enabled": _enabled,
+            "slow_ms": _slow_ms,
+            "calls": {k: h.summary() for k, h in _calls.items()},
+            "sql": {k: h.summary() for k, h in _sql.items()},
+        }
+
+
+def record(kind: str, name: str, ms: float) -> None:
+    """Add one sample to the 'calls' or 'sql' histogram called name."""
+    table = _calls if kind == "calls" else _sql
+    with _lock:
+        hist = table.get(name)
+        if hist is None:
+            hist = table[name] = _Histogram()
+        hist.add(ms)
+
+
+def timed(fn):
+    """Decorator timing a database.py function into the 'calls' histograms."""
+    name = fn.__name__
+
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        if not _enabled:
+            return fn(*args, **kwargs)
+        t0 = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            record("calls", name, (time.perf_counter() - t0) * 1000)
+
+    return wrapper
+
+
+def connect(path: str, **kwargs) -> sqlite3.Connection:
+    """sqlite3.connect(), returning a statement-timing connection when enabled."""
+    if _enabled:
+        kwargs.setdefault("factory", TimedConnection)
+    return sqlite3.connect(path, **kwargs)
+
+
+# ---- Statement timing ------------------------------------------------------
+def _normalize(sql: str) -> str:
+    return " ".join(sql.split())
+
+
+def _finish(conn: sqlite3.Connection, sql: str, params, ms: float, explain: bool = True) -> None:
+    key = _normalize(sql)
+    record("sql", key, ms)
+    if ms < _slow_ms:
+        return
+    plan = ""
+    if explain and key not in _explained and not key.upper().startswith(("BEGIN", "COMMIT", "PRAGMA", "EXPLAIN")):
+        _explained.add(key)
+        try:
+            # a plain cursor: the caller's row_factory (Event rows) must not apply to plan rows
+            cur = sqlite3.Cursor(conn)
+            cur.row_factory = None
+            rows = cur.execute("EXPLAIN QUERY PLAN " + sql, params or ()).fetchall()
+            if rows:
+                plan = "\n    " + "\n    ".join(str(r[-1]) for r in rows)
+        except Exception:  # noqa: BLE001 - profiling must never fail the query it describes
+            log.debug("could not explain %s", key, exc_info=True)
+    log.warning("slow query (%.1f ms): %s%s", ms, key, plan)
+
+
+class TimedCursor(sqlite3.Cursor):
+    """Cursor recording execute()/executemany() time per statement."""
+
+    def execute(self, sql, parameters=()):
+        t0 = time.perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            _finish(self.connection, sql, parameters, (time.perf_counter() - t0) * 1000)
+
+    def executemany(self, sql, seq_of_parameters):
+        t0 = time.perf_counter()
+        try:
+            return super().executemany(sql, seq_of_parameters)
+        finally:
+            _finish(self.connection, sql, None, (time.perf_counter() - t0) * 1000, explain=False)
+
+
+class TimedConnection(sqlite3.Connection):
+    """Connection routing statements through TimedCursor and timing commits."""
+
+    def cursor(self, factory=TimedCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+    def commit(self):
+        t0 = time.perf_counter()
+        try:
+            super().commit()
+        finally:
+            _finish(self, "COMMIT", None, (time.perf_counter() - t0) * 1000)
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None and self.in_transaction:
+            self.commit()
+        return super().__exit__(exc_type, exc, tb)
@@ -69,7 +69,7 @@ class LoginPage(QWidget):
         
         try:
             if database.verify_user(username, password):
-                self.app.current_user = username
+                self.app.set_user(username)
                 QMessageBox.information(self, "Login Successs", f"Welcome, {username}!")
                 self.app.show_page("CalendarPage")
             else:
@@ -0,0 +1,285 @@
+"""
+Event reminders, fired from a heap that holds only the next window of them.
+
+An event carries reminder offsets (minutes before its start, see
+database.set_reminders). The reminders table keeps each one with the minute
+it is due, indexed, so nothing ever scans the calendar: the scheduler loads
+the reminders due in the next WINDOW_MIN minutes into a heap, keeps a single
+timer pending for the earliest of them (or for the end of the window, when
+it loads the next one) and hands each due reminder to fire(reminder, event).
+
+    reminders = qt_reminders(show_notification, username="alice")   # or tk_reminders(root, ...)
+    reminders.start()
+    ...
+    reminders.stop()
+
+Writes made through database.py reschedule what they touch (via
+database.add_listener): the event's old reminders stop at once and its
+current ones are read back RELOAD_DELAY_MS later, together with any other
+event written meanwhile. Writes by other processes are picked up when the
+next window loads, and every reminder is checked against its event before
+it fires, so one whose event was moved or deleted elsewhere stays quiet.
+"""
+import heapq
+import logging
+import threading
+from contextlib import closing
+from datetime import datetime, timezone
+
+import database
+import zones
+
+log = logging.getLogger(__name__)
+
+WINDOW_MIN = 60        # minutes of reminders held in memory
+LATE_LIMIT_MIN = 60    # after a sleep, reminders missed by longer than this are dropped
+RELOAD_DELAY_MS = 100  # writes are read back together this long after the first one
+
+# what the event dialogs offer: (label, offset in minutes or None for no reminder)
+REMINDER_CHOICES = (
+    ("No reminder", None),
+    ("At start time", 0),
+    ("5 minutes before", 5),
+    ("10 minutes before", 10),
+    ("15 minutes before", 15),
+    ("30 minutes before", 30),
+    ("1 hour before", 60),
+    ("1 day before", 1440),
+)
+
+_COLUMNS = "due_min, event_id, offset_min, user_id"
+
+
+def to_minute(when: datetime) -> int:
+    """UTC minutes since 1970-01-01 of an aware datetime: the unit of reminders.due_min."""
+    return zones.utc_minute(when)
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class Reminder:
+    """One reminder of one event, due at due_min (offset_min minutes before the event)."""
+
+    __slots__ = ("due_min", "event_id", "offset_min", "user_id", "cancelled")
+
+    def __init__(self, due_min: int, event_id: int, offset_min: int, user_id: int):
+        self.due_min = due_min
+        self.event_id = event_id
+        self.offset_min = offset_min
+        self.user_id = user_id
+        self.cancelled = False  # set when the event was written; the heap skips it
+
+    @property
+    def due(self) -> datetime:
+        """When it is due, as an aware UTC datetime."""
+        return zones.utc_datetime(self.due_min)
+
+    def __repr__(self):
+        return f"Reminder(event {self.event_id}, {self.offset_min} min before, due {self.due:%Y-%m-%d %H:%M} UTC)"
+
+
+class ReminderScheduler:
+    """Fires the reminders of one user (or of every user, username=None) as they come due."""
+
+    def __init__(self, call_later, cancel, fire, username: str | None = None,
+                 now=_utcnow, window_min: int = WINDOW_MIN):
+        """
+        call_later(delay_ms, callback) -> handle   schedules a one-shot timer
+        cancel(handle)                             cancels it
+        fire(reminder, event)                      shows / sends one due reminder
+        now()                                      current time, aware (injectable for tests)
+        """
+        self._call_later = call_later
+        self._cancel = cancel
+        self._fire = fire
+        self.username = username
+        self._now = now
+        self.window_min = window_min
+        self._lock = threading.RLock()
+        self._heap: list[tuple[int, int, Reminder]] = []
+        self._by_event: dict[int, list[Reminder]] = {}  # what the heap holds, for cancelling
+        self._seq = 0
+        self._next_min = 0      # reminders due before this minute have been handled
+        self._loaded_until = 0  # the heap has every reminder due in [_next_min, _loaded_until)
+        self._dirty: set[int] = set()  # events written since the last reload
+        self._job = None
+        self._token = None  # identifies the current timer; a late one from before a re-arm does nothing
+        self._running = False
+        self.loads = 0  # window and reload queries, for the benchmark
+
+    @property
+    def pending(self) -> int:
+        """Reminders in memory that are still to fire."""
+        with self._lock:
+            return sum(len(rs) for rs in self._by_event.values())
+
+    def start(self) -> None:
+        """Load the first window (from this minute on) and start firing."""
+        with self._lock:
+            if self._running:
+                return
+            self._running = True
+            now = to_minute(self._now())
+            self._next_min = self._loaded_until = now
+            self._load_window(now + self.window_min)
+            database.add_listener(self._on_write)
+            self._arm()
+
+    def stop(self) -> None:
+        """Cancel the timer, stop listening for writes and forget the loaded reminders."""
+        database.remove_listener(self._on_write)
+        with self._lock:
+            self._running = False
+            if self._job is not None:
+                self._cancel(self._job)
+                self._job = None
+            self._heap.clear()
+            self._by_event.clear()
+            self._dirty.clear()
+
+    # ---- Timer ----
+    def _arm(self) -> None:
+        if self._job is not None:
+            self._cancel(self._job)
+        heap = self._heap
+        while heap and heap[0][2].cancelled:
+            heapq.heappop(heap)
+        wake = min(heap[0][0], self._loaded_until) if heap else self._loaded_until
+        delay_ms = (wake * 60 - self._now().timestamp()) * 1000
+        if self._dirty:
+            delay_ms = min(delay_ms, RELOAD_DELAY_MS)
+        token = self._token = object()
+        self._job = self._call_later(max(1, int(delay_ms)), lambda: self._tick(token))
+
+    def _tick(self, token) -> None:
+        due = []
+        with self._lock:
+            if token is not self._token or not self._running:
+                return
+            self._job = None
+            now = to_minute(self._now())
+            self._reload_dirty()
+            start = max(self._next_min, now - LATE_LIMIT_MIN)
+            if self._loaded_until <= now:
+                self._loaded_until = max(self._loaded_until, start)
+                self._load_window(now + self.window_min)
+            heap = self._heap
+            while heap and heap[0][0] <= now:
+                reminder = heapq.heappop(heap)[2]
+                if reminder.cancelled:
+                    continue
+                self._forget(reminder)
+                if reminder.due_min >= start:
+                    due.append(reminder)
+            self._next_min = now + 1
+            self._arm()
+        for reminder in due:
+            self._deliver(reminder)
+
+    def _deliver(self, reminder: Reminder) -> None:
+        try:
+            ev = database.get_event(reminder.event_id)
+            # a write by another process may have moved or deleted the event since the window loaded
+            if ev is None or ev.start_utc - reminder.offset_min != reminder.due_min:
+                return
+            self._fire(reminder, ev)
+        except Exception:
+            log.exception("firing %r failed", reminder)
+
+    # ---- Loading ----
+    def _load_window(self, until: int) -> None:
+        self._push(self._select("due_min >= ? AND due_min < ?", (self._loaded_until, until)))
+        self._loaded_until = until
+
+    def _reload_dirty(self) -> None:
+        if not self._dirty:
+            return
+        ids = sorted(self._dirty)
+        self._dirty.clear()
+        for event_id in ids:
+            self._cancel_event(event_id)
+        for i in range(0, len(ids), 500):
+            chunk = ids[i:i + 500]
+            self._push(self._select(
+                f"event_id IN ({', '.join('?' * len(chunk))}) AND due_min >= ? AND due_min < ?",
+                (*chunk, self._next_min, self._loaded_until),
+            ))
+
+    def _select(self, where: str, params: tuple) -> list[Reminder]:
+        self.loads += 1
+        database._wait_for_writes()
+        if self.username is not None:
+            uid = database.user_id(self.username)
+            if uid is None:
+                return []
+            where, params = f"user_id = ? AND {where}", (uid, *params)
+            paths = [database._user_path(self.username)]
+        else:
+            paths = database._router.paths if database._router is not None else [None]
+        found = []
+        for path in paths:
+            with closing(database._get_conn(path)) as conn:
+                found += [Reminder(*row) for row in
+                          conn.execute(f"SELECT {_COLUMNS} FROM reminders WHERE {where}", params)]
+        return found
+
+    def _push(self, reminders: list[Reminder]) -> None:
+        for reminder in reminders:
+            self._seq += 1
+            heapq.heappush(self._heap, (reminder.due_min, self._seq, reminder))
+            self._by_event.setdefault(reminder.event_id, []).append(reminder)
+
+    def _forget(self, reminder: Reminder) -> None:
+        held = self._by_event.get(reminder.event_id)
+        if held is not None:
+            held.remove(reminder)
+            if not held:
+                del self._by_event[reminder.event_id]
+
+    def _cancel_event(self, event_id: int) -> None:
+        for reminder in self._by_event.pop(event_id, ()):
+            reminder.cancelled = True
+
+    # ---- Invalidation ----
+    def _on_write(self, op: str, args: tuple) -> None:
+        if op not in ("add_event", "update_event", "delete_event", "set_reminders"):
+            return  # bulk inserts carry no reminders
+        if op == "add_event" and self.username not in (None, args[0]):
+            return
+        event_id = args[2] if op == "add_event" else args[0]
+        with self._lock:
+            if not self._running:
+                return
+            self._cancel_event(event_id)
+            was_dirty = bool(self._dirty)
+            self._dirty.add(event_id)
+            if not was_dirty:
+                self._arm()
+
+
+# ---- Drivers ---------------------------------------------------------------
+def tk_reminders(widget, fire, username: str | None = None) -> ReminderScheduler:
+    """ReminderScheduler driven by Tk's after()/after_cancel()."""
+    return ReminderScheduler(widget.after, widget.after_cancel, fire, username)
+
+
+def qt_reminders(fire, username: str | None = None) -> ReminderScheduler:
+    """ReminderScheduler driven by a single-shot QTimer (needs a QApplication)."""
+    from clock import qt_timer
+    return ReminderScheduler(*qt_timer(), fire, username)
+
+
+def thread_reminders(fire, username: str | None = None, window_min: int = WINDOW_MIN) -> ReminderScheduler:
+    """
+    ReminderScheduler driven by threading.Timer, for processes without an
+    event loop (the backend). fire runs on the timer's thread.
+    """
+    def call_later(delay_ms, callback):
+        timer = threading.Timer(delay_ms / 1000, callback)
+        timer.daemon = True
+        timer.start()
+        return timer
+
+    return ReminderScheduler(call_later, lambda timer: timer.cancel(), fire, username, window_min=window_min)
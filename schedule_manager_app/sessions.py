@@ -0,0 +1,239 @@
+"""
+Login sessions for the backend, and the rate limits that keep guessing slow.
+
+A client logs in once with its password and then sends the token it got
+back with every request; checking a token never touches the password hash.
+The sessions table keeps each token's SHA-256 with its user and expiry (a
+copy of the database hands out no live tokens); the tokens checked lately
+are kept in an LRU, so a request from an active client costs a dictionary
+lookup.
+
+    token = sessions.login("alice", "secret", ip="203.0.113.7")  # None if wrong
+    session = sessions.validate(token)                            # None if unknown or expired
+    sessions.logout(token)
+
+validate may read the sessions table. An async caller can check the LRU on
+its event loop (cached, then admit) and leave only the lookups to a thread.
+
+Logins are limited with token buckets, per username and per client address:
+each attempt takes a token from both and a successful one gives them back,
+so only failures count. Wrong guesses at one account, from anywhere, are
+held to LOGIN_RATE a minute after the first LOGIN_BURST; those from one
+address, at any accounts, to ADDRESS_RATE after ADDRESS_BURST (larger: many
+users may share an address). Tokens that are not valid count against their
+address in the same way. Requests with a valid token are limited per
+user by the much larger REQUEST_RATE. Over a limit, RateLimited is raised
+with the seconds until the next attempt would be let through.
+
+Each process has its own LRU and buckets. A logout in another process (a
+uvicorn worker of serve.py) is seen here once the cached entry is older
+than RECHECK_S, when the token is looked up again.
+"""
+import hashlib
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from typing import NamedTuple
+
+import database
+
+SESSION_TTL_S = 7 * 24 * 3600  # how long a token stays valid after login
+CACHE_SIZE = 10_000            # tokens kept in the LRU
+RECHECK_S = 60                 # cached tokens are looked up again after this long
+
+LOGIN_BURST = 5                # failed logins let through at once, per username
+LOGIN_RATE = 5                 # ... and per minute after that
+ADDRESS_BURST = 30             # failed logins and bad tokens let through at once, per client address
+ADDRESS_RATE = 30              # ... and per minute after that
+REQUEST_BURST = 200            # authenticated requests at once, per user
+REQUEST_RATE = 6000            # ... and per minute after that
+MAX_KEYS = 100_000             # buckets kept per limiter; the least recently used go first
+
+
+class RateLimited(Exception):
+    """Too many attempts; retry_after is the seconds until the next one is let through."""
+
+    def __init__(self, retry_after: float):
+        super().__init__(f"too many attempts, retry in {retry_after:.0f}s")
+        self.retry_after = retry_after
+
+
+class Session(NamedTuple):
+    username: str
+    user_id: int
+    expires: int  # seconds since 1970-01-01 UTC
+
+
+class TokenBucket:
+    """
+    Per-key token buckets: each key holds up to burst tokens and gets rate
+    back per minute. Buckets of keys not seen lately are dropped past
+    max_keys (a dropped key starts over full, as an idle one would be).
+    """
+
+    def __init__(self, burst: int, rate: float, max_keys: int = MAX_KEYS, clock=time.monotonic):
+        self.burst = burst
+        self.per_second = rate / 60
+        self.max_keys = max_keys
+        self.clock = clock
+        self._buckets: OrderedDict = OrderedDict()  # key -> [tokens, when they were counted]
+        self._lock = threading.Lock()
+
+    def take(self, key) -> float:
+        """Take a token for key: 0 if there was one, else the seconds until there will be."""
+        now = self.clock()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = [self.burst, now]
+                if len(self._buckets) > self.max_keys:
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end(key)
+                bucket[0] = min(self.burst, bucket[0] + (now - bucket[1]) * self.per_second)
+                bucket[1] = now
+            if bucket[0] < 1:
+                return (1 - bucket[0]) / self.per_second
+            bucket[0] -= 1
+            return 0.0
+
+    def give_back(self, key) -> None:
+        """Return the token key just took (the attempt turned out not to count)."""
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is not None:
+                bucket[0] = min(self.burst, bucket[0] + 1)
+
+
+login_limits = TokenBucket(LOGIN_BURST, LOGIN_RATE)
+address_limits = TokenBucket(ADDRESS_BURST, ADDRESS_RATE)
+request_limits = TokenBucket(REQUEST_BURST, REQUEST_RATE)
+
+# token -> (Session, when it was last looked up), least recently used first.
+# Like database's user id cache it belongs to one DB_FILE.
+_cache: OrderedDict = OrderedDict()
+_cache_lock = threading.Lock()
+_cache_file = None
+hits = misses = 0
+
+
+def _hash(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def _take_all(limits) -> None:
+    """Take a token from every (bucket, key), or from none of them and raise RateLimited."""
+    taken = []
+    for bucket, key in limits:
+        wait = bucket.take(key)
+        if wait:
+            for bucket, key in taken:
+                bucket.give_back(key)
+            raise RateLimited(wait)
+        taken.append((bucket, key))
+
+
+def login(username: str, password: str, ip: str | None = None) -> str | None:
+    """
+    A new session token for username, or None if the password is wrong.
+    Raises RateLimited when username or ip has failed too often lately.
+    """
+    limits = [(login_limits, username)] + ([(address_limits, ip)] if ip else [])
+    _take_all(limits)
+    if not database.verify_user(username, password):
+        return None
+    for bucket, key in limits:
+        bucket.give_back(key)
+    token = secrets.token_urlsafe(32)
+    now = int(time.time())
+    session = Session(username, database.user_id(username), now + SESSION_TTL_S)
+    database._write("create_session", None, session.user_id, _hash(token), session.expires, now)
+    _remember(token, session)
+    return token
+
+
+def validate(token: str, ip: str | None = None) -> Session | None:
+    """
+    The session token belongs to, or None if it is unknown or has expired.
+    Raises RateLimited when ip has sent too many bad tokens, or the user too
+    many requests.
+    """
+    global misses
+    session = cached(token)
+    if session is None:
+        misses += 1
+        session = _look_up(token)
+        if session is None:
+            wait = address_limits.take(ip) if ip else 0
+            if wait:
+                raise RateLimited(wait)
+            return None
+        _remember(token, session)
+    return admit(token, session)
+
+
+def cached(token: str) -> Session | None:
+    """token's session if this process looked it up lately (no database access), else None."""
+    global hits
+    now = time.time()
+    with _cache_lock:
+        entry = _cached().get(token)
+        if entry is None or now - entry[1] >= RECHECK_S:
+            return None
+        _cache.move_to_end(token)
+        hits += 1
+        return entry[0]
+
+
+def admit(token: str, session: Session) -> Session | None:
+    """
+    The rest of validate for a session cached() found: None once it has
+    expired, RateLimited when its user made too many requests.
+    """
+    if session.expires <= time.time():
+        forget(token)
+        return None
+    wait = request_limits.take(session.user_id)
+    if wait:
+        raise RateLimited(wait)
+    return session
+
+
+def logout(token: str) -> bool:
+    """End the session; False if there was none."""
+    forget(token)
+    return database._write("delete_session", None, _hash(token))
+
+
+def forget(token: str) -> None:
+    """Drop token from this process's LRU (it is looked up again next time)."""
+    with _cache_lock:
+        _cached().pop(token, None)
+
+
+def _cached() -> OrderedDict:
+    global _cache_file
+    if _cache_file != database.DB_FILE:
+        _cache.clear()
+        _cache_file = database.DB_FILE
+    return _cache
+
+
+def _remember(token: str, session: Session) -> None:
+    with _cache_lock:
+        cache = _cached()
+        cache[token] = (session, time.time())
+        cache.move_to_end(token)
+        if len(cache) > CACHE_SIZE:
+            cache.popitem(last=False)
+
+
+def _look_up(token: str) -> Session | None:
+    with database._get_conn() as conn:
+        row = conn.execute(
+            "SELECT s.user_id, s.expires, u.username FROM sessions s JOIN users u ON u.id = s.user_id"
+            " WHERE s.token_hash = ? AND s.expires > ?",
+            (_hash(token), int(time.time()))
+        ).fetchone()
+    return None if row is None else Session(row[2], row[0], row[1])
@@ -0,0 +1,225 @@
+"""
+Per-user sharding of the events store over several SQLite files.
+
+Each user's events live in one shard file, so heavy tenants only contend
+for their own file's write lock and no single file grows without bound.
+DB_FILE stays the directory: it holds the users table, the placements table
+(user -> shard) and is itself shard 0, so an existing database keeps working
+as-is and its users stay where their events already are.
+
+    router = shards.open_shards(4)           # DB_FILE + 3 more files next to it
+    database.enable_sharding(router)         # every database.py call is now routed
+    router.move_user("alice", 2)             # online, while alice keeps editing
+
+Placement is "hash" (crc32 of the username; the shard count must then stay
+fixed) or "directory" (new users go to the shard with the fewest users and
+the choice is recorded). Moved users are always recorded in placements.
+
+Event ids encode their home shard (shard << ID_BITS), so get/update/delete by
+id need no lookup. Moving a user copies their events to the destination under
+new ids and leaves forwarding rows (event_forwards, moved_users) behind in the
+source, which database.py follows when a stale id or cached placement reaches
+the old shard.
+"""
+import os
+import threading
+import zlib
+from contextlib import closing
+
+import archive
+import database
+
+ID_BITS = 40
+PLACEMENTS = ("hash", "directory")
+
+# every column of a user's events, as copied between shards
+_SELECT_USER = (
+    "SELECT id, user_id, title, date, start, end, start_min, end_min, version, tz, start_utc, end_utc, created_at"
+    " FROM events WHERE user_id = ?"
+)
+_INSERT = (
+    "INSERT INTO events (user_id, title, date, start, end, start_min, end_min, version, tz, start_utc, end_utc,"
+    " created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+)
+_UPDATE = (
+    "UPDATE events SET user_id = ?, title = ?, date = ?, start = ?, end = ?, start_min = ?,"
+    " end_min = ?, version = ?, tz = ?, start_utc = ?, end_utc = ?, created_at = ? WHERE id = ?"
+)
+
+
+class ShardRouter:
+    """Maps users and event ids to shard files; paths[0] is the directory DB."""
+
+    def __init__(self, paths: list[str], placement: str = "hash"):
+        if placement not in PLACEMENTS:
+            raise ValueError(f"placement must be one of {PLACEMENTS}, not {placement!r}")
+        self.paths = list(paths)
+        self.placement = placement
+        self._lock = threading.Lock()
+        self._shards: dict[str, int] = {}  # placement cache
+
+        for shard, path in enumerate(self.paths):
+            database.init_db(path)
+            if shard:
+                self._seed_ids(path, shard)
+        with closing(database._get_conn(self.paths[0])) as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS placements (
+                    username TEXT PRIMARY KEY,
+                    shard INTEGER NOT NULL
+                )
+            """)
+            # users whose events predate sharding stay in the directory file
+            conn.execute("INSERT OR IGNORE INTO placements SELECT DISTINCT u.username, 0"
+                         " FROM events e JOIN users u ON u.id = e.user_id")
+            conn.commit()
+
+    @staticmethod
+    def _seed_ids(path: str, shard: int) -> None:
+        """Start the shard's AUTOINCREMENT ids at shard << ID_BITS."""
+        with closing(database._get_conn(path)) as conn:
+            conn.execute(
+                "INSERT INTO sqlite_sequence (name, seq) SELECT 'events', ?"
+                " WHERE NOT EXISTS (SELECT 1 FROM sqlite_sequence WHERE name = 'events')",
+                (shard << ID_BITS,),
+            )
+            conn.commit()
+
+    # ---- Routing ----
+    def path(self, shard: int) -> str:
+        return self.paths[shard]
+
+    def shard_for_event(self, event_id: int) -> int:
+        shard = event_id >> ID_BITS
+        return shard if shard < len(self.paths) else 0
+
+    def shard_for_user(self, username: str) -> int:
+        shard = self._shards.get(username)
+        if shard is None:
+            shard = self._shards[username] = self._place(username)
+        return shard
+
+    def moved(self, username: str, shard: int) -> None:
+        """Note that username now lives in shard (learned from a forwarding row)."""
+        self._shards[username] = shard
+
+    def _place(self, username: str) -> int:
+        with closing(database._get_conn(self.paths[0])) as conn:
+            row = conn.execute("SELECT shard FROM placements WHERE username = ?", (username,)).fetchone()
+            if row:
+                return row[0]
+            if self.placement == "hash":
+                return zlib.crc32(username.encode()) % len(self.paths)
+            counts = dict(conn.execute("SELECT shard, COUNT(*) FROM placements GROUP BY shard"))
+            shard = min(range(len(self.paths)), key=lambda s: counts.get(s, 0))
+            conn.execute("INSERT OR IGNORE INTO placements (username, shard) VALUES (?, ?)", (username, shard))
+            conn.commit()
+            # another process may have placed the user first; its choice wins
+            return conn.execute("SELECT shard FROM placements WHERE username = ?", (username,)).fetchone()[0]
+
+    def users_per_shard(self) -> list[int]:
+        """Placed users per shard (hash-placed users without events are not counted)."""
+        counts = [0] * len(self.paths)
+        with closing(database._get_conn(self.paths[0])) as conn:
+            for shard, n in conn.execute("SELECT shard, COUNT(*) FROM placements GROUP BY shard"):
+                counts[shard] = n
+        return counts
+
+    # ---- Moving users ----
+    def move_user(self, username: str, dest: int) -> int:
+        """
+        Move a user's events to shard dest while they keep reading and writing.
+
+        The bulk copy runs without blocking anyone; the source shard's write
+        lock is held only while the changes made during the copy are applied
+        and the old rows are swapped for forwarding rows. Returns the number
+        of events moved.
+        """
+        src = self.shard_for_user(username)
+        uid = database.user_id(username)
+        if src == dest or uid is None:
+            return 0
+        database.flush_writes()  # buffered writes land in the source first
+        with self._lock, closing(database._get_conn(self.path(dest))) as dst:
+            # leftovers of an interrupted move, and the marker of an earlier move away
+            dst.execute("DELETE FROM events WHERE user_id = ?", (uid,))
+            dst.execute("DELETE FROM moved_users WHERE user_id = ?", (uid,))
+            dst.execute("DELETE FROM reminders WHERE user_id = ?", (uid,))
+
+            # 1. bulk copy
+            with closing(database._get_conn(self.path(src))) as conn:
+                copied = {row[0]: row for row in conn.execute(_SELECT_USER, (uid,))}
+            new_ids = self._copy(dst, copied.values())
+            dst.commit()
+
+            # 2. catch up and switch, holding the source's write lock
+            with closing(database._get_conn(self.path(src))) as conn:
+                conn.execute("BEGIN IMMEDIATE")
+                try:
+                    current = {row[0]: row for row in conn.execute(_SELECT_USER, (uid,))}
+                    for old_id in copied.keys() - current.keys():
+                        dst.execute("DELETE FROM events WHERE id = ?", (new_ids.pop(old_id),))
+                    dst.executemany(_UPDATE, [
+                        (*row[1:], new_ids[old_id])
+                        for old_id, row in current.items() if old_id in copied and row != copied[old_id]
+                    ])
+                    new_ids.update(self._copy(dst, [row for old_id, row in current.items() if old_id not in copied]))
+                    # archived events come along as hot rows; the destination's next archive run takes them back
+                    archived = archive.user_rows(self.path(src), uid)
+                    new_ids.update(self._copy(dst, archived))
+                    dst.executemany(
+                        "INSERT INTO reminders (event_id, user_id, offset_min, due_min) VALUES (?, ?, ?, ?)",
+                        [(new_ids[event_id], uid, offset, due) for event_id, offset, due in conn.execute(
+                            "SELECT event_id, offset_min, due_min FROM reminders WHERE user_id = ?", (uid,))
+                         if event_id in new_ids],
+                    )
+                    dst.commit()
+
+                    conn.executemany("INSERT OR REPLACE INTO event_forwards (old_id, new_id) VALUES (?, ?)",
+                                     new_ids.items())
+                    conn.execute("INSERT OR REPLACE INTO moved_users (user_id, shard) VALUES (?, ?)",
+                                 (uid, dest))
+                    conn.execute("DELETE FROM events WHERE user_id = ?", (uid,))
+                    conn.execute("DELETE FROM reminders WHERE user_id = ?", (uid,))
+                    conn.commit()
+                except BaseException:
+                    conn.rollback()
+                    raise
+            archive.drop(self.path(src), [row[0] for row in archived])
+
+        # other processes learn the move from moved_users until their placement lookup is fresh
+        with closing(database._get_conn(self.paths[0])) as conn:
+            conn.execute("INSERT OR REPLACE INTO placements (username, shard) VALUES (?, ?)", (username, dest))
+            conn.commit()
+        self.moved(username, dest)
+        return len(new_ids)
+
+    @staticmethod
+    def _copy(dst, rows) -> dict[int, int]:
+        """Insert rows into dst under new ids; returns old id -> new id."""
+        return {row[0]: dst.execute(_INSERT, row[1:]).lastrowid for row in rows}
+
+
+def shard_paths(count: int, db_file: str | None = None) -> list[str]:
+    """DB_FILE followed by count - 1 shard files next to it (name.shard1.db, ...)."""
+    db_file = db_file or database.DB_FILE
+    base, ext = os.path.splitext(db_file)
+    return [db_file] + [f"{base}.shard{k}{ext or '.db'}" for k in range(1, count)]
+
+
+def open_shards(count: int, placement: str = "hash", db_file: str | None = None) -> ShardRouter:
+    """A router over DB_FILE and count - 1 shard files next to it (created if missing)."""
+    return ShardRouter(shard_paths(count, db_file), placement)
+
+
+# "4" or "4:directory": set by backend/serve.py --shards for its processes
+SHARDS_ENV = "SCHEDULE_MANAGER_SHARDS"
+
+
+def from_env() -> ShardRouter | None:
+    """The router configured by SCHEDULE_MANAGER_SHARDS, or None when unset."""
+    value = os.environ.get(SHARDS_ENV)
+    if not value:
+        return None
+    count, _, placement = value.partition(":")
+    return open_shards(int(count), placement or "hash")
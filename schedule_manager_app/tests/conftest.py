@@ -0,0 +1,60 @@
+"""Shared fixtures: the flat app modules on sys.path and a fresh database per test."""
+import os
+import sys
+import tempfile
+
+import pytest
+
+# make the flat app modules (database, views, ...) importable
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if APP_DIR not in sys.path:
+    sys.path.insert(0, APP_DIR)
+
+# whatever opens the default DB_FILE at import (the backend does) opens a scratch file, not the app's
+os.environ.setdefault("SCHEDULE_MANAGER_DB", os.path.join(tempfile.mkdtemp(prefix="schedule-tests-"), "default.db"))
+
+import database  # noqa: E402
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    """database.py pointed at an empty file in tmp_path; returns its path."""
+    monkeypatch.setattr(database, "DB_FILE", str(tmp_path / "test.db"))
+    database.init_db()
+    return database.DB_FILE
+
+
+@pytest.fixture
+def user(db):
+    """A user "alice" (password "secret") in the test database."""
+    database.create_user("alice", "secret")
+    return "alice"
+
+
+@pytest.fixture(scope="session")
+def qapp():
+    """The QApplication for Qt tests, headless; skips them without PySide6."""
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    widgets = pytest.importorskip("PySide6.QtWidgets")
+    return widgets.QApplication.instance() or widgets.QApplication([])
+
+
+@pytest.fixture
+def client(user, monkeypatch):
+    """A TestClient on the backend, logged in as user; skips without fastapi."""
+    pytest.importorskip("fastapi")
+    pytest.importorskip("httpx")
+    backend = os.path.join(APP_DIR, "backend")
+    if backend not in sys.path:
+        sys.path.insert(0, backend)
+    from fastapi.testclient import TestClient
+    from app.main import app
+    import sessions
+    for name, burst, rate in (("login_limits", sessions.LOGIN_BURST, sessions.LOGIN_RATE),
+                              ("address_limits", sessions.ADDRESS_BURST, sessions.ADDRESS_RATE),
+                              ("request_limits", sessions.REQUEST_BURST, sessions.REQUEST_RATE)):
+        monkeypatch.setattr(sessions, name, sessions.TokenBucket(burst, rate))
+    client = TestClient(app)
+    token = client.post("/login", json={"username": user, "password": "secret"}).json()["token"]
+    client.headers["Authorization"] = f"Bearer {token}"
+    return client
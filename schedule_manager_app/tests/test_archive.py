@@ -0,0 +1,37 @@
+import pytest
+
+import archive
+import database
+
+OLD, NEW = "2020-03-02", "2025-01-06"
+
+
+@pytest.fixture
+def archived(user):
+    """An event of user dated OLD, moved to the archive, and one dated NEW left hot."""
+    old = database.add_event(user, "old", OLD, "09:00 AM", "10:00 AM", reminders=(10,))
+    new = database.add_event(user, "new", NEW, "09:00 AM", "10:00 AM")
+    assert archive.archive_events("2024-01-01") == 1
+    return old, new
+
+
+@pytest.mark.parametrize("buffered", [False, True])
+def test_unversioned_writes_reach_archived_events(user, archived, buffered):
+    old, new = archived
+    if buffered:  # as the desktop apps run
+        database.enable_write_buffer(20)
+    try:
+        database.update_event(old, "old, renamed", OLD, "09:30 AM", "10:30 AM")
+        assert database.set_reminders(old, [5, 30]) is True  # found it, in the archive
+        database.update_event(new, "new, renamed", NEW, "09:00 AM", "10:00 AM")
+        database.flush_writes()
+        ev = database.get_event(old)
+        assert (ev.title, ev.start) == ("old, renamed", "09:30 AM")
+        assert database.get_event(new).title == "new, renamed"
+
+        database.delete_event(old)
+        database.flush_writes()
+        assert database.get_event(old) is None
+        assert database.get_events_for_day(user, OLD) == []
+    finally:
+        database.disable_write_buffer()
@@ -0,0 +1,54 @@
+import pytest
+
+EVENT = {"title": "Standup", "date": "2025-01-06", "start": "09:00 AM", "end": "09:15 AM"}
+
+
+@pytest.mark.parametrize("change", [
+    {"start": "10:00 AM", "end": "09:00 AM"},
+    {"date": "2025-02-30"},
+    {"date": "not a date"},
+    {"start": "25:00"},
+])
+def test_writes_validate_the_event(client, user, change):
+    assert client.post(f"/users/{user}/events", json={**EVENT, **change}).status_code == 422
+    event_id = client.post(f"/users/{user}/events", json=EVENT).json()["id"]
+    assert client.put(f"/events/{event_id}", json={**EVENT, **change}).status_code == 422
+    assert client.get(f"/users/{user}/events", params={"date": "2025-01-06"}).json()[0]["start"] == "09:00 AM"
+
+
+def test_zero_length_event_is_accepted(client, user):
+    assert client.post(f"/users/{user}/events", json={**EVENT, "end": "09:00 AM"}).status_code == 201
+
+
+def test_database_is_never_opened_on_the_event_loop(client, user, monkeypatch):
+    import asyncio
+
+    import database
+    import sessions
+
+    opened = []
+    get_conn = database._get_conn
+
+    def off_the_loop(*args, **kwargs):
+        try:
+            asyncio.get_running_loop()
+            opened.append("on the loop")
+        except RuntimeError:
+            opened.append("in a thread")
+        return get_conn(*args, **kwargs)
+
+    monkeypatch.setattr(database, "_get_conn", off_the_loop)
+    event_id = client.post(f"/users/{user}/events", json=EVENT).json()["id"]
+    sessions.forget(client.headers["Authorization"].split()[1])  # the next request reads the sessions table
+    assert client.get(f"/users/{user}/events", params={"date": "2025-01-06"}).status_code == 200
+    assert client.get(f"/users/{user}/events/range", params={"first": "2025-01-01", "last": "2025-01-31"}).json()
+    assert client.get(f"/users/{user}/events/list").json()["events"][0]["id"] == event_id
+    assert client.get("/me").json() == {"username": user}
+    assert opened and set(opened) == {"in a thread"}
+
+
+def test_metrics_need_a_session(client):
+    assert client.get("/metrics", headers={"Authorization": ""}).status_code == 401
+    assert client.get("/metrics", headers={"Authorization": "Bearer not-a-token"}).status_code == 401
+    resp = client.get("/metrics")
+    assert resp.status_code == 200 and isinstance(resp.json(), dict)
@@ -0,0 +1,89 @@
+import types
+from datetime import datetime
+
+from clock import ClockService
+
+
+class FakeTimers:
+    """call_later/cancel for a ClockService, keeping the pending callbacks in a dict."""
+
+    def __init__(self):
+        self.pending = {}  # handle -> (delay_ms, callback)
+        self._next = 0
+
+    def call_later(self, delay_ms, callback):
+        self._next += 1
+        self.pending[self._next] = (delay_ms, callback)
+        return self._next
+
+    def cancel(self, handle):
+        del self.pending[handle]
+
+    def fire(self):
+        """Run the one pending callback, as its timer would."""
+        (handle, (_, callback)), = self.pending.items()
+        del self.pending[handle]
+        callback()
+
+
+def clock_with(timers, now=datetime(2025, 1, 6, 9, 30, 15)):
+    return ClockService(timers.call_later, timers.cancel, now=lambda: now)
+
+
+def test_one_timer_for_any_number_of_subscribers():
+    timers = FakeTimers()
+    clock = clock_with(timers)
+    seen = []
+    tokens = [clock.subscribe(seen.append) for _ in range(3)]
+    assert clock.active and len(timers.pending) == 1
+    assert [delay for delay, _ in timers.pending.values()] == [45_000]  # to the next minute boundary
+    timers.fire()
+    assert len(seen) == 6 and len(timers.pending) == 1
+    for token in tokens:
+        clock.unsubscribe(token)
+    assert clock.active is False and timers.pending == {}
+
+
+def test_last_tick_after_unsubscribe_schedules_nothing():
+    timers = FakeTimers()
+    clock = clock_with(timers)
+    token = clock.subscribe(lambda now: None)
+    clock.unsubscribe(token)
+    clock.unsubscribe(token)  # twice is harmless
+    assert clock.active is False and timers.pending == {}
+
+
+def test_qt_views_hold_a_timer_only_while_the_day_view_is_visible(qapp, user):
+    from calendar_page_qt import CalendarPage
+    from undo import UndoJournal
+
+    timers = FakeTimers()
+    clock = clock_with(timers)
+    page = CalendarPage(types.SimpleNamespace(current_user=user, clock=clock, undo=UndoJournal(user)))
+    try:
+        page.show()
+        for view in ("month", "week", "agenda", "search"):
+            page.switch_view(view)
+            qapp.processEvents()
+            assert clock.active is False and timers.pending == {}, view
+
+        page.switch_view("day")
+        qapp.processEvents()
+        assert clock.active and len(timers.pending) == 1
+        timers.fire()  # a minute passes: the now-line moves and the next tick is the only timer
+        assert len(timers.pending) == 1
+
+        page.hide()  # e.g. logging out
+        qapp.processEvents()
+        assert clock.active is False and timers.pending == {}
+
+        page.show()
+        qapp.processEvents()
+        assert clock.active and len(timers.pending) == 1
+
+        page.switch_view("month")
+        qapp.processEvents()
+        assert clock.active is False and timers.pending == {}
+    finally:
+        page.events.close()
+        page.close()
@@ -0,0 +1,67 @@
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import database
+
+DAY = "2025-01-06"
+WORKERS = 4
+INCREMENTS = 50
+
+
+def _increment(db_file: str, event_id: int, increments: int) -> int:
+    """Read-modify-write the counter in the event's title; retries on conflict. Returns the conflicts."""
+    database.DB_FILE = db_file
+    conflicts = done = 0
+    while done < increments:
+        ev = database.get_event(event_id)
+        try:
+            database.update_event(event_id, f"count {int(ev.title.split()[1]) + 1}", ev.date, ev.start, ev.end,
+                                  ev.version)
+            done += 1
+        except database.ConflictError as exc:
+            assert exc.current.version > ev.version
+            conflicts += 1
+    return conflicts
+
+
+@pytest.fixture
+def counter(user):
+    return database.add_event(user, "count 0", DAY, "09:00 AM", "10:00 AM")
+
+
+def test_no_lost_updates_across_processes(db, counter):
+    with multiprocessing.get_context("spawn").Pool(WORKERS) as pool:
+        pool.starmap(_increment, [(db, counter, INCREMENTS)] * WORKERS)
+    ev = database.get_event(counter)
+    assert ev.title == f"count {WORKERS * INCREMENTS}"
+    assert ev.version == 1 + WORKERS * INCREMENTS
+
+
+def test_no_lost_updates_across_threads(db, counter):
+    with ThreadPoolExecutor(WORKERS) as pool:
+        list(pool.map(lambda _: _increment(db, counter, INCREMENTS), range(WORKERS)))
+    ev = database.get_event(counter)
+    assert ev.title == f"count {WORKERS * INCREMENTS}"
+    assert ev.version == 1 + WORKERS * INCREMENTS
+
+
+def test_stale_writes_conflict_with_the_current_event(counter):
+    ev = database.get_event(counter)
+    assert database.update_event(counter, "count 1", DAY, "09:00 AM", "10:00 AM", ev.version) == ev.version + 1
+    with pytest.raises(database.ConflictError) as exc:
+        database.update_event(counter, "count 1 again", DAY, "09:00 AM", "10:00 AM", ev.version)
+    assert (exc.value.current.title, exc.value.current.version) == ("count 1", ev.version + 1)
+    with pytest.raises(database.ConflictError):
+        database.delete_event(counter, ev.version)
+    assert database.get_event(counter).title == "count 1"
+
+
+def test_backend_answers_409_with_the_current_event(client, user, counter):
+    body = {"title": "mine", "date": DAY, "start": "09:00 AM", "end": "10:00 AM", "version": 1}
+    assert client.put(f"/events/{counter}", json=body).json()["version"] == 2
+    resp = client.put(f"/events/{counter}", json={**body, "title": "theirs"})
+    assert resp.status_code == 409
+    assert resp.json()["detail"]["current"]["title"] == "mine"
+    assert client.delete(f"/events/{counter}", params={"version": 1}).status_code == 409
@@ -0,0 +1,50 @@
+import pytest
+
+import database
+
+
+@pytest.mark.parametrize("day", ["garbage", "2025-13-01", "2025-1-6", "20250106", ""])
+def test_bad_dates_are_refused_not_stored_at_the_epoch(user, day):
+    with pytest.raises(ValueError):
+        database.add_event(user, "Nowhen", day, "09:00 AM", "10:00 AM")
+    assert database.list_events(user)[0] == []
+
+
+def test_update_patch_and_restore_refuse_bad_dates(user):
+    event_id = database.add_event(user, "Standup", "2025-01-06", "09:00 AM", "09:15 AM")
+    ev = database.get_event(event_id)
+    with pytest.raises(ValueError):
+        database.update_event(event_id, "Standup", "garbage", "09:00 AM", "09:15 AM")
+    with pytest.raises(ValueError):
+        database.patch_event(event_id, ev.version, when=("garbage", "09:00 AM", "09:15 AM", ev.tz))
+    assert database.get_event(event_id).to_dict() == ev.to_dict()
+
+    database.delete_event(event_id)
+    with pytest.raises(ValueError):
+        database.restore_event(user, event_id, "Standup", "garbage", "09:00 AM", "09:15 AM", ev.tz, ev.version)
+    assert database.get_event(event_id) is None
+
+
+def test_migration_keeps_rows_with_bad_dates(db):
+    assert database._utc_or_epoch("garbage", 540, 600, "UTC") == (0, 0)
+
+
+def test_backend_answers_422(client, user):
+    body = {"title": "Nowhen", "date": "garbage", "start": "09:00 AM", "end": "10:00 AM"}
+    assert client.post(f"/users/{user}/events", json=body).status_code == 422
+    assert client.get(f"/users/{user}/events/range", params={"first": "2000-01-01", "last": "2100-01-01"}).json() == []
+
+
+@pytest.mark.parametrize("start, end", [("9 o'clock", "10:00 AM"), ("09:00 AM", "25:00"), ("", "10:00 AM")])
+def test_bad_times_are_refused_not_stored_at_midnight(user, start, end):
+    with pytest.raises(ValueError):
+        database.add_event(user, "Sometime", "2025-01-06", start, end)
+    assert database.list_events(user)[0] == []
+
+    event_id = database.add_event(user, "Standup", "2025-01-06", "09:00 AM", "09:15 AM")
+    ev = database.get_event(event_id)
+    with pytest.raises(ValueError):
+        database.update_event(event_id, "Standup", "2025-01-06", start, end)
+    with pytest.raises(ValueError):
+        database.patch_event(event_id, ev.version, when=("2025-01-06", start, end, ev.tz))
+    assert database.get_event(event_id).to_dict() == ev.to_dict()
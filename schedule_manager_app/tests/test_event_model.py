@@ -0,0 +1,136 @@
+import random
+import time
+import types
+from collections import Counter
+from datetime import date, timedelta
+
+import pytest
+
+import database
+from timeutil import format_minutes
+
+START = date(2025, 1, 6)  # a Monday
+WEEKS = 6
+
+
+@pytest.fixture
+def page(qapp, user, monkeypatch):
+    """A shown CalendarPage over WEEKS weeks of events; page.fetched counts each event the model loaded."""
+    from calendar_page_qt import CalendarPage
+    from undo import UndoJournal
+
+    rng = random.Random(5)
+    for i in range(200):
+        day = START + timedelta(days=rng.randrange(WEEKS * 7))
+        start = rng.randrange(0, 1380, 15)
+        database.add_event(user, f"Event {i}", day.isoformat(), format_minutes(start), format_minutes(start + 30))
+
+    fetched = Counter()
+    get_events_between = database.get_events_between
+
+    def load(username, first, last, tz=None):
+        events = get_events_between(username, first, last, tz)
+        fetched.update(ev.id for ev in events)
+        return events
+
+    monkeypatch.setattr(database, "get_events_between", load)  # what the page's EventModel loads with
+    page = CalendarPage(types.SimpleNamespace(current_user=user, clock=None, undo=UndoJournal(user)))
+    page.fetched = fetched
+    page.resize(1100, 800)
+    page.show()
+    yield page
+    page.events.close()
+    page.close()
+
+
+def settle(qapp, page) -> None:
+    """Let the model finish loading and the views draw what it loaded."""
+    while not page.events.idle():
+        qapp.processEvents()
+        time.sleep(0.0005)
+    qapp.processEvents()
+
+
+def walk(qapp, page) -> None:
+    """Every month, week and day of the filled range in its view, then a search scrolled to the end."""
+    from PySide6.QtCore import QDate, QModelIndex
+    first = QDate(START.year, START.month, START.day)
+    last = first.addDays(WEEKS * 7 - 1)
+    page.go_to(first)
+    for view in ("month", "week", "day"):
+        page.current_date = first
+        page.switch_view(view)
+        while page.current_date <= last:
+            settle(qapp, page)
+            page.page_by(1)
+
+    page.switch_view("search")
+    search = page.content
+    search.query.setText("Event 1")
+    while True:
+        settle(qapp, page)
+        search.results.scrollToBottom()
+        if not search.proxy.canFetchMore(QModelIndex()):
+            break
+        search.proxy.fetchMore(QModelIndex())
+    settle(qapp, page)
+
+
+def test_every_event_is_fetched_once_across_views(qapp, user, page):
+    walk(qapp, page)
+    assert len(page.fetched) == 200
+    assert set(page.fetched.values()) == {1}
+
+
+def test_edits_update_rows_without_loading_ranges_again(qapp, user, page):
+    walk(qapp, page)
+    model = page.events
+    queries = model.queries
+    rng = random.Random(8)
+    for i in range(30):
+        ev = rng.choice(model.events_between(START.isoformat(), "9999"))
+        kind = ("move", "rename", "delete")[i % 3]
+        if kind == "delete":
+            page.app.undo.delete(ev)
+        else:
+            day = date.fromisoformat(ev.date) + timedelta(days=rng.choice((-1, 1)) if kind == "move" else 0)
+            start = rng.randrange(0, 1380, 15) if kind == "move" else ev.start_min
+            title = ev.title + "'" if kind == "rename" else ev.title
+            page.app.undo.update(ev, title, day.isoformat(), format_minutes(start), format_minutes(start + 30))
+        qapp.processEvents()
+        shown = {e.id: (e.title, e.date, e.start_min) for e in model.events_between(START.isoformat(), "9999")}
+        now = database.get_event(ev.id, tz=model.tz)
+        if now is not None and model.loaded(now.date, now.date):
+            assert shown.get(ev.id) == (now.title, now.date, now.start_min), kind
+        else:  # deleted, or moved to a week not loaded
+            assert ev.id not in shown, kind
+    assert model.queries == queries
+
+
+def test_weeks_furthest_from_the_last_request_are_dropped(qapp, user):
+    from event_model_qt import EventModel
+
+    for week in range(12):
+        database.add_event(user, f"Week {week}", (START + timedelta(weeks=week)).isoformat(), "09:00 AM", "10:00 AM")
+    model = EventModel(database.user_zone(user), max_weeks=4)
+    model.set_user(user)
+    removed = []
+    model.rowsRemoved.connect(lambda _parent, first, last: removed.append(last - first + 1))
+    try:
+        for week in range(12):  # paging forward a week at a time
+            day = (START + timedelta(weeks=week)).isoformat()
+            model.request(day, day)
+            while not model.idle() or not model.loaded(day, day):
+                qapp.processEvents()
+            assert len(model._weeks) <= 4
+            assert len(model._by_id) == model.rowCount() <= 4
+        assert sum(removed) == 8
+        assert [ev.title for ev in model.events_between("0000", "9999")] == [f"Week {w}" for w in range(8, 12)]
+
+        first = START.isoformat()  # back to the start: loaded again, the far end is dropped
+        model.request(first, first)
+        while not model.idle() or not model.loaded(first, first):
+            qapp.processEvents()
+        assert model.loaded(first, first) and not model.loaded("2025-03-24", "2025-03-24")
+    finally:
+        model.close()
@@ -0,0 +1,32 @@
+import database
+import ics
+
+CALENDAR = """BEGIN:VCALENDAR
+VERSION:2.0
+BEGIN:VEVENT
+SUMMARY:Too old
+DTSTART:09990101T090000
+DTEND:09990101T100000
+END:VEVENT
+BEGIN:VEVENT
+SUMMARY:Standup
+DTSTART:20250106T090000
+DTEND:20250106T091500
+END:VEVENT
+BEGIN:VEVENT
+SUMMARY:No start
+END:VEVENT
+END:VCALENDAR
+"""
+
+
+def test_events_without_a_usable_date_are_skipped(user):
+    assert ics.import_ics(user, CALENDAR.splitlines(keepends=True)) == 1
+    [ev] = database.get_events_for_day(user, "2025-01-06")
+    assert (ev.title, ev.start, ev.end) == ("Standup", "09:00 AM", "09:15 AM")
+
+
+def test_backend_import_skips_them_too(client, user):
+    resp = client.post(f"/users/{user}/import.ics", files={"file": ("cal.ics", CALENDAR.encode(), "text/calendar")})
+    assert resp.status_code == 200 and resp.json() == {"imported": 1}
+    assert "SUMMARY:Standup" in client.get(f"/users/{user}/export.ics").text
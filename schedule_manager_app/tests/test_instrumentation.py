@@ -0,0 +1,42 @@
+import logging
+
+import pytest
+
+import database
+import instrumentation
+
+
+@pytest.fixture
+def profiling():
+    """Every statement over the slow threshold (0 ms), as with SCHEDULE_MANAGER_SLOW_MS=0."""
+    slow_ms = instrumentation._slow_ms
+    instrumentation.reset()
+    instrumentation.enable(slow_ms=0)
+    yield
+    instrumentation.disable()
+    instrumentation._slow_ms = slow_ms
+    instrumentation.reset()
+
+
+def test_slow_event_reads_are_explained_not_raised(user, profiling, caplog):
+    event_id = database.add_event(user, "Standup", "2025-01-06", "09:00 AM", "09:15 AM")
+    with caplog.at_level(logging.WARNING, logger=instrumentation.log.name):
+        day = database.get_events_for_day(user, "2025-01-06")
+        event = database.get_event(event_id)
+        between = database.get_events_between(user, "2025-01-01", "2025-01-31")
+    assert [ev.id for ev in day] == [event_id]
+    assert event.title == "Standup"
+    assert [ev.id for ev in between] == [event_id]
+    slow = [r.getMessage() for r in caplog.records if r.getMessage().startswith("slow query")]
+    assert any("FROM events" in msg and "\n    " in msg for msg in slow)  # logged with its plan
+
+
+def test_explaining_never_raises(db, profiling):
+    def broken(cursor, row):
+        raise TypeError("not this row shape")
+
+    with database._get_conn() as conn:
+        conn.row_factory = broken  # whatever the caller's rows are made with, plans are plain tuples
+        instrumentation._finish(conn, "SELECT id FROM events WHERE user_id = ?", (1,), 1.0)
+        # EXPLAIN of a statement with the wrong parameter count fails: logged, not raised
+        instrumentation._finish(conn, "SELECT ? + ?", (1,), 1.0)
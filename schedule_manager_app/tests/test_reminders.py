@@ -0,0 +1,141 @@
+import heapq
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+import database
+from reminders import LATE_LIMIT_MIN, ReminderScheduler, to_minute
+from timeutil import format_minutes
+
+START = datetime(2025, 6, 30, 8, 0, tzinfo=timezone.utc)
+DAY = START.date().isoformat()
+
+
+class SimClock:
+    """call_later/cancel/now over simulated time; run() fires the timers in order."""
+
+    def __init__(self, now: datetime):
+        self.now = now
+        self._timers = []
+        self._seq = 0
+
+    def call_later(self, delay_ms, callback):
+        self._seq += 1
+        timer = [self.now + timedelta(milliseconds=delay_ms), self._seq, callback]
+        heapq.heappush(self._timers, timer)
+        return timer
+
+    def cancel(self, timer) -> None:
+        timer[2] = None
+
+    @property
+    def pending(self) -> int:
+        return sum(t[2] is not None for t in self._timers)
+
+    def run(self, until: datetime) -> None:
+        while self._timers and self._timers[0][0] < until:
+            at, _, callback = heapq.heappop(self._timers)
+            if callback is not None:
+                self.now = at
+                callback()
+        self.now = until
+
+
+@pytest.fixture
+def utc_user(user):
+    database.set_user_zone(user, "UTC")
+    return user
+
+
+@pytest.fixture
+def run(utc_user):
+    """A scheduler for utc_user on a SimClock at START; run(hours) advances it, returns what fired."""
+    clock = SimClock(START)
+    fired = []
+
+    def fire(reminder, ev):
+        fired.append((ev.id, reminder.offset_min, clock.now))
+
+    scheduler = ReminderScheduler(clock.call_later, clock.cancel, fire, username=utc_user,
+                                  now=lambda: clock.now, window_min=60)
+
+    def advance(hours: float) -> list:
+        if not scheduler._running:
+            scheduler.start()
+        clock.run(clock.now + timedelta(hours=hours))
+        return fired
+
+    advance.clock, advance.scheduler = clock, scheduler
+    yield advance
+    scheduler.stop()
+
+
+def add(user: str, minute_of_day: int, reminders=(10,), title="Event") -> int:
+    return database.add_event(user, title, DAY, format_minutes(minute_of_day), format_minutes(minute_of_day + 30),
+                              reminders=reminders)
+
+
+def at(minute_of_day: int) -> datetime:
+    return datetime(START.year, START.month, START.day, tzinfo=timezone.utc) + timedelta(minutes=minute_of_day)
+
+
+def test_every_reminder_fires_once_at_its_minute_across_windows(utc_user, run):
+    # 09:00 .. 14:40 every 20 minutes: several 60-minute windows, two reminders each
+    events = {add(utc_user, m, reminders=(0, 15)): m for m in range(9 * 60, 15 * 60, 20)}
+    fired = run(8)
+    expected = sorted((eid, off, at(m - off)) for eid, m in events.items() for off in (0, 15))
+    assert sorted(fired) == expected
+    assert [when for _, _, when in fired] == sorted(when for _, _, when in fired)
+    assert all(when.second == 0 and when.microsecond == 0 for _, _, when in fired)
+
+
+def test_writes_reschedule_cancel_and_change_reminders(utc_user, run):
+    moved = add(utc_user, 9 * 60)
+    deleted = add(utc_user, 9 * 60 + 30)
+    changed = add(utc_user, 10 * 60)
+    run(0.5)  # 08:30: all still ahead
+    database.update_event(moved, "Event", DAY, format_minutes(11 * 60), format_minutes(11 * 60 + 30))
+    database.delete_event(deleted)
+    database.set_reminders(changed, [5, 30])
+    added_later = add(utc_user, 9 * 60 + 45, reminders=(0,))
+    fired = run(4)
+    assert sorted(fired) == sorted([
+        (moved, 10, at(11 * 60 - 10)),
+        (changed, 5, at(10 * 60 - 5)),
+        (changed, 30, at(10 * 60 - 30)),
+        (added_later, 0, at(9 * 60 + 45)),
+    ])
+
+
+def test_writes_by_another_process_never_fire_stale_reminders(utc_user, run):
+    event_id = add(utc_user, 9 * 60)
+    run(0.1)  # the window with its reminder is loaded
+    with database._get_conn() as conn:  # no listener sees this
+        conn.execute("UPDATE events SET start_utc = start_utc + 120 WHERE id = ?", (event_id,))
+    assert run(2) == []
+
+
+def test_after_a_sleep_only_recent_misses_fire(utc_user, run):
+    add(utc_user, 8 * 60 + 20)              # due 08:10: missed by 170 minutes, more than LATE_LIMIT_MIN
+    recent = add(utc_user, 10 * 60 + 20)    # due 10:10: missed by 50 minutes
+    ahead = add(utc_user, 11 * 60 + 30)     # due 11:20
+    assert 50 < LATE_LIMIT_MIN < 170
+    run(0)  # started at 08:00
+    clock = run.clock
+    clock._timers.clear()  # asleep: no timer ran ...
+    clock.now = at(11 * 60)  # ... until 11:00, 170 minutes later
+    run.scheduler._arm()
+    fired = run(1)
+    assert [(eid, to_minute(when)) for eid, _, when in fired] == [
+        (recent, to_minute(at(11 * 60))),  # on waking
+        (ahead, to_minute(at(11 * 60 + 20))),
+    ]
+
+
+def test_nothing_due_before_start_fires_and_one_timer_is_pending(utc_user, run):
+    add(utc_user, 8 * 60 + 5)  # due 07:55, before the scheduler starts
+    assert run(1) == []
+    assert run.clock.pending == 1
+    run.scheduler.stop()
+    assert run.clock.pending == 0
+    assert to_minute(run.clock.now) == to_minute(START) + 60
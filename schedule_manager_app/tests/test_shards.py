@@ -0,0 +1,34 @@
+import pytest
+
+import database
+import shards
+
+DAY = "2025-01-06"
+
+
+@pytest.fixture
+def router(db, tmp_path):
+    """DB_FILE and one more shard file, routed by directory placement."""
+    router = shards.ShardRouter([db, str(tmp_path / "shard1.db")], placement="directory")
+    database.enable_sharding(router)
+    yield router
+    database.disable_write_buffer()
+    database.enable_sharding(None)
+
+
+def test_buffered_writes_to_stale_ids_follow_a_moved_user(router, user):
+    kept = database.add_event(user, "kept", DAY, "09:00 AM", "10:00 AM")
+    gone = database.add_event(user, "gone", DAY, "11:00 AM", "12:00 PM")
+    src = router.shard_for_user(user)
+    assert router.move_user(user, 1 - src) == 2
+
+    database.enable_write_buffer(20)
+    # ids from before the move reach the old shard, which only has forwarding rows for them
+    database.update_event(kept, "renamed", DAY, "09:30 AM", "10:30 AM")
+    database.set_reminders(kept, [15])
+    database.delete_event(gone)
+    database.flush_writes()
+
+    [ev] = database.get_events_for_day(user, DAY)
+    assert ev.id != kept and (ev.title, ev.start) == ("renamed", "09:30 AM")
+    assert database.get_reminders(ev.id) == [15]
@@ -0,0 +1,54 @@
+import time
+
+import pytest
+
+import database
+from event import Event
+
+
+@pytest.fixture
+def events(user):
+    """200 events of user, spread over January 2025."""
+    return [database.add_event(user, f"Event {i}", f"2025-01-{i % 28 + 1:02d}", "09:00 AM", "10:00 AM")
+            for i in range(200)]
+
+
+@pytest.mark.parametrize("mode", ["wal", "copy"])
+def test_writes_go_through_while_a_snapshot_is_being_read(user, events, mode):
+    with database.snapshot(mode) as snap:
+        rows = snap.execute("SELECT id, title FROM events ORDER BY id")
+        first = rows.fetchmany(50)  # mid-scan: the read transaction is open
+
+        t0 = time.perf_counter()
+        added = database.add_event(user, "During the scan", "2025-01-06", "11:00 AM", "12:00 PM")
+        database.update_event(events[0], "Renamed during the scan", "2025-01-01", "09:00 AM", "10:00 AM")
+        database.delete_event(events[-1])
+        took = time.perf_counter() - t0
+        # a blocked writer would wait out sqlite's busy timeout (5 s) or fail with "database is locked"
+        assert took < 1.0
+
+        # the snapshot still sees the state it started with
+        scanned = first + rows.fetchall()
+        assert [eid for eid, _ in scanned] == events
+        assert scanned[0][1] == "Event 0"
+        assert snap.execute("SELECT COUNT(*) FROM events WHERE id = ?", (added,)).fetchone() == (0,)
+
+    # and the writes are there for everyone else
+    assert database.get_event(events[0]).title == "Renamed during the scan"
+    assert database.get_event(events[-1]) is None
+    assert database.get_event(added).title == "During the scan"
+
+
+def test_snapshot_is_read_only(events):
+    with database.snapshot("wal") as snap:
+        with pytest.raises(Exception, match="readonly"):
+            snap.execute("DELETE FROM events")
+    assert len(database.list_events("alice", limit=1000)[0]) == len(events)
+
+
+def test_snapshot_rows_read_as_events(events):
+    from event import row_factory
+    with database.snapshot("copy") as snap:
+        snap.row_factory = row_factory
+        ev = snap.execute(f"SELECT {database.EVENT_COLUMNS} FROM all_events ORDER BY id LIMIT 1").fetchone()
+    assert isinstance(ev, Event) and ev.id == events[0]
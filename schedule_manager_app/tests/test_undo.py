@@ -0,0 +1,122 @@
+import random
+
+import pytest
+
+import database
+from timeutil import format_minutes
+from undo import UndoJournal
+
+DAYS = [f"2025-07-{d:02d}" for d in range(1, 32)]
+LIMIT = 20
+
+
+def calendar(user: str) -> set:
+    """The user's events and reminders, without versions (which undo moves on)."""
+    with database._get_conn() as conn:
+        uid = database.user_id(user)
+        events = conn.execute("SELECT id, title, date, start, end, tz, start_utc, end_utc FROM events"
+                              " WHERE user_id = ?", (uid,)).fetchall()
+        reminders = conn.execute("SELECT event_id, offset_min, due_min FROM reminders WHERE user_id = ?",
+                                 (uid,)).fetchall()
+    return set(events) | set(reminders)
+
+
+def logged(user: str) -> int:
+    with database._get_conn() as conn:
+        return conn.execute("SELECT COUNT(*) FROM undo_log WHERE user_id = ?", (database.user_id(user),)).fetchone()[0]
+
+
+def edit(journal: UndoJournal, ids: list[int], rng: random.Random) -> None:
+    """One random add, move, rename or delete through the journal."""
+    op = rng.choices(("add", "update", "delete"), (3, 5, 2))[0] if ids else "add"
+    if op == "add":
+        start = rng.randrange(0, 1380, 15)
+        ids.append(journal.add(f"Event {len(ids)}", rng.choice(DAYS), format_minutes(start),
+                               format_minutes(start + 60), reminders=rng.choice(((), (10,), (5, 60)))))
+        return
+    before = database.get_event(ids[k := rng.randrange(len(ids))])
+    if op == "delete":
+        journal.delete(before)
+        ids[k] = ids[-1]
+        ids.pop()
+    elif rng.random() < 0.3:
+        journal.update(before, before.title + "'", before.date, before.start, before.end)
+    else:
+        start = rng.randrange(0, 1380, 15)
+        journal.update(before, before.title, rng.choice(DAYS), format_minutes(start), format_minutes(start + 60))
+
+
+@pytest.mark.parametrize("persist", [False, True])
+def test_journal_keeps_at_most_limit_entries(user, persist):
+    journal = UndoJournal(user, limit=LIMIT, persist=persist)
+    rng = random.Random(1)
+    ids = []
+    for n in range(1, 10 * LIMIT):
+        edit(journal, ids, rng)
+        if n % 7 == 0:
+            journal.undo()
+            ids[:] = [ev.id for ev in database.list_events(user, limit=1000)[0]]
+        assert len(journal) <= LIMIT
+        assert len(journal._versions) == len(journal._refs) <= LIMIT
+    assert len(journal) == LIMIT  # full: the oldest entries fell off
+    database.flush_writes()
+    assert logged(user) == (len(journal) if persist else 0)
+
+    undone = 0
+    while journal.undo() is not None:
+        undone += 1
+    assert 0 < undone <= LIMIT
+
+
+def test_undoing_everything_restores_the_calendar_and_redo_reapplies_it(user):
+    rng = random.Random(2)
+    ids = [database.add_event(user, f"Seed {i}", rng.choice(DAYS), "09:00 AM", "10:00 AM") for i in range(20)]
+    journal = UndoJournal(user, limit=LIMIT, persist=True)
+    before = calendar(user)
+    for _ in range(LIMIT):
+        edit(journal, ids, rng)
+    after = calendar(user)
+    assert after != before
+
+    for i in range(LIMIT):
+        if i == LIMIT // 2:  # re-opened from undo_log, as after a restart
+            journal = UndoJournal(user, limit=LIMIT, persist=True)
+            assert len(journal) == LIMIT and journal.can_undo and journal.can_redo
+        assert journal.undo() is not None
+    assert journal.undo() is None
+    assert calendar(user) == before
+
+    for _ in range(LIMIT):
+        assert journal.redo() is not None
+    assert journal.redo() is None
+    assert calendar(user) == after
+
+
+def test_undo_never_overwrites_a_change_made_elsewhere(user):
+    journal = UndoJournal(user, persist=True)
+    event_id = journal.add("Lunch", DAYS[0], "12:00 PM", "01:00 PM")
+    other = journal.add("Dinner", DAYS[0], "07:00 PM", "08:00 PM")
+    ev = database.get_event(event_id)
+    journal.update(ev, "Lunch", DAYS[1], "12:00 PM", "01:00 PM")
+    ev = database.get_event(event_id)
+    database.update_event(event_id, "Lunch elsewhere", ev.date, ev.start, ev.end, ev.version)
+
+    with pytest.raises(database.ConflictError):
+        journal.undo()
+    assert database.get_event(event_id).title == "Lunch elsewhere"
+    assert len(journal) == 1  # only Dinner's entry is left, here and in undo_log
+    database.flush_writes()
+    assert logged(user) == 1
+    assert journal.undo() == "add" and database.get_event(other) is None
+    assert database.get_event(event_id).title == "Lunch elsewhere"
+
+
+def test_new_edit_after_undo_drops_the_redo_side(user):
+    journal = UndoJournal(user)
+    journal.add("One", DAYS[0], "09:00 AM", "10:00 AM")
+    journal.undo()
+    assert journal.can_redo
+    journal.add("Two", DAYS[0], "09:00 AM", "10:00 AM")
+    assert not journal.can_redo and len(journal) == 1
+    journal.clear()
+    assert len(journal) == 0 and journal.undo() is None
@@ -0,0 +1,120 @@
+import os
+import signal
+import sqlite3
+import subprocess
+import sys
+import time
+
+import pytest
+
+import database
+
+DAY = "2025-01-06"
+EVENTS = 5
+
+
+@pytest.fixture
+def buffered(user):
+    database.enable_write_buffer(20)
+    yield user
+    database.disable_write_buffer()
+
+
+def test_edits_share_transactions_and_reads_see_them(buffered):
+    ids = [database.add_event(buffered, f"event {i}", DAY, "09:00 AM", "10:00 AM") for i in range(EVENTS)]
+    before = database._buffer.transactions
+    for n in range(200):
+        assert database.update_event(ids[n % EVENTS], f"edit {n}", DAY, "09:00 AM", "10:00 AM") is None  # queued
+    # a read waits for the caller's own queued writes
+    assert [ev.title for ev in database.get_events_for_day(buffered, DAY)] == [f"edit {195 + i}" for i in range(EVENTS)]
+    assert database._buffer.transactions - before < 200
+
+
+def test_flush_raises_a_failed_buffered_write(buffered, monkeypatch):
+    event_id = database.add_event(buffered, "event", DAY, "09:00 AM", "10:00 AM")
+
+    def fail(conn, *args):
+        raise sqlite3.IntegrityError("constraint failed")
+
+    monkeypatch.setitem(database.WRITES, "delete_event", fail)
+    database.delete_event(event_id)  # queued: returns before it fails
+    with pytest.raises(sqlite3.IntegrityError):
+        database.flush_writes()
+    database.flush_writes()  # reported once
+
+
+def test_a_failed_write_is_raised_after_later_writes_and_reads(buffered, monkeypatch):
+    event_id = database.add_event(buffered, "event", DAY, "09:00 AM", "10:00 AM")
+    other = database.add_event(buffered, "other", DAY, "11:00 AM", "12:00 PM")
+
+    def fail(conn, *args):
+        raise sqlite3.IntegrityError("constraint failed")
+
+    monkeypatch.setitem(database.WRITES, "delete_event", fail)
+    database.delete_event(event_id)
+    time.sleep(0.1)  # committed (and failed) before the next write is queued
+    database.update_event(other, "renamed", DAY, "11:00 AM", "12:00 PM")
+    assert database.get_event(other).title == "renamed"  # a read waits for both, and raises neither
+    time.sleep(0.1)
+    database.update_event(other, "renamed again", DAY, "11:00 AM", "12:00 PM")
+    with pytest.raises(sqlite3.IntegrityError):
+        database.flush_writes()
+    database.flush_writes()
+    assert database.get_event(other).title == "renamed again"
+
+
+@pytest.mark.skipif(not hasattr(signal, "SIGKILL"), reason="needs SIGKILL")
+def test_acknowledged_writes_survive_sigkill(tmp_path):
+    db_file = str(tmp_path / "crash.db")
+    env = {**os.environ, "PYTHONPATH": os.path.dirname(os.path.dirname(os.path.abspath(__file__)))}
+    child = subprocess.Popen([sys.executable, __file__, db_file], stdout=subprocess.PIPE, text=True, env=env)
+    try:
+        flushed = int(child.stdout.readline().split()[1])
+        added = []
+        deadline = time.monotonic() + 0.3
+        while time.monotonic() < deadline:  # add_event returns once committed: each id is acknowledged
+            line = child.stdout.readline().split()
+            if line and line[0] == "ADDED":
+                added.append(int(line[1]))
+    finally:
+        os.kill(child.pid, signal.SIGKILL)
+        child.wait()
+    assert flushed and added
+
+    conn = sqlite3.connect(db_file)
+    assert conn.execute("PRAGMA integrity_check").fetchone() == ("ok",)
+    ids = {eid for (eid,) in conn.execute("SELECT id FROM events")}
+    titles = [t for (t,) in conn.execute("SELECT title FROM events WHERE title LIKE 'edit %' ORDER BY id")]
+    conn.close()
+
+    assert set(added) <= ids
+    # each edited event holds its last flushed edit or a later one: nothing lost, no torn batch
+    last_flushed = {n % EVENTS: n for n in range(flushed)}
+    assert len(titles) == EVENTS
+    for i, title in enumerate(titles):
+        n = int(title.split()[1])
+        assert n % EVENTS == i and n >= last_flushed[i]
+
+
+def _crash_child(db_file: str) -> None:
+    """Buffered edits and a flush, then edits and adds until the parent kills the process."""
+    database.DB_FILE = db_file
+    database.init_db()
+    database.create_user("crash", "crash")
+    ids = [database.add_event("crash", "start", DAY, "09:00 AM", "10:00 AM") for _ in range(EVENTS)]
+    database.enable_write_buffer(20)
+    n = 0
+    for _ in range(20 * EVENTS):
+        database.update_event(ids[n % EVENTS], f"edit {n}", DAY, "09:00 AM", "10:00 AM")
+        n += 1
+    database.flush_writes()
+    print(f"FLUSHED {n}", flush=True)
+    while True:
+        database.update_event(ids[n % EVENTS], f"edit {n}", DAY, "09:00 AM", "10:00 AM")
+        n += 1
+        if n % 10 == 0:
+            print(f"ADDED {database.add_event('crash', 'added', DAY, '11:00 AM', '12:00 PM')}", flush=True)
+
+
+if __name__ == "__main__":
+    _crash_child(sys.argv[1])
@@ -0,0 +1,71 @@
+"""
+Time-of-day parsing and formatting shared by every view, dialog and importer.
+
+All 1,440 minutes of the day are formatted once at import time, and every
+spelling we accept is mapped back to its minute, so parsing and formatting an
+event's times is a dict/list lookup instead of split()/strptime per call.
+
+    parse_minutes("09:30 PM")          -> 1290
+    format_minutes(1290)               -> "09:30 PM"   (stored in the DB)
+    format_minutes(1290, "short")      -> "9:30 PM"
+    format_minutes(1290, "24h")        -> "21:30"
+    HOUR_LABELS["h AP"][21]            -> "9 PM"
+"""
+MINUTES_PER_DAY = 24 * 60
+
+
+def _build_formats() -> dict[str, tuple[str, ...]]:
+    formats = {"12h": [], "short": [], "24h": []}
+    for minute in range(MINUTES_PER_DAY):
+        hh, mm = divmod(minute, 60)
+        hr12 = hh % 12 or 12
+        suffix = "AM" if hh < 12 else "PM"
+        formats["12h"].append(f"{hr12:02d}:{mm:02d} {suffix}")
+        formats["short"].append(f"{hr12}:{mm:02d} {suffix}")
+        formats["24h"].append(f"{hh:02d}:{mm:02d}")
+    return {name: tuple(table) for name, table in formats.items()}
+
+
+def _build_parse_table() -> dict[str, int]:
+    table = {}
+    for minute in range(MINUTES_PER_DAY):
+        hh, mm = divmod(minute, 60)
+        hr12 = hh % 12 or 12
+        suffix = "AM" if hh < 12 else "PM"
+        for clock in (f"{hr12:02d}:{mm:02d}", f"{hr12}:{mm:02d}"):
+            table[f"{clock} {suffix}"] = minute
+            table[f"{clock}{suffix}"] = minute
+        table[f"{hh:02d}:{mm:02d}"] = minute
+        table[f"{hh}:{mm:02d}"] = minute
+    return table
+
+
+FORMATS = _build_formats()
+_PARSE = _build_parse_table()
+
+# hour labels for the time columns, by Qt-style format name
+HOUR_LABELS = {
+    "h AP": tuple(f"{h % 12 or 12} {'AM' if h < 12 else 'PM'}" for h in range(24)),
+    "hh:mm AP": tuple(FORMATS["12h"][h * 60] for h in range(24)),
+    "HH:mm": tuple(FORMATS["24h"][h * 60] for h in range(24)),
+}
+
+
+def parse_minutes(time_str: str) -> int:
+    """'hh:mm AM/PM', 'h:mm am' or 24h 'HH:MM' -> minutes since midnight. Raises ValueError."""
+    minute = _PARSE.get(time_str)
+    if minute is None:
+        minute = _PARSE.get(" ".join(str(time_str).split()).upper())
+        if minute is None:
+            raise ValueError(f"not a time of day: {time_str!r}")
+    return minute
+
+
+def format_minutes(minute: int, style: str = "12h") -> str:
+    """Minutes since midnight -> '09:30 PM' (12h, the DB format), '9:30 PM' (short) or '21:30' (24h)."""
+    return FORMATS[style][minute % MINUTES_PER_DAY]
+
+
+def to_24h(hour12: int, ampm: str) -> int:
+    """12-hour clock hour + 'AM'/'PM' -> 0..23."""
+    return int(hour12) % 12 + (12 if (ampm or "AM").upper() == "PM" else 0)
@@ -0,0 +1,223 @@
+"""
+Undo/redo of a user's event edits, kept as a bounded journal of diffs.
+
+The desktop pages add, update and delete events through an UndoJournal
+instead of calling database.py directly; it does the write and records what
+it changed:
+
+    ("add",    event_id, row, reminders)    row = (title, date, start_min, end_min, tz, (start_utc, end_utc))
+    ("update", event_id, title, when)       title = (old, new) or None,
+                                            when = ((date, start_min, end_min, tz), (...new)) or None
+    ("delete", event_id, row, reminders)
+
+An update keeps only the fields that changed; times are kept as minutes and
+the date and zone strings, which repeat from entry to entry, are interned.
+Undo and redo pop one entry and apply it with a single version-checked
+write (delete_event, patch_event or restore_event), so they never overwrite
+a change made elsewhere meanwhile: that raises database.ConflictError and
+the event's entries are dropped from the journal. The journal holds at most
+`limit` entries, undo and redo sides together; the oldest fall off.
+
+    journal = UndoJournal("alice")
+    event_id = journal.add("Lunch", "2025-06-30", "12:00 PM", "01:00 PM")
+    journal.delete(database.get_event(event_id))
+    journal.undo()   # the event is back, under the same id
+    journal.redo()   # and gone again
+
+With persist=True every entry is also written to the undo_log table (through
+the write buffer when it is on), and a journal opened later for the same
+user picks up where the last one stopped.
+"""
+import json
+import sys
+from collections import deque
+
+import database
+from event import Event
+from timeutil import format_minutes, parse_minutes
+
+UNDO_LIMIT = 1000  # entries kept per journal
+
+
+class UndoJournal:
+    """One user's undo and redo stacks; the add/update/delete commands go through it."""
+
+    def __init__(self, username: str, limit: int = UNDO_LIMIT, persist: bool = False):
+        self.username = username
+        self.limit = limit
+        self.persist = persist
+        self._undo: deque = deque()  # (seq, kind, event_id, a, b), newest last
+        self._redo: list = []        # undone entries, most recently undone last
+        self._versions: dict[int, int] = {}  # event id -> its version after our last write to it
+        self._refs: dict[int, int] = {}      # event id -> entries that mention it
+        self._seq = 0
+        if persist:
+            self._load()
+
+    def __len__(self):
+        return len(self._undo) + len(self._redo)
+
+    @property
+    def can_undo(self) -> bool:
+        return bool(self._undo)
+
+    @property
+    def can_redo(self) -> bool:
+        return bool(self._redo)
+
+    def clear(self) -> None:
+        """Forget every entry (and, when persisted, the stored ones)."""
+        seqs = [entry[0] for entry in (*self._undo, *self._redo)]
+        self._undo.clear()
+        self._redo.clear()
+        self._versions.clear()
+        self._refs.clear()
+        if self.persist and seqs:
+            database._write_user("forget_undo", self.username, seqs)
+
+    # ---- Commands ----
+    def add(self, title: str, date: str, start: str, end: str, reminders=(), tz: str | None = None) -> int:
+        """database.add_event, undoable; returns the new event's id."""
+        tz = tz or database.user_zone(self.username)
+        event_id = database.add_event(self.username, title, date, start, end, reminders=reminders, tz=tz)
+        self._record("add", event_id, 1, (title, *_when(date, parse_minutes(start), parse_minutes(end), tz), None),
+                     tuple(reminders))
+        return event_id
+
+    def update(self, before: Event, title: str, date: str, start: str, end: str, tz: str | None = None) -> int:
+        """
+        database.update_event of the event as read (before), if it is still
+        at before.version; undoable. Returns the new version.
+        """
+        tz = tz or before.tz
+        version = database.update_event(before.id, title, date, start, end, before.version, tz=tz)
+        old = _when(before.date, before.start_min, before.end_min, before.tz)
+        new = _when(date, parse_minutes(start), parse_minutes(end), tz)
+        title_diff = (before.title, title) if title != before.title else None
+        when_diff = (old, new) if old != new else None
+        if title_diff or when_diff:
+            self._record("update", before.id, version, title_diff, when_diff)
+        elif before.id in self._versions:
+            self._versions[before.id] = version
+        return version
+
+    def delete(self, before: Event) -> None:
+        """database.delete_event of the event as read, if it is still at before.version; undoable."""
+        reminders = tuple(database.get_reminders(before.id))
+        database.delete_event(before.id, before.version)
+        row = (before.title, *_when(before.date, before.start_min, before.end_min, before.tz),
+               (before.start_utc, before.end_utc))
+        self._record("delete", before.id, before.version, row, reminders)
+
+    # ---- Undo / redo ----
+    def undo(self) -> str | None:
+        """Revert the newest entry; returns its kind ("add", "update", "delete"), None if there is none."""
+        if not self._undo:
+            return None
+        entry = self._undo[-1]
+        self._apply(entry, backwards=True)
+        self._redo.append(self._undo.pop())
+        self._mark(entry, undone=True)
+        return entry[1]
+
+    def redo(self) -> str | None:
+        """Apply the most recently undone entry again; returns its kind, None if there is none."""
+        if not self._redo:
+            return None
+        entry = self._redo[-1]
+        self._apply(entry, backwards=False)
+        self._undo.append(self._redo.pop())
+        self._mark(entry, undone=False)
+        return entry[1]
+
+    def _apply(self, entry: tuple, backwards: bool) -> None:
+        _, kind, event_id, a, b = entry
+        version = self._versions[event_id]
+        try:
+            if kind == "update":
+                pick = 0 if backwards else 1
+                when = None
+                if b:
+                    date, start_min, end_min, tz = b[pick]
+                    when = (date, format_minutes(start_min), format_minutes(end_min), tz)
+                version = database.patch_event(event_id, version, title=a and a[pick], when=when)
+            elif (kind == "add") == backwards:
+                database.delete_event(event_id, version)
+            else:
+                title, date, start_min, end_min, tz, utc = a
+                version += 1
+                database.restore_event(self.username, event_id, title, date, format_minutes(start_min),
+                                       format_minutes(end_min), tz, version, reminders=b, utc=utc)
+        except database.ConflictError:
+            self._drop_event(event_id)  # changed elsewhere: none of its entries can be applied any more
+            raise
+        self._versions[event_id] = version
+
+    # ---- Bookkeeping ----
+    def _record(self, kind: str, event_id: int, version: int, a, b) -> None:
+        for dropped in self._redo:
+            self._unref(dropped[2])
+        self._redo.clear()
+        if len(self._undo) >= self.limit:
+            self._unref(self._undo.popleft()[2])
+        self._seq += 1
+        entry = (self._seq, kind, event_id, a, b)
+        self._undo.append(entry)
+        self._refs[event_id] = self._refs.get(event_id, 0) + 1
+        self._versions[event_id] = version
+        if self.persist:
+            database._write_user("log_undo", self.username, self._seq, json.dumps(entry[1:]), version,
+                                 self._undo[0][0])
+
+    def _mark(self, entry: tuple, undone: bool) -> None:
+        if self.persist:
+            database._write_user("mark_undo", self.username, entry[0], undone, self._versions[entry[2]])
+
+    def _unref(self, event_id: int) -> None:
+        refs = self._refs[event_id] - 1
+        if refs:
+            self._refs[event_id] = refs
+        else:
+            del self._refs[event_id]
+            del self._versions[event_id]
+
+    def _drop_event(self, event_id: int) -> None:
+        dropped = [entry for entry in (*self._undo, *self._redo) if entry[2] == event_id]
+        self._undo = deque(entry for entry in self._undo if entry[2] != event_id)
+        self._redo = [entry for entry in self._redo if entry[2] != event_id]
+        self._refs.pop(event_id, None)
+        self._versions.pop(event_id, None)
+        if self.persist and dropped:
+            database._write_user("forget_undo", self.username, [entry[0] for entry in dropped])
+
+    def _load(self) -> None:
+        uid = database.user_id(self.username)
+        if uid is None:
+            return
+        database._wait_for_writes()
+        with database._get_conn(database._user_path(self.username)) as conn:
+            rows = conn.execute("SELECT seq, undone, version, entry FROM undo_log WHERE user_id = ? ORDER BY seq",
+                                (uid,)).fetchall()
+        for seq, undone, version, text in rows[-self.limit:]:
+            kind, event_id, a, b = json.loads(text)
+            a, b = _tuples(a), _tuples(b)
+            if kind == "update" and b:
+                b = tuple(_when(*when) for when in b)
+            elif kind != "update":
+                a = (a[0], *_when(*a[1:5]), a[5])
+            entry = (seq, kind, event_id, a, b)
+            (self._redo if undone else self._undo).append(entry)
+            self._refs[event_id] = self._refs.get(event_id, 0) + 1
+            # versions only grow, so the highest is from the last time the event was touched
+            self._versions[event_id] = max(version, self._versions.get(event_id, 0))
+            self._seq = seq
+        self._redo.reverse()  # the last one undone was the earliest of them
+
+
+def _when(date: str, start_min: int, end_min: int, tz: str) -> tuple:
+    return sys.intern(date), start_min, end_min, sys.intern(tz)
+
+
+def _tuples(value):
+    """JSON lists back to the tuples they were written from."""
+    return tuple(_tuples(v) for v in value) if isinstance(value, list) else value
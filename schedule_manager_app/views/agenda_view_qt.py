@@ -0,0 +1,323 @@
+"""
+Agenda: every event of the user in one scrolling list, past and future.
+
+AgendaModel holds a window of at most max_rows consecutive events in
+(date, start_min, id) order, read a page at a time with database.list_events'
+keyset cursor, so a page costs the same at any depth of the history.
+Scrolling near the end loads the next page (fetchMore), near the start the
+page before (fetch_previous); once the window is full the page at the other
+end is dropped, so memory stays the same however far the user scrolls.
+AgendaView shifts its scroll position by the rows added or dropped above
+what is shown, so the list does not jump.
+
+    model = AgendaModel()
+    row = model.start_at("alice", "2025-06-02")   # a page before and a page from that day
+    view.results.scrollTo(model.index(row), QListView.PositionAtTop)
+
+Events are listed as entered, in their own zone. While the view is shown
+(attach/detach), a write made through database.py that touches the window
+reads the window again from its first row.
+"""
+from datetime import date
+
+from PySide6.QtWidgets import QWidget, QVBoxLayout, QListView, QStyle, QStyledItemDelegate
+from PySide6.QtCore import Qt, QAbstractListModel, QModelIndex, QRectF, QSize, Signal
+from PySide6.QtGui import QColor, QFont
+
+import database
+from event import Event
+from event_model_qt import DATE_ROLE, EVENT_ROLE, TITLE_ROLE
+
+PAGE_SIZE = 100   # events per keyset query
+MAX_ROWS = 1000   # events kept in the window
+PREFETCH_ROWS = 50  # rows from either end of the window at which the next page is loaded
+DAY_RULE_COLOR = "#666666"  # line above each day's first event
+
+
+class AgendaModel(QAbstractListModel):
+    """A sliding window over one user's events, paged in with keyset queries."""
+
+    # rows added (> 0) or dropped (< 0) above the rows that were there, after the change
+    shifted = Signal(int)
+    _written = Signal(str, object)
+
+    def __init__(self, page_size: int = PAGE_SIZE, max_rows: int = MAX_ROWS, parent=None):
+        super().__init__(parent)
+        self.page_size = page_size
+        self.max_rows = max(max_rows, 2 * page_size)
+        self.username = None
+        self._day = None  # where start_at began
+        self._events: list[Event] = []
+        self._ids: set[int] = set()
+        self._more_before = self._more_after = False
+        self.pages = 0  # keyset queries made
+        self._attached = False
+        self._written.connect(self._apply_write)
+
+    def attach(self) -> None:
+        """Follow writes again, and catch up with the ones made while detached."""
+        if not self._attached:
+            self._attached = True
+            database.add_listener(self._on_write)
+            self._reload()
+
+    def detach(self) -> None:
+        """Stop following writes (the view is hidden or going away)."""
+        if self._attached:
+            self._attached = False
+            database.remove_listener(self._on_write)
+
+    def start_at(self, username: str, day: str) -> int:
+        """Fill the window around day (YYYY-MM-DD): a page before it and a page from it on; returns its first row."""
+        self.beginResetModel()
+        self.username = username
+        self._day = day
+        anchor = (day, -1, -1)  # sorts before every event of day
+        after = self._page(anchor, "asc")
+        before = self._page(anchor, "desc")
+        before.reverse()
+        self._events = before + after
+        self._ids = {ev.id for ev in self._events}
+        self._more_before = len(before) == self.page_size
+        self._more_after = len(after) == self.page_size
+        self.endResetModel()
+        return len(before)
+
+    # ---- QAbstractListModel ----
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._events)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or not 0 <= index.row() < len(self._events):
+            return None
+        ev = self._events[index.row()]
+        if role == Qt.DisplayRole:
+            return f"{ev.date}   {ev.start} - {ev.end}   {ev.title}"
+        if role == EVENT_ROLE:
+            return ev
+        if role == TITLE_ROLE:
+            return ev.title
+        if role == DATE_ROLE:
+            return ev.date
+        return None
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and self._more_after
+
+    def fetchMore(self, parent=QModelIndex()):
+        """The page after the last row, dropping rows from the top once the window is full."""
+        if not self.canFetchMore(parent):
+            return
+        page = self._page(database.event_key(self._events[-1]), "asc")
+        self._more_after = len(page) == self.page_size
+        if page:
+            self._insert(len(self._events), page)
+            self._trim(top=True)
+
+    def can_fetch_previous(self) -> bool:
+        return self._more_before
+
+    def fetch_previous(self) -> None:
+        """The page before the first row, dropping rows from the bottom once the window is full."""
+        if not self._more_before:
+            return
+        page = self._page(database.event_key(self._events[0]), "desc")
+        page.reverse()
+        self._more_before = len(page) == self.page_size
+        if page:
+            self._insert(0, page)
+            self.shifted.emit(len(page))
+            self._trim(top=False)
+
+    def _page(self, after_key: tuple, order: str) -> list[Event]:
+        self.pages += 1
+        return database.list_events(self.username, after_key, self.page_size, order)[0]
+
+    def _insert(self, row: int, events: list[Event]) -> None:
+        self.beginInsertRows(QModelIndex(), row, row + len(events) - 1)
+        self._events[row:row] = events
+        self._ids.update(ev.id for ev in events)
+        self.endInsertRows()
+
+    def _trim(self, top: bool) -> None:
+        extra = len(self._events) - self.max_rows
+        if extra <= 0:
+            return
+        first = 0 if top else len(self._events) - extra
+        self.beginRemoveRows(QModelIndex(), first, first + extra - 1)
+        self._ids.difference_update(ev.id for ev in self._events[first:first + extra])
+        del self._events[first:first + extra]
+        self.endRemoveRows()
+        if top:
+            self._more_before = True
+            self.shifted.emit(-extra)
+        else:
+            self._more_after = True
+
+    # ---- Writes ----
+    def _on_write(self, op: str, args: tuple) -> None:
+        if op != "set_reminders":
+            self._written.emit(op, args)  # direct on the GUI thread, queued from any other
+
+    def _apply_write(self, op: str, args: tuple) -> None:
+        if not self.username:
+            return
+        if op == "add_event":
+            touched = args[0] == self.username and self._spans(args[1])
+        elif op == "update_event":
+            touched = args[0] in self._ids or (args[1] is not None and self._spans(args[1]))
+        elif op == "delete_event":
+            touched = args[0] in self._ids
+        else:
+            touched = True
+        if touched:
+            self._reload()
+
+    def _spans(self, day: str) -> bool:
+        """Whether an event on day would fall in the window (or right after it, at the calendar's ends)."""
+        if not self._events:
+            return True
+        return ((not self._more_before or day >= self._events[0].date)
+                and (not self._more_after or day <= self._events[-1].date))
+
+    def _reload(self) -> None:
+        """Read the window again from its first row (the calendar's first, if it started there), as many rows."""
+        if not self.username:
+            return
+        if not self._events:
+            self.start_at(self.username, self._day)
+            return
+        key = None
+        if self._more_before:
+            first = self._events[0]
+            # (date, start_min, id - 1) is just before the first row: ids are whole numbers
+            key = (first.date, first.start_min, first.id - 1)
+        self.beginResetModel()
+        events, more = [], True
+        while more and len(events) < len(self._events):
+            page = self._page(database.event_key(events[-1]) if events else key, "asc")
+            events.extend(page)
+            more = len(page) == self.page_size
+        self._more_after = more
+        self._events = events
+        self._ids = {ev.id for ev in events}
+        self.endResetModel()
+
+
+class AgendaDelegate(QStyledItemDelegate):
+    """
+    One row per event: its day (on the first event of each day only), time
+    and title. Every row is the same height, so the list can use uniform
+    item sizes.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.day_width = 120
+        self.time_width = 150
+
+    def sizeHint(self, option, index):
+        return QSize(self.day_width + self.time_width + 200, option.fontMetrics.height() + 10)
+
+    def paint(self, painter, option, index):
+        ev: Event = index.data(EVENT_ROLE)
+        if ev is None:
+            return
+        painter.save()
+        selected = option.state & QStyle.State_Selected
+        if selected:
+            painter.fillRect(option.rect, option.palette.highlight())
+        text = (option.palette.highlightedText() if selected else option.palette.text()).color()
+        rect = QRectF(option.rect)
+        flags = Qt.AlignLeft | Qt.AlignVCenter
+        row = index.row()
+        if row == 0 or index.siblingAtRow(row - 1).data(DATE_ROLE) != ev.date:
+            painter.setPen(QColor(DAY_RULE_COLOR))
+            painter.drawLine(option.rect.topLeft(), option.rect.topRight())
+            bold = QFont(option.font)
+            bold.setBold(True)
+            painter.setFont(bold)
+            painter.setPen(text)
+            painter.drawText(rect.adjusted(8, 0, 0, 0), flags, _day_label(ev.date))
+            painter.setFont(option.font)
+        painter.setPen(text)
+        painter.drawText(rect.adjusted(self.day_width, 0, 0, 0), flags, f"{ev.start} - {ev.end}")
+        title = rect.adjusted(self.day_width + self.time_width, 0, -4, 0)
+        painter.drawText(title, flags, option.fontMetrics.elidedText(ev.title, Qt.ElideRight, int(title.width())))
+        painter.restore()
+
+
+def _day_label(day: str) -> str:
+    return date.fromisoformat(day).strftime("%a %b %d %Y")
+
+
+class AgendaView(QWidget):
+    """The AgendaModel in a QListView, loading pages at either end as it is scrolled."""
+
+    eventDoubleClicked = Signal(int)
+
+    def __init__(self, parent=None, model=None):
+        super().__init__(parent)
+        self.model = model or AgendaModel(parent=self)
+        self.results = QListView()
+        self.results.setUniformItemSizes(True)
+        self.results.setVerticalScrollMode(QListView.ScrollPerPixel)
+        self.results.setItemDelegate(AgendaDelegate(self.results))
+        self.results.setModel(self.model)
+        self.results.setEditTriggers(QListView.NoEditTriggers)
+        self.results.doubleClicked.connect(lambda index: self.eventDoubleClicked.emit(index.data(EVENT_ROLE).id))
+        self.results.verticalScrollBar().valueChanged.connect(self._scrolled)
+        self.model.shifted.connect(self._shift)
+        self._scroll = 0
+        self.model.modelAboutToBeReset.connect(lambda: setattr(self, "_scroll", self._bar().value()))
+        self.model.modelReset.connect(self._restore)
+
+        layout = QVBoxLayout()
+        layout.addWidget(self.results)
+        self.setLayout(layout)
+
+    def show_from(self, username: str, day: str):
+        """List username's events with day's first at the top."""
+        row = self.model.start_at(username, day)
+        self.results.doItemsLayout()
+        if row < self.model.rowCount():
+            self.results.scrollTo(self.model.index(row), QListView.PositionAtTop)
+        self._scroll = self._bar().value()
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.model.attach()
+
+    def hideEvent(self, event):
+        self.model.detach()
+        super().hideEvent(event)
+
+    def _bar(self):
+        return self.results.verticalScrollBar()
+
+    def _scrolled(self, value: int):
+        bar = self._bar()
+        step = self._row_step()
+        if value <= bar.minimum() + PREFETCH_ROWS * step and self.model.can_fetch_previous():
+            self.model.fetch_previous()
+        # at the very end QAbstractItemView calls fetchMore itself
+        elif bar.maximum() - PREFETCH_ROWS * step <= value < bar.maximum() and self.model.canFetchMore():
+            self.model.fetchMore()
+
+    def _shift(self, rows: int):
+        """Keep the same events in view when rows were added or dropped above them."""
+        bar, delta = self._bar(), rows * self._row_step()
+        if delta > 0:
+            # the list lays itself out (and sets the range) later; a forced layout costs a rowCount per row
+            bar.setMaximum(bar.maximum() + delta)
+        bar.setValue(bar.value() + delta)
+
+    def _row_step(self) -> int:
+        """Scroll bar units per row."""
+        if self.results.verticalScrollMode() == QListView.ScrollPerItem:
+            return 1
+        return max(1, self.results.sizeHintForRow(0))
+
+    def _restore(self):
+        self.results.doItemsLayout()
+        self._bar().setValue(self._scroll)
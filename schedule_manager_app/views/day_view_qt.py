@@ -1,14 +1,131 @@
-from PySide6.QtWidgets import QWidget, QVBoxLayout, QLabel, QGraphicsView, QGraphicsScene, QGraphicsRectItem, QGraphicsTextItem
-from PySide6.QtCore import Qt, QTime, QRectF, Signal
-from PySide6.QtGui import QPen, QColor
+from datetime import datetime
+
+from PySide6.QtWidgets import (QApplication, QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QGraphicsView,
+                               QGraphicsScene, QGraphicsItem, QGraphicsRectItem, QStyleOptionGraphicsItem)
+from PySide6.QtCore import Qt, QDate, QEvent, QRectF, Signal
+from PySide6.QtGui import QPen, QColor, QTransform
+
+from event import Event
+from timeutil import HOUR_LABELS, format_minutes
+from views.layout import Block, layout_day
+
+
+SNAP_MINUTES = 15   # drags land on quarter hours
+RESIZE_MARGIN = 6   # pixels at a box's bottom edge that resize instead of move
+LAST_MINUTE = 24 * 60 - 1
+
+EVENTS_WIDTH = 600  # scene width of the event area, right of the time column
+EVENT_COLOR, MORE_COLOR, BORDER_COLOR = "#00E5FF", "#B2EBF2", "#222222"
+
+# level of detail
+MIN_COLUMN_PX = 24  # narrower columns collapse into a "+N more" box (on-screen pixels)
+TEXT_LOD = 0.75     # zoomed out further than this, boxes are drawn without text
+ZOOM_STEP = 1.25
+MIN_ZOOM, MAX_ZOOM = 0.25, 4.0
+_TEXT_FLAGS = Qt.AlignLeft | Qt.AlignTop
+
+
+def _snap(minute: float) -> int:
+    return int(round(minute / SNAP_MINUTES)) * SNAP_MINUTES
+
+
+def _legible(painter) -> bool:
+    """Whether text is worth drawing at the painter's current zoom."""
+    return QStyleOptionGraphicsItem.levelOfDetailFromTransform(painter.worldTransform()) >= TEXT_LOD
+
+
+def _block_lines(block: Block) -> list[str]:
+    if block.more:
+        return [f"+{len(block.events)} more"]
+    ev = block.events[0]
+    return [ev.title, f"{ev.start} - {ev.end}"]
+
+
+def _paint_lines(painter, rect: QRectF, lines: list[str]):
+    """Draw as many of lines as fit in rect, each elided to its width."""
+    metrics = painter.fontMetrics()
+    rect = rect.adjusted(4, 2, -3, -2)
+    fit = min(len(lines), int(rect.height() // metrics.height()))
+    if fit == 0 or rect.width() < metrics.averageCharWidth():
+        return
+    painter.setPen(Qt.black)
+    for i, line in enumerate(lines[:fit]):
+        painter.drawText(QRectF(rect.x(), rect.y() + i * metrics.height(), rect.width(), metrics.height()),
+                         _TEXT_FLAGS, metrics.elidedText(line, Qt.ElideRight, int(rect.width())))
 
 
 # ✅ NEW: EventBox subclass to emit double-click signal
 class EventBox(QGraphicsRectItem):
-    def __init__(self, event_id, rect, parent=None):
-        super().__init__(rect)
-        self.event_id = event_id
+    """
+    One event's box. Dragging it moves the event, dragging its bottom edge
+    changes the end time; both snap to SNAP_MINUTES. While dragging only the
+    box changes; the new times are handed to DayView on release.
+
+    The title and times are painted into the box (elided, and only at zoom
+    levels where they are legible) and the result is cached per item.
+    """
+
+    def __init__(self, event, rect, pixels_per_minute, parent=None):
+        super().__init__(rect, parent)
+        self.event = event
+        self.event_id = event.id
+        self.pixels_per_minute = pixels_per_minute
+        self._drag = None   # (mode, press y, start_min, end_min) while the mouse is down
+        self._shown = (event.start_min, event.start_min + event.duration)
+        self._times = f"{event.start} - {event.end}"
+        self.setCacheMode(QGraphicsItem.DeviceCoordinateCache)
         self.setAcceptHoverEvents(True)
+        self.setCursor(Qt.OpenHandCursor)
+
+    def paint(self, painter, option, widget=None):
+        super().paint(painter, option, widget)
+        if _legible(painter):
+            _paint_lines(painter, self.rect(), [self.event.title, self._times])
+
+    def _on_bottom_edge(self, pos) -> bool:
+        return self.rect().bottom() - pos.y() <= RESIZE_MARGIN
+
+    def hoverMoveEvent(self, event):
+        self.setCursor(Qt.SizeVerCursor if self._on_bottom_edge(event.pos()) else Qt.OpenHandCursor)
+        super().hoverMoveEvent(event)
+
+    def mousePressEvent(self, event):
+        if event.button() != Qt.LeftButton:
+            return super().mousePressEvent(event)
+        mode = "resize" if self._on_bottom_edge(event.pos()) else "move"
+        self._drag = (mode, event.scenePos().y(), *self._shown)
+        self.setZValue(5)  # above its neighbours while dragged
+        event.accept()
+
+    def mouseMoveEvent(self, event):
+        if self._drag is None:
+            return super().mouseMoveEvent(event)
+        mode, y0, start, end = self._drag
+        dy = event.scenePos().y() - y0
+        if (start, end) == self._shown and abs(dy) < QApplication.startDragDistance():
+            return  # a shaky click, not a drag
+        delta = dy / self.pixels_per_minute
+        if mode == "move":
+            length = end - start
+            start = min(max(0, _snap(start + delta)), LAST_MINUTE - length)
+            end = start + length
+        else:
+            end = min(max(start + SNAP_MINUTES, _snap(end + delta)), LAST_MINUTE)
+        if (start, end) != self._shown:
+            self._shown = (start, end)
+            rect = self.rect()
+            self.setRect(rect.x(), start * self.pixels_per_minute,
+                         rect.width(), (end - start) * self.pixels_per_minute)
+            self._times = f"{format_minutes(start)} - {format_minutes(end)}"
+
+    def mouseReleaseEvent(self, event):
+        if self._drag is None:
+            return super().mouseReleaseEvent(event)
+        _, _, start, end = self._drag
+        self._drag = None
+        self.setZValue(0)
+        if self._shown != (start, end):
+            self.scene().views()[0].parent().eventRescheduled.emit(self.event, *self._shown)
 
     def mouseDoubleClickEvent(self, event):
         # emit signal up to DayView’s parent (CalendarPage listens there)
@@ -16,34 +133,184 @@ class EventBox(QGraphicsRectItem):
         super().mouseDoubleClickEvent(event)
 
 
+class MoreBox(QGraphicsRectItem):
+    """Stands in for the events of a cluster that do not fit; double-click zooms in on it."""
+
+    def __init__(self, events, rect, parent=None):
+        super().__init__(rect, parent)
+        self.events = events
+        self.setCacheMode(QGraphicsItem.DeviceCoordinateCache)
+
+    def paint(self, painter, option, widget=None):
+        super().paint(painter, option, widget)
+        if _legible(painter):
+            _paint_lines(painter, self.rect(), [f"+{len(self.events)} more"])
+
+    def mouseDoubleClickEvent(self, event):
+        self.scene().views()[0].parent().zoom_into(event.scenePos())
+
+
+class EventLayer(QGraphicsItem):
+    """
+    All of a day's events as one item: paints the blocks of the day's layout
+    that intersect the exposed area and hit-tests through the layout's index.
+    A drag is handed to a temporary EventBox over the dragged event.
+    """
+
+    def __init__(self, day_view, day_layout, parent=None):
+        super().__init__(parent)
+        self.day_view = day_view
+        self.day_layout = day_layout
+        self._dragged = None  # (block, EventBox) while an event is dragged
+        self.setFlag(QGraphicsItem.ItemUsesExtendedStyleOption)  # for option.exposedRect
+        # the cache is clipped to the viewport, so it stays screen-sized however long the day
+        self.setCacheMode(QGraphicsItem.DeviceCoordinateCache)
+        self.setAcceptHoverEvents(True)
+
+    def boundingRect(self):
+        dv = self.day_view
+        return QRectF(dv.time_column_width, 0, EVENTS_WIDTH, 24 * 60 * dv.pixels_per_minute)
+
+    def paint(self, painter, option, widget=None):
+        dv = self.day_view
+        exposed = option.exposedRect
+        dragged = self._dragged[0] if self._dragged else None
+        blocks = [b for b in self.day_layout.between(exposed.top() / dv.pixels_per_minute,
+                                                      exposed.bottom() / dv.pixels_per_minute) if b is not dragged]
+        rects = [dv.block_rect(b) for b in blocks]
+        painter.setPen(QPen(QColor(BORDER_COLOR)))
+        brushes = {False: QColor(EVENT_COLOR), True: QColor(MORE_COLOR)}
+        for block, rect in zip(blocks, rects):
+            painter.setBrush(brushes[block.more])
+            painter.drawRect(rect)
+        if _legible(painter):
+            for block, rect in zip(blocks, rects):
+                _paint_lines(painter, rect, _block_lines(block))
+
+    def block_at(self, pos) -> Block | None:
+        dv = self.day_view
+        return self.day_layout.at(pos.y() / dv.pixels_per_minute, (pos.x() - dv.time_column_width) / EVENTS_WIDTH)
+
+    def hoverMoveEvent(self, event):
+        block = self.block_at(event.pos())
+        if block is None:
+            self.unsetCursor()
+        elif block.more:
+            self.setCursor(Qt.PointingHandCursor)
+        elif self.day_view.block_rect(block).bottom() - event.pos().y() <= RESIZE_MARGIN:
+            self.setCursor(Qt.SizeVerCursor)
+        else:
+            self.setCursor(Qt.OpenHandCursor)
+
+    def mousePressEvent(self, event):
+        block = self.block_at(event.pos())
+        if event.button() != Qt.LeftButton or block is None or block.more:
+            return event.ignore()
+        box = self.day_view._event_box(block)
+        self.scene().addItem(box)
+        self._dragged = (block, box)
+        self.update(box.rect())
+        box.mousePressEvent(event)
+
+    def mouseMoveEvent(self, event):
+        if self._dragged:
+            self._dragged[1].mouseMoveEvent(event)
+
+    def mouseReleaseEvent(self, event):
+        if not self._dragged:
+            return
+        block, box = self._dragged
+        box.mouseReleaseEvent(event)  # emits eventRescheduled if the times changed
+        self._dragged = None
+        self.scene().removeItem(box)
+        self.update(self.day_view.block_rect(block))
+
+    def mouseDoubleClickEvent(self, event):
+        block = self.block_at(event.pos())
+        if block is None:
+            return
+        if block.more:
+            self.day_view.zoom_into(event.scenePos())
+        else:
+            self.day_view.eventDoubleClicked.emit(block.events[0].id)
+
+
 class DayView(QWidget):
     """Minute-precision day view with Google Calendar-style event boxes."""
 
     # ✅ Signal that CalendarPage connects to
     eventDoubleClicked = Signal(int)
+    # (event, start_min, end_min) once a drag ends; nothing is saved before that
+    eventRescheduled = Signal(object, int, int)
 
-    def __init__(self, parent=None, date=None):
+    def __init__(self, parent=None, date=None, clock=None, renderer="layer"):
         super().__init__(parent)
         self.date = date
+        self.clock = clock  # shared ClockService driving the now-line
+        self.renderer = renderer  # "layer": one EventLayer item; "items": an item per block
+        self._clock_token = None
+        self._nowline = None
+        self._event_items = []  # items drawn by load_events
+        self._events = []       # what they show, laid out again when the zoom changes
+        self.day_layout = layout_day([], 1)
+        self.zoom = 1.0
         self.pixels_per_minute = 2
         self.time_column_width = 80
         self.scene = QGraphicsScene()
         self.view = QGraphicsView(self.scene)
+        self.view.viewport().installEventFilter(self)  # Ctrl+wheel zooms
 
         layout = QVBoxLayout()
+        top = QHBoxLayout()
         self.header = QLabel(self.date.toString("MMMM d, yyyy") if self.date else "")
         self.header.setStyleSheet("font-size: 18px; font-weight: bold;")
-        layout.addWidget(self.header)
+        top.addWidget(self.header)
+        top.addStretch()
+        for text, factor in (("−", 1 / ZOOM_STEP), ("+", ZOOM_STEP)):
+            btn = QPushButton(text)
+            btn.setFixedWidth(32)
+            btn.clicked.connect(lambda _=False, f=factor: self.set_zoom(self.zoom * f))
+            top.addWidget(btn)
+        layout.addLayout(top)
         layout.addWidget(self.view)
         self.setLayout(layout)
 
         self._draw_time_labels()
 
+    def set_date(self, date):
+        """Show another day (reusing the scene); call load_events with its events next."""
+        self.date = date
+        self.header.setText(date.toString("MMMM d, yyyy"))
+        if self._clock_token is not None:
+            self.draw_nowline()
+
+    # ---- zoom ----
+    def set_zoom(self, zoom: float):
+        """Scale the view (clamped to MIN_ZOOM..MAX_ZOOM) and lay the events out again for it."""
+        zoom = min(MAX_ZOOM, max(MIN_ZOOM, zoom))
+        if zoom == self.zoom:
+            return
+        self.zoom = zoom
+        self.view.setTransform(QTransform.fromScale(zoom, zoom))
+        if self._events:
+            self.load_events(self._events)
+
+    def zoom_into(self, scene_pos):
+        """Zoom in two steps around scene_pos (double-click on "+N more")."""
+        self.set_zoom(self.zoom * ZOOM_STEP * ZOOM_STEP)
+        self.view.centerOn(scene_pos)
+
+    def eventFilter(self, obj, event):
+        if event.type() == QEvent.Wheel and event.modifiers() & Qt.ControlModifier:
+            self.set_zoom(self.zoom * (ZOOM_STEP if event.angleDelta().y() > 0 else 1 / ZOOM_STEP))
+            return True
+        return super().eventFilter(obj, event)
+
     def _draw_time_labels(self):
         """Draw timeline column with labels and divider line."""
         for hour in range(24):
             y = hour * 60 * self.pixels_per_minute
-            label = QTime(hour, 0).toString("h AP")
+            label = HOUR_LABELS["h AP"][hour]
 
             # label
             text = self.scene.addText(label)
@@ -53,7 +320,7 @@ class DayView(QWidget):
             # subtle horizontal line across calendar
             self.scene.addLine(
                 self.time_column_width, y,
-                self.time_column_width + 600, y,
+                self.time_column_width + EVENTS_WIDTH, y,
                 QPen(QColor("#333333"))
             )
         
@@ -64,76 +331,64 @@ class DayView(QWidget):
             QPen(QColor("#444444"))
         )
 
-    def load_events(self, events: list[tuple]):
-        """
-        Draw events as EventBox items.
-        events = [(id, title, start, end), ...]
-        """
-        # remove old EventBox items
-        for item in self.scene.items():
-            if isinstance(item, QGraphicsRectItem):
-                self.scene.removeItem(item)
-
-        blocks = []
-        for ev_id, title, start, end in events:
-            start_qt = self._parse_time(start)
-            end_qt = self._parse_time(end)
-            start_min = start_qt.hour() * 60 + start_qt.minute()
-            end_min = end_qt.hour() * 60 + end_qt.minute()
-            duration = max(1, end_min - start_min)
-            blocks.append((ev_id, title, start, end, start_min, end_min, duration))
-
-        blocks.sort(key = lambda x: x[4])
-
-        clusters = []
-        current_cluster = []
-        current_end = -1
-
-        # current cluster overlapping events
-        for block in blocks:
-            if not current_cluster or block[4] < current_end:
-                current_cluster.append(block)
-                current_end = max(current_end, block[5])
-            else:
-                clusters.append(current_cluster)
-                current_cluster = [block]
-                current_end = block[5]
-        if current_cluster:
-            clusters.append(current_cluster)
-
-        # draw clusters with equal width splits
-        total_width = 600
-        for cluster in clusters:
-            cluster_size = len(cluster)
-            col_width = total_width / cluster_size
-            for i, (ev_id, title, start, end, start_min, end_min, duration) in enumerate(cluster):
-                x = self.time_column_width + i * col_width
-                y = start_min * self.pixels_per_minute
-                h = duration * self.pixels_per_minute
-
-                event_box = EventBox(ev_id, QRectF(x, y, col_width, h))
-                event_box.setBrush(QColor("#00E5FF"))
-                event_box.setPen(QPen(QColor("#222222")))
-                self.scene.addItem(event_box)
-
-                text = QGraphicsTextItem(f"{title}\n{start} - {end}")
-                text.setDefaultTextColor(Qt.black)
-                text.setTextWidth(col_width - 6)
-                text.setPos(x+5, y+5)
-                self.scene.addItem(text)
-
-        self.scene.setSceneRect(0,0,self.time_column_width + total_width, 24 * 60 * self.pixels_per_minute)
-
-
-    def _parse_time(self, time_str: str) -> QTime:
-        try:
-            parts = time_str.strip().split()
-            hh, mm = map(int, parts[0].split(":"))
-            ampm = parts[1].upper()
-            if ampm == "PM" and hh != 12:
-                hh += 12
-            if ampm == "AM" and hh == 12:
-                hh = 0
-            return QTime(hh, mm)
-        except Exception:
-            return QTime.currentTime()
+    # ---- now-line (ticks only while visible) ----
+    def showEvent(self, event):
+        super().showEvent(event)
+        if self.clock is not None and self._clock_token is None:
+            self._clock_token = self.clock.subscribe(self.draw_nowline)
+
+    def hideEvent(self, event):
+        if self.clock is not None:
+            self.clock.unsubscribe(self._clock_token)
+        self._clock_token = None
+        super().hideEvent(event)
+
+    def draw_nowline(self, when: datetime | None = None):
+        """Move the red now-line (created once) to the current minute; hidden on other days."""
+        when = when or datetime.now()
+        today = QDate(when.year, when.month, when.day)
+        if self.date is not None and self.date != today:
+            if self._nowline is not None:
+                self._nowline.hide()
+            return
+        y = (when.hour * 60 + when.minute) * self.pixels_per_minute
+        x2 = self.time_column_width + EVENTS_WIDTH
+        if self._nowline is None:
+            self._nowline = self.scene.addLine(0, y, x2, y, QPen(QColor("red"), 2))
+            self._nowline.setZValue(10)
+        else:
+            self._nowline.setLine(0, y, x2, y)
+            self._nowline.show()
+
+    def load_events(self, events: list[Event]):
+        """Lay events out for the current zoom and draw them with the view's renderer."""
+        for item in self._event_items:
+            self.scene.removeItem(item)
+        self._events = events
+        # columns narrower than MIN_COLUMN_PX on screen are folded into "+N more"
+        self.day_layout = layout_day(events, int(EVENTS_WIDTH * self.zoom // MIN_COLUMN_PX))
+        if self.renderer == "layer":
+            self._event_items = [EventLayer(self, self.day_layout)]
+        else:
+            self._event_items = [self._more_box(b) if b.more else self._event_box(b)
+                                 for b in self.day_layout.blocks()]
+        for item in self._event_items:
+            self.scene.addItem(item)
+        self.scene.setSceneRect(0, 0, self.time_column_width + EVENTS_WIDTH, 24 * 60 * self.pixels_per_minute)
+
+    def block_rect(self, block: Block) -> QRectF:
+        width = EVENTS_WIDTH / block.columns
+        return QRectF(self.time_column_width + block.column * width, block.start * self.pixels_per_minute,
+                      width, (block.end - block.start) * self.pixels_per_minute)
+
+    def _event_box(self, block: Block) -> EventBox:
+        box = EventBox(block.events[0], self.block_rect(block), self.pixels_per_minute)
+        box.setBrush(QColor(EVENT_COLOR))
+        box.setPen(QPen(QColor(BORDER_COLOR)))
+        return box
+
+    def _more_box(self, block: Block) -> MoreBox:
+        box = MoreBox(block.events, self.block_rect(block))
+        box.setBrush(QColor(MORE_COLOR))
+        box.setPen(QPen(QColor(BORDER_COLOR)))
+        return box
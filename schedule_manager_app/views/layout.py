@@ -0,0 +1,128 @@
+"""
+Day layout shared by the day view renderers.
+
+Events that overlap in time form a cluster. Each cluster is packed into
+columns (an event takes the leftmost column that is free at its start) and
+the cluster's width is split evenly between its columns. A cluster that
+needs more than max_columns keeps max_columns - 1 of them and folds the
+events of the rest into one "+N more" block in the last column.
+
+    day = layout_day(events, max_columns=25)
+    for block in day.between(480, 720):      # blocks visible from 8 AM to noon
+        ...
+    block = day.at(500, 0.3)                 # block at 8:20 AM, 30% across
+
+Within a column blocks never overlap, so their starts and ends are both
+sorted; at() and between() bisect them instead of scanning the day.
+"""
+from bisect import bisect_right
+from heapq import heappop, heappush
+
+
+class Block:
+    """An event (or, when more is set, the folded events) at minutes start..end in column of columns."""
+
+    __slots__ = ("start", "end", "column", "columns", "events", "more")
+
+    def __init__(self, start: int, end: int, column: int, events: list, more: bool = False):
+        self.start = start
+        self.end = end
+        self.column = column
+        self.columns = 0  # the cluster's column count, set once it is packed
+        self.events = events
+        self.more = more
+
+
+class _Cluster:
+    __slots__ = ("start", "end", "columns", "ends")
+
+    def __init__(self, start: int, columns: list[list[Block]]):
+        self.start = start
+        self.end = max(col[-1].end for col in columns)
+        self.columns = columns
+        self.ends = [[b.end for b in col] for col in columns]
+        for col in columns:
+            for b in col:
+                b.columns = len(columns)
+
+
+class DayLayout:
+    """Packed clusters of one day, sorted by time, with bisecting lookups."""
+
+    def __init__(self, clusters: list[_Cluster]):
+        self._clusters = clusters
+        self._ends = [c.end for c in clusters]
+
+    def __len__(self) -> int:
+        """Number of events laid out, folded ones included."""
+        return sum(len(b.events) for b in self.blocks())
+
+    def blocks(self):
+        for cluster in self._clusters:
+            for col in cluster.columns:
+                yield from col
+
+    def between(self, start: float, end: float):
+        """Blocks overlapping minutes [start, end)."""
+        clusters = self._clusters
+        for i in range(bisect_right(self._ends, start), len(clusters)):
+            cluster = clusters[i]
+            if cluster.start >= end:
+                return
+            for col, ends in zip(cluster.columns, cluster.ends):
+                for j in range(bisect_right(ends, start), len(col)):
+                    if col[j].start >= end:
+                        break
+                    yield col[j]
+
+    def at(self, minute: float, fraction: float) -> Block | None:
+        """The block at this minute, fraction (0..1) of the way across the event area."""
+        i = bisect_right(self._ends, minute)
+        if i == len(self._clusters) or self._clusters[i].start > minute or not 0 <= fraction < 1:
+            return None
+        cluster = self._clusters[i]
+        column = int(fraction * len(cluster.columns))
+        j = bisect_right(cluster.ends[column], minute)
+        col = cluster.columns[column]
+        if j < len(col) and col[j].start <= minute:
+            return col[j]
+        return None
+
+
+def layout_day(events, max_columns: int) -> DayLayout:
+    """Pack events (anything with start_min and duration) into a DayLayout."""
+    clusters = []
+    columns: list[list[Block]] = []
+    busy: list[tuple[int, int]] = []  # heap of (end, column) of columns in use
+    free: list[int] = []              # heap of columns free again, leftmost first
+    cluster_start = cluster_end = -1
+    for ev in sorted(events, key=lambda ev: (ev.start_min, -ev.duration)):
+        start, end = ev.start_min, ev.start_min + ev.duration
+        if start >= cluster_end and columns:
+            clusters.append(_fold(cluster_start, columns, max_columns))
+            columns, busy, free = [], [], []
+        if not columns:
+            cluster_start, cluster_end = start, end
+        cluster_end = max(cluster_end, end)
+        while busy and busy[0][0] <= start:
+            heappush(free, heappop(busy)[1])
+        if free:
+            column = heappop(free)
+        else:
+            column = len(columns)
+            columns.append([])
+        columns[column].append(Block(start, end, column, [ev]))
+        heappush(busy, (end, column))
+    if columns:
+        clusters.append(_fold(cluster_start, columns, max_columns))
+    return DayLayout(clusters)
+
+
+def _fold(start: int, columns: list[list[Block]], max_columns: int) -> _Cluster:
+    max_columns = max(1, max_columns)
+    if len(columns) > max_columns:
+        hidden = [b for col in columns[max_columns - 1:] for b in col]
+        more = Block(min(b.start for b in hidden), max(b.end for b in hidden), max_columns - 1,
+                     sorted((ev for b in hidden for ev in b.events), key=lambda ev: ev.start_min), more=True)
+        columns = columns[:max_columns - 1] + [[more]]
+    return _Cluster(start, columns)
@@ -0,0 +1,53 @@
+from PySide6.QtWidgets import QCalendarWidget
+from PySide6.QtCore import Qt, QDate, QRectF
+
+from event import Event
+
+
+class MonthView(QCalendarWidget):
+    """The month grid with the first few event titles of each day drawn under its number."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setVerticalHeaderFormat(QCalendarWidget.NoVerticalHeader)
+        self._titles: dict[str, list[str]] = {}  # YYYY-MM-DD -> titles in start order
+
+    def days(self) -> tuple[str, str]:
+        """
+        First and last day the page may show, YYYY-MM-DD: the grid starts in
+        the week before the 1st at the earliest and is six weeks long.
+        """
+        first = QDate(self.yearShown(), self.monthShown(), 1)
+        return first.addDays(-7).toString("yyyy-MM-dd"), first.addDays(41).toString("yyyy-MM-dd")
+
+    def load_events(self, events: list[Event]):
+        """Show events (in start order) in their days' cells."""
+        titles: dict[str, list[str]] = {}
+        for ev in events:
+            titles.setdefault(ev.date, []).append(ev.title)
+        self._titles = titles
+        self.updateCells()
+
+    def paintCell(self, painter, rect, date):
+        super().paintCell(painter, rect, date)
+        titles = self._titles.get(date.toString("yyyy-MM-dd"))
+        if not titles:
+            return
+        painter.save()
+        font = painter.font()
+        if font.pointSizeF() > 0:
+            font.setPointSizeF(font.pointSizeF() * 0.8)
+            painter.setFont(font)
+        metrics = painter.fontMetrics()
+        line = metrics.height()
+        area = QRectF(rect).adjusted(3, line + 4, -3, -2)  # below the day number
+        fit = int(area.height() // line)
+        if fit < 1:
+            painter.restore()
+            return
+        lines = titles if len(titles) <= fit else titles[:fit - 1] + [f"+{len(titles) - fit + 1} more"]
+        painter.setPen(Qt.darkCyan)
+        for i, title in enumerate(lines):
+            painter.drawText(QRectF(area.x(), area.y() + i * line, area.width(), line), Qt.AlignLeft | Qt.AlignTop,
+                             metrics.elidedText(title, Qt.ElideRight, int(area.width())))
+        painter.restore()
@@ -0,0 +1,54 @@
+from PySide6.QtWidgets import QWidget, QVBoxLayout, QLineEdit, QListView
+from PySide6.QtCore import Qt, QModelIndex, QSortFilterProxyModel, Signal
+
+from event_model_qt import EVENT_ROLE, TITLE_ROLE
+
+MIN_RESULTS = 50  # matches wanted before the list waits for the user to scroll
+
+
+class SearchView(QWidget):
+    """
+    Events whose title contains the search text, in date order, filtered
+    from the shared EventModel: the weeks the calendar has loaded and those
+    after them. The model is asked for more weeks until MIN_RESULTS match
+    (or there are no more), after that as the list is scrolled to its end
+    (fetchMore).
+    """
+
+    eventDoubleClicked = Signal(int)
+
+    def __init__(self, model, parent=None):
+        super().__init__(parent)
+        self.model = model
+        self.proxy = QSortFilterProxyModel(self)
+        self.proxy.setSourceModel(model)
+        self.proxy.setFilterRole(TITLE_ROLE)
+        self.proxy.setFilterCaseSensitivity(Qt.CaseInsensitive)
+
+        self.query = QLineEdit()
+        self.query.setPlaceholderText("Search event titles")
+        self.query.setClearButtonEnabled(True)
+        self.query.textChanged.connect(self.search)
+        self.results = QListView()
+        self.results.setModel(self.proxy)
+        self.results.setUniformItemSizes(True)
+        self.results.setEditTriggers(QListView.NoEditTriggers)
+        self.results.doubleClicked.connect(
+            lambda index: self.eventDoubleClicked.emit(index.data(EVENT_ROLE).id))
+
+        layout = QVBoxLayout()
+        layout.addWidget(self.query)
+        layout.addWidget(self.results)
+        self.setLayout(layout)
+
+        model.daysChanged.connect(self.fill)
+        self.fill()
+
+    def search(self, text: str):
+        self.proxy.setFilterFixedString(text)
+        self.fill()
+
+    def fill(self, *_):
+        """Ask for the next weeks while fewer than MIN_RESULTS match."""
+        if self.proxy.rowCount() < MIN_RESULTS and self.proxy.canFetchMore(QModelIndex()):
+            self.proxy.fetchMore(QModelIndex())
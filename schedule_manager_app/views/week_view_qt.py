@@ -0,0 +1,109 @@
+from PySide6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QGraphicsView, QGraphicsScene
+from PySide6.QtCore import Qt, QDate, QRectF, Signal
+from PySide6.QtGui import QPen, QColor
+
+from event import Event
+from timeutil import HOUR_LABELS
+from views.day_view_qt import BORDER_COLOR, EVENT_COLOR, MIN_COLUMN_PX, MORE_COLOR, EventBox, MoreBox
+from views.layout import Block, layout_day
+
+
+DAY_WIDTH = 130  # scene width of one day's column
+
+
+class WeekView(QWidget):
+    """Seven day columns (Monday first) side by side, each laid out like the DayView."""
+
+    # the same signals as DayView, so CalendarPage handles both alike
+    eventDoubleClicked = Signal(int)
+    eventRescheduled = Signal(object, int, int)
+    # a day header (or a "+N more" box) was clicked: open that day
+    dayActivated = Signal(QDate)
+
+    def __init__(self, parent=None, date=None):
+        super().__init__(parent)
+        self.pixels_per_minute = 1
+        self.time_column_width = 60
+        self._event_items = []
+        self.scene = QGraphicsScene()
+        self.view = QGraphicsView(self.scene)
+        self.view.setAlignment(Qt.AlignLeft | Qt.AlignTop)
+
+        layout = QVBoxLayout()
+        self.header = QLabel()
+        self.header.setStyleSheet("font-size: 18px; font-weight: bold;")
+        layout.addWidget(self.header)
+        days = QHBoxLayout()
+        days.setSpacing(0)
+        days.addSpacing(self.time_column_width + self.view.frameWidth())
+        self.day_buttons = []
+        for i in range(7):
+            btn = QPushButton()
+            btn.setFlat(True)
+            btn.setFixedWidth(DAY_WIDTH)
+            btn.clicked.connect(lambda _=False, i=i: self.dayActivated.emit(self.first.addDays(i)))
+            days.addWidget(btn)
+            self.day_buttons.append(btn)
+        days.addStretch()
+        layout.addLayout(days)
+        layout.addWidget(self.view)
+        self.setLayout(layout)
+
+        self._draw_grid()
+        self.set_date(date or QDate.currentDate())
+
+    def set_date(self, date: QDate):
+        """Show the week of date; call load_events with its events next."""
+        self.first = date.addDays(1 - date.dayOfWeek())
+        self.header.setText(f"{self.first.toString('MMMM d')} – {self.first.addDays(6).toString('MMMM d, yyyy')}")
+        for i, btn in enumerate(self.day_buttons):
+            btn.setText(self.first.addDays(i).toString("ddd d"))
+
+    def days(self) -> tuple[str, str]:
+        """The first and last day shown, YYYY-MM-DD."""
+        return self.first.toString("yyyy-MM-dd"), self.first.addDays(6).toString("yyyy-MM-dd")
+
+    def _draw_grid(self):
+        pen = QPen(QColor("#333333"))
+        right = self.time_column_width + 7 * DAY_WIDTH
+        for hour in range(24):
+            y = hour * 60 * self.pixels_per_minute
+            text = self.scene.addText(HOUR_LABELS["h AP"][hour])
+            text.setDefaultTextColor(QColor("#AAAAAA"))
+            text.setPos(5, y - 6)
+            self.scene.addLine(self.time_column_width, y, right, y, pen)
+        for i in range(8):
+            x = self.time_column_width + i * DAY_WIDTH
+            self.scene.addLine(x, 0, x, 24 * 60 * self.pixels_per_minute, QPen(QColor("#444444")))
+        self.scene.setSceneRect(0, 0, right, 24 * 60 * self.pixels_per_minute)
+
+    def load_events(self, events: list[Event]):
+        """Lay out and draw the week's events (any order), one layout per day."""
+        for item in self._event_items:
+            self.scene.removeItem(item)
+        by_day: dict[str, list[Event]] = {}
+        for ev in events:
+            by_day.setdefault(ev.date, []).append(ev)
+        self._event_items = []
+        for i in range(7):
+            day_events = by_day.get(self.first.addDays(i).toString("yyyy-MM-dd"))
+            if not day_events:
+                continue
+            for block in layout_day(day_events, DAY_WIDTH // MIN_COLUMN_PX).blocks():
+                rect = self.block_rect(i, block)
+                item = MoreBox(block.events, rect) if block.more else EventBox(block.events[0], rect,
+                                                                                self.pixels_per_minute)
+                item.setBrush(QColor(MORE_COLOR if block.more else EVENT_COLOR))
+                item.setPen(QPen(QColor(BORDER_COLOR)))
+                self.scene.addItem(item)
+                self._event_items.append(item)
+
+    def block_rect(self, day: int, block: Block) -> QRectF:
+        width = DAY_WIDTH / block.columns
+        return QRectF(self.time_column_width + day * DAY_WIDTH + block.column * width,
+                      block.start * self.pixels_per_minute, width, (block.end - block.start) * self.pixels_per_minute)
+
+    def zoom_into(self, scene_pos):
+        """Open the day under scene_pos (double-click on "+N more")."""
+        day = int((scene_pos.x() - self.time_column_width) // DAY_WIDTH)
+        self.dayActivated.emit(self.first.addDays(min(max(day, 0), 6)))
@@ -0,0 +1,111 @@
+"""
+Write-behind buffer for the desktop apps.
+
+Dragging or quickly editing events issues a burst of update_event calls,
+each of which used to be its own transaction (and fsync). With the buffer
+enabled (database.enable_write_buffer()), updates and deletes return as soon
+as they are queued; a GroupCommitter commits everything that arrives within
+the window in one transaction. Writes whose result the caller needs
+(add_event's id, create_user) and version-checked updates/deletes, which must
+report conflicts to their caller, still wait for their commit, as does any
+write database.py passes wait=True for because it acts on the outcome (e.g.
+resending a write that reached a shard the event has moved away from).
+
+Reads flush first, so a view never reads around its own queued writes, and
+the apps flush on logout and close, so a write that returned is durable once
+flush() has returned.
+"""
+import logging
+import threading
+
+from group_commit import GroupCommitter
+
+log = logging.getLogger(__name__)
+
+# how long the first queued write waits for company before committing
+WINDOW_MS = 20.0
+
+# writes whose callers use the return value; these wait for their commit
+_WAIT_FOR_RESULT = frozenset(("create_user", "add_event", "insert_events", "restore_event"))
+# writes whose last argument is an expected row version (None = unchecked)
+_VERSIONED = frozenset(("update_event", "delete_event", "patch_event"))
+
+
+def _waits(op: str, args: tuple) -> bool:
+    return op in _WAIT_FOR_RESULT or (op in _VERSIONED and args[-1] is not None)
+
+
+class WriteBuffer:
+    """database.set_writer() target that queues writes onto windowed GroupCommitters (one per DB file)."""
+
+    def __init__(self, window_ms: float = WINDOW_MS):
+        self.window_ms = window_ms
+        self._lock = threading.Lock()
+        self._committers: dict[str | None, GroupCommitter] = {}
+        self._pending = []  # futures of writes that returned before committing
+        self._error = None  # first failure of a settled write, until flush() raises it
+
+    def __call__(self, op: str, args: tuple, path: str | None = None, wait: bool = False):
+        fut = self._committer(path).submit(op, *args)
+        if wait or _waits(op, args):
+            return fut.result()
+        with self._lock:
+            self._pending = [f for f in self._pending if not self._settled(f)]
+            self._pending.append(fut)
+        return None
+
+    def _settled(self, fut) -> bool:
+        """Whether fut is done; a failure is logged and kept for flush() to raise. Call with _lock held."""
+        if not fut.done():
+            return False
+        exc = fut.exception()
+        if exc is not None:
+            log.error("buffered write failed: %r", exc)
+            self._error = self._error or exc
+        return True
+
+    def _committer(self, path: str | None) -> GroupCommitter:
+        committer = self._committers.get(path)
+        if committer is None:
+            with self._lock:
+                committer = self._committers.get(path)
+                if committer is None:
+                    committer = self._committers[path] = GroupCommitter(path, max_wait_ms=self.window_ms)
+        return committer
+
+    @property
+    def transactions(self) -> int:
+        """Transactions committed so far, over all DB files."""
+        return sum(c.transactions for c in self._committers.values())
+
+    @property
+    def pending(self) -> int:
+        with self._lock:
+            return sum(not f.done() for f in self._pending)
+
+    def flush(self, raise_errors: bool = True) -> None:
+        """
+        Wait until every queued write is committed, then re-raise the first
+        failure since the last flush that raised. Without raise_errors
+        failures are only logged, and the next flush() raises them.
+        """
+        with self._lock:
+            pending, self._pending = self._pending, []
+        for fut in pending:
+            fut.exception()  # waits for it
+        with self._lock:
+            for fut in pending:
+                self._settled(fut)
+            error = self._error
+            if raise_errors:
+                self._error = None
+        if error is not None and raise_errors:
+            raise error
+
+    def close(self) -> None:
+        """Flush and stop the commit thread."""
+        try:
+            self.flush()
+        finally:
+            for committer in self._committers.values():
+                committer.close()
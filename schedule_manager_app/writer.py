@@ -0,0 +1,124 @@
+"""
+Single writer process for multi-process deployments.
+
+SQLite allows one writer at a time, so when the backend runs several worker
+processes they all send their writes here instead of opening write
+transactions themselves. The writer owns a GroupCommitter, so concurrent
+writes from every worker share transactions (and fsyncs). Reads stay in the
+workers and run in parallel thanks to WAL.
+
+    # writer process
+    writer.serve(("127.0.0.1", 8765), authkey)
+
+    # each worker process
+    database.set_writer(writer.WriterClient(("127.0.0.1", 8765), authkey).call)
+
+The protocol is multiprocessing.connection: the client sends (op, args, path)
+and gets back ("ok", result) or ("error", exception). path is the DB file the
+write is for (None = DB_FILE); each file gets its own GroupCommitter.
+"""
+import logging
+import os
+import threading
+from multiprocessing.connection import Client, Listener
+
+import database
+from group_commit import MAX_BATCH, GroupCommitter
+
+log = logging.getLogger(__name__)
+
+# "host:port" of the writer; set by backend/serve.py for its workers
+ADDRESS_ENV = "SCHEDULE_MANAGER_WRITER"
+AUTHKEY_ENV = "SCHEDULE_MANAGER_WRITER_KEY"
+
+
+def parse_address(text: str) -> tuple[str, int]:
+    host, _, port = text.rpartition(":")
+    return host or "127.0.0.1", int(port)
+
+
+# ---- Server ----------------------------------------------------------------
+def serve(address: tuple[str, int], authkey: bytes, db_file: str | None = None,
+          max_batch: int = MAX_BATCH, max_wait_ms: float = 0.0, ready=None) -> None:
+    """Accept worker connections forever and apply their writes through one GroupCommitter."""
+    if db_file:
+        database.DB_FILE = db_file
+    database.init_db()
+    committers = _Committers(max_batch, max_wait_ms)
+    # every worker thread opens its own connection, often all at once under load
+    with Listener(address, backlog=128, authkey=authkey) as listener:
+        log.info("writer listening on %s:%d (%s)", *address, database.DB_FILE)
+        if ready is not None:
+            ready.set()
+        while True:
+            try:
+                conn = listener.accept()
+            except OSError:  # includes a failed authkey handshake
+                log.exception("rejected writer connection")
+                continue
+            threading.Thread(target=_handle, args=(conn, committers), daemon=True).start()
+
+
+class _Committers(dict):
+    """DB file -> its GroupCommitter, created on first use."""
+
+    def __init__(self, max_batch: int, max_wait_ms: float):
+        super().__init__()
+        self.max_batch = max_batch
+        self.max_wait_ms = max_wait_ms
+        self._lock = threading.Lock()
+
+    def __missing__(self, path):
+        with self._lock:
+            if path not in self:
+                self[path] = GroupCommitter(path, max_batch=self.max_batch, max_wait_ms=self.max_wait_ms)
+            return self[path]
+
+
+def _handle(conn, committers: _Committers) -> None:
+    """Serve one worker connection (one request in flight at a time)."""
+    with conn:
+        while True:
+            try:
+                op, args, path = conn.recv()
+            except (EOFError, OSError):
+                return
+            try:
+                reply = ("ok", committers[path].call(op, *args))
+            except Exception as exc:
+                reply = ("error", exc)
+            conn.send(reply)
+
+
+# ---- Client ----------------------------------------------------------------
+class WriterClient:
+    """Sends writes to the writer process; one connection per calling thread."""
+
+    def __init__(self, address: tuple[str, int], authkey: bytes):
+        self.address = address
+        self.authkey = authkey
+        self._local = threading.local()
+
+    @classmethod
+    def from_env(cls) -> "WriterClient | None":
+        """The client configured by serve.py's environment variables, or None."""
+        address = os.environ.get(ADDRESS_ENV)
+        if not address:
+            return None
+        return cls(parse_address(address), os.environ.get(AUTHKEY_ENV, "").encode())
+
+    def call(self, op: str, args: tuple = (), path: str | None = None):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = Client(self.address, authkey=self.authkey)
+        try:
+            conn.send((op, tuple(args), path))
+            status, value = conn.recv()
+        except (EOFError, OSError):
+            # writer restarted or went away: reconnect on the next call
+            self._local.conn = None
+            conn.close()
+            raise
+        if status == "error":
+            raise value
+        return value
@@ -0,0 +1,134 @@
+"""
+Time zones: cached zoneinfo lookups and precomputed UTC offsets.
+
+An event keeps the wall-clock date and times it was entered with and the
+IANA zone they are in (events.tz), plus its start and end as UTC minutes
+since 1970-01-01 (events.start_utc / end_utc) for range queries and
+reminders. Showing a month of events in another zone converts every one of
+them, so conversions never build datetimes per event: a zone's offset is
+looked up once per (zone, day), together with the minute it changes on a
+DST day, and cached; each conversion is then integer arithmetic.
+
+    to_utc("2025-03-30", 150, "Europe/Berlin")   # -> 29054970 (02:30 does not exist that day: 03:30)
+    from_utc(29054970, "America/New_York")       # -> ("2025-03-29", 1290), 9:30 PM the day before
+    local_zone()                                 # this machine's zone, e.g. "Europe/Berlin"
+
+Wall times that a DST change skips are read with the offset before the
+change (shifted forward); repeated ones mean their first occurrence.
+"""
+import os
+from datetime import date, datetime, timedelta, timezone
+from functools import lru_cache
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+UTC = "UTC"
+MINUTES_PER_DAY = 24 * 60
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+_MINUTE = timedelta(minutes=1)
+
+
+@lru_cache(maxsize=None)
+def zone(name: str) -> ZoneInfo:
+    """The ZoneInfo of an IANA zone name. Raises ValueError for unknown names."""
+    try:
+        return ZoneInfo(name)
+    except (ZoneInfoNotFoundError, ValueError) as exc:
+        raise ValueError(f"unknown time zone: {name!r}") from exc
+
+
+def check_zone(name: str) -> str:
+    """name, if it is a known IANA zone (else ValueError)."""
+    zone(name)
+    return name
+
+
+@lru_cache(maxsize=1)
+def local_zone() -> str:
+    """This machine's IANA zone: $TZ, else where /etc/localtime points; UTC if neither says."""
+    name = os.environ.get("TZ", "").lstrip(":")
+    if not name:
+        target = os.path.realpath("/etc/localtime")
+        name = target.partition("zoneinfo/")[2]
+    try:
+        return check_zone(name)
+    except ValueError:
+        return UTC
+
+
+# ---- Day numbers -------------------------------------------------------------
+@lru_cache(maxsize=65536)
+def day_number(day: str) -> int:
+    """'YYYY-MM-DD' -> days since 1970-01-01."""
+    return date.fromisoformat(day).toordinal() - _EPOCH_ORDINAL
+
+
+@lru_cache(maxsize=65536)
+def day_string(number: int) -> str:
+    """Days since 1970-01-01 -> 'YYYY-MM-DD'."""
+    return date.fromordinal(number + _EPOCH_ORDINAL).isoformat()
+
+
+def utc_minute(when: datetime | None = None) -> int:
+    """UTC minutes since 1970-01-01 of an aware datetime (now when None)."""
+    return ((when or datetime.now(timezone.utc)) - _EPOCH) // _MINUTE
+
+
+def utc_datetime(minute: int) -> datetime:
+    """The aware UTC datetime of a UTC minute."""
+    return _EPOCH + timedelta(minutes=minute)
+
+
+# ---- Offsets -------------------------------------------------------------------
+# (offset before, minute of the day it changes, offset after), all in minutes;
+# the minute is MINUTES_PER_DAY on the (almost all) days without a change.
+@lru_cache(maxsize=16384)
+def _wall_day(name: str, day: int) -> tuple[int, int, int]:
+    """Offsets of a wall-clock day in zone name, by wall-clock minute."""
+    tzinfo = zone(name)
+    midnight = datetime.fromordinal(day + _EPOCH_ORDINAL)
+    return _split(lambda minute: (midnight + minute * _MINUTE).replace(tzinfo=tzinfo).utcoffset() // _MINUTE)
+
+
+@lru_cache(maxsize=16384)
+def _utc_day(name: str, day: int) -> tuple[int, int, int]:
+    """Offsets of a UTC day in zone name, by UTC minute."""
+    tzinfo = zone(name)
+    midnight = _EPOCH + timedelta(days=day)
+    return _split(lambda minute: (midnight + minute * _MINUTE).astimezone(tzinfo).utcoffset() // _MINUTE)
+
+
+def _split(offset_at) -> tuple[int, int, int]:
+    before, after = offset_at(0), offset_at(MINUTES_PER_DAY - 1)
+    if before == after:
+        return before, MINUTES_PER_DAY, before
+    lo, hi = 1, MINUTES_PER_DAY - 1  # the first minute with the new offset (one change a day at most)
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if offset_at(mid) == before:
+            lo = mid + 1
+        else:
+            hi = mid
+    return before, lo, after
+
+
+# ---- Conversions ---------------------------------------------------------------
+def to_utc(day: str, minute: int, name: str) -> int:
+    """The UTC minute of wall-clock minute `minute` of `day` in zone name."""
+    number = day_number(day)
+    before, change, after = _wall_day(name, number)
+    return number * MINUTES_PER_DAY + minute - (before if minute < change else after)
+
+
+def from_utc(utc: int, name: str) -> tuple[str, int]:
+    """(YYYY-MM-DD, minute of the day) of a UTC minute on the wall clock of zone name."""
+    number, minute = divmod(utc, MINUTES_PER_DAY)
+    before, change, after = _utc_day(name, number)
+    number, minute = divmod(utc + (before if minute < change else after), MINUTES_PER_DAY)
+    return day_string(number), minute
+
+
+def day_bounds(first: str, last: str, name: str) -> tuple[int, int]:
+    """UTC minutes from the start of wall-clock day first to the end of day last in zone name."""
+    return to_utc(first, 0, name), to_utc(day_string(day_number(last) + 1), 0, name)
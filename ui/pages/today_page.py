@@ -4,10 +4,16 @@ from datetime import datetime, date, time, timedelta
 
 import os, sys
 ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-if ROOT not in sys.path:
-    sys.path.insert(0, ROOT)
+APP_DIR = os.path.join(ROOT, "schedule_manager_app")  # database.py + shared models
+for p in (ROOT, APP_DIR):
+    if p not in sys.path:
+        sys.path.insert(0, p)
 
 import database
+import zones
+from event import Event
+from reminders import REMINDER_CHOICES
+from timeutil import HOUR_LABELS, format_minutes, to_24h
 
 class Timeline(ttk.Frame):
     "Scrollable 24-hour vertical timeline with:"
@@ -44,6 +50,7 @@ class Timeline(ttk.Frame):
         self.now_tag = "nowline"
         self.event_tag = "event"
 
+        self._hour_lines = []
         self._draw_grid()
         self._nowline_id = None
 
@@ -91,23 +98,20 @@ class Timeline(ttk.Frame):
         left_pad = 60
         width = max(480, int(self.canvas.winfo_width() or 480))
 
+        self._hour_lines = []
         for h in range(25):
             y = h * self.PPH
             #horizontal hour line
-            self.canvas.create_line(left_pad, y, width, y, fill="#d9d9d9", tags=self.bg_tag)
+            self._hour_lines.append(
+                self.canvas.create_line(left_pad, y, width, y, fill="#d9d9d9", tags=self.bg_tag)
+            )
 
             if h < 24:
-                # 12 hour label with AM/PM
-                hr12 = h % 12
-                hr12 = 12 if hr12 == 0 else hr12
-                suffix = "AM" if h < 12 else "PM"
-                label_text = f"{hr12:02d}:00 {suffix}"
-
-                # place label just left of the vertical separator
+                # place 12 hour label with AM/PM just left of the vertical separator
                 self.canvas.create_text(
                 left_pad - 10, y + 2,
                 anchor="ne",
-                text=label_text,
+                text=HOUR_LABELS["hh:mm AP"][h],
                 font=("", 9),
                 fill="#c6c6c6",
                 tags=self.bg_tag
@@ -121,24 +125,33 @@ class Timeline(ttk.Frame):
 
 
     def _on_resize(self, _event=None):
-        self._draw_grid()
+        """Only the width changes on resize: stretch the existing hour lines instead of redrawing."""
+        if not self._hour_lines:
+            self._draw_grid()
+            return
+        left_pad = 60
+        width = max(480, int(self.canvas.winfo_width() or 480))
+        for h, line_id in enumerate(self._hour_lines):
+            y = h * self.PPH
+            self.canvas.coords(line_id, left_pad, y, width, y)
+        self.canvas.config(scrollregion=(0, 0, width, self.total_height))
 
     def _bind_resize(self):
         self.canvas.bind("<Configure>", self._on_resize)
 
     def draw_nowline(self, when: datetime | None = None):
-        # remove old
-        self.canvas.delete(self.now_tag)
         if when is None:
             when = datetime.now()
         y = (when.hour + when.minute / 60 + when.second / 3600) * self.PPH
-        self._nowline_id = self.canvas.create_line(0, y, 480, y, fill="red", width=2, tags=self.now_tag)
+        # move the existing line; only create it the first time
+        if self._nowline_id is not None and self.canvas.find_withtag(self._nowline_id):
+            self.canvas.coords(self._nowline_id, 0, y, 480, y)
+            self.canvas.tag_raise(self._nowline_id)
+        else:
+            self._nowline_id = self.canvas.create_line(0, y, 480, y, fill="red", width=2, tags=self.now_tag)
 
-    def draw_events(self, events: list[tuple]):
-        """
-        Render events as blocks with a 12h AM/PM start time perfix
-        events: list of (id, title, start_iso, duration_minutes)
-        """
+    def draw_events(self, events: list[Event]):
+        """Render events as blocks with a 12h AM/PM start time perfix"""
         self.canvas.delete(self.event_tag)
 
         left_pad = 60
@@ -146,42 +159,29 @@ class Timeline(ttk.Frame):
         x1 = left_pad + 6
         x2 = max(480, int(self.canvas.winfo_width() or 480)) - right_pad
 
-        for (eid, title, start_iso, dur) in events:
-            try:
-                # 1_ parse start time (support with/without seconds)
-                start_dt = datetime.strptime(start_iso, "%Y-%m-%d %H:%M")
-            except ValueError:
-                # fallback: try seconds variant
-                try:
-                    start_dt = datetime.strptime(start_iso, "%Y-%m-%d %H:%M:%S")
-                except ValueError:
-                    continue
-            
-            #2 position vertically
-            start_y = (start_dt.hour + start_dt.minute / 60) * self.PPH
-            end_y = start_y + (int(dur) / 60) * self.PPH
+        for ev in events:
+            #1 position vertically
+            start_y = (ev.start_min / 60) * self.PPH
+            end_y = start_y + (ev.duration / 60) * self.PPH
             #min visible height
             if end_y - start_y < 10:
                 end_y = start_y + 10
 
-            #3 Convert to 12h display
-            hr12 = start_dt.hour % 12
-            hr12 = 12 if hr12 == 0 else hr12
-            suffix = "AM" if start_dt.hour < 12 else "PM"
-            time_str = f"{hr12}:{start_dt.minute:02d} {suffix}"
+            #2 12h display, e.g. "9:05 AM"
+            time_str = format_minutes(ev.start_min, "short")
 
-            #4 Draw block + label
+            #3 Draw block + label
             self.canvas.create_rectangle(
                 x1, start_y + 2, x2, end_y -2,
                 fill="#e8f0fe", outline="#5b9bff", width=1.5,
-                tags=(self.event_tag, f"event_{eid}")
+                tags=(self.event_tag, f"event_{ev.id}")
             )
             self.canvas.create_text(
                 x1+6, start_y+6,
                 anchor="nw",
-                text=f"{time_str} - {title}",
+                text=f"{time_str} - {ev.title}",
                 width=(x2 - x1 - 12),
-                tags=(self.event_tag, f"event_{eid}")
+                tags=(self.event_tag, f"event_{ev.id}")
             )
             
     def scroll_to_now(self):
@@ -219,6 +219,24 @@ class Timeline(ttk.Frame):
         self.canvas.bind("<Button-4>", self._on_mousewheel)
         self.canvas.bind("<Button-5>", self._on_mousewheel)
 
+def _reminder_picker(wrapper, row: int, offsets=()) -> ttk.Combobox:
+    """Read-only choice of REMINDER_CHOICES at row, set to the first of offsets."""
+    labels = {offset: label for label, offset in REMINDER_CHOICES}
+    if offsets and offsets[0] not in labels:  # set elsewhere to an offset the list does not offer
+        labels[offsets[0]] = f"{offsets[0]} minutes before"
+    ttk.Label(wrapper, text="Reminder").grid(row=row, column=0, sticky="w", pady=(10, 0))
+    box = ttk.Combobox(wrapper, values=list(labels.values()), state="readonly", width=18)
+    box.set(labels[offsets[0] if offsets else None])
+    box.grid(row=row + 1, column=0, columnspan=4, sticky="w")
+    box.offsets = {label: offset for offset, label in labels.items()}
+    return box
+
+
+def _picked_reminders(box: ttk.Combobox) -> list[int]:
+    offset = box.offsets[box.get()]
+    return [] if offset is None else [offset]
+
+
 class AddEventDialog(tk.Toplevel):
     """
     simple modal dialog to add an event for Today:
@@ -291,9 +309,11 @@ class AddEventDialog(tk.Toplevel):
         )
         dur_sb.grid(row=5, column=0, sticky="w")
 
+        self.reminder_box = _reminder_picker(wrapper, 6)
+
         # Buttons (aligned right)
         btns = ttk.Frame(wrapper)
-        btns.grid(row=6, column=0, columnspan=8, sticky="e", pady=(14,0))
+        btns.grid(row=8, column=0, columnspan=8, sticky="e", pady=(14,0))
         ttk.Button(btns, text="Cancel", command=self.destroy).grid(row=0,column=0, padx=(0,8))
         ttk.Button(btns, text="Save", command=lambda: self._save(on_save)).grid(row=0, column=1)
 
@@ -329,28 +349,20 @@ class AddEventDialog(tk.Toplevel):
             messagebox.showerror("Invalid Duration", "Duration must be positive.")
             return
         
-        h24 = self._to_24h(h12, ap)
-        on_save(title, h24, m, d)
+        h24 = to_24h(h12, ap)
+        on_save(title, h24, m, d, _picked_reminders(self.reminder_box))
         self.destroy()
 
-    def _to_24h(self, h12: int, ampm: str) -> int:
-        ampm = (ampm or "AM").upper()
-        h12 = int(h12)
-        if ampm == "AM":
-            return 0 if h12 == 12 else h12
-        else:
-            return 12 if h12 == 12 else h12 + 12
-
 class EditEventDialog(tk.Toplevel):
-    def __init__(self, parent, event_row, on_update, on_delete):
+    def __init__(self, parent, event: Event, on_update, on_delete, reminders=()):
         super().__init__(parent)
         self.title("Edit Event")
         self.resizable(False, False)
         self.transient(parent.winfo_toplevel())
         self.grab_set()
 
-        (eid, title, start_iso, dur) = event_row
-        start_dt = datetime.strptime(start_iso, "%Y-%m-%d %H:%M")
+        eid, title, dur = event.id, event.title, event.duration
+        start_dt = datetime.combine(date.today(), time(*divmod(event.start_min, 60)))
 
         #same layout as AddEventDialog but prepopped
 
@@ -379,24 +391,23 @@ class EditEventDialog(tk.Toplevel):
         ttk.Label(wrapper, text="Duration (minutes)").grid(row=3, column=0, sticky="w", pady=(10,0))
         tk.Spinbox(wrapper, from_=5, to=480, increment=5, textvariable=self.dur_var, width=6).grid(row=4, column=0)
 
+        self.reminder_box = _reminder_picker(wrapper, 5, reminders)
+        self._reminders = _picked_reminders(self.reminder_box)
+
         btns = ttk.Frame(wrapper)
-        btns.grid(row=5, column=0, columnspan=6, sticky="e", pady=(14,0))
+        btns.grid(row=7, column=0, columnspan=6, sticky="e", pady=(14,0))
         ttk.Button(btns, text="Delete", command=lambda: (on_delete(eid), self.destroy())).pack(side="left")
         ttk.Button(btns, text="Save", command=lambda: self._save(eid, on_update)).pack(side="right")
 
         title_entry.focus_set()
 
-    def _to_24h(self, h12, ampm):
-        return 0 if h12 == 12 and ampm == "AM" else (h12 if ampm == "AM" else (12 if h12 == 12 else h12+12))
-    
     def _save(self, eid, on_update):
         title = self.title_var.get().strip()
-        h24 = self._to_24h(int(self.hour_var.get()), self.ampm_var.get())
+        h24 = to_24h(int(self.hour_var.get()), self.ampm_var.get())
         m = int(self.minute_var.get())
         d = int(self.dur_var.get())
-        today = date.today().strftime("%Y-%m-%d")
-        start_iso = f"{today} {h24:02d}:{m:02d}"
-        on_update(eid, title, start_iso, d)
+        reminders = _picked_reminders(self.reminder_box)
+        on_update(eid, title, h24 * 60 + m, d, None if reminders == self._reminders else reminders)
         self.destroy()
 
 
@@ -407,7 +418,7 @@ class TodayPage(ttk.Frame):
     def __init__(self, parent, controller):
         super().__init__(parent)
         self.controller = controller
-        self._tick_job = None
+        self._clock_token = None
 
         wrapper = ttk.Frame(self, padding=12)
         wrapper.pack(fill="both", expand=True)
@@ -422,6 +433,10 @@ class TodayPage(ttk.Frame):
             top,
             text="Add Event",
             command=self.open_add_dialog).pack(side="right")
+        self.redo_btn = ttk.Button(top, text="Redo", command=self.redo)
+        self.redo_btn.pack(side="right", padx=(0, 6))
+        self.undo_btn = ttk.Button(top, text="Undo", command=self.undo)
+        self.undo_btn.pack(side="right", padx=(0, 6))
         
         # Timeline
         self.timeline = Timeline(wrapper, pixels_per_hour=60)
@@ -435,14 +450,24 @@ class TodayPage(ttk.Frame):
     # Lifecycle
     def on_show(self):
         self.refresh()
-        # start live updates every 30s
-        self._schedule_tick()
-
-    def _schedule_tick(self):
-        if self._tick_job:
-            self.after_cancel(self._tick_job)
-        self.timeline.draw_nowline()
-        self._tick_job = self.after(30*1000, self._schedule_tick) # 30s interval
+        # live now-line updates on each minute, only while this page is visible
+        clock = getattr(self.controller, "clock", None)
+        if clock is not None and self._clock_token is None:
+            self._clock_token = clock.subscribe(self.timeline.draw_nowline)
+        for seq, handler in self._undo_keys():
+            self.controller.bind(seq, handler)
+
+    def on_hide(self):
+        clock = getattr(self.controller, "clock", None)
+        if clock is not None:
+            clock.unsubscribe(self._clock_token)
+        self._clock_token = None
+        for seq, _ in self._undo_keys():
+            self.controller.unbind(seq)
+
+    def _undo_keys(self):
+        return (("<Control-z>", lambda _e: self.undo()), ("<Control-y>", lambda _e: self.redo()),
+                ("<Control-Shift-Z>", lambda _e: self.redo()))
 
     def _today_iso_date(self) -> str:
         return date.today().strftime("%Y-%m-%d")
@@ -456,30 +481,54 @@ class TodayPage(ttk.Frame):
             self.timeline._draw_grid()
             self.timeline.draw_nowline()
             return
-        rows = database.get_events_for_day(username, self._today_iso_date())
+        # shown on this machine's clock, whatever zone an event was entered in
+        rows = database.get_events_for_day(username, self._today_iso_date(), zones.local_zone())
         # drawingggg
         self.timeline._draw_grid()
         self.timeline.draw_nowline()
         self.timeline.draw_events(rows)
         # scroll to around "now"
         self.timeline.scroll_to_now()
+        self._update_undo_buttons()
+
+    # Undo / redo
+    def undo(self):
+        self._step(lambda journal: journal.undo())
+
+    def redo(self):
+        self._step(lambda journal: journal.redo())
+
+    def _step(self, step):
+        journal = getattr(self.controller, "undo", None)
+        if journal is None:
+            return
+        try:
+            step(journal)
+        except database.ConflictError as e:
+            messagebox.showinfo("Cannot Undo", f"{e}, so its earlier changes can no longer be undone.")
+        self.refresh()
+
+    def _update_undo_buttons(self):
+        journal = getattr(self.controller, "undo", None)
+        self.undo_btn.state(["!disabled"] if journal is not None and journal.can_undo else ["disabled"])
+        self.redo_btn.state(["!disabled"] if journal is not None and journal.can_redo else ["disabled"])
 
     # Add event
     def open_add_dialog(self):
         dlg = AddEventDialog(self, on_save=self._save_new_event)
 
-    def _save_new_event(self, title: str, h: int, m: int, d: int):
+    def _save_new_event(self, title: str, h: int, m: int, d: int, reminders=()):
         username = getattr(self.controller, "current_user", None)
         if not username:
             messagebox.showerror("Error", "No user logged in.")
             return
         
-        # Building 'YYYY-MM-DD HH:MM' string
-        today = date.today().strftime("%Y-%m-%d")
-        start_iso = f"{today} {h:02d}:{m:02d}"
+        start_min = h * 60 + m
+        ev = Event.from_minutes(title, self._today_iso_date(), start_min, min(start_min + d, 24 * 60 - 1))
 
         try:
-            database.add_event(username, title, start_iso, duration_minutes=d)
+            self.controller.undo.add(ev.title, ev.date, ev.start, ev.end, reminders=reminders,
+                                     tz=zones.local_zone())
         except Exception as e:
             messagebox.showerror("Error", f"Failed to add event: {e}")
             return
@@ -492,25 +541,50 @@ class TodayPage(ttk.Frame):
         username = getattr(self.controller, "current_user", None)
         if not username:
             return
-        # get event row from db
-        rows = database.get_events_for_day(username, self._today_iso_date())
-        row = next((r for r in rows if r[0] == event_id), None)
-        if not row:
+        # get event from db
+        ev = database.get_event(event_id, tz=zones.local_zone())
+        if not ev:
             return
         
-        def do_update(eid, title, start_iso, dur):
+        def do_update(eid, title, start_min, dur, reminders=None):
+            edited = Event.from_minutes(title, ev.date, start_min, min(start_min + dur, 24 * 60 - 1))
             try:
-                database.update_event(eid, title, start_iso, dur)
+                self._save_edit(ev, edited)
+                if reminders is not None:
+                    database.set_reminders(eid, reminders)
                 self.refresh()
             except Exception as e:
                 messagebox.showerror("Error", f"Could not update: {e}")
 
         def do_delete(eid):
             try:
-                database.delete_event(eid)
+                self._save_edit(ev, None)
                 self.refresh()
             except Exception as e:
                 messagebox.showerror("Error", f"Could not delete: {e}")
-        
-        EditEventDialog(self, row, do_update, do_delete)
+
+        EditEventDialog(self, ev, do_update, do_delete, database.get_reminders(event_id))
+
+    def _save_edit(self, ev: Event, edited: Event | None):
+        """Write an edit (edited=None: delete), undoably, unless someone else changed the event meanwhile."""
+        journal, base = self.controller.undo, ev
+        while True:
+            try:
+                if edited is None:
+                    journal.delete(base)
+                else:
+                    journal.update(base, edited.title, edited.date, edited.start, edited.end, tz=ev.tz)
+                return
+            except database.ConflictError as e:
+                if e.current is None:
+                    messagebox.showinfo("Event Deleted", "This event was deleted elsewhere.")
+                    return
+                cur = e.current
+                if not messagebox.askyesno(
+                    "Event Changed",
+                    f"\"{cur.title}\" was changed elsewhere since you opened it "
+                    f"({cur.start} - {cur.end}).\n\nOverwrite it with your changes?",
+                ):
+                    return
+                base = cur  # what gets overwritten, and what undo brings back
 